@@ -0,0 +1,510 @@
+"""
+Module containing the batch grading mode.
+Grades a whole directory of submissions, spreading them over a pool of worker processes.
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Any, Iterator, Optional
+
+import grader.utils.constants as const
+
+from grader.checks.abstract_check import CheckError
+from grader.checks.checks_factory import create_checks
+from grader.runner import grade_project, grade_project_async
+from grader.utils.forkserver import get_worker_context
+from grader.utils.logger import VERBOSE, reset_logger, student_log_file
+from grader.utils.mypy_daemon import MypyDaemon, MypyDaemonError, is_mypy_daemon_supported
+from grader.utils.reaper import get_reaper
+from grader.utils.requirements import read_requirements, RequirementsError
+from grader.utils.virtual_environment import VirtualEnvironment
+
+logger = logging.getLogger("grader")
+
+
+@dataclass
+class SubmissionResult:
+    """
+    The outcome of grading a single submission.
+    If the grading could not be completed, the error is set and the scores are empty.
+    """
+
+    student_id: str
+    scores: list[tuple[str, float, int]] = field(default_factory=list)
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+def discover_submissions(submissions_dir: str) -> list[tuple[str, str]]:
+    """
+    Find all submissions in the submissions directory.
+    Each non-hidden directory directly under it is a submission, its name is used as the student id.
+
+    :param submissions_dir: The path to the directory, containing the submissions
+    :type submissions_dir: str
+    :return: A list of (student id, project root) tuples, sorted by student id
+    :rtype: list[tuple[str, str]]
+    """
+    submissions_dir = os.path.abspath(submissions_dir)
+
+    with os.scandir(submissions_dir) as entries:
+        submissions = [
+            (entry.name, entry.path) for entry in entries if entry.is_dir() and not entry.name.startswith(".")
+        ]
+
+    return sorted(submissions)
+
+
+def grade_submission(  # pylint: disable=too-many-arguments
+    config: dict,
+    student_id: str,
+    project_root: str,
+    max_parallel_checks: int = 1,
+    venv_options: Optional[dict[str, Any]] = None,
+    *,
+    workspace_dir: Optional[str] = None,
+) -> SubmissionResult:
+    """
+    Grade a single submission. Executed inside a worker process.
+    Everything logged while grading goes to the student's log file.
+
+    :param config: The configuration dictionary.
+    :type config: dict
+    :param student_id: The id of the student.
+    :type student_id: str
+    :param project_root: The root of the student's project.
+    :type project_root: str
+    :param max_parallel_checks: The maximum amount of checks running at the same time, defaults to 1
+    :type max_parallel_checks: int
+    :param venv_options: Keyword arguments for the VirtualEnvironment of the project, defaults to None
+    :type venv_options: Optional[dict[str, Any]]
+    :param workspace_dir: The directory for the scratch files of the project, defaults to None (in the project)
+    :type workspace_dir: Optional[str]
+    :return: The result of the grading.
+    :rtype: SubmissionResult
+    """
+    start_time = time.monotonic()
+
+    with student_log_file(student_id):
+        logger.info("Running checks for student %s", student_id)
+
+        try:
+            scores = grade_project(config, project_root, max_parallel_checks, venv_options, workspace_dir=workspace_dir)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # A single broken submission should not stop the whole batch
+            return build_result(student_id, start_time, error=error)
+
+        return build_result(student_id, start_time, scores)
+
+
+async def grade_submission_async(  # pylint: disable=too-many-arguments
+    config: dict,
+    student_id: str,
+    project_root: str,
+    semaphore: asyncio.Semaphore,
+    venv_options: Optional[dict[str, Any]] = None,
+    *,
+    workspace_dir: Optional[str] = None,
+) -> SubmissionResult:
+    """
+    Asyncio counterpart of grade_submission - grade a single submission on the event loop.
+    Everything logged while grading goes to the student's log file.
+
+    :param config: The configuration dictionary.
+    :type config: dict
+    :param student_id: The id of the student.
+    :type student_id: str
+    :param project_root: The root of the student's project.
+    :type project_root: str
+    :param semaphore: Semaphore bounding the commands running at the same time, shared by all submissions.
+    :type semaphore: asyncio.Semaphore
+    :param venv_options: Keyword arguments for the VirtualEnvironment of the project, defaults to None
+    :type venv_options: Optional[dict[str, Any]]
+    :param workspace_dir: The directory for the scratch files of the project, defaults to None (in the project)
+    :type workspace_dir: Optional[str]
+    :return: The result of the grading.
+    :rtype: SubmissionResult
+    """
+    start_time = time.monotonic()
+
+    with student_log_file(student_id):
+        logger.info("Running checks for student %s", student_id)
+
+        try:
+            scores = await grade_project_async(
+                config, project_root, semaphore, venv_options, workspace_dir=workspace_dir
+            )
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # A single broken submission should not stop the whole batch
+            return build_result(student_id, start_time, error=error)
+
+        return build_result(student_id, start_time, scores)
+
+
+def build_result(
+    student_id: str,
+    start_time: float,
+    scores: Optional[list[tuple[str, float, int]]] = None,
+    error: Optional[Exception] = None,
+) -> SubmissionResult:
+    """
+    Log the outcome of grading a submission, into the student's log file, and build its result.
+
+    :param student_id: The id of the student.
+    :type student_id: str
+    :param start_time: The monotonic time the grading started at.
+    :type start_time: float
+    :param scores: The scores of the checks, defaults to None
+    :type scores: Optional[list[tuple[str, float, int]]]
+    :param error: The error the grading failed with, defaults to None
+    :type error: Optional[Exception]
+    :return: The result of the grading.
+    :rtype: SubmissionResult
+    """
+    if error is not None:
+        logger.error("Grading failed: %s", error)
+        return SubmissionResult(student_id, error=str(error), elapsed=time.monotonic() - start_time)
+
+    for name, score, max_score in scores or []:
+        logger.info("Check: %s, Score: %s/%s", name, score, max_score)
+
+    return SubmissionResult(student_id, scores or [], elapsed=time.monotonic() - start_time)
+
+
+def grade_submissions(  # pylint: disable=too-many-arguments
+    config: dict,
+    submissions: list[tuple[str, str]],
+    jobs: int,
+    max_parallel_checks: int = 1,
+    venv_options: Optional[dict[str, Any]] = None,
+    *,
+    workspace_dir: Optional[str] = None,
+    forkserver: bool = False,
+) -> list[SubmissionResult]:
+    """
+    Grade all submissions, using a pool of worker processes.
+    With the forkserver, each submission is graded in a worker of its own, forked from a process which has
+    already imported the checks' tooling.
+
+    :param config: The configuration dictionary.
+    :type config: dict
+    :param submissions: A list of (student id, project root) tuples.
+    :type submissions: list[tuple[str, str]]
+    :param jobs: The amount of worker processes.
+    :type jobs: int
+    :param max_parallel_checks: The maximum amount of checks running at the same time per submission, defaults to 1
+    :type max_parallel_checks: int
+    :param venv_options: Keyword arguments for the VirtualEnvironment of each project, defaults to None
+    :type venv_options: Optional[dict[str, Any]]
+    :param workspace_dir: The directory for the scratch files of each project, defaults to None (in the project)
+    :type workspace_dir: Optional[str]
+    :param forkserver: Whether to fork the workers from a preloaded forkserver, defaults to False
+    :type forkserver: bool
+    :return: The results of the grading, sorted by student id.
+    :rtype: list[SubmissionResult]
+    """
+    results = []
+
+    executor_options: dict[str, Any] = {}
+    if forkserver:
+        executor_options = {"mp_context": get_worker_context(), "max_tasks_per_child": 1}
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=reset_logger, **executor_options) as executor:
+        futures = {
+            executor.submit(
+                grade_submission,
+                config,
+                student_id,
+                project_root,
+                max_parallel_checks,
+                venv_options,
+                workspace_dir=workspace_dir,
+            ): student_id
+            for student_id, project_root in submissions
+        }
+
+        for future in as_completed(futures):
+            student_id = futures[future]
+            try:
+                result = future.result()
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                # The worker process itself died, e.g. was killed by the OS
+                logger.error("Worker failed while grading %s: %s", student_id, error)
+                result = SubmissionResult(student_id, error=str(error))
+
+            results.append(result)
+            logger.log(VERBOSE, "Graded %s in %.1fs (%d/%d)", student_id, result.elapsed, len(results), len(futures))
+
+    return sorted(results, key=lambda result: result.student_id)
+
+
+async def grade_submissions_async(
+    config: dict,
+    submissions: list[tuple[str, str]],
+    jobs: int,
+    venv_options: Optional[dict[str, Any]] = None,
+    *,
+    workspace_dir: Optional[str] = None,
+) -> list[SubmissionResult]:
+    """
+    Grade all submissions on a single event loop, in the current process.
+    All submissions are graded at the same time - the commands of their tools are awaited on the event loop, with at
+    most as many running at the same time as there are jobs, and the venvs are set up in worker threads.
+
+    :param config: The configuration dictionary.
+    :type config: dict
+    :param submissions: A list of (student id, project root) tuples.
+    :type submissions: list[tuple[str, str]]
+    :param jobs: The maximum amount of commands running, and venvs being set up, at the same time.
+    :type jobs: int
+    :param venv_options: Keyword arguments for the VirtualEnvironment of each project, defaults to None
+    :type venv_options: Optional[dict[str, Any]]
+    :param workspace_dir: The directory for the scratch files of each project, defaults to None (in the project)
+    :type workspace_dir: Optional[str]
+    :return: The results of the grading, sorted by student id.
+    :rtype: list[SubmissionResult]
+    """
+    semaphore = asyncio.Semaphore(jobs)
+    results = []
+
+    tasks = {
+        asyncio.ensure_future(
+            grade_submission_async(
+                config, student_id, project_root, semaphore, venv_options, workspace_dir=workspace_dir
+            )
+        ): student_id
+        for student_id, project_root in submissions
+    }
+
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            result = task.result()
+            results.append(result)
+            logger.log(VERBOSE, "Graded %s in %.1fs (%d/%d)", tasks[task], result.elapsed, len(results), len(tasks))
+
+    return sorted(results, key=lambda result: result.student_id)
+
+
+@contextmanager
+def batch_lint(
+    config: dict, submissions: list[tuple[str, str]], jobs: int, venv_options: Optional[dict[str, Any]] = None
+) -> Iterator[dict]:
+    """
+    Lint the submissions ahead of grading, storing the results of each file in the pylint cache.
+    Each of the worker processes lints a whole share of the submissions, one after the other, in-process -
+    so pylint is started, and the standard library is analyzed, once per worker, instead of once per submission.
+    The pylint check of each submission then only reads the cached results.
+
+    Only the submissions without requirements are linted ahead - the others are linted against their own venv.
+    They are all linted against the venv of a project without requirements, set up once for the batch - the venv
+    each of them gets while grading - so the results are the same as when they are linted while grading.
+    If the pylint check has no cache directory configured, a temporary one is used for the batch.
+
+    :param config: The configuration dictionary.
+    :type config: dict
+    :param submissions: A list of (student id, project root) tuples.
+    :type submissions: list[tuple[str, str]]
+    :param jobs: The amount of worker processes.
+    :type jobs: int
+    :param venv_options: Keyword arguments for the VirtualEnvironment of each project, defaults to None
+    :type venv_options: Optional[dict[str, Any]]
+    :return: The configuration, with the pylint check reading the cache.
+    :rtype: Iterator[dict]
+    """
+    pylint_config = next((check for check in config.get("checks", []) if check.get("name") == "pylint"), None)
+    if pylint_config is None:
+        yield config
+        return
+
+    options = dict(pylint_config.get("options", {}))
+    temp_cache_dir = None
+    if options.get("cache_dir") is None:
+        temp_cache_dir = tempfile.mkdtemp(prefix="pylint-cache-")
+        options["cache_dir"] = temp_cache_dir
+
+    pylint_config = {**pylint_config, "options": options}
+    project_roots = [project_root for _, project_root in submissions if is_linted_ahead(project_root)]
+
+    logger.info("Linting %d of %d submissions ahead of grading", len(project_roots), len(submissions))
+    chunks = [project_roots[index::jobs] for index in range(min(jobs, len(project_roots)))]
+
+    try:
+        try:
+            if chunks:
+                with lint_venv(venv_options) as venv_path, ProcessPoolExecutor(
+                    max_workers=len(chunks), initializer=reset_logger
+                ) as executor:
+                    list(executor.map(lint_projects, repeat(pylint_config), chunks, repeat(venv_path)))
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # The submissions, which aren't cached, are still linted while grading
+            logger.error("Linting ahead of grading failed: %s", error)
+
+        yield {
+            **config,
+            "checks": [pylint_config if check.get("name") == "pylint" else check for check in config["checks"]],
+        }
+    finally:
+        if temp_cache_dir is not None:
+            get_reaper().remove(temp_cache_dir)
+
+
+def is_linted_ahead(project_root: str) -> bool:
+    """
+    Check if a project is linted ahead of grading - if it has no requirements.
+    A project with requirements, which can't be read, is linted while grading, like the projects with requirements.
+
+    :param project_root: The root of the project.
+    :type project_root: str
+    :return: True if the project is linted ahead, False otherwise.
+    :rtype: bool
+    """
+    try:
+        return not read_requirements(os.path.join(project_root, const.REQUIREMENTS_FILENAME))
+    except (RequirementsError, OSError) as error:
+        logger.warning("Failed to read the requirements of %s, it is linted while grading: %s", project_root, error)
+        return False
+
+
+@contextmanager
+def lint_venv(venv_options: Optional[dict[str, Any]] = None) -> Iterator[str]:
+    """
+    Set up the venv of a project without requirements, in a temporary directory, for as long as the context is active.
+
+    :param venv_options: Keyword arguments for the VirtualEnvironment, defaults to None
+    :type venv_options: Optional[dict[str, Any]]
+    :raises VirtualEnvironmentError: If the venv can't be set up.
+    :return: The path to the venv.
+    :rtype: Iterator[str]
+    """
+    project_root = tempfile.mkdtemp(prefix="batch-lint-")
+    try:
+        with open(os.path.join(project_root, const.REQUIREMENTS_FILENAME), "w", encoding="utf-8"):
+            pass
+
+        with VirtualEnvironment(project_root, **(venv_options or {})):
+            yield os.path.join(project_root, const.VENV_NAME)
+    finally:
+        get_reaper().remove(project_root)
+
+
+def lint_projects(pylint_config: dict, project_roots: list[str], venv_path: str) -> None:
+    """
+    Lint the projects one after the other, in the current process. Executed inside a worker process.
+    The results are only stored in the pylint cache of the check.
+
+    :param pylint_config: The configuration of the pylint check, with a cache directory.
+    :type pylint_config: dict
+    :param project_roots: The roots of the projects.
+    :type project_roots: list[str]
+    :param venv_path: The venv, the projects are linted against.
+    :type venv_path: str
+    """
+    options = {**pylint_config.get("options", {}), "in_process": True, "venv_path": venv_path}
+    in_process_config = {**pylint_config, "options": options}
+
+    for project_root in project_roots:
+        non_venv_checks, venv_checks = create_checks({"checks": [in_process_config]}, project_root)
+
+        for check in non_venv_checks + venv_checks:
+            try:
+                check.run()
+            except CheckError as error:
+                logger.warning("Linting %s ahead of grading failed: %s", project_root, error)
+
+
+@contextmanager
+def batch_mypy_daemon(config: dict) -> Iterator[dict]:
+    """
+    Start the mypy daemon of the batch, for as long as the context is active, and check the type hints with it.
+    The daemon lives in the batch process, so it is shared by all workers - including the workers forked for
+    a single submission - and analyzes the modules every project imports only once for the whole batch.
+    If the daemon can't be started, the type hints are checked without it.
+
+    :param config: The configuration dictionary.
+    :type config: dict
+    :return: The configuration, with the type hints check using the daemon.
+    :rtype: Iterator[dict]
+    """
+    type_hints_config = next((check for check in config.get("checks", []) if check.get("name") == "type-hints"), None)
+    options = dict(type_hints_config.get("options", {})) if type_hints_config is not None else {}
+    if type_hints_config is None or options.get("engine") == const.TYPE_HINTS_ENGINE_NATIVE:
+        yield config
+        return
+
+    if not is_mypy_daemon_supported():
+        logger.warning("The mypy daemon is not supported on this platform, running mypy for each submission")
+        yield config
+        return
+
+    daemon = MypyDaemon(const.MYPY_TYPE_HINT_CONFIG)
+    try:
+        daemon.start()
+    except MypyDaemonError as error:
+        logger.error("Failed to start the mypy daemon, running mypy for each submission: %s", error)
+        yield config
+        return
+
+    try:
+        options["daemon"] = daemon.address
+        type_hints_config = {**type_hints_config, "options": options}
+        yield {
+            **config,
+            "checks": [type_hints_config if check.get("name") == "type-hints" else check for check in config["checks"]],
+        }
+    finally:
+        daemon.stop()
+
+
+def calculate_throughput(submissions_count: int, elapsed: float) -> float:
+    """
+    Calculate the throughput of a batch run.
+
+    :param submissions_count: The amount of graded submissions.
+    :type submissions_count: int
+    :param elapsed: The wall-clock duration of the run, in seconds.
+    :type elapsed: float
+    :return: The amount of submissions graded per minute.
+    :rtype: float
+    """
+    if elapsed <= 0:
+        return 0.0
+
+    return submissions_count / (elapsed / 60)
+
+
+def report_results(results: list[SubmissionResult], elapsed: float) -> None:
+    """
+    Log the per-student results and the overall throughput of a batch run.
+
+    :param results: The results of the grading.
+    :type results: list[SubmissionResult]
+    :param elapsed: The wall-clock duration of the run, in seconds.
+    :type elapsed: float
+    """
+    for result in results:
+        if result.error is not None:
+            logger.error("Student: %s, Grading failed: %s", result.student_id, result.error)
+            continue
+
+        for name, score, max_score in result.scores:
+            logger.info("Student: %s, Check: %s, Score: %s/%s", result.student_id, name, score, max_score)
+
+    failed_count = sum(1 for result in results if result.error is not None)
+    if failed_count > 0:
+        logger.warning("Grading failed for %d out of %d submissions", failed_count, len(results))
+
+    logger.info(
+        "Graded %d submissions in %.1fs (%.1f submissions/min)",
+        len(results),
+        elapsed,
+        calculate_throughput(len(results), elapsed),
+    )
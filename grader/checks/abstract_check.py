@@ -3,11 +3,16 @@ Module containing a class representing an abstract check.
 Each check should inherit from this class.
 """
 
+import asyncio
 import logging
 from abc import ABC
+from typing import Optional
 
+from grader.utils import process
 from grader.utils.logger import VERBOSE
+from grader.utils.process import Steps
 from grader.utils.virtual_environment import VirtualEnvironment
+from grader.utils.workspace import Workspace
 
 logger = logging.getLogger("grader")
 
@@ -16,26 +21,60 @@ class AbstractCheck(ABC):
     """
     Each check has a name and a maximum amount of points.
     It also needs the project root path.
+    The workspace tells where the venv is, and where the artifacts of the tools go.
     """
 
-    def __init__(self, name: str, max_points: int, project_root: str, is_venv_requred: bool = False):
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        name: str,
+        max_points: int,
+        project_root: str,
+        is_venv_requred: bool = False,
+        *,
+        workspace: Optional[Workspace] = None,
+    ):
         self._name = name
         self._max_points = max_points
         self._project_root = project_root
         self._is_venv_required = is_venv_requred
+        self._workspace = workspace or Workspace(project_root)
 
     def run(self) -> float:
         """
-        Main method that executes the check.
+        Main method that executes the check - runs its steps, blocking on the commands of its tools.
 
         :returns: The score of the check.
         :rtype: float
         """
+        return process.run_steps(self._steps())
+
+    async def run_async(self, semaphore: Optional[asyncio.Semaphore] = None) -> float:
+        """
+        Asyncio counterpart of run - runs the same steps, awaiting the commands of the tools on the event loop,
+        so that the checks of many projects can run on a single event loop.
+
+        :param semaphore: Semaphore bounding the commands running at the same time, defaults to None (unbounded)
+        :type semaphore: Optional[asyncio.Semaphore]
+        :returns: The score of the check.
+        :rtype: float
+        """
+        return await process.run_steps_async(self._steps(), semaphore)
+
+    def _steps(self) -> Steps[float]:
+        """
+        The steps of the check. Each check overrides them, starting with the steps of this class.
+        The steps yield the commands of the tools to run at the same time, are sent their outputs,
+        and return the score - so that the check runs the same way, whether the commands are blocked on or awaited.
+
+        :returns: The steps, returning the score of the check.
+        :rtype: Steps[float]
+        """
         if self._is_venv_required and not self.is_running_within_venv():
             raise CheckError("Virtual environment is required for this check")
 
         logger.log(VERBOSE, "Running %s", self.name)
 
+        yield from ()
         return 0.0
 
     @property
@@ -2,6 +2,9 @@
 Factory for creating the checks objects.
 """
 
+import inspect
+from typing import Any, Optional
+
 from grader.checks.abstract_check import AbstractCheck
 
 from grader.checks.coverage_check import CoverageCheck
@@ -9,6 +12,7 @@ from grader.checks.pylint_check import PylintCheck
 from grader.checks.requirements_check import RequirementsCheck
 from grader.checks.type_hints_check import TypeHintsCheck
 from grader.utils.config import InvalidConfigError
+from grader.utils.workspace import Workspace
 
 
 NAME_TO_CHECK: dict[str, type[AbstractCheck]] = {
@@ -19,15 +23,20 @@ NAME_TO_CHECK: dict[str, type[AbstractCheck]] = {
 }
 
 
-def create_checks(config: dict, project_root: str) -> tuple[list[AbstractCheck], list[AbstractCheck]]:
+def create_checks(
+    config: dict, project_root: str, workspace: Optional[Workspace] = None
+) -> tuple[list[AbstractCheck], list[AbstractCheck]]:
     """
     Build two lists, containing the non-venv checks and the venv checks.
+    The options of a check, if any, are passed to the check as keyword arguments.
 
     :param config: The configuration dictionary.
     :type config: dict
     :param project_root: The root of the project.
     :type project_root: str
-    :raises InvalidConfigError: If no checks are found in the configuration file.
+    :param workspace: The workspace of the project, defaults to None
+    :type workspace: Optional[Workspace]
+    :raises InvalidConfigError: If no checks are found in the configuration file, or the options of a check are invalid.
     :raises InvalidCheckError: If the check name is unknown.
     :return: A tuple containing the non-venv checks and the venv checks.
     :rtype: tuple[list[AbstractCheck], list[AbstractCheck]]
@@ -51,8 +60,21 @@ def create_checks(config: dict, project_root: str) -> tuple[list[AbstractCheck],
 
         is_venv = check.get("requires_venv", False)
 
+        options = check.get("options", {})
+
         check_class = NAME_TO_CHECK[name]
-        created_check = check_class(name, max_points, project_root)
+        arguments = build_check_arguments(
+            check_class,
+            name=name,
+            max_points=max_points,
+            project_root=project_root,
+            workspace=workspace,
+            options=options,
+        )
+        try:
+            created_check = check_class(**arguments)
+        except (TypeError, ValueError) as error:
+            raise InvalidConfigError(f"Invalid configuration of the {name} check: {error}") from error
 
         if is_venv:
             venv_checks.append(created_check)
@@ -62,6 +84,47 @@ def create_checks(config: dict, project_root: str) -> tuple[list[AbstractCheck],
     return non_venv_checks, venv_checks
 
 
+def build_check_arguments(  # pylint: disable=too-many-arguments
+    check_class: type[AbstractCheck],
+    *,
+    name: str,
+    max_points: int,
+    project_root: str,
+    workspace: Optional[Workspace],
+    options: dict[str, Any],
+) -> dict[str, Any]:
+    """
+    Build the arguments of a check, from the signature of its class.
+    The workspace is only passed to the checks which take one, and the options must match the parameters of the check.
+
+    :param check_class: The class of the check
+    :param name: The name of the check
+    :param max_points: The max points of the check
+    :param project_root: The root of the project
+    :param workspace: The workspace of the project
+    :param options: The options of the check, from the configuration file
+    :raises InvalidConfigError: If the options don't match the parameters of the check
+    :return: The arguments of the check, by parameter name
+    """
+    signature = inspect.signature(check_class)
+
+    arguments: dict[str, Any] = {"name": name, "max_points": max_points, "project_root": project_root}
+    if "workspace" in signature.parameters:
+        arguments["workspace"] = workspace
+
+    reserved_options = set(arguments) & set(options)
+    if reserved_options:
+        raise InvalidConfigError(f"Invalid options for the {name} check: {sorted(reserved_options)}")
+
+    arguments.update(options)
+    try:
+        signature.bind(**arguments)
+    except TypeError as error:
+        raise InvalidConfigError(f"Invalid options for the {name} check: {options}") from error
+
+    return arguments
+
+
 class InvalidCheckError(Exception):
     """
     Custom exception for invalid check names.
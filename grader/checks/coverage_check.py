@@ -2,19 +2,25 @@
 Module containing the unit test code coverage check.
 """
 
+import json
 import logging
 import os
+import tempfile
+from typing import Optional
 
 from grader.checks.abstract_check import AbstractCheck, CheckError
+from grader.checks import coverage_plugins
 from grader.utils.constants import (
-    COVERAGE_PATH,
-    COVERAGE_RUN_ARGS,
-    COVERAGE_RUN_PYTEST_ARGS,
-    COVERAGE_REPORT_ARGS,
-    COVERAGE_REPORT_ARGS_NO_FORMAT,
+    COVERAGE_JSON_REPORT_NAME,
+    COVERAGE_REPORTS_DIR_PREFIX,
+    COVERAGE_RUNNER,
+    COVERAGE_RUNNER_REPORT_ERROR,
+    PYTHON_BIN,
+    VENV_BIN_DIR,
 )
 from grader.utils.files import find_all_source_files
-from grader.utils.process import run
+from grader.utils.process import Command, Steps
+from grader.utils.workspace import Workspace
 
 logger = logging.getLogger("grader")
 
@@ -22,25 +28,42 @@ logger = logging.getLogger("grader")
 class CoverageCheck(AbstractCheck):
     """
     The Coverage check class.
-    """
 
-    def __init__(self, name: str, max_points: int, project_root: str):
-        super().__init__(name, max_points, project_root)
+    The tests are run under coverage by the coverage runner of the grader, with the python of the project's venv.
+    The runner writes the JSON report of the source files as well, in the same process, so the data file isn't
+    loaded again by another coverage process - the score is computed from the totals of the report.
 
-        self.__coverage_full_path = os.path.join(project_root, COVERAGE_PATH)
+    With shards, the runner splits the collected tests between that many worker processes, run at the same time
+    under coverage, and combines their data before the report - the same coverage as a single run, in less time.
+    """
 
-    def run(self) -> float:
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        name: str,
+        max_points: int,
+        project_root: str,
+        workspace: Optional[Workspace] = None,
+        *,
+        shards: int = 1,
+    ):
+        super().__init__(name, max_points, project_root, workspace=workspace)
+
+        self.__python_full_path = os.path.join(self._workspace.venv_path, VENV_BIN_DIR, PYTHON_BIN)
+        self.__shards = max(1, shards)
+
+    def _steps(self) -> Steps[float]:
         """
         Run the coverage check on the project.
 
         :returns: The score from the coverage check.
-        :rtype: float
+        :rtype: Steps[float]
         """
-        super().run()
+        yield from super()._steps()
 
-        self.__coverage_run()
+        with self.__create_reports_dir() as reports_dir:
+            yield from self.__coverage_run(reports_dir)
 
-        coverage_report_result = self.__coverage_report()
+            coverage_report_result = self.__coverage_report(reports_dir)
 
         if coverage_report_result is None:
             raise CheckError("Coverage report generation failed")
@@ -70,44 +93,91 @@ class CoverageCheck(AbstractCheck):
 
         return self._max_points
 
-    def __coverage_run(self):
+    def __create_reports_dir(self) -> tempfile.TemporaryDirectory:
         """
-        Run the coverage tool on the project.
+        Create the reports directory of this run, in the reports directory of the workspace.
+        It is removed, with the report, once the run is done.
+
+        :return: The reports directory, as a context manager
         """
-        command = [self.__coverage_full_path] + COVERAGE_RUN_ARGS + COVERAGE_RUN_PYTEST_ARGS + [self._project_root]
+        try:
+            os.makedirs(self._workspace.reports_dir, exist_ok=True)
+            return tempfile.TemporaryDirectory(
+                prefix=COVERAGE_REPORTS_DIR_PREFIX, dir=self._workspace.reports_dir, ignore_cleanup_errors=True
+            )
+        except OSError as e:
+            logger.error("Error while creating the reports directory: %s", e)
+            raise CheckError("Error while creating the reports directory") from e
+
+    def __coverage_run(self, reports_dir: str) -> Steps[None]:
+        """
+        Run the tests of the project under the coverage tool, and write the report.
 
+        :param reports_dir: The directory to write the report to
+        """
+        command = Command(
+            self.__coverage_run_command(reports_dir), self._project_root, self._workspace.get_environment()
+        )
         try:
-            output = run(command, current_directory=self._project_root)
+            [output] = yield [command]
         except (OSError, ValueError) as e:
             logger.error("Coverage run failed: %s", e)
             raise CheckError("Coverage run failed") from e
 
-        if output.returncode != 0:
+        self.__check_returncode(output.returncode)
+
+    @staticmethod
+    def __check_returncode(returncode: int):
+        """
+        Check the exit code of the coverage runner - the exit code of pytest, or its own if the report failed.
+
+        :param returncode: The exit code of the runner
+        """
+        if returncode == COVERAGE_RUNNER_REPORT_ERROR:
+            logger.error("Coverage report failed")
+            raise CheckError("Coverage report failed")
+
+        if returncode != 0:
             logger.error("Coverage run failed")
             raise CheckError("Coverage run failed")
 
-    def __coverage_report(self):
+    def __coverage_run_command(self, reports_dir: str) -> list[str]:
         """
-        Generate a report from the coverage tool.
-        """
-        source_files = find_all_source_files(self._project_root)
+        Build the command, running the tests under the coverage tool and reporting on the source files.
 
+        :param reports_dir: The directory to write the report to
+        :return: The command
+        """
         try:
-            command = [self.__coverage_full_path] + COVERAGE_REPORT_ARGS_NO_FORMAT + source_files
-            output = run(command, current_directory=self._project_root)
-        except (OSError, ValueError) as e:
-            logger.error("Coverage report (no format) failed: %s", e)
-            raise CheckError("Coverage report (no format) failed") from e
+            source_files = find_all_source_files(self._project_root)
+        except OSError as e:
+            logger.error("Error while finding python files: %s", e)
+            raise CheckError("Error while finding python files") from e
 
-        try:
-            command = [self.__coverage_full_path] + COVERAGE_REPORT_ARGS + source_files
-            output = run(command, current_directory=self._project_root)
-        except (OSError, ValueError) as e:
-            logger.error("Coverage report (with format) failed: %s", e)
-            raise CheckError("Coverage report (with format) failed") from e
+        pytest_args = []
+        if self._workspace.pytest_cache_dir is not None:
+            pytest_args.extend(["-o", f"cache_dir={self._workspace.pytest_cache_dir}"])
 
-        if output.returncode != 0:
-            logger.error("Coverage report failed")
-            raise CheckError("Coverage report failed")
+        runner_args = ["--report", os.path.join(reports_dir, COVERAGE_JSON_REPORT_NAME), "--sources", *source_files]
+        if self.__shards > 1:
+            runner_args.extend(["--shards", str(self.__shards)])
+        runner_path = os.path.join(os.path.dirname(os.path.abspath(coverage_plugins.__file__)), COVERAGE_RUNNER)
+
+        return [self.__python_full_path, runner_path] + runner_args + ["--"] + pytest_args + [self._project_root]
+
+    @staticmethod
+    def __coverage_report(reports_dir: str) -> float:
+        """
+        Read the total coverage from the JSON report, rounded like coverage reports it.
+
+        :param reports_dir: The directory, containing the report
+        :return: The total coverage percentage
+        """
+        try:
+            with open(os.path.join(reports_dir, COVERAGE_JSON_REPORT_NAME), "r", encoding="utf-8") as report_file:
+                report = json.load(report_file)
 
-        return int(output.stdout)
+            return float(report["totals"]["percent_covered_display"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error("Coverage report failed: %s", e)
+            raise CheckError("Coverage report failed") from e
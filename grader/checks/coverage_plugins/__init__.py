@@ -0,0 +1,5 @@
+"""
+Coverage plugins of the grader.
+The modules in it are run by the python of a project's venv, so they must only depend on coverage, pytest and
+the standard library.
+"""
@@ -0,0 +1,190 @@
+"""
+Module containing the coverage runner, running the tests of a project under coverage and writing the JSON report.
+Both happen in a single process - the report is written from the data in memory, instead of starting coverage again
+and loading the data file for it.
+
+With shards, the tests are split between that many worker processes of the runner, run at the same time, each
+measuring its own tests in a data file of its own. The data files are then combined, and the report is written from
+the combined data - the same lines are covered as by a single run, as long as the tests don't depend on each other.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import uuid
+from typing import Any, Optional
+
+import coverage
+import pytest
+
+# Pytest exits with the codes 0-5, so a failed report gets a code of its own
+REPORT_ERROR_EXIT_CODE = 64
+
+
+class ShardPlugin:  # pylint: disable=too-few-public-methods
+    """
+    Pytest plugin, keeping only the tests of one shard out of the collected tests.
+
+    Every worker collects all tests in the same order, and keeps a contiguous part of them, so the tests of a module
+    mostly stay in the same shard and share its fixtures.
+    """
+
+    def __init__(self, shard: int, shards: int):
+        self.shard = shard
+        self.shards = shards
+        self.collected = 0
+
+    def pytest_collection_modifyitems(self, config: Any, items: list[Any]):
+        """
+        Deselect the tests of the other shards.
+
+        :param config: The pytest config
+        :param items: The collected tests, modified in place
+        """
+        self.collected = len(items)
+
+        start = self.shard * len(items) // self.shards
+        end = (self.shard + 1) * len(items) // self.shards
+
+        deselected = items[:start] + items[end:]
+        items[:] = items[start:end]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+
+
+def parse_arguments(arguments: list[str]) -> argparse.Namespace:
+    """
+    Parse the arguments of the runner - the report file, the source files, the shards and the arguments of pytest.
+
+    :param arguments: The command line arguments
+    :return: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Run the tests under coverage, and write the JSON report")
+    parser.add_argument("--report", required=True, help="The JSON report file to write")
+    parser.add_argument("--sources", nargs="*", default=[], help="The source files to report on")
+    parser.add_argument("--shards", type=int, default=1, help="The number of worker processes to split the tests in")
+    parser.add_argument("--shard", type=int, default=None, help="The shard to run, in a worker process")
+    parser.add_argument("--data-suffix", default=None, help="The suffix of the data file, in a worker process")
+    parser.add_argument("pytest_args", nargs=argparse.REMAINDER, help="The arguments of pytest, after --")
+
+    parsed = parser.parse_args(arguments)
+    if parsed.pytest_args[:1] == ["--"]:
+        parsed.pytest_args = parsed.pytest_args[1:]
+
+    return parsed
+
+
+def run_tests(
+    pytest_args: list[str], data_suffix: Optional[str] = None, plugins: Optional[list[Any]] = None
+) -> tuple[int, coverage.Coverage]:
+    """
+    Run the tests under coverage, and save the data.
+
+    :param pytest_args: The arguments of pytest
+    :param data_suffix: The suffix of the data file, defaults to None
+    :param plugins: The pytest plugins to run the tests with, defaults to None
+    :return: The exit code of pytest, and the coverage of the tests
+    """
+    # The configuration and the data file (COVERAGE_FILE) are found the same way coverage run finds them
+    cov = coverage.Coverage(data_suffix=data_suffix)
+    cov.start()
+    try:
+        exit_code = int(pytest.main(pytest_args, plugins=plugins))
+    finally:
+        cov.stop()
+        cov.save()
+
+    return exit_code, cov
+
+
+def run_shard(parsed: argparse.Namespace) -> int:
+    """
+    Run the tests of a shard under coverage, in a worker process.
+
+    :param parsed: The parsed arguments
+    :return: The exit code of pytest
+    """
+    shard_plugin = ShardPlugin(parsed.shard, parsed.shards)
+    exit_code, _ = run_tests(parsed.pytest_args, parsed.data_suffix, [shard_plugin])
+
+    # A shard without tests of its own is fine, as long as the project has tests
+    if exit_code == pytest.ExitCode.NO_TESTS_COLLECTED and shard_plugin.collected > 0:
+        return 0
+
+    return exit_code
+
+
+def run_shards(parsed: argparse.Namespace) -> tuple[int, coverage.Coverage]:
+    """
+    Run the shards in worker processes at the same time, and combine their data.
+
+    :param parsed: The parsed arguments
+    :return: The exit code of the shards, and the combined coverage of the tests
+    """
+    run_id = uuid.uuid4().hex
+    data_suffixes = [f"{run_id}.{shard}" for shard in range(parsed.shards)]
+
+    workers = [
+        subprocess.Popen(  # pylint: disable=consider-using-with
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                *["--report", parsed.report, "--shards", str(parsed.shards), "--shard", str(shard)],
+                *["--data-suffix", data_suffix, "--", *parsed.pytest_args],
+            ]
+        )
+        for shard, data_suffix in enumerate(data_suffixes)
+    ]
+    exit_codes = [worker.wait() for worker in workers]
+
+    cov = coverage.Coverage()
+    cov.erase()
+
+    # Only the data files of this run are combined (and removed), not the leftovers of other runs
+    data_file = cov.get_data().data_filename()
+    data_paths = [f"{data_file}.{data_suffix}" for data_suffix in data_suffixes]
+    data_paths = [data_path for data_path in data_paths if os.path.exists(data_path)]
+    if data_paths:
+        cov.combine(data_paths=data_paths)
+        cov.save()
+
+    # The first failed shard decides the exit code, and a project without tests fails in every shard
+    return next((exit_code for exit_code in exit_codes if exit_code != 0), 0), cov
+
+
+def main(arguments: list[str]) -> int:
+    """
+    Run the tests under coverage, and write the JSON report if they pass.
+
+    :param arguments: The command line arguments
+    :return: The exit code of pytest, or REPORT_ERROR_EXIT_CODE if the report can't be written
+    """
+    parsed = parse_arguments(arguments)
+
+    # Like python -m pytest (and coverage run -m pytest), the tests import the project from the working directory
+    sys.path[0] = os.getcwd()
+
+    if parsed.shard is not None:
+        return run_shard(parsed)
+
+    if parsed.shards > 1:
+        exit_code, cov = run_shards(parsed)
+    else:
+        exit_code, cov = run_tests(parsed.pytest_args)
+
+    if exit_code != 0:
+        return exit_code
+
+    try:
+        # Without source files, everything measured is reported, like coverage report
+        cov.json_report(morfs=parsed.sources or None, outfile=parsed.report)
+    except coverage.CoverageException as error:
+        print(f"Coverage report failed: {error}", file=sys.stderr)
+        return REPORT_ERROR_EXIT_CODE
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,66 +1,330 @@
 """
 Module containing the pylint check.
-It uses the pylint python library directly to run the check.
+It runs the pylint of the project's venv, or the pylint python library directly, in the grader process.
 """
 
+import glob
+import json
 import logging
 import os
-import re
+import sys
+import sysconfig
+import threading
+from contextlib import contextmanager
 from io import StringIO
+from subprocess import CompletedProcess
+from typing import Any, Iterator, Optional
 
-from pylint.reporters.text import TextReporter
+from astroid import MANAGER
+from pylint import lint
+from pylint.checkers.utils import clear_lru_caches
+from pylint.config.config_initialization import _config_initialization
 
 import grader.utils.constants as const
-from grader.utils import process
 from grader.checks.abstract_check import AbstractCheck, CheckError
+from grader.checks.pylint_plugins import grader_stats_reporter
+from grader.checks.pylint_plugins.grader_stats_reporter import GraderStatsReporter
+from grader.utils.astroid_cache import get_astroid_cache, get_cacheable_modules
 from grader.utils.files import find_all_python_files
+from grader.utils.process import Command, Steps
+from grader.utils.pylint_cache import PylintCache, hash_file, hash_files
+from grader.utils.requirements import read_requirements, RequirementsError
+from grader.utils.tool_layer import find_site_packages
+from grader.utils.workspace import Workspace
 
 logger = logging.getLogger("grader")
 
 
+# Pylint keeps its state in globals (the astroid cache, sys.path), so only one in-process run is allowed at a time
+_in_process_lock = threading.Lock()
+
+
 class PylintCheck(AbstractCheck):
     """
     The Pylint check class.
+
+    Pylint reports the statistics of each file (the number of statements and messages of each category),
+    and the score is computed from them with the evaluation formula of the pylintrc.
+    So the files don't have to be linted together, for the score to be the same as pylint's own.
+
+    By default, pylint is run from the project's venv, in a process of its own.
+    With shards, the files are split between that many pylint processes, run at the same time.
+    Duplicate code is only found between the files linted together, so the shards don't look for it,
+    and another process, running only the similarity checker, looks for it over all files.
+    In-process, pylint is run in the grader process, and checks the files with only the standard library and
+    the project's venv site-packages on sys.path - the modules the pylint process of the venv finds, and not the
+    packages of the grader.
+    This saves starting the interpreter and importing pylint for every project, and the standard library modules,
+    which astroid has already built, are reused from the previous runs.
+
+    With a cache directory, the results of each file are cached, keyed by the content of the whole project,
+    as the messages of a file depend on the files it imports. Only the files which aren't cached are linted.
+
+    With an astroid cache directory, the standard library modules built by astroid are stored on disk,
+    and loaded by the next grader process instead of being built again. It implies running in-process.
+
+    With a venv path, the files are linted against that venv, instead of the project's own.
     """
 
-    def __init__(self, name: str, max_points: int, project_root: str):
-        AbstractCheck.__init__(self, name, max_points, project_root)
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        name: str,
+        max_points: int,
+        project_root: str,
+        *,
+        workspace: Optional[Workspace] = None,
+        in_process: bool = False,
+        cache_dir: Optional[str] = None,
+        shards: int = 1,
+        astroid_cache_dir: Optional[str] = None,
+        venv_path: Optional[str] = None,
+    ):
+        AbstractCheck.__init__(self, name, max_points, project_root, workspace=workspace)
         self.__pylint_max_score = 10
+        self.__cache = PylintCache(cache_dir) if cache_dir is not None else None
+        self.__astroid_cache = get_astroid_cache(astroid_cache_dir) if astroid_cache_dir is not None else None
+        self.__in_process = in_process or self.__astroid_cache is not None
+        self.__shards = max(1, shards)
+        self.__venv_path = venv_path or self._workspace.venv_path
 
-    def run(self) -> float:
+    def _steps(self) -> Steps[float]:
         """
         Run the pylint check on the project.
-        First, find all python files in the project, then create a custom reporter (to suppress all output).
-        Run the pylint check itself and map the score within the desired bounds.
+        First, find all python files in the project, and look up the ones with cached results.
+        Lint the rest, compute the pylint score from the results of all files and map it within the desired bounds.
 
         :returns: The score from the pylint check.
-        :rtype: float
+        :rtype: Steps[float]
+        """
+        yield from super()._steps()
+
+        python_files = self.__find_python_files()
+        cache_context = self.__compute_cache_context(python_files) if self.__cache is not None else ""
+        cached_results, missing_files = self.__get_cached_results(python_files, cache_context)
+
+        results = (yield from self.__lint(missing_files)) if missing_files else {"evaluation": None, "files": {}}
+        self.__cache_results(results, cache_context)
+
+        return self.__evaluate(merge_results([cached_results, results]))
+
+    def __lint(self, python_files: list[str]) -> Steps[dict[str, Any]]:
+        """
+        Lint the files, in the grader process or in pylint processes - one for each shard, run at the same time.
+
+        :param python_files: The files to lint
+        :return: The results of the files, as written by the grader stats reporter
+        """
+        if self.__in_process:
+            return self.__lint_in_process(python_files)
+
+        shards = split_into_shards(python_files, self.__shards)
+        if len(shards) == 1:
+            [shard_results] = yield from self.__lint_shards([(shards[0], [])])
+            return shard_results
+
+        rcfile_path = const.PYLINTRC if os.path.exists(const.PYLINTRC) else None
+        if not is_message_enabled(const.PYLINT_DUPLICATE_CODE, rcfile_path):
+            return merge_results((yield from self.__lint_shards([(shard, []) for shard in shards])))
+
+        shard_options = [f"--disable={const.PYLINT_DUPLICATE_CODE}"]
+        duplicate_code_options = ["--disable=all", f"--enable={const.PYLINT_DUPLICATE_CODE}"]
+        duplicate_code_results, *results = yield from self.__lint_shards(
+            [(python_files, duplicate_code_options)] + [(shard, shard_options) for shard in shards]
+        )
+
+        return merge_duplicate_code(merge_results(results), duplicate_code_results)
+
+    def __lint_shards(self, shards: list[tuple[list[str], list[str]]]) -> Steps[list[dict[str, Any]]]:
         """
-        super().run()
+        Lint the shards in pylint processes, run at the same time.
 
+        :param shards: The files of each process, and its pylint options on top of the shared ones
+        :return: The results of the files of each shard
+        """
+        commands = [
+            Command(self.__build_command(python_files, options), self._project_root, self.__build_environment())
+            for python_files, options in shards
+        ]
         try:
-            pylint_args = find_all_python_files(self._project_root)
+            outputs = yield commands
+        except (OSError, ValueError) as error:
+            logger.error("Error while running pylint: %s", error)
+            raise CheckError("Error while running pylint") from error
+
+        return [self.__read_results(output) for output in outputs]
+
+    def __lint_in_process(self, python_files: list[str]) -> dict[str, Any]:
+        """
+        Lint the files in the grader process.
+
+        :param python_files: The files to lint
+        :return: The results of the files
+        """
+        reporter = GraderStatsReporter(StringIO())
+
+        with _in_process_lock:
+            if self.__astroid_cache is not None:
+                self.__astroid_cache.load()
+
+            try:
+                search_path = get_venv_search_path(find_site_packages(self.__venv_path))
+                run_isolated(python_files + self.__build_options(), reporter, search_path)
+            except (OSError, ValueError, SystemExit) as error:
+                logger.error("Error while running pylint: %s", error)
+                raise CheckError("Error while running pylint") from error
+            finally:
+                forget_project_modules()
+
+                if self.__astroid_cache is not None:
+                    self.__astroid_cache.save(get_cacheable_modules())
+
+        if reporter.results is None:
+            raise CheckError("Pylint check failed")
+
+        return reporter.results
+
+    def __get_cached_results(self, python_files: list[str], cache_context: str) -> tuple[dict[str, Any], list[str]]:
+        """
+        Look up the cached results of the files.
+
+        :param python_files: The python files of the project
+        :param cache_context: The context of the cache keys of the project
+        :return: The cached results, and the files without cached results
+        """
+        cached_results: dict[str, Any] = {"evaluation": None, "files": {}}
+        if self.__cache is None:
+            return cached_results, python_files
+
+        for file in python_files:
+            file_results = self.__cache.get(self.__compute_cache_key(file, cache_context))
+            if file_results is not None:
+                cached_results["evaluation"] = file_results.pop("evaluation", None)
+                cached_results["files"][os.path.abspath(file)] = file_results
+
+        missing_files = [file for file in python_files if os.path.abspath(file) not in cached_results["files"]]
+        logger.debug(
+            "Pylint results are cached for %d of %d files", len(python_files) - len(missing_files), len(python_files)
+        )
+
+        return cached_results, missing_files
+
+    def __cache_results(self, results: dict[str, Any], cache_context: str):
+        """
+        Store the results of the linted files in the cache, along with the evaluation formula to score them by.
+
+        :param results: The results of the linted files
+        :param cache_context: The context of the cache keys of the project
+        """
+        if self.__cache is None:
+            return
+
+        for file, file_results in results["files"].items():
+            self.__cache.put(
+                self.__compute_cache_key(file, cache_context), {**file_results, "evaluation": results["evaluation"]}
+            )
+
+    def __compute_cache_context(self, python_files: list[str]) -> str:
+        """
+        :return: The context of the cache keys of the project - shared by all its files.
+        """
+        rcfile_path = const.PYLINTRC if os.path.exists(const.PYLINTRC) else None
+        requirements_path = os.path.join(self._project_root, const.REQUIREMENTS_FILENAME)
+        try:
+            requirements = read_requirements(requirements_path)
+        except RequirementsError:
+            # The projects are still told apart by the raw content of their requirements
+            requirements = [hash_file(requirements_path)]
+
+        return PylintCache.compute_context(rcfile_path, requirements, hash_files(python_files, self._project_root))
+
+    def __compute_cache_key(self, file: str, cache_context: str) -> str:
+        """
+        :return: The cache key of a project file.
+        """
+        return PylintCache.compute_key(file, os.path.relpath(file, self._project_root), cache_context)
+
+    def __build_command(self, python_files: list[str], options: list[str]) -> list[str]:
+        """
+        Build the pylint command, running over the given python files.
+
+        :param python_files: The files to lint
+        :param options: The pylint options of this process, overriding the pylintrc
+        :return: The pylint command
+        """
+        logger.debug("Running pylint check on files: %s", python_files)
+
+        pylint_bin = os.path.join(self.__venv_path, const.PYLINT_BIN)
+        output_options = [f"--output-format={const.PYLINT_STATS_REPORTER}"]
+        return [pylint_bin] + python_files + self.__build_options() + options + output_options
+
+    @staticmethod
+    def __build_environment() -> dict[str, str]:
+        """
+        Build the environment of the pylint process, which must be able to load the grader stats reporter.
+
+        :return: The environment variables to set
+        """
+        plugins_dir = os.path.dirname(os.path.abspath(grader_stats_reporter.__file__))
+        python_path = os.environ.get("PYTHONPATH")
+
+        return {"PYTHONPATH": os.pathsep.join([plugins_dir, python_path]) if python_path else plugins_dir}
+
+    def __find_python_files(self) -> list[str]:
+        """
+        Find all python files in the project.
+
+        :return: The python files
+        """
+        try:
+            return find_all_python_files(self._project_root)
         except OSError as error:
             logger.error("Error while finding python files: %s", error)
             raise CheckError("Error while finding python files") from error
 
-        logger.debug("Running pylint check on files: %s", pylint_args)
+    @staticmethod
+    def __build_options() -> list[str]:
+        """
+        Build the pylint options, shared by every pylint run.
+
+        :return: The pylint options
+        """
         pylintrc_path = const.PYLINTRC
-        pylint_args.append("--fail-under=0")
+        pylint_options = ["--fail-under=0"]
         if os.path.exists(pylintrc_path):
-            pylint_args.extend(["--rcfile", pylintrc_path])
+            pylint_options.extend(["--rcfile", pylintrc_path])
 
-        command = [os.path.join(self._project_root, const.PYLINT_PATH)] + pylint_args
-        try:
-            results = process.run(command, current_directory=self._project_root)
-        except (OSError, ValueError) as error:
-            logger.error("Error while running pylint: %s", error)
-            raise CheckError("Error while running pylint") from error
+        return pylint_options
 
-        if results.returncode != 0:
-            raise CheckError("Pylint check failed")
+    @staticmethod
+    def __read_results(results: CompletedProcess[str]) -> dict[str, Any]:
+        """
+        Read the results of the files from the output of the pylint process.
+        Pylint exits with a non-zero code whenever it finds messages, so only missing results count as a failure.
+
+        :param results: The output of the pylint process
+        :return: The results of the files
+        """
+        for line in reversed(results.stdout.strip().split("\n")):
+            try:
+                file_results = json.loads(line)
+            except ValueError:
+                continue
+
+            if isinstance(file_results, dict) and "files" in file_results:
+                return file_results
 
-        pylint_score = self.__get_pylint_score(results.stdout)
+        logger.error("Pylint results not found, pylint exited with %s: %s", results.returncode, results.stderr)
+        raise CheckError("Pylint check failed")
+
+    def __evaluate(self, results: dict[str, Any]) -> float:
+        """
+        Compute the pylint score from the results of all files and map it within the desired bounds.
+
+        :param results: The results of all files
+        :return: The translated score
+        """
+        file_stats = [file_results["stats"] for file_results in results["files"].values()]
+        pylint_score = compute_pylint_score(file_stats, results["evaluation"] or const.PYLINT_DEFAULT_EVALUATION)
 
         logger.debug("Pylint score: %s", pylint_score)
         return self.__translate_score(pylint_score)
@@ -87,42 +351,212 @@ class PylintCheck(AbstractCheck):
 
         return self._max_points
 
-    def __get_pylint_score(self, pylint_output: str) -> float:
+
+def run_isolated(args: list[str], reporter: GraderStatsReporter, search_path: list[str]):
+    """
+    Run pylint in the grader process, checking the files with the given sys.path.
+    Pylint loads its own checkers with the grader's sys.path, so only the checks themselves run with the search path.
+
+    :param args: The pylint arguments
+    :param reporter: The reporter of the results
+    :param search_path: The sys.path, the checked files import their modules from
+    """
+
+    class IsolatedLinter(lint.PyLinter):
         """
-        Get the score from the pylint output.
-        The score is the last value in the output.
+        Linter, checking the files with the search path as sys.path.
+        """
+
+        def check(self, files_or_modules):
+            with replaced_sys_path(search_path):
+                super().check(files_or_modules)
 
-        :param pylint_output: The output from the pylint check
-        :return: The score from the pylint check
+    class IsolatedRun(lint.Run):  # pylint: disable=too-few-public-methods
         """
-        expression = re.compile(r"[a-zA-Z ]*(\d*.\d*)\/.*")
+        Pylint run, with the isolated linter.
+        """
+
+        LinterClass = IsolatedLinter
+
+    IsolatedRun(args, reporter=reporter, exit=False)
 
-        for line in pylint_output.strip().split("\n"):
-            if "Your code has been rated at" in line:
-                match expression.match(line):
-                    case re.Match() as match_result:
-                        score = match_result.group(1)
-                        return float(score)
-                    case None:
-                        logger.error("Pylint score not found")
-                        raise CheckError("Pylint score not found")
 
-        logger.error("Pylint score not found")
-        raise CheckError("Pylint score not found")
+@contextmanager
+def replaced_sys_path(search_path: list[str]) -> Iterator[None]:
+    """
+    Replace sys.path with the search path, while the context is active.
+
+    :param search_path: The directories to search the modules in
+    """
+    original_sys_path = list(sys.path)
+    sys.path[:] = search_path
+    try:
+        yield
+    finally:
+        sys.path[:] = original_sys_path
 
 
-class PylintCustomReporter(TextReporter):
+def get_venv_search_path(site_packages: Optional[str]) -> list[str]:
     """
-    Custom reported to suppress all output.
-    By default, the pylint library shows everything on the stdout.
+    Get the sys.path of a venv of the grader's Python - the standard library, the site-packages
+    and the directories its .pth files add.
+
+    :param site_packages: The site-packages directory of the venv, or None if the venv has none
+    :return: The search path of the venv
     """
+    base_prefixes = {os.path.abspath(sys.base_prefix), os.path.abspath(sys.base_exec_prefix)}
+    search_path = [
+        path for path in sys.path if path and any(is_stdlib_file(path, base_prefix) for base_prefix in base_prefixes)
+    ]
+    if site_packages is None:
+        return search_path
+
+    search_path.append(site_packages)
+    for pth_file in sorted(glob.glob(os.path.join(site_packages, "*.pth"))):
+        try:
+            with open(pth_file, "r", encoding="utf-8") as file:
+                lines = [line.strip() for line in file]
+        except (OSError, ValueError):
+            continue
+
+        # Only the directories are added - the import lines would run code of the venv in the grader process
+        for line in lines:
+            if not line or line.startswith(("#", "import ", "import\t")):
+                continue
+
+            path = os.path.join(site_packages, line)
+            if os.path.isdir(path):
+                search_path.append(os.path.abspath(path))
+
+    return search_path
+
+
+def forget_project_modules():
+    """
+    Remove everything but the standard library from the astroid cache.
+    Projects (and their venvs) have modules with the same names, which must not be mixed up between them.
+    The standard library is the same for all of them, so it is kept, and not built again for the next project.
+    """
+    stdlib_path = os.path.abspath(sysconfig.get_paths()["stdlib"])
+
+    for module_name, module in list(MANAGER.astroid_cache.items()):
+        if module_name in sys.builtin_module_names or is_stdlib_file(module.file, stdlib_path):
+            continue
+
+        del MANAGER.astroid_cache[module_name]
+
+    # The module lookups depend on sys.path, which differs between the projects
+    MANAGER._mod_file_cache.clear()  # pylint: disable=protected-access
+    clear_lru_caches()
 
-    def __init__(self):
-        self.output = StringIO()
-        super().__init__(self.output)
 
-    def display_messages(self, layout):
-        pass
+def split_into_shards(python_files: list[str], shards: int) -> list[list[str]]:
+    """
+    Split the files between the shards, round-robin, so that the directories are spread over all of them.
+
+    :param python_files: The files to split
+    :param shards: The maximum number of shards
+    :return: The files of each shard, without empty shards
+    """
+    return [python_files[index::shards] for index in range(min(shards, len(python_files)))] or [[]]
+
+
+def merge_results(results: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Merge the results of separate pylint runs.
+
+    :param results: The results of each run, as written by the grader stats reporter
+    :return: The results of all files
+    """
+    merged_results: dict[str, Any] = {"evaluation": None, "files": {}}
+
+    for run_results in results:
+        merged_results["evaluation"] = merged_results["evaluation"] or run_results["evaluation"]
+        merged_results["files"].update(run_results["files"])
+
+    return merged_results
+
+
+def merge_duplicate_code(results: dict[str, Any], duplicate_code_results: dict[str, Any]) -> dict[str, Any]:
+    """
+    Add the duplicate code, found over all files, to the results of the shards, which didn't look for it.
+    Pylint counts each message in the statistics of the file it is reported for, so the files get a refactor each.
+
+    :param results: The merged results of the shards
+    :param duplicate_code_results: The results of the run, which only looked for duplicate code
+    :return: The results with the duplicate code
+    """
+    for file, duplicate_code_file_results in duplicate_code_results["files"].items():
+        messages = [
+            message
+            for message in duplicate_code_file_results["messages"]
+            if message["symbol"] == const.PYLINT_DUPLICATE_CODE
+        ]
+        if not messages or file not in results["files"]:
+            continue
+
+        results["files"][file]["messages"].extend(messages)
+        results["files"][file]["stats"]["refactor"] += len(messages)
+
+    return results
+
+
+def is_message_enabled(message: str, rcfile_path: Optional[str]) -> bool:
+    """
+    Check if pylint emits a message, under the given pylintrc.
+
+    :param message: The symbol of the message
+    :param rcfile_path: The path to the pylintrc, or None for the defaults of pylint
+    :return: True if the message is enabled, False otherwise
+    """
+    linter = lint.PyLinter()
+    linter.load_default_plugins()
+    if rcfile_path is None:
+        return linter.is_message_enabled(message)
+
+    try:
+        _config_initialization(linter, [], config_file=rcfile_path)
+    except (OSError, ValueError, SystemExit) as error:
+        # The pylint processes fail on the same pylintrc, with the error reported from there
+        logger.debug("Failed to read the pylintrc: %s", error)
+
+    return linter.is_message_enabled(message)
+
+
+def compute_pylint_score(file_stats: list[dict[str, int]], evaluation: str = const.PYLINT_DEFAULT_EVALUATION) -> float:
+    """
+    Compute the pylint score of a project, from the statistics of its files.
+    The score is evaluated the same way pylint does - with the evaluation formula of the pylintrc.
+
+    :param file_stats: The statistics of each file
+    :param evaluation: The evaluation formula, defaults to the one of pylint
+    :return: The pylint score
+    """
+    stats = {category: sum(stats.get(category, 0) for stats in file_stats) for category in const.PYLINT_STAT_CATEGORIES}
+
+    # Pylint doesn't rate a project without statements
+    if stats["statement"] == 0:
+        return 0.0
+
+    try:
+        return float(eval(evaluation, {}, stats))  # pylint: disable=eval-used
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        logger.error("Error while evaluating the pylint score: %s", error)
+        raise CheckError("Error while evaluating the pylint score") from error
+
+
+def is_stdlib_file(file_path: Optional[str], stdlib_path: str) -> bool:
+    """
+    Check if a file belongs to the standard library.
+
+    :param file_path: The path to the file
+    :param stdlib_path: The standard library directory
+    :return: True if the file is in the standard library directory, outside of site-packages, False otherwise
+    """
+    if file_path is None:
+        return False
+
+    relative_path = os.path.relpath(os.path.abspath(file_path), stdlib_path)
+    parts = relative_path.split(os.sep)
 
-    def display_reports(self, layout):
-        pass
+    return parts[0] != os.pardir and "site-packages" not in parts
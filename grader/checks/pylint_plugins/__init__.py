@@ -0,0 +1,5 @@
+"""
+Pylint plugins of the grader.
+The directory is put on the PYTHONPATH of the pylint run from a project's venv, so the modules in it
+must only depend on pylint and the standard library.
+"""
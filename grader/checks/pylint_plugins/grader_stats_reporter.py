@@ -0,0 +1,68 @@
+"""
+Module containing the pylint reporter, collecting the statistics and the messages of each linted file.
+"""
+
+import json
+import os
+from typing import Any, Optional
+
+from pylint.reporters.base_reporter import BaseReporter
+
+# The statistics pylint rates a project by
+STAT_CATEGORIES = ["convention", "error", "fatal", "info", "refactor", "statement", "warning"]
+
+
+class GraderStatsReporter(BaseReporter):
+    """
+    Reporter writing the results of a pylint run as a single JSON document, instead of the text output.
+
+    The results contain the statistics and the messages of each file, and the evaluation formula from the pylintrc,
+    so that the score can be computed from the results of any set of files - linted together or not.
+    """
+
+    name = "grader-stats"
+    extension = "json"
+
+    def __init__(self, output=None) -> None:
+        super().__init__(output)
+        self.module_paths: dict[str, str] = {}
+        self.file_messages: dict[str, list[dict[str, Any]]] = {}
+        self.results: Optional[dict[str, Any]] = None
+
+    def handle_message(self, msg):
+        self.file_messages.setdefault(os.path.abspath(msg.abspath), []).append(
+            {
+                "line": msg.line,
+                "column": msg.column,
+                "msg_id": msg.msg_id,
+                "symbol": msg.symbol,
+                "message": msg.msg,
+            }
+        )
+
+    def on_set_current_module(self, module: str, filepath: Optional[str]):
+        super().on_set_current_module(module, filepath)
+
+        if filepath is not None:
+            self.module_paths[module] = os.path.abspath(filepath)
+
+    def on_close(self, stats, previous_stats):
+        files = {}
+        for module_name, file_path in self.module_paths.items():
+            module_stats: Any = stats.by_module.get(module_name, {})
+            files[file_path] = {
+                "stats": {category: module_stats.get(category, 0) for category in STAT_CATEGORIES},
+                "messages": self.file_messages.get(file_path, []),
+            }
+
+        self.results = {"evaluation": self.linter.config.evaluation, "files": files}
+        self.writeln(json.dumps(self.results))
+
+    def display_messages(self, layout):
+        pass
+
+    def display_reports(self, layout):
+        pass
+
+    def _display(self, layout):
+        pass
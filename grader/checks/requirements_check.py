@@ -5,9 +5,12 @@ It checks if requirements.txt exists in the project root.
 
 import logging
 import os
+from typing import Optional
 
 from grader.checks.abstract_check import AbstractCheck
 from grader.utils.constants import REQUIREMENTS_FILENAME
+from grader.utils.process import Steps
+from grader.utils.workspace import Workspace
 
 logger = logging.getLogger("grader")
 
@@ -17,18 +20,18 @@ class RequirementsCheck(AbstractCheck):
     The requirements.txt check class.
     """
 
-    def __init__(self, name: str, max_points: int, project_root: str):
-        super().__init__(name, max_points, project_root)
+    def __init__(self, name: str, max_points: int, project_root: str, workspace: Optional[Workspace] = None):
+        super().__init__(name, max_points, project_root, workspace=workspace)
 
         self.__requirements_path = os.path.join(self._project_root, REQUIREMENTS_FILENAME)
 
-    def run(self) -> float:
+    def _steps(self) -> Steps[float]:
         """
         Run the requirements check on the project.
         Check if requirements.txt exists in the project root - the score is either 0 or full points.
         :return: The score from the requirements.txt check
-        :rtype: float
+        :rtype: Steps[float]
         """
-        super().run()
+        yield from super()._steps()
 
         return int(os.path.exists(self.__requirements_path)) * self.max_points
@@ -1,77 +1,391 @@
 """
 Module containing the type hints check.
-It calls mypy as a subprocess to generate a report and then read from the report.
+It counts the annotated functions natively, or calls mypy as a subprocess, the mypy python library in the grader
+process, or the mypy daemon of a batch, to generate a report and then read from the report.
 """
 
 import logging
+import os
+import tempfile
+import threading
+from typing import Optional
+
+from mypy import build as mypy_build
+from mypy import main as mypy_main
+from mypy.errors import CompileError
 
 from grader.checks.abstract_check import AbstractCheck, CheckError
-from grader.utils.constants import MYPY_TYPE_HINT_CONFIG, REPORTS_TEMP_DIR, MYPY_LINE_COUNT_REPORT
+from grader.utils.config import InvalidConfigError
+from grader.utils.constants import (
+    MYPY_TYPE_HINT_CONFIG,
+    TYPE_HINTS_ENGINE_MYPY,
+    TYPE_HINTS_ENGINE_NATIVE,
+    TYPE_HINTS_REPORTS_DIR_PREFIX,
+)
 from grader.utils import files
-from grader.utils import process
+from grader.utils import linecount
+from grader.utils.process import Command, Steps
+from grader.utils.linecount import LineCount
+from grader.utils.linecount_cache import LinecountCache
+from grader.utils.mypy_daemon import MypyDaemonError, check_project
+from grader.utils.mypy_report import read_module, write_linecount_report
+from grader.utils.workspace import Workspace
 
 logger = logging.getLogger("grader")
 
 
-class TypeHintsCheck(AbstractCheck):
+# Mypy keeps its state in globals, so only one in-process run is allowed at a time
+_in_process_lock = threading.Lock()
+
+
+class TypeHintsCheck(AbstractCheck):  # pylint: disable=too-many-instance-attributes
     """
     The TypeHints check class.
+
+    The score only depends on the linecount report of mypy - the annotated functions out of all functions.
+    By default, the mypy engine runs mypy for the report. The native engine approximates the report from the syntax
+    trees of the source files instead, the same way mypy counts, without type checking the project. It only follows
+    the dataclass bases through the classes and imports of the project, not through assignments or star imports, and
+    only knows the dataclasses, total_ordering and attrs plugins - for those bases, and other class decorators (e.g.
+    dataclass_transform), its counts differ from mypy's, and so may the score.
+
+    With the mypy engine, by default, mypy is run in a process of its own. In-process, mypy is run in the grader
+    process, which saves starting the interpreter and importing mypy for every project.
+    Mypy ignores its cache whenever it writes a report, so in-process, the linecount report is written by the check
+    itself, with the reporter of mypy, from the modules mypy has analyzed.
+
+    With a cache directory, the incremental mypy cache is kept there, in a SQLite database, and shared by all
+    projects. Typeshed and the standard library are then only analyzed once, by the first project, and the
+    following projects only analyze their own modules. It implies running in-process.
+
+    With a daemon, the project is checked by the mypy daemon of the batch, at the given address, which keeps the
+    modules every project imports analyzed in memory, and writes the linecount report from the analyzed modules of
+    the project. If the daemon can't check the project, mypy is run in a process of its own instead. The daemon takes
+    precedence over in-process.
+
+    The whole report is read into a table of the modules. With a linecount cache directory, the table is kept there,
+    keyed by the content of the whole project, as the counts of a module depend on the modules it imports.
+    Only the modules which aren't cached are analyzed - the score is computed from the counts of all modules.
     """
 
-    def __init__(self, name: str, max_points: int, project_root: str):
-        super().__init__(name, max_points, project_root)
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        name: str,
+        max_points: int,
+        project_root: str,
+        workspace: Optional[Workspace] = None,
+        *,
+        in_process: bool = False,
+        cache_dir: Optional[str] = None,
+        engine: Optional[str] = None,
+        linecount_cache_dir: Optional[str] = None,
+        daemon: Optional[str] = None,
+    ):
+        super().__init__(name, max_points, project_root, workspace=workspace)
 
         self.__mypy_binary = "mypy"
-        self.__mypy_arguments = ["--config-file", MYPY_TYPE_HINT_CONFIG, "--linecount-report", REPORTS_TEMP_DIR]
+        self.__mypy_arguments = ["--config-file", MYPY_TYPE_HINT_CONFIG]
+        if cache_dir is not None:
+            self.__mypy_arguments.extend(["--cache-dir", os.path.abspath(cache_dir), "--sqlite-cache"])
+        elif self._workspace.mypy_cache_dir is not None:
+            self.__mypy_arguments.extend(["--cache-dir", self._workspace.mypy_cache_dir])
+        self.__in_process = in_process or cache_dir is not None
+        self.__daemon = daemon
+
+        if engine is None:
+            engine = TYPE_HINTS_ENGINE_MYPY
+        if engine not in (TYPE_HINTS_ENGINE_NATIVE, TYPE_HINTS_ENGINE_MYPY):
+            raise InvalidConfigError(f"Unknown type hints engine: {engine}")
+        self.__engine = engine
+
+        self.__cache = LinecountCache(linecount_cache_dir) if linecount_cache_dir is not None else None
+
         self.__mypy_max_score = 1
 
-    def run(self) -> float:
+    def _steps(self) -> Steps[float]:
         """
         Run the mypy check on the project.
 
-        First, find all python files in the project, then run mypy on all files with the special config.
+        First, find all python files in the project, and look up the ones with cached counts.
+        Then run mypy on the other files with the special config.
         Mypy then generates a report with the amount of lines with type hints and the total amount of lines.
+        The report is written to a directory of this run, so that the checks of other projects, graded at the same
+        time, don't overwrite it.
 
-        The first line in the report contains the values for all files.
-        The line contains a lot of stuff, we just need the type-hinted lines and the total amount of lines.
+        The first line in the report contains the values for all files, and each following line the values of
+        a module. We just need the type-hinted functions and the total amount of functions.
 
         :returns: The score from the mypy check.
-        :rtype: float
+        :rtype: Steps[float]
         """
-        super().run()
+        yield from super()._steps()
 
-        # Gather all files
+        source_files = self.__find_source_files()
+        cache_context = self.__compute_cache_context(source_files)
+        cached_counts, missing_files = self.__get_cached_counts(source_files, cache_context)
+        if cache_context is not None and not missing_files:
+            return self.__evaluate(linecount.sum_counts(cached_counts.values()))
+
+        with self.__create_reports_dir() as reports_dir:
+            if self.__engine == TYPE_HINTS_ENGINE_NATIVE:
+                self.__run_native(missing_files, source_files, reports_dir)
+            elif self.__daemon is not None:
+                yield from self.__run_with_daemon(self.__daemon, missing_files, reports_dir)
+            elif self.__in_process:
+                self.__run_in_process(missing_files, reports_dir)
+            else:
+                yield from self.__run_process(missing_files, reports_dir)
+
+            totals, module_counts = self.__read_report(reports_dir)
+
+        if cache_context is None:
+            # Without a cache, the totals of the report are used as they are
+            return self.__evaluate(totals)
+
+        return self.__evaluate(self.__merge_counts(module_counts, cached_counts, missing_files, cache_context))
+
+    def __create_reports_dir(self) -> tempfile.TemporaryDirectory:
+        """
+        Create the reports directory of this run, in the reports directory of the workspace.
+        It is removed, with the report, once the run is done.
+
+        :return: The reports directory, as a context manager
+        """
         try:
-            all_source_files = files.find_all_source_files(self._project_root)
+            os.makedirs(self._workspace.reports_dir, exist_ok=True)
+            return tempfile.TemporaryDirectory(
+                prefix=TYPE_HINTS_REPORTS_DIR_PREFIX, dir=self._workspace.reports_dir, ignore_cleanup_errors=True
+            )
         except OSError as error:
-            logger.error("Error while finding python files: %s", error)
-            raise CheckError("Error while finding python files") from error
+            logger.error("Error while creating the reports directory: %s", error)
+            raise CheckError("Error while creating the reports directory") from error
 
-        # Run mypy on all files
-        command = [self.__mypy_binary] + self.__mypy_arguments + all_source_files
+    def __run_native(self, missing_files: list[str], source_files: list[str], reports_dir: str):
+        """
+        Count the annotated functions of the source files, and write the linecount report, without running mypy.
+
+        :param missing_files: The source files to count
+        :param source_files: All source files of the project, which the dataclasses inherit their fields from
+        :param reports_dir: The directory to write the report to
+        """
         try:
-            _ = process.run(command)
+            counts = linecount.count_files(missing_files, MYPY_TYPE_HINT_CONFIG, project_files=source_files)
+            linecount.write_report(counts, reports_dir)
+        except linecount.LinecountError as error:
+            # Mypy doesn't write a report for a project it can't parse either
+            logger.error("Error while counting the type hints: %s", error)
+            raise CheckError("Error while counting the type hints") from error
+        except OSError as error:
+            logger.error("Error while writing the linecount report: %s", error)
+            raise CheckError("Error while writing the linecount report") from error
+
+    def __run_in_process(self, source_files: list[str], reports_dir: str):
+        """
+        Run mypy in the grader process, and write the linecount report of the analyzed modules.
+
+        :param source_files: The source files of the project
+        :param reports_dir: The directory to write the report to
+        """
+        with _in_process_lock:
+            try:
+                sources, options = mypy_main.process_options(self.__mypy_arguments + source_files)
+                # The report needs the function definitions, which mypy drops once a module is checked
+                options.preserve_asts = True
+                # Fresh modules are only loaded from the cache as skeletons, without the methods the plugins add to
+                # their classes - given their text, the source modules are always analyzed, and only the modules
+                # they import come from the cache
+                for source in sources:
+                    if source.path is not None:
+                        source.text = read_module(source.path)
+                result = mypy_build.build(sources, options)
+            except CompileError as error:
+                # Blocking errors, e.g. a syntax error in the project - mypy doesn't write a report for them either
+                logger.error("Mypy failed: %s", "\n".join(error.messages))
+                raise CheckError("Error while running mypy") from error
+            except (OSError, ValueError, SystemExit) as error:
+                logger.error("Error while running mypy: %s", error)
+                raise CheckError("Error while running mypy") from error
+
+            write_linecount_report(sources, reports_dir, result)
+
+    def __run_process(self, source_files: list[str], reports_dir: str) -> Steps[None]:
+        """
+        Run mypy in a process of its own, writing the linecount report.
+
+        :param source_files: The source files of the project
+        :param reports_dir: The directory to write the report to
+        """
+        try:
+            _ = yield [Command(self.__build_command(source_files, reports_dir))]
         except (OSError, ValueError) as error:
             logger.error("Error while running mypy: %s", error)
             raise CheckError("Error while running mypy") from error
 
-        # Read mypy linecount report
+    def __run_with_daemon(self, address: str, source_files: list[str], reports_dir: str) -> Steps[None]:
+        """
+        Check the project with the mypy daemon of the batch, which writes the linecount report.
+        If the daemon can't check the project, mypy is run in a process of its own instead.
+
+        :param address: The address of the daemon
+        :param source_files: The source files of the project
+        :param reports_dir: The directory to write the report to
+        """
         try:
-            with open(MYPY_LINE_COUNT_REPORT, "r", encoding="utf-8") as report_file:
-                report = report_file.readline().strip().split()
+            messages = check_project(address, source_files, reports_dir)
+        except MypyDaemonError as error:
+            logger.warning("The mypy daemon can't check the project, running mypy instead: %s", error)
+            yield from self.__run_process(source_files, reports_dir)
+            return
+
+        if messages:
+            # Blocking errors, e.g. a syntax error in the project - mypy doesn't write a report for them either
+            logger.error("Mypy failed: %s", "\n".join(messages))
+            raise CheckError("Error while running mypy")
+
+    def __build_command(self, source_files: list[str], reports_dir: str) -> list[str]:
+        """
+        Build the mypy command, running over the source files.
+
+        :param source_files: The source files to check
+        :param reports_dir: The directory to write the report to
+        :return: The mypy command
+        """
+        linecount_arguments = ["--linecount-report", reports_dir]
+        return [self.__mypy_binary] + self.__mypy_arguments + linecount_arguments + source_files
+
+    def __find_source_files(self) -> list[str]:
+        """
+        Find all source files in the project.
+
+        :return: The source files
+        """
+        try:
+            return files.find_all_source_files(self._project_root)
+        except OSError as error:
+            logger.error("Error while finding python files: %s", error)
+            raise CheckError("Error while finding python files") from error
+
+    def __get_cached_counts(
+        self, source_files: list[str], cache_context: Optional[str]
+    ) -> tuple[dict[str, LineCount], list[str]]:
+        """
+        Look up the cached counts of the source files.
+
+        :param source_files: The source files of the project
+        :param cache_context: The context of the cache keys of the project, or None if the cache isn't used
+        :return: The cached counts, by module name, and the files without cached counts
+        """
+        if self.__cache is None or cache_context is None:
+            return {}, source_files
+
+        cached_counts: dict[str, LineCount] = {}
+        missing_files = []
+        for source_file in source_files:
+            module_name = linecount.get_module_name(source_file)
+            count = self.__cache.get(self.__compute_cache_key(source_file, module_name, cache_context))
+            if count is None:
+                missing_files.append(source_file)
+            else:
+                cached_counts[module_name] = count
+
+        logger.debug(
+            "Linecounts are cached for %d of %d files", len(source_files) - len(missing_files), len(source_files)
+        )
+
+        return cached_counts, missing_files
+
+    def __merge_counts(
+        self,
+        module_counts: dict[str, LineCount],
+        cached_counts: dict[str, LineCount],
+        analyzed_files: list[str],
+        cache_context: str,
+    ) -> LineCount:
+        """
+        Store the counts of the analyzed files in the cache, and merge them with the cached counts.
+
+        :param module_counts: The counts of the modules in the report, by module name
+        :param cached_counts: The cached counts, by module name
+        :param analyzed_files: The source files, analyzed for the report
+        :param cache_context: The context of the cache keys of the project
+        :return: The totals of all modules
+        """
+        for source_file in analyzed_files:
+            module_name = linecount.get_module_name(source_file)
+            if self.__cache is not None and module_name in module_counts:
+                self.__cache.put(
+                    self.__compute_cache_key(source_file, module_name, cache_context), module_counts[module_name]
+                )
+
+        return linecount.sum_counts({**cached_counts, **module_counts}.values())
+
+    def __compute_cache_context(self, source_files: list[str]) -> Optional[str]:
+        """
+        Compute the context of the cache keys of the project - shared by all its modules.
+
+        :param source_files: The source files of the project
+        :return: The context, or None if there is no cache, or the project can't be keyed and the cache is skipped
+        """
+        if self.__cache is None:
+            return None
+
+        try:
+            return LinecountCache.compute_context(
+                MYPY_TYPE_HINT_CONFIG, self.__engine, source_files, self._project_root
+            )
+        except OSError as error:
+            logger.warning("Failed to compute the linecount cache key, the cache isn't used: %s", error)
+            return None
+
+    @staticmethod
+    def __compute_cache_key(source_file: str, module_name: str, cache_context: str) -> str:
+        """
+        Compute the cache key of a source file.
+
+        :param source_file: The source file
+        :param module_name: The full name of its module
+        :param cache_context: The context of the cache keys of the project
+        :return: The cache key
+        """
+        try:
+            return LinecountCache.compute_key(source_file, module_name, cache_context)
+        except OSError as error:
+            logger.error("Error while reading %s: %s", source_file, error)
+            raise CheckError(f"Error while reading {source_file}") from error
+
+    @staticmethod
+    def __read_report(reports_dir: str) -> tuple[LineCount, dict[str, LineCount]]:
+        """
+        Read the whole linecount report - the totals, and the counts of each module.
+
+        :param reports_dir: The directory, containing the report
+        :return: The totals, and the counts of each module, by module name
+        """
+        try:
+            return linecount.read_report(reports_dir)
         except FileNotFoundError as error:
             logger.error("Mypy linecount report not found")
             raise CheckError("Mypy linecount report not found") from error
+        except (OSError, linecount.LinecountError) as error:
+            logger.error("Error while reading the linecount report: %s", error)
+            raise CheckError("Error while reading the linecount report") from error
+
+    def __evaluate(self, totals: LineCount) -> float:
+        """
+        Calculate the score from the totals of the linecount report.
 
-        # Fancy way to get the needed values - I need the 3rd and 4th values, out of 5 total
-        *_, lines_with_type_annotations, lines_total, _ = report
+        :param totals: The totals of the report
+        :return: The translated score
+        """
+        # We need the 3rd and 4th values - the annotated functions and all functions
+        _, _, lines_with_type_annotations, lines_total = totals
 
-        if int(lines_total) == 0:
+        if lines_total == 0:
             logger.error("Mypy linecount report is empty")
             return 0.0
 
         # Calculate score
-        return self.__translate_score(int(lines_with_type_annotations) / int(lines_total))
+        return self.__translate_score(lines_with_type_annotations / lines_total)
 
     def __translate_score(self, mypy_score: float) -> float:
         """
@@ -0,0 +1,214 @@
+"""
+Module containing the grading flow for a single project.
+Creates the checks from the configuration, runs them and collects their scores.
+"""
+
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, asynccontextmanager, nullcontext
+from typing import Any, AsyncIterator, Optional, TypeVar
+
+from grader.checks.abstract_check import AbstractCheck, CheckError
+from grader.checks.checks_factory import create_checks
+from grader.utils.files import get_tests_directory_name
+from grader.utils.virtual_environment import VirtualEnvironment
+from grader.utils.workspace import Workspace
+
+logger = logging.getLogger("grader")
+
+T = TypeVar("T")
+
+
+def grade_project(
+    config: dict,
+    project_root: str,
+    max_parallel_checks: int = 1,
+    venv_options: Optional[dict[str, Any]] = None,
+    *,
+    workspace_dir: Optional[str] = None,
+) -> list[tuple[str, float, int]]:
+    """
+    Run all configured checks on a single project.
+    The checks are executed on a pool of threads - most of them just wait for a child process to finish.
+    The non-venv checks are started right away, while the virtual environment is being set up.
+    The venv checks are started once the virtual environment is ready.
+    With a workspace directory, the venv and the artifacts of the checks are placed in a directory of their own
+    under it, and removed once the project is graded.
+
+    :param config: The configuration dictionary.
+    :type config: dict
+    :param project_root: The root of the project.
+    :type project_root: str
+    :param max_parallel_checks: The maximum amount of checks running at the same time, defaults to 1
+    :type max_parallel_checks: int
+    :param venv_options: Keyword arguments for the VirtualEnvironment of the project, defaults to None
+    :type venv_options: Optional[dict[str, Any]]
+    :param workspace_dir: The directory for the scratch files of the project, defaults to None (in the project)
+    :type workspace_dir: Optional[str]
+    :return: A list of (check name, score, max points) tuples, non-venv checks first, in the order they are configured.
+    :rtype: list[tuple[str, float, int]]
+    """
+    warn_missing_tests(project_root)
+
+    with Workspace(project_root, workspace_dir) as workspace:
+        non_venv_checks, venv_checks = create_checks(config, project_root, workspace)
+
+        with ThreadPoolExecutor(max_workers=max_parallel_checks) as executor:
+            # The checks log on behalf of the caller, e.g. into the log file of its student
+            non_venv_futures = [
+                executor.submit(contextvars.copy_context().run, run_check, check) for check in non_venv_checks
+            ]
+
+            with VirtualEnvironment(project_root, **get_venv_options(workspace, venv_options)):
+                venv_futures = [
+                    executor.submit(contextvars.copy_context().run, run_check, check) for check in venv_checks
+                ]
+                venv_scores = [future.result() for future in venv_futures]
+
+            non_venv_scores = [future.result() for future in non_venv_futures]
+
+    return non_venv_scores + venv_scores
+
+
+async def grade_project_async(
+    config: dict,
+    project_root: str,
+    semaphore: asyncio.Semaphore,
+    venv_options: Optional[dict[str, Any]] = None,
+    *,
+    workspace_dir: Optional[str] = None,
+) -> list[tuple[str, float, int]]:
+    """
+    Asyncio counterpart of grade_project - run all configured checks on a single project, on the event loop.
+    All checks of the project run at the same time, and the commands of their tools are awaited on the event loop,
+    so the projects graded at the same time share a single event loop. The semaphore bounds the commands running at
+    the same time, and the venvs being set up, over all of them.
+    The workspace and the venv are set up, and torn down, in worker threads.
+
+    :param config: The configuration dictionary.
+    :type config: dict
+    :param project_root: The root of the project.
+    :type project_root: str
+    :param semaphore: Semaphore bounding the commands running at the same time, e.g. shared by many projects.
+    :type semaphore: asyncio.Semaphore
+    :param venv_options: Keyword arguments for the VirtualEnvironment of the project, defaults to None
+    :type venv_options: Optional[dict[str, Any]]
+    :param workspace_dir: The directory for the scratch files of the project, defaults to None (in the project)
+    :type workspace_dir: Optional[str]
+    :return: A list of (check name, score, max points) tuples, non-venv checks first, in the order they are configured.
+    :rtype: list[tuple[str, float, int]]
+    """
+    warn_missing_tests(project_root)
+
+    async with enter_in_thread(Workspace(project_root, workspace_dir)) as workspace:
+        non_venv_checks, venv_checks = create_checks(config, project_root, workspace)
+        non_venv_tasks = [asyncio.ensure_future(run_check_async(check, semaphore)) for check in non_venv_checks]
+
+        try:
+            venv = VirtualEnvironment(project_root, **get_venv_options(workspace, venv_options))
+            async with enter_in_thread(venv, semaphore):
+                venv_scores = await asyncio.gather(*(run_check_async(check, semaphore) for check in venv_checks))
+        finally:
+            # The checks are done before the workspace is torn down, like with the thread pool of grade_project
+            non_venv_scores = await asyncio.gather(*non_venv_tasks)
+
+    return list(non_venv_scores) + list(venv_scores)
+
+
+@asynccontextmanager
+async def enter_in_thread(
+    context_manager: AbstractContextManager[T], semaphore: Optional[asyncio.Semaphore] = None
+) -> AsyncIterator[T]:
+    """
+    Enter and exit a blocking context manager in worker threads, without blocking the event loop.
+
+    :param context_manager: The context manager.
+    :type context_manager: AbstractContextManager[T]
+    :param semaphore: Semaphore to hold while entering the context, defaults to None
+    :type semaphore: Optional[asyncio.Semaphore]
+    :return: The value of the context.
+    :rtype: AsyncIterator[T]
+    """
+    async with semaphore or nullcontext():
+        value = await asyncio.to_thread(context_manager.__enter__)
+
+    try:
+        yield value
+    except BaseException as error:
+        await asyncio.to_thread(context_manager.__exit__, type(error), error, error.__traceback__)
+        raise
+
+    await asyncio.to_thread(context_manager.__exit__, None, None, None)
+
+
+def warn_missing_tests(project_root: str):
+    """
+    Warn if the project has no tests directory.
+
+    :param project_root: The root of the project.
+    :type project_root: str
+    """
+    tests_directory = get_tests_directory_name(project_root)
+    if tests_directory is None:
+        logger.warning("No tests directory found in the project directory. Either it is missing or named differently.")
+
+
+def get_venv_options(workspace: Workspace, venv_options: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+    """
+    Get the keyword arguments for the VirtualEnvironment of a project, placing the venv in its workspace.
+
+    :param workspace: The workspace of the project.
+    :type workspace: Workspace
+    :param venv_options: Keyword arguments for the VirtualEnvironment of the project, defaults to None
+    :type venv_options: Optional[dict[str, Any]]
+    :return: The keyword arguments for the VirtualEnvironment.
+    :rtype: dict[str, Any]
+    """
+    venv_options = dict(venv_options or {})
+    if workspace.is_isolated:
+        venv_options["venv_path"] = workspace.venv_path
+
+    return venv_options
+
+
+def run_check(check: AbstractCheck) -> tuple[str, float, int]:
+    """
+    Run a single check. If the check fails, it is scored with 0 points.
+
+    :param check: The check to run.
+    :type check: AbstractCheck
+    :return: A (check name, score, max points) tuple.
+    :rtype: tuple[str, float, int]
+    """
+    try:
+        check_score = check.run()
+    except CheckError as error:
+        logger.error("Check failed: %s", error)
+        check_score = 0.0
+
+    return check.name, check_score, check.max_points
+
+
+async def run_check_async(
+    check: AbstractCheck, semaphore: Optional[asyncio.Semaphore] = None
+) -> tuple[str, float, int]:
+    """
+    Asyncio counterpart of run_check - run a single check on the event loop. If the check fails, it is scored
+    with 0 points.
+
+    :param check: The check to run.
+    :type check: AbstractCheck
+    :param semaphore: Semaphore bounding the commands running at the same time, defaults to None (unbounded)
+    :type semaphore: Optional[asyncio.Semaphore]
+    :return: A (check name, score, max points) tuple.
+    :rtype: tuple[str, float, int]
+    """
+    try:
+        check_score = await check.run_async(semaphore)
+    except CheckError as error:
+        logger.error("Check failed: %s", error)
+        check_score = 0.0
+
+    return check.name, check_score, check.max_points
@@ -0,0 +1,161 @@
+"""
+Module containing the persistent astroid cache.
+Astroid builds (and pylint infers) the same standard library modules for every project. The built trees are stored
+on disk, and loaded by the next grader process, so the standard library is only built once per grading host.
+"""
+
+import hashlib
+import logging
+import os
+import sys
+import sysconfig
+import uuid
+
+import astroid
+import dill
+import pylint
+from astroid import MANAGER, nodes
+
+import grader.utils.constants as const
+
+logger = logging.getLogger("grader")
+
+
+class AstroidCache:
+    """
+    Persistent cache of the astroid trees of the standard library modules, serialized with dill.
+
+    The cache file is keyed by the Python, astroid, pylint and dill versions - the trees of one version
+    are never loaded by another. Only the pure python modules are stored, the ones built from living objects
+    (e.g. sys, or the C extensions) can't be serialized.
+
+    The cache is loaded once per process. It is saved whenever the process has built modules which are not
+    in the cache file yet, which stops happening once the standard library used by the projects is cached.
+    The file is written atomically, so the cache can be shared between processes.
+    """
+
+    def __init__(self, cache_dir: str):
+        self._cache_dir = os.path.abspath(cache_dir)
+        self._is_loaded = False
+        self._cached_modules: set[str] = set()
+
+    @property
+    def cache_path(self) -> str:
+        """
+        :returns: The path to the cache file of the current versions.
+        :rtype: str
+        """
+        return os.path.join(self._cache_dir, self.compute_key() + const.ASTROID_CACHE_EXTENSION)
+
+    @staticmethod
+    def compute_key() -> str:
+        """
+        Compute the key of the cache file, from everything the built trees depend on.
+
+        :return: The cache key.
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+
+        parts = [
+            sys.version,
+            sysconfig.get_paths()["stdlib"],
+            astroid.__version__,
+            pylint.__version__,
+            dill.__version__,
+        ]
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+
+        return digest.hexdigest()[: const.ASTROID_CACHE_KEY_LENGTH]
+
+    def load(self) -> int:
+        """
+        Load the cached trees into astroid, unless they are loaded already.
+        The modules which astroid has already built are kept.
+
+        :return: The amount of loaded modules.
+        :rtype: int
+        """
+        if self._is_loaded:
+            return 0
+
+        self._is_loaded = True
+
+        try:
+            with open(self.cache_path, "rb") as cache_file:
+                modules = dill.load(cache_file)
+        except FileNotFoundError:
+            return 0
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # A corrupt cache file is simply replaced by the next save
+            logger.debug("Failed to load the astroid cache %s: %s", self.cache_path, error)
+            return 0
+
+        for module_name, module in modules.items():
+            MANAGER.astroid_cache.setdefault(module_name, module)
+
+        self._cached_modules = set(modules)
+        logger.debug("Loaded %d modules from the astroid cache", len(modules))
+
+        return len(modules)
+
+    def save(self, modules: dict[str, nodes.Module]) -> bool:
+        """
+        Save the trees, if any of them are not in the cache file yet.
+
+        :param modules: The trees to save, by module name.
+        :type modules: dict[str, nodes.Module]
+        :return: True if the cache file was written, False otherwise.
+        :rtype: bool
+        """
+        if set(modules) <= self._cached_modules:
+            return False
+
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+        temp_cache_path = f"{self.cache_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_cache_path, "wb") as cache_file:
+                dill.dump(modules, cache_file)
+
+            os.replace(temp_cache_path, self.cache_path)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            logger.debug("Failed to save the astroid cache %s: %s", self.cache_path, error)
+            if os.path.exists(temp_cache_path):
+                os.remove(temp_cache_path)
+            return False
+
+        self._cached_modules = set(modules)
+        logger.debug("Saved %d modules to the astroid cache", len(modules))
+
+        return True
+
+
+_astroid_caches: dict[str, AstroidCache] = {}
+
+
+def get_astroid_cache(cache_dir: str) -> AstroidCache:
+    """
+    Get the astroid cache of the current process, for the cache directory.
+    It is shared by all checks, so the cache is only loaded once.
+
+    :param cache_dir: The directory, containing the cache files
+    :return: The astroid cache
+    """
+    cache_dir = os.path.abspath(cache_dir)
+
+    if cache_dir not in _astroid_caches:
+        _astroid_caches[cache_dir] = AstroidCache(cache_dir)
+
+    return _astroid_caches[cache_dir]
+
+
+def get_cacheable_modules() -> dict[str, nodes.Module]:
+    """
+    Get the trees in the astroid cache, which can be saved.
+
+    :return: The pure python modules astroid has built, by module name
+    """
+    return {module_name: module for module_name, module in MANAGER.astroid_cache.items() if module.pure_python}
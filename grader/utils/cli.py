@@ -1,10 +1,18 @@
 """
 Module containing the CLI arguments parser.
 """
+
 import argparse
+import os
+import sys
 
 from typing import Any
 
+import grader.utils.constants as const
+
+BATCH_COMMAND = "batch"
+WHEELHOUSE_COMMAND = "wheelhouse"
+
 
 def get_args() -> dict[str, Any]:
     """
@@ -18,8 +26,160 @@ def get_args() -> dict[str, Any]:
     parser.add_argument("project_root", type=str, help="The path to the project directory")
     parser.add_argument("-c", "--config", type=str, help="The path to the config file to use")
     parser.add_argument("--student-id", type=str, help="The student's id")
+    add_grading_arguments(parser)
+
+    return parser.parse_args().__dict__
+
+
+def is_batch_mode() -> bool:
+    """
+    Check if the grader was started in batch mode, i.e. as ``main.py batch <submissions_dir>``.
+
+    :returns: True if the first CLI argument is the batch command, False otherwise
+    """
+    return len(sys.argv) > 1 and sys.argv[1] == BATCH_COMMAND
+
+
+def get_batch_args() -> dict[str, Any]:
+    """
+    Create the CLI parser for batch mode and return the parsed arguments.
+    The batch command itself is not part of the parsed arguments.
+
+    :returns: Dictionary, containing the parsed arguments
+    """
+    parser = argparse.ArgumentParser("Python project grader (batch mode)")
+
+    parser.add_argument(
+        "submissions_dir", type=str, help="The path to a directory, containing one project directory per student"
+    )
+    parser.add_argument("-c", "--config", type=str, help="The path to the config file to use")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1, help="The amount of submissions graded in parallel"
+    )
+    parser.add_argument(
+        "--forkserver",
+        action="store_true",
+        help="Fork a worker for each submission from a process, which has imported the checks' tooling once",
+    )
     parser.add_argument(
+        "--asyncio",
+        action="store_true",
+        help="Grade all submissions on a single event loop, with at most --jobs tool processes running at a time",
+    )
+    parser.add_argument(
+        "--batch-lint",
+        action="store_true",
+        help="Lint the submissions without requirements ahead of grading, many of them in each pylint process",
+    )
+    parser.add_argument(
+        "--mypy-daemon",
+        action="store_true",
+        help="Check the type hints with a mypy daemon of the batch, analyzing the modules every project imports once",
+    )
+    add_grading_arguments(parser)
+
+    return parser.parse_args(sys.argv[2:]).__dict__
+
+
+def is_wheelhouse_mode() -> bool:
+    """
+    Check if the grader was started to manage the wheelhouse, i.e. as ``main.py wheelhouse build <wheelhouse_dir>``.
+
+    :returns: True if the first CLI argument is the wheelhouse command, False otherwise
+    """
+    return len(sys.argv) > 1 and sys.argv[1] == WHEELHOUSE_COMMAND
+
+
+def get_wheelhouse_args() -> dict[str, Any]:
+    """
+    Create the CLI parser for managing the wheelhouse and return the parsed arguments.
+    The wheelhouse command itself is not part of the parsed arguments.
+
+    :returns: Dictionary, containing the parsed arguments
+    """
+    parser = argparse.ArgumentParser("Python project grader (wheelhouse)")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    build_parser = subparsers.add_parser(
+        "build", help="Fetch the wheels for the grader requirements, and any additional requirements files"
+    )
+    build_parser.add_argument("wheelhouse_dir", type=str, help="The path to the wheelhouse directory")
+    build_parser.add_argument(
+        "-r",
+        "--requirements",
+        type=str,
+        action="append",
+        default=[],
+        help="Additional requirements file to fetch the wheels for, e.g. the common course requirements",
+    )
+    build_parser.add_argument("--pip-cache-dir", type=str, help="The pip cache directory to use")
+    build_parser.add_argument(
         "-v", "--verbosity", action="count", default=0, help="Set verbosity (0: DEBUG, 1: VERBOSE, 2: INFO)"
     )
 
-    return parser.parse_args().__dict__
+    return parser.parse_args(sys.argv[2:]).__dict__
+
+
+def add_grading_arguments(parser: argparse.ArgumentParser):
+    """
+    Add the arguments shared by the single project and the batch mode.
+
+    :param parser: The parser to add the arguments to
+    """
+    parser.add_argument(
+        "--max-parallel-checks", type=int, default=1, help="The maximum amount of checks running at the same time"
+    )
+    parser.add_argument(
+        "--venv-cache-dir", type=str, help="Cache the virtual environments in this directory, and reuse them"
+    )
+    parser.add_argument(
+        "--venv-cache-size",
+        type=int,
+        default=const.VENV_CACHE_MAX_SIZE // (1024 * 1024),
+        help="The size budget of the virtual environment cache, in MiB",
+    )
+    parser.add_argument(
+        "--incremental-install",
+        action="store_true",
+        help="Build new cached virtual environments from the cached one with the closest requirements",
+    )
+    parser.add_argument(
+        "--venv-pool-dir",
+        type=str,
+        help="Keep pre-warmed virtual environments in this directory, and hand one to each project",
+    )
+    parser.add_argument(
+        "--venv-pool-size",
+        type=int,
+        default=const.VENV_POOL_SIZE,
+        help="The amount of pre-warmed virtual environments to keep ready",
+    )
+    parser.add_argument(
+        "--venv-template-dir",
+        type=str,
+        help="Keep a template virtual environment in this directory, and clone the new virtual environments from it",
+    )
+    parser.add_argument(
+        "--shared-venv-dir",
+        type=str,
+        help="Build a tool environment once in this directory, and use it for every project without requirements",
+    )
+    parser.add_argument(
+        "--tool-layer-dir",
+        type=str,
+        help="Install the grader tools once in this directory, and layer them into each virtual environment",
+    )
+    parser.add_argument(
+        "--wheelhouse-dir",
+        type=str,
+        help="Install the requirements only from this wheelhouse, without access to the package index",
+    )
+    parser.add_argument("--pip-cache-dir", type=str, help="The pip cache directory to use")
+    parser.add_argument(
+        "--workspace-dir",
+        type=str,
+        help="Keep the virtual environment, reports and caches of each project in this directory (e.g. /dev/shm)",
+    )
+    parser.add_argument(
+        "-v", "--verbosity", action="count", default=0, help="Set verbosity (0: DEBUG, 1: VERBOSE, 2: INFO)"
+    )
@@ -19,7 +19,31 @@ PYTHON_BIN = PYTHON_BIN_WINDOWS if os.name == "nt" else PYTHON_BIN_UNIX
 
 # Type hints constants
 MYPY_TYPE_HINT_CONFIG = os.path.join(ROOT_DIR, "config", "mypy_type_hints_2024.ini")
-MYPY_LINE_COUNT_REPORT = os.path.join(REPORTS_TEMP_DIR, "linecount.txt")
+MYPY_LINE_COUNT_REPORT_NAME = "linecount.txt"
+MYPY_INLINE_CONFIG_PREFIX = "# mypy: "
+TYPE_HINTS_ENGINE_NATIVE = "native"
+TYPE_HINTS_ENGINE_MYPY = "mypy"
+TYPE_HINTS_REPORTS_DIR_PREFIX = "type-hints-"
+LINECOUNT_PARALLEL_MIN_FILES = 64
+LINECOUNT_CHUNKS_PER_WORKER = 4
+LINECOUNT_CACHE_KEY_LENGTH = 32
+DATACLASS_DECORATOR = "dataclasses.dataclass"
+TOTAL_ORDERING_DECORATOR = "functools.total_ordering"
+ATTRS_DECORATORS = [
+    "attr.s",
+    "attr.attrs",
+    "attr.attributes",
+    "attr.dataclass",
+    "attr.frozen",
+    "attrs.frozen",
+    "attr.define",
+    "attr.mutable",
+    "attrs.define",
+    "attrs.mutable",
+]
+ORDERING_METHODS = ["__lt__", "__le__", "__gt__", "__ge__"]
+DATACLASS_DUNDER_REPLACE_VERSION = (3, 13)
+PACKAGE_INIT_FILES = ["__init__.pyi", "__init__.py"]
 
 # Virtual environment constants
 REQUIREMENTS_FILENAME = "requirements.txt"
@@ -30,27 +54,77 @@ PIP_PATH_UNIX = os.path.join("bin", "pip")
 
 PIP_PATH = PIP_PATH_WINDOWS if os.name == "nt" else PIP_PATH_UNIX
 
+VENV_BIN_DIR_WINDOWS = "Scripts"
+VENV_BIN_DIR_UNIX = "bin"
+VENV_BIN_DIR = VENV_BIN_DIR_WINDOWS if os.name == "nt" else VENV_BIN_DIR_UNIX
+
 GRADER_REQUIREMENTS = os.path.join(CONFIG_DIR, "grader_requirements.txt")
 
+# Virtual environment cache constants
+VENV_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024  # 10 GiB
+VENV_CACHE_KEY_LENGTH = 32
+VENV_CACHE_METADATA_FILENAME = "entry.json"
+VENV_CACHE_LOCK_TIMEOUT = 30 * 60  # seconds
+VENV_CACHE_LOCK_POLL_INTERVAL = 1  # seconds
+VENV_CACHE_LOCK_HEARTBEAT_INTERVAL = 60  # seconds
+VENV_CACHE_EVICTION_GRACE_PERIOD = 60 * 60  # seconds
+
+# Virtual environment pool constants
+VENV_POOL_SIZE = 4
+VENV_POOL_READY_MARKER = "ready"
+VENV_POOL_CLAIMED_MARKER = "claimed"
+VENV_POOL_POLL_INTERVAL = 1  # seconds
+VENV_POOL_STALE_TIMEOUT = 6 * 60 * 60  # seconds
+
+# Workspace constants
+WORKSPACE_REPORTS_DIR = "reports"
+WORKSPACE_COVERAGE_DATA_FILE = ".coverage"
+WORKSPACE_PYTEST_CACHE_DIR = ".pytest_cache"
+WORKSPACE_MYPY_CACHE_DIR = ".mypy_cache"
+WORKSPACE_PYCACHE_DIR = "__pycache__"
+
+# Reaper constants
+REAPER_MAX_BACKLOG = 16
+
+# Astroid cache constants
+ASTROID_CACHE_KEY_LENGTH = 32
+ASTROID_CACHE_EXTENSION = ".dill"
+
+# Forkserver constants
+FORKSERVER_PRELOAD_MODULE = "grader.utils.forkserver_preload"
+FORKSERVER_PRELOAD_MODULES = ["astroid", "pylint.lint", "mypy.api", "coverage", "grader.runner"]
+
+# Mypy daemon constants
+MYPY_DAEMON_DIR_PREFIX = "mypy-daemon-"
+MYPY_DAEMON_SOCKET_NAME = "daemon.sock"
+MYPY_DAEMON_PLACEHOLDER_MODULE = "_grader_placeholder"
+MYPY_DAEMON_START_TIMEOUT = 5 * 60  # seconds
+MYPY_DAEMON_STOP_TIMEOUT = 10  # seconds
+MYPY_DAEMON_CONNECT_TIMEOUT = 30  # seconds
+MYPY_DAEMON_POLL_INTERVAL = 0.1  # seconds
+
+# Tool layer constants
+TOOL_LAYER_PTH_FILENAME = "_grader_tool_layer.pth"
+
 # Pylint constants
 PYLINT_BIN_WINDOWS = os.path.join("Scripts", "pylint.exe")
 PYLINT_BIN_UNIX = os.path.join("bin", "pylint")
 PYLINT_BIN = PYLINT_BIN_WINDOWS if os.name == "nt" else PYLINT_BIN_UNIX
 PYLINT_PATH = os.path.join(VENV_NAME, PYLINT_BIN)
 PYLINTRC = os.path.join(CONFIG_DIR, "2024.pylintrc")
+PYLINT_CACHE_KEY_LENGTH = 32
+PYLINT_STAT_CATEGORIES = ["convention", "error", "fatal", "info", "refactor", "statement", "warning"]
+PYLINT_STATS_REPORTER = "grader_stats_reporter.GraderStatsReporter"
+PYLINT_DUPLICATE_CODE = "duplicate-code"
+PYLINT_DEFAULT_EVALUATION = (
+    "max(0, 0 if fatal else 10.0 - ((float(5 * error + warning + refactor + convention) / statement) * 10))"
+)
 
 # Coverage constants
-COVERAGE_BIN_WINDOWS = "coverage.exe"
-COVERAGE_BIN_UNIX = "coverage"
-COVERAGE_BIN = COVERAGE_BIN_WINDOWS if os.name == "nt" else COVERAGE_BIN_UNIX
-
-COVERAGE_PATH_WINDOWS = os.path.join(VENV_NAME, "Scripts", COVERAGE_BIN)
-COVERAGE_PATH_UNIX = os.path.join(VENV_NAME, "bin", COVERAGE_BIN)
-COVERAGE_PATH = COVERAGE_PATH_WINDOWS if os.name == "nt" else COVERAGE_PATH_UNIX
-COVERAGE_RUN_ARGS = ["run", "-m"]
-COVERAGE_RUN_PYTEST_ARGS = ["pytest"]
-COVERAGE_REPORT_ARGS = ["report", "--format=total"]
-COVERAGE_REPORT_ARGS_NO_FORMAT = ["report"]
+COVERAGE_JSON_REPORT_NAME = "coverage.json"
+COVERAGE_REPORTS_DIR_PREFIX = "coverage-"
+COVERAGE_RUNNER = "grader_coverage_runner.py"
+COVERAGE_RUNNER_REPORT_ERROR = 64  # The exit code of the runner, when the report fails
 
 # Tests constants
 POSSIBLE_TEST_DIRS = ["tests", "test", "tst"]
@@ -0,0 +1,31 @@
+"""
+Module containing the forkserver of the batch workers.
+The forkserver imports the checks' tooling once, and each worker is forked from it, instead of starting
+a fresh interpreter and importing everything again.
+"""
+
+import logging
+import multiprocessing
+from multiprocessing.context import BaseContext
+
+import grader.utils.constants as const
+
+logger = logging.getLogger("grader")
+
+
+def get_worker_context() -> BaseContext:
+    """
+    Get the multiprocessing context for the batch workers, forking them from a preloaded forkserver.
+    The forkserver isn't available on Windows, where the default context is used instead.
+
+    :return: The multiprocessing context
+    :rtype: BaseContext
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        logger.warning("The forkserver is not supported on this platform, starting the workers the default way")
+        return multiprocessing.get_context()
+
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([const.FORKSERVER_PRELOAD_MODULE])
+
+    return context
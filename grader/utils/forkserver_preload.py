@@ -0,0 +1,23 @@
+"""
+Module imported by the forkserver of the batch workers, before it forks any of them.
+It imports the heavy tooling once, and then freezes everything imported so far.
+Frozen objects are never visited by the garbage collector, so the workers don't write to (and copy) the pages
+they share with the forkserver.
+"""
+
+import gc
+import importlib
+import logging
+
+import grader.utils.constants as const
+
+logger = logging.getLogger("grader")
+
+
+for module_name in const.FORKSERVER_PRELOAD_MODULES:
+    try:
+        importlib.import_module(module_name)
+    except ImportError as error:
+        logger.debug("Failed to preload %s: %s", module_name, error)
+
+gc.freeze()
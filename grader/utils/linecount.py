@@ -0,0 +1,780 @@
+"""
+Module containing the native linecount engine.
+The type hints check only needs the linecount report of mypy - the amount of annotated functions of each module.
+The report is computed here from the syntax trees of the modules, without type checking them, the same way mypy does.
+The counts are approximate - the classes mypy only recognizes through type checking, such as the dataclass bases
+reached through assignments or star imports, or the dataclass_transform decorators, are counted like any other class.
+"""
+
+import ast
+import configparser
+import fnmatch
+import functools
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional, Union
+
+import grader.utils.constants as const
+
+logger = logging.getLogger("grader")
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+LineCount = tuple[int, int, int, int]
+# The fields a class declares, if it is a dataclass, and the full names of its bases
+ClassInfo = tuple[int, tuple[str, ...]]
+
+
+class ModuleVisitor(ast.NodeVisitor):
+    """
+    Visits a module, resolving the names it uses to their full names, through its imports - like mypy does.
+    The classes of the module are named by the module, e.g. "package.models.Point".
+    """
+
+    def __init__(self, module_name: str = "", is_package: bool = False):
+        self._module_name = module_name
+        self.__is_package = is_package
+        self.__imported_names: dict[str, str] = {}
+        self.__class_names: set[str] = set()
+
+    def visit_Import(self, node: ast.Import):  # pylint: disable=invalid-name
+        """
+        Remember the names the modules are imported as.
+
+        :param node: The import statement
+        :type node: ast.Import
+        """
+        for alias in node.names:
+            if alias.asname is not None:
+                self.__imported_names[alias.asname] = alias.name
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):  # pylint: disable=invalid-name
+        """
+        Remember the names the module members are imported as.
+
+        :param node: The import statement
+        :type node: ast.ImportFrom
+        """
+        module = self._resolve_import(node)
+        if module is None:
+            return
+
+        for alias in node.names:
+            self.__imported_names[alias.asname or alias.name] = f"{module}.{alias.name}"
+
+    def visit_ClassDef(self, node: ast.ClassDef):  # pylint: disable=invalid-name
+        """
+        Remember the name of a class of the module.
+
+        :param node: The class definition
+        :type node: ast.ClassDef
+        """
+        self.__class_names.add(node.name)
+
+    def _resolve_import(self, node: ast.ImportFrom) -> Optional[str]:
+        """
+        Resolve the full name of the module a member is imported from, relative to this module if needed.
+
+        :param node: The import statement
+        :return: The full name of the module, or None if it is out of the packages
+        """
+        return resolve_import_module(self._module_name, self.__is_package, node)
+
+    def _resolve(self, node: ast.expr) -> str:
+        """
+        Resolve the full name of a name or an attribute expression, through the imports and the classes of the module.
+
+        :param node: The expression
+        :return: The full name
+        """
+        name, _, attribute = get_dotted_name(node).partition(".")
+        if name in self.__imported_names:
+            full_name = self.__imported_names[name]
+        elif name in self.__class_names:
+            full_name = self._qualify(name)
+        else:
+            full_name = name
+
+        return f"{full_name}.{attribute}" if attribute else full_name
+
+    def _qualify(self, name: str) -> str:
+        """
+        Get the full name of a class of the module.
+
+        :param name: The name of the class
+        :return: The full name
+        """
+        return f"{self._module_name}.{name}" if self._module_name else name
+
+    def _is_dataclass(self, decorator: ast.expr) -> bool:
+        """
+        Check if a class decorator is dataclasses.dataclass, called or not.
+
+        :param decorator: The decorator
+        :return: True if the decorator is dataclasses.dataclass, False otherwise
+        """
+        decorator_name = self._resolve(decorator.func if isinstance(decorator, ast.Call) else decorator)
+        return decorator_name == const.DATACLASS_DECORATOR
+
+
+class ClassCollector(ModuleVisitor):
+    """
+    Collects the classes of a module - the fields each dataclass declares, and the full names of the bases of each
+    class, so that dataclasses inherit the fields of their bases from any module of the project.
+
+    The names a module imports are collected as classes deriving from the imported ones, without fields of their own,
+    so that a dataclass inherits the same fields through a re-export.
+    """
+
+    def __init__(self, module_name: str = "", is_package: bool = False):
+        super().__init__(module_name, is_package)
+        self.classes: dict[str, ClassInfo] = {}
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):  # pylint: disable=invalid-name
+        """
+        Remember the names the module members are imported as, and collect them as classes.
+
+        :param node: The import statement
+        :type node: ast.ImportFrom
+        """
+        super().visit_ImportFrom(node)
+
+        module = self._resolve_import(node)
+        if module is None:
+            return
+
+        for alias in node.names:
+            self.classes.setdefault(self._qualify(alias.asname or alias.name), (0, (f"{module}.{alias.name}",)))
+
+    def visit_ClassDef(self, node: ast.ClassDef):  # pylint: disable=invalid-name
+        """
+        Collect a class, and the classes nested in it.
+
+        :param node: The class definition
+        :type node: ast.ClassDef
+        """
+        self.generic_visit(node)
+
+        is_dataclass = any(self._is_dataclass(decorator) for decorator in node.decorator_list)
+        fields = count_dataclass_fields(node) if is_dataclass else 0
+        bases = tuple(self._resolve(base) for base in node.bases)
+
+        super().visit_ClassDef(node)
+        self.classes[self._qualify(node.name)] = (fields, bases)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):  # pylint: disable=invalid-name
+        """
+        Skip a function - mypy doesn't count the classes in the function bodies.
+
+        :param node: The function definition
+        :type node: ast.FunctionDef
+        """
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):  # pylint: disable=invalid-name
+        """
+        Skip a coroutine function - mypy doesn't count the classes in the function bodies.
+
+        :param node: The function definition
+        :type node: ast.AsyncFunctionDef
+        """
+
+
+class FunctionCounter(ModuleVisitor):
+    """
+    Counts the annotated and unannotated functions of a module, like the linecount reporter of mypy.
+
+    The functions and methods are counted, including the overloads, but not the functions nested in them -
+    mypy doesn't visit the function bodies either. A function is annotated when any of its arguments or its
+    return value is, by an annotation or a type comment.
+
+    Mypy also counts the methods its plugins add to the classes decorated with dataclasses.dataclass,
+    functools.total_ordering and the class decorators of attrs (all of them annotated), so they are counted here as
+    well. Whether a dataclass gets an __init__ depends on the fields it inherits, so the fields of the dataclasses of
+    the project, inherited ones included, are given by their full names.
+    """
+
+    def __init__(
+        self, module_name: str = "", is_package: bool = False, dataclass_fields: Optional[dict[str, int]] = None
+    ):
+        super().__init__(module_name, is_package)
+        self.annotated = 0
+        self.unannotated = 0
+        self.__dataclass_fields = dataclass_fields or {}
+
+    def visit_ClassDef(self, node: ast.ClassDef):  # pylint: disable=invalid-name
+        """
+        Count the methods of a class, and the methods the plugins of mypy add to it.
+
+        :param node: The class definition
+        :type node: ast.ClassDef
+        """
+        self.generic_visit(node)
+        super().visit_ClassDef(node)
+
+        for decorator in node.decorator_list:
+            if self._is_dataclass(decorator):
+                self.annotated += self.__count_dataclass_methods(node, get_decorator_arguments(decorator))
+            elif self._resolve(decorator) == const.TOTAL_ORDERING_DECORATOR:
+                self.annotated += count_total_ordering_methods(node)
+            elif self.__is_attrs_class(decorator):
+                self.annotated += count_attrs_methods(get_decorator_arguments(decorator))
+
+    def __is_attrs_class(self, decorator: ast.expr) -> bool:
+        """
+        Check if a class decorator is one of the class decorators of attrs, called or not.
+
+        :param decorator: The decorator
+        :return: True if the decorator makes an attrs class, False otherwise
+        """
+        decorator_name = self._resolve(decorator.func if isinstance(decorator, ast.Call) else decorator)
+        return decorator_name in const.ATTRS_DECORATORS
+
+    def __count_dataclass_methods(self, node: ast.ClassDef, arguments: dict[str, object]) -> int:
+        """
+        Count the methods the dataclasses plugin of mypy adds to a dataclass.
+
+        :param node: The class definition
+        :param arguments: The constant keyword arguments of the dataclass decorator
+        :return: The amount of added methods
+        """
+        names = get_class_names(node)
+        fields = self.__dataclass_fields.get(self._qualify(node.name), 0)
+
+        # The internal replace method is always added
+        methods = 1
+        if arguments.get("init", True) and "__init__" not in names and fields:
+            methods += 1
+        if arguments.get("order", False):
+            methods += len(const.ORDERING_METHODS)
+        if sys.version_info >= const.DATACLASS_DUNDER_REPLACE_VERSION:
+            methods += 1
+        if "__post_init__" in names:
+            methods += 1
+
+        return methods
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):  # pylint: disable=invalid-name
+        """
+        Count a function, without visiting its body.
+
+        :param node: The function definition
+        :type node: ast.FunctionDef
+        """
+        self.__count(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):  # pylint: disable=invalid-name
+        """
+        Count a coroutine function, without visiting its body.
+
+        :param node: The function definition
+        :type node: ast.AsyncFunctionDef
+        """
+        self.__count(node)
+
+    def __count(self, node: FunctionNode):
+        """
+        Count a function as annotated or unannotated.
+
+        :param node: The function definition
+        """
+        if is_annotated(node):
+            self.annotated += 1
+        else:
+            self.unannotated += 1
+
+
+def is_annotated(node: FunctionNode) -> bool:
+    """
+    Check if a function has any annotation - on its arguments or its return value, or in a type comment.
+
+    :param node: The function definition
+    :return: True if the function is annotated, False otherwise
+    """
+    if node.returns is not None or node.type_comment is not None:
+        return True
+
+    arguments = node.args
+    all_arguments = [*arguments.posonlyargs, *arguments.args, *arguments.kwonlyargs]
+    all_arguments.extend(argument for argument in [arguments.vararg, arguments.kwarg] if argument is not None)
+
+    return any(argument.annotation is not None or argument.type_comment is not None for argument in all_arguments)
+
+
+def get_dotted_name(node: ast.expr) -> str:
+    """
+    Get the dotted name of a name or an attribute expression, e.g. "dataclasses.dataclass".
+
+    :param node: The expression
+    :return: The dotted name, or an empty string for any other expression
+    """
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        value = get_dotted_name(node.value)
+        return f"{value}.{node.attr}" if value else ""
+
+    return ""
+
+
+def get_class_names(node: ast.ClassDef) -> set[str]:
+    """
+    Get the names a class body defines - its methods, classes and assigned names.
+
+    :param node: The class definition
+    :return: The defined names
+    """
+    names = set()
+    for statement in node.body:
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(statement.name)
+        elif isinstance(statement, ast.Assign):
+            names.update(target.id for target in statement.targets if isinstance(target, ast.Name))
+        elif isinstance(statement, ast.AnnAssign) and isinstance(statement.target, ast.Name):
+            names.add(statement.target.id)
+
+    return names
+
+
+def count_dataclass_fields(node: ast.ClassDef) -> int:
+    """
+    Count the fields a dataclass declares - its annotated names, except the class variables.
+
+    :param node: The class definition
+    :return: The amount of fields
+    """
+    return sum(
+        1
+        for statement in node.body
+        if isinstance(statement, ast.AnnAssign)
+        and isinstance(statement.target, ast.Name)
+        and not is_class_var(statement.annotation)
+    )
+
+
+def resolve_import_module(module_name: str, is_package: bool, node: ast.ImportFrom) -> Optional[str]:
+    """
+    Resolve the full name of the module a member is imported from, like mypy does for the relative imports.
+
+    :param module_name: The full name of the importing module
+    :param is_package: Whether the importing module is a package - an __init__ module
+    :param node: The import statement
+    :return: The full name of the module, or None if a relative import goes out of the packages
+    """
+    if node.level == 0:
+        return node.module
+
+    package_parts = module_name.split(".") if is_package else module_name.split(".")[:-1]
+    if node.level - 1 > len(package_parts):
+        return None
+
+    module_parts = package_parts[: len(package_parts) - (node.level - 1)]
+    if node.module:
+        module_parts.append(node.module)
+
+    return ".".join(module_parts) or None
+
+
+def resolve_dataclass_fields(classes: dict[str, ClassInfo]) -> dict[str, int]:
+    """
+    Resolve the fields of each class, with the fields it inherits from its bases, through all the modules.
+
+    :param classes: The classes of the project, by full name
+    :return: The fields of the classes with any, by full name
+    """
+    fields: dict[str, int] = {}
+
+    def resolve(class_name: str, visiting: set[str]) -> int:
+        if class_name in fields:
+            return fields[class_name]
+        if class_name not in classes or class_name in visiting:
+            return 0
+
+        visiting.add(class_name)
+        own_fields, bases = classes[class_name]
+        fields[class_name] = own_fields + sum(resolve(base, visiting) for base in bases)
+        visiting.discard(class_name)
+
+        return fields[class_name]
+
+    for class_name in classes:
+        resolve(class_name, set())
+
+    return {class_name: count for class_name, count in fields.items() if count}
+
+
+def get_decorator_arguments(decorator: ast.expr) -> dict[str, object]:
+    """
+    Get the keyword arguments of a class decorator, which are constants - the ones the plugins of mypy look at.
+
+    :param decorator: The decorator, called or not
+    :return: The values of the constant keyword arguments, by name
+    """
+    if not isinstance(decorator, ast.Call):
+        return {}
+
+    return {
+        keyword.arg: keyword.value.value
+        for keyword in decorator.keywords
+        if keyword.arg is not None and isinstance(keyword.value, ast.Constant)
+    }
+
+
+def count_attrs_methods(arguments: dict[str, object]) -> int:
+    """
+    Count the methods the attrs plugin of mypy adds to an attrs class.
+
+    The plugin always adds __init__ (or __attrs_init__, without init), even when the class defines it, and the
+    comparison methods when the class is ordered - by default, as long as it is compared for equality.
+
+    :param arguments: The constant keyword arguments of the attrs decorator
+    :return: The amount of added methods
+    """
+    order = arguments.get("cmp")
+    if order is None:
+        equality = arguments.get("eq")
+        order = arguments.get("order")
+        if order is None:
+            order = equality is not False
+
+    return 1 + (len(const.ORDERING_METHODS) if order else 0)
+
+
+def count_total_ordering_methods(node: ast.ClassDef) -> int:
+    """
+    Count the methods the functools plugin of mypy adds to a class decorated with total_ordering.
+
+    The plugin adds the comparison methods the class doesn't define, only when all the ones it defines are annotated.
+
+    :param node: The class definition
+    :return: The amount of added methods
+    """
+    comparison_methods = [
+        statement
+        for statement in node.body
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)) and statement.name in const.ORDERING_METHODS
+    ]
+    if not comparison_methods or not all(is_annotated(method) for method in comparison_methods):
+        return 0
+
+    return len(const.ORDERING_METHODS) - len({method.name for method in comparison_methods})
+
+
+def is_class_var(annotation: ast.expr) -> bool:
+    """
+    Check if an annotation is a class variable - ClassVar, or ClassVar[...], which dataclasses don't use as fields.
+
+    :param annotation: The annotation
+    :return: True if the annotation is a class variable, False otherwise
+    """
+    if isinstance(annotation, ast.Subscript):
+        annotation = annotation.value
+
+    return get_dotted_name(annotation).split(".")[-1] == "ClassVar"
+
+
+def parse_file(file_path: str) -> tuple[bytes, ast.Module]:
+    """
+    Read and parse a module.
+
+    :param file_path: The path to the module
+    :raises LinecountError: If the module can't be read or parsed.
+    :return: The source of the module, and its syntax tree
+    """
+    try:
+        with open(file_path, "rb") as module_file:
+            source = module_file.read()
+
+        return source, ast.parse(source, filename=file_path, type_comments=True)
+    except (OSError, SyntaxError, ValueError) as error:
+        raise LinecountError(f"Failed to parse {file_path}: {error}") from error
+
+
+def is_package_file(file_path: str) -> bool:
+    """
+    Check if a module is a package - an __init__ module.
+
+    :param file_path: The path to the module
+    :return: True if the module is a package, False otherwise
+    """
+    return os.path.splitext(os.path.basename(file_path))[0] == "__init__"
+
+
+def collect_classes(file_path: str, tree: Optional[ast.Module] = None) -> dict[str, ClassInfo]:
+    """
+    Collect the classes of a module, for the fields the dataclasses inherit.
+
+    :param file_path: The path to the module
+    :param tree: The syntax tree of the module, defaults to None - the module is parsed
+    :raises LinecountError: If the module can't be read or parsed.
+    :return: The classes of the module, by full name
+    """
+    if tree is None:
+        _, tree = parse_file(file_path)
+
+    collector = ClassCollector(get_module_name(file_path), is_package_file(file_path))
+    collector.visit(tree)
+
+    return collector.classes
+
+
+def count_file(
+    file_path: str, ignore_errors: bool = False, dataclass_fields: Optional[dict[str, int]] = None
+) -> LineCount:
+    """
+    Count the lines and functions of a module, the same way the linecount reporter of mypy does.
+
+    :param file_path: The path to the module
+    :param ignore_errors: Whether mypy is configured to ignore the errors of the module, defaults to False
+    :param dataclass_fields: The fields of the dataclasses of the project, by full name, defaults to None -
+        only the module itself is looked at
+    :raises LinecountError: If the module can't be read or parsed.
+    :return: The imputed annotated lines, the physical lines, the annotated functions and all functions
+    """
+    source, tree = parse_file(file_path)
+    if dataclass_fields is None:
+        dataclass_fields = resolve_dataclass_fields(collect_classes(file_path, tree))
+
+    # Mypy counts the lines the way readlines does - split on \n only
+    physical_lines = source.count(b"\n") + (1 if source and not source.endswith(b"\n") else 0)
+
+    counter = FunctionCounter(get_module_name(file_path), is_package_file(file_path), dataclass_fields)
+    counter.visit(tree)
+    annotated_funcs = counter.annotated
+    total_funcs = counter.annotated + counter.unannotated
+
+    # Mypy doesn't count the functions of a module as annotated, when its errors are ignored
+    if ignore_errors or has_ignore_errors_comment(source.decode("utf-8", errors="replace")):
+        annotated_funcs = 0
+
+    imputed_annotated_lines = physical_lines * annotated_funcs // total_funcs if total_funcs else physical_lines
+
+    return imputed_annotated_lines, physical_lines, annotated_funcs, total_funcs
+
+
+def count_files(
+    file_paths: list[str],
+    config_file: Optional[str] = None,
+    jobs: Optional[int] = None,
+    project_files: Optional[list[str]] = None,
+) -> dict[str, LineCount]:
+    """
+    Count the lines and functions of the modules. Many modules are counted in a process pool.
+
+    First, the classes of all modules of the project are collected, so that the dataclasses inherit the fields of
+    their bases from other modules, the same way mypy resolves them.
+
+    :param file_paths: The paths to the modules
+    :param config_file: The mypy config file, deciding which modules have their errors ignored, defaults to None
+    :param jobs: The number of processes, defaults to None - as many as there are CPUs
+    :param project_files: The paths to all modules of the project, defaults to None - the counted modules
+    :raises LinecountError: If any of the modules can't be read or parsed.
+    :return: The counts of each module, by module name
+    """
+    module_names = [get_module_name(file_path) for file_path in file_paths]
+    ignored = read_ignored_modules(config_file) if config_file is not None else []
+    ignore_errors = [is_module_ignored(module_name, ignored) for module_name in module_names]
+    project_files = project_files if project_files is not None else file_paths
+
+    classes: dict[str, ClassInfo] = {}
+    if jobs == 1 or len(project_files) < const.LINECOUNT_PARALLEL_MIN_FILES:
+        for module_classes in map(collect_classes, project_files):
+            classes.update(module_classes)
+
+        count = functools.partial(count_file, dataclass_fields=resolve_dataclass_fields(classes))
+        return dict(zip(module_names, map(count, file_paths, ignore_errors)))
+
+    workers = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(project_files) // (const.LINECOUNT_CHUNKS_PER_WORKER * workers))
+        for module_classes in executor.map(collect_classes, project_files, chunksize=chunksize):
+            classes.update(module_classes)
+
+        count = functools.partial(count_file, dataclass_fields=resolve_dataclass_fields(classes))
+        chunksize = max(1, len(file_paths) // (const.LINECOUNT_CHUNKS_PER_WORKER * workers))
+        counts = list(executor.map(count, file_paths, ignore_errors, chunksize=chunksize))
+
+    return dict(zip(module_names, counts))
+
+
+def write_report(counts: dict[str, LineCount], reports_dir: str):
+    """
+    Write the linecount report, in the format of mypy - the totals, and then each module, largest first.
+
+    :param counts: The counts of each module, by module name
+    :param reports_dir: The directory to write the report to
+    """
+    sorted_counts = sorted(((count, module_name) for module_name, count in counts.items()), reverse=True)
+    total_counts = sum_counts(count for count, _ in sorted_counts)
+
+    os.makedirs(reports_dir, exist_ok=True)
+    with open(os.path.join(reports_dir, const.MYPY_LINE_COUNT_REPORT_NAME), "w", encoding="utf-8") as report_file:
+        report_file.write(f"{total_counts[0]:7} {total_counts[1]:7} {total_counts[2]:6} {total_counts[3]:6} total\n")
+        for count, module_name in sorted_counts:
+            report_file.write(f"{count[0]:7} {count[1]:7} {count[2]:6} {count[3]:6} {module_name}\n")
+
+
+def read_report(reports_dir: str) -> tuple[LineCount, dict[str, LineCount]]:
+    """
+    Read the linecount report, line by line - the totals, and the counts of each module.
+
+    :param reports_dir: The directory, containing the report
+    :raises OSError: If the report can't be read
+    :raises LinecountError: If a line of the report is malformed
+    :return: The totals, and the counts of each module, by module name
+    """
+    totals: Optional[LineCount] = None
+    counts: dict[str, LineCount] = {}
+
+    with open(os.path.join(reports_dir, const.MYPY_LINE_COUNT_REPORT_NAME), "r", encoding="utf-8") as report_file:
+        for line in report_file:
+            values = line.split()
+            if not values:
+                continue
+
+            try:
+                *numbers, module_name = values
+                count = (int(numbers[0]), int(numbers[1]), int(numbers[2]), int(numbers[3]))
+            except (ValueError, IndexError) as error:
+                raise LinecountError(f"Malformed line in the linecount report: {line.strip()}") from error
+
+            # The first line holds the totals, the rest the modules
+            if totals is None:
+                totals = count
+            else:
+                counts[module_name] = count
+
+    return totals if totals is not None else (0, 0, 0, 0), counts
+
+
+def sum_counts(counts: Iterable[LineCount]) -> LineCount:
+    """
+    Sum the counts of several modules.
+
+    :param counts: The counts of the modules
+    :return: The total counts
+    """
+    total = [0, 0, 0, 0]
+    for count in counts:
+        for index, value in enumerate(count):
+            total[index] += value
+
+    return total[0], total[1], total[2], total[3]
+
+
+def get_module_name(file_path: str) -> str:
+    """
+    Get the full name of a module, like mypy does - crawling up the packages, the directories with an __init__.py,
+    and the namespace packages within them.
+
+    :param file_path: The path to the module
+    :return: The full name of the module
+    """
+    directory, file_name = os.path.split(os.path.abspath(file_path))
+    module_name = os.path.splitext(file_name)[0]
+
+    package_name = get_package_name(directory) or ""
+    if module_name == "__init__":
+        return package_name
+
+    return f"{package_name}.{module_name}" if package_name else module_name
+
+
+@functools.lru_cache(maxsize=None)
+def get_package_name(directory: str) -> Optional[str]:
+    """
+    Get the full name of the package in a directory, like mypy does.
+
+    :param directory: The absolute path to the directory
+    :return: The full name of the package, or None if the directory isn't in a package
+    """
+    parent, name = os.path.split(directory)
+    name = name.removesuffix("-stubs")
+
+    if any(os.path.isfile(os.path.join(directory, init_file)) for init_file in const.PACKAGE_INIT_FILES):
+        parent_package = get_package_name(parent)
+        return f"{parent_package}.{name}" if parent_package else name
+
+    if not name or not parent or not name.isidentifier():
+        return None
+
+    # A directory without an __init__.py is a namespace package, if any of its parents is a package
+    parent_package = get_package_name(parent)
+    return f"{parent_package}.{name}" if parent_package is not None else None
+
+
+def has_ignore_errors_comment(source: str) -> bool:
+    """
+    Check if a module ignores its errors with an inline mypy configuration comment - "# mypy: ignore-errors".
+
+    :param source: The source code of the module
+    :return: True if the module ignores its errors, False otherwise
+    """
+    if const.MYPY_INLINE_CONFIG_PREFIX not in source:
+        return False
+
+    ignore_errors = False
+    for line in source.split("\n"):
+        if not line.startswith(const.MYPY_INLINE_CONFIG_PREFIX):
+            continue
+
+        for setting in line.removeprefix(const.MYPY_INLINE_CONFIG_PREFIX).split(","):
+            key, _, value = setting.partition("=")
+            if key.strip().replace("-", "_") == "ignore_errors":
+                ignore_errors = value.strip().lower() in ("", "1", "yes", "true", "on")
+
+    return ignore_errors
+
+
+def read_ignored_modules(config_file: str) -> list[str]:
+    """
+    Read the patterns of the modules, which have their errors ignored in the mypy config file.
+
+    :param config_file: The path to the mypy config file
+    :return: The module patterns, "*" for all modules
+    """
+    parser = configparser.ConfigParser()
+    parser.read(config_file, encoding="utf-8")
+
+    ignored = []
+    for section in parser.sections():
+        if section != "mypy" and not section.startswith("mypy-"):
+            continue
+
+        try:
+            if not parser.getboolean(section, "ignore_errors", fallback=False):
+                continue
+        except ValueError:
+            logger.debug("Invalid ignore_errors value in the section %s of %s", section, config_file)
+            continue
+
+        if section == "mypy":
+            ignored.append("*")
+        else:
+            ignored.extend(pattern.strip() for pattern in section.removeprefix("mypy-").split(","))
+
+    return ignored
+
+
+def is_module_ignored(module_name: str, patterns: list[str]) -> bool:
+    """
+    Check if a module matches any of the module patterns of the mypy config file.
+
+    :param module_name: The full name of the module
+    :param patterns: The module patterns
+    :return: True if the module matches, False otherwise
+    """
+    for pattern in patterns:
+        # "package.*" matches the package itself, as well as its submodules
+        if pattern.endswith(".*") and module_name == pattern[:-2]:
+            return True
+        if fnmatch.fnmatchcase(module_name, pattern):
+            return True
+
+    return False
+
+
+class LinecountError(Exception):
+    """
+    Exception raised when a module can't be counted.
+    """
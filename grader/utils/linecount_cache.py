@@ -0,0 +1,141 @@
+"""
+Module containing the linecount cache.
+The linecount of a module depends on the modules it imports as well (e.g. the fields its dataclasses inherit),
+so the counts are reused while the whole project and the mypy config are the same - on regrades of unchanged projects.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import uuid
+from typing import Optional
+
+import mypy.version
+
+import grader.utils.constants as const
+from grader.utils.linecount import LineCount
+from grader.utils.pylint_cache import hash_file, hash_files
+
+logger = logging.getLogger("grader")
+
+
+class LinecountCache:
+    """
+    Content-addressed cache of per-module linecounts - the table of the linecount report.
+
+    Each entry is keyed by a hash of the file content and its module name, the content of all project files,
+    the mypy config, the engine which counted it, the grader, mypy and Python versions
+    (mypy adds methods to dataclasses depending on the version). So any change to the project invalidates
+    the entries of all its modules.
+    An entry holds the linecount of the module - the annotated lines, the lines, the annotated functions and the
+    functions.
+
+    Entries are written atomically, so the cache can be shared between processes.
+    """
+
+    def __init__(self, cache_dir: str):
+        self._cache_dir = os.path.abspath(cache_dir)
+
+    @property
+    def cache_dir(self) -> str:
+        """
+        :returns: The directory, containing the cache entries.
+        :rtype: str
+        """
+        return self._cache_dir
+
+    @staticmethod
+    def compute_context(config_path: str, engine: str, source_files: list[str], project_root: str) -> str:
+        """
+        Compute the part of the cache key, shared by all modules of a project.
+
+        :param config_path: The path to the mypy config.
+        :type config_path: str
+        :param engine: The engine, counting the modules.
+        :type engine: str
+        :param source_files: All source files of the project.
+        :type source_files: list[str]
+        :param project_root: The root directory of the project.
+        :type project_root: str
+        :raises OSError: If the mypy config or a source file can't be read.
+        :return: The context of the cache keys.
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+
+        parts = [engine, const.VERSION, mypy.version.__version__, sys.version, hash_file(config_path)]
+        for part in parts + [hash_files(source_files, project_root)]:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def compute_key(file_path: str, module_name: str, context: str) -> str:
+        """
+        Compute the cache key for a module.
+
+        :param file_path: The path to the module.
+        :type file_path: str
+        :param module_name: The full name of the module.
+        :type module_name: str
+        :param context: The context of the project, as returned by compute_context.
+        :type context: str
+        :return: The cache key.
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+
+        for part in [context, module_name, hash_file(file_path)]:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+
+        return digest.hexdigest()[: const.LINECOUNT_CACHE_KEY_LENGTH]
+
+    def get(self, key: str) -> Optional[LineCount]:
+        """
+        Look up the linecount of a module in the cache.
+
+        :param key: The cache key.
+        :type key: str
+        :return: The cached linecount, or None if it is not cached.
+        :rtype: Optional[LineCount]
+        """
+        try:
+            with open(self.__entry_path(key), "r", encoding="utf-8") as entry_file:
+                annotated_lines, lines, annotated_funcs, funcs = json.load(entry_file)
+        except (OSError, ValueError, TypeError):
+            return None
+
+        return int(annotated_lines), int(lines), int(annotated_funcs), int(funcs)
+
+    def put(self, key: str, count: LineCount):
+        """
+        Store the linecount of a module in the cache.
+
+        :param key: The cache key.
+        :type key: str
+        :param count: The linecount of the module.
+        :type count: LineCount
+        """
+        entry_path = self.__entry_path(key)
+        temp_entry_path = f"{entry_path}.{uuid.uuid4().hex}.tmp"
+
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            with open(temp_entry_path, "w", encoding="utf-8") as entry_file:
+                entry_file.write(json.dumps(list(count)))
+
+            os.replace(temp_entry_path, entry_path)
+        except OSError as error:
+            logger.debug("Failed to store the linecount %s: %s", key, error)
+            if os.path.exists(temp_entry_path):
+                os.remove(temp_entry_path)
+
+    def __entry_path(self, key: str) -> str:
+        """
+        :return: The path to the entry file. Entries are spread over subdirectories, by the start of the key.
+        """
+        return os.path.join(self._cache_dir, key[:2], key + ".json")
@@ -5,11 +5,16 @@ Module containing the logger setup function and the custom VERBOSE level.
 import logging
 import sys
 
-from typing import Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
 
 VERBOSE = 15
 logging.addLevelName(VERBOSE, "VERBOSE")
 
+# The student, whose submission is being graded in the current context - None outside of the grading of a submission
+_student_id: ContextVar[Optional[str]] = ContextVar("student_id", default=None)
+
 
 def setup_logger(student_id: Optional[str] = None, verbosity: int = 0) -> logging.Logger:
     """
@@ -51,7 +56,70 @@ def setup_logger(student_id: Optional[str] = None, verbosity: int = 0) -> loggin
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(logging.Formatter(file_format))
 
+    # The records of the submissions graded in this process only go to the log files of their students
+    console_handler.addFilter(is_grader_record)
+    file_handler.addFilter(is_grader_record)
+
     logger.addHandler(console_handler)
     logger.addHandler(file_handler)
 
     return logger
+
+
+def is_grader_record(_: logging.LogRecord) -> bool:
+    """
+    Check if a record is logged outside of the grading of a submission.
+
+    Args:
+        _: The log record.
+
+    Returns:
+        bool: True if no submission is being graded in the current context, False otherwise.
+    """
+    return _student_id.get() is None
+
+
+def reset_logger() -> logging.Logger:
+    """
+    Remove all handlers from the grader logger.
+    Used in worker processes, which should not write to the console or log file inherited from the parent process.
+
+    Returns:
+        logging.Logger: The grader logger, without any handlers.
+    """
+    logger = logging.getLogger("grader")
+    logger.setLevel(logging.DEBUG)
+
+    # The handlers are not closed - they belong to the parent process. Closing them would flush the parent's buffers,
+    # which might be locked by another thread of the parent at the time of the fork.
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+    return logger
+
+
+@contextmanager
+def student_log_file(student_id: str) -> Iterator[None]:
+    """
+    Collect everything logged while inside the context in the student's log file.
+    The context is tracked with a context variable, so the submissions graded at the same time, e.g. by the tasks
+    of an event loop, each log into their own file - along with the threads they start, with a copy of the context.
+
+    Args:
+        student_id: The id of the student, used as the name of the log file.
+    """
+    logger = logging.getLogger("grader")
+
+    file_handler = logging.FileHandler(student_id + ".log")
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    file_handler.addFilter(lambda _: _student_id.get() == student_id)
+
+    token = _student_id.set(student_id)
+    logger.addHandler(file_handler)
+    try:
+        yield
+    finally:
+        logger.removeHandler(file_handler)
+        file_handler.close()
+        _student_id.reset(token)
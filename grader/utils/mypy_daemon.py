@@ -0,0 +1,424 @@
+"""
+Module containing the mypy daemon of a batch.
+Starting mypy and analyzing builtins, typing and the modules they import takes seconds, for every project. The daemon
+analyzes them once, and checks each project in a process forked from the analyzed modules.
+"""
+
+import logging
+import multiprocessing
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing.process import BaseProcess
+from typing import Optional
+
+from mypy import build as mypy_build
+from mypy import main as mypy_main
+from mypy.errors import CompileError
+from mypy.find_sources import InvalidSourceList, create_source_list
+from mypy.modulefinder import BuildSource, BuildSourceSet, FindModuleCache, compute_search_paths
+
+import grader.utils.constants as const
+from grader.utils.mypy_report import write_linecount_report
+
+logger = logging.getLogger("grader")
+
+
+class MypyDaemon:
+    """
+    The mypy daemon of a batch, owned by the batch process. Acts as a context manager.
+
+    The daemon is a process of its own, which analyzes the modules every project imports - builtins, typing and
+    the modules they import - once, and keeps them in memory. Each project is checked in a process forked from the
+    daemon, which only analyzes the modules of the project (and the modules they import, which aren't analyzed yet),
+    the same way mypy does, and writes the linecount report from the analyzed modules. The projects never change the
+    modules of the daemon, so no project sees the modules of another one.
+
+    Before each project, the daemon checks if the mypy config, or a module it has analyzed, has changed since,
+    and analyzes them again if so. The daemon is restarted if it exits while the batch is running, and stopped with
+    the batch. The checks reach it through its socket, from any worker of the batch.
+    """
+
+    def __init__(self, config_file: str):
+        self.__config_file = config_file
+        self.__socket_dir: Optional[str] = None
+        self.__process: Optional[BaseProcess] = None
+        self.__watcher: Optional[threading.Thread] = None
+        self.__stopping = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def address(self) -> str:
+        """
+        :returns: The address of the socket of the daemon.
+        :rtype: str
+        """
+        if self.__socket_dir is None:
+            raise MypyDaemonError("The mypy daemon is not started")
+
+        return os.path.join(self.__socket_dir, const.MYPY_DAEMON_SOCKET_NAME)
+
+    @property
+    def pid(self) -> Optional[int]:
+        """
+        :returns: The process id of the daemon, or None if it isn't started.
+        :rtype: Optional[int]
+        """
+        return self.__process.pid if self.__process is not None else None
+
+    def is_running(self) -> bool:
+        """
+        Check if the daemon is running.
+
+        :return: True if the daemon is running, False otherwise.
+        :rtype: bool
+        """
+        return self.__process is not None and self.__process.is_alive()
+
+    def start(self):
+        """
+        Start the daemon, and wait until it has analyzed the modules every project imports.
+
+        :raises MypyDaemonError: If the daemon fails to start.
+        """
+        self.__socket_dir = tempfile.mkdtemp(prefix=const.MYPY_DAEMON_DIR_PREFIX)
+        self.__stopping.clear()
+
+        try:
+            self.__spawn()
+        except MypyDaemonError:
+            shutil.rmtree(self.__socket_dir, ignore_errors=True)
+            self.__socket_dir = None
+            raise
+
+        self.__watcher = threading.Thread(target=self.__watch, name="mypy-daemon-watcher", daemon=True)
+        self.__watcher.start()
+
+    def stop(self):
+        """
+        Stop the daemon, and remove its socket. The checks still running in its forked processes are finished.
+        """
+        self.__stopping.set()
+        self.__terminate()
+
+        # The watcher may be restarting the daemon - the restarted daemon is terminated as well
+        if self.__watcher is not None:
+            self.__watcher.join()
+            self.__watcher = None
+        self.__terminate()
+
+        if self.__socket_dir is not None:
+            shutil.rmtree(self.__socket_dir, ignore_errors=True)
+            self.__socket_dir = None
+
+    def __spawn(self):
+        """
+        Start the daemon process, in a fresh interpreter, and wait until it is ready.
+
+        :raises MypyDaemonError: If the daemon fails to start.
+        """
+        # A daemon, which has exited, leaves its socket behind
+        if os.path.exists(self.address):
+            os.remove(self.address)
+
+        # The daemon forks a process for each project, so it is started without the threads of the batch process
+        context = multiprocessing.get_context("spawn")
+        ready_reader, ready_writer = context.Pipe(duplex=False)
+        process = context.Process(
+            target=serve, args=(self.address, self.__config_file, ready_writer), name="mypy-daemon", daemon=True
+        )
+        process.start()
+        ready_writer.close()
+
+        try:
+            if ready_reader.poll(const.MYPY_DAEMON_START_TIMEOUT):
+                error = ready_reader.recv()
+            else:
+                error = "Timed out while starting the mypy daemon"
+        except EOFError:
+            process.join()
+            error = f"The mypy daemon exited with code {process.exitcode} while starting"
+        finally:
+            ready_reader.close()
+
+        if error is not None:
+            process.kill()
+            process.join()
+            raise MypyDaemonError(error)
+
+        self.__process = process
+        logger.debug("Started the mypy daemon %s", self.address)
+
+    def __watch(self):
+        """
+        Restart the daemon whenever it exits, until it is stopped. Executed in a thread of the batch process.
+        """
+        while not self.__stopping.is_set():
+            process = self.__process
+            if process is None:
+                return
+
+            process.join()
+            if self.__stopping.is_set():
+                return
+
+            logger.warning("The mypy daemon exited with code %s, restarting it", process.exitcode)
+            try:
+                self.__spawn()
+            except MypyDaemonError as error:
+                # The checks run mypy themselves from now on
+                logger.error("Failed to restart the mypy daemon: %s", error)
+                return
+
+    def __terminate(self):
+        """
+        Terminate the daemon process, if it is running - or kill it, if it doesn't exit in time.
+        """
+        process = self.__process
+        if process is None or not process.is_alive():
+            return
+
+        process.terminate()
+        process.join(const.MYPY_DAEMON_STOP_TIMEOUT)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+
+class SharedBuild:
+    """
+    The mypy build of the modules every project imports, analyzed once. Lives in the daemon process.
+
+    The build is extended by a project in a process forked from the daemon - the project's modules are loaded into
+    the build graph and analyzed in dependency order, the way mypy analyzes the modules it doesn't find in its cache.
+    """
+
+    def __init__(self, config_file: str):
+        self.__config_file = config_file
+
+        _, self.__options = mypy_main.process_options(["--config-file", config_file], require_targets=False)
+        # The report needs the function definitions, which mypy drops once a module is checked
+        self.__options.preserve_asts = True
+        self.__options.incremental = False
+
+        placeholder = BuildSource(None, const.MYPY_DAEMON_PLACEHOLDER_MODULE, text="")
+        self.__result = mypy_build.build([placeholder], self.__options)
+        self.__snapshot = self.__take_snapshot()
+
+    def is_stale(self) -> bool:
+        """
+        Check if the mypy config, or a module of the build, has changed since it was analyzed.
+
+        :return: True if the build has to be analyzed again, False otherwise.
+        :rtype: bool
+        """
+        return self.__take_snapshot() != self.__snapshot
+
+    def check(self, source_files: list[str], reports_dir: str) -> list[str]:
+        """
+        Check a project, and write its linecount report. Executed in a process forked from the daemon,
+        as the project is added to the build.
+
+        :param source_files: The source files of the project.
+        :type source_files: list[str]
+        :param reports_dir: The directory to write the report to.
+        :type reports_dir: str
+        :return: The blocking errors of mypy, if any - mypy writes no report for them.
+        :rtype: list[str]
+        """
+        manager = self.__result.manager
+
+        try:
+            manager.fscache.flush()
+            sources = create_source_list(source_files, self.__options, manager.fscache)
+
+            if any(source.module in self.__result.graph for source in sources):
+                # A module of the project shadows a module of the build - it is checked without the build, so mypy
+                # reports it the way it always does
+                sources, options = mypy_main.process_options(["--config-file", self.__config_file] + source_files)
+                options.preserve_asts = True
+                options.incremental = False
+                result = mypy_build.build(sources, options)
+            else:
+                result = self.__extend(sources)
+        except InvalidSourceList as error:
+            return [str(error)]
+        except CompileError as error:
+            return error.messages
+
+        write_linecount_report(sources, reports_dir, result)
+        return []
+
+    def __extend(self, sources: list[BuildSource]) -> mypy_build.BuildResult:
+        """
+        Add the project to the build, and analyze the modules which aren't analyzed yet.
+
+        :param sources: The source modules of the project
+        :raises CompileError: If mypy reports blocking errors, e.g. a syntax error.
+        :return: The result of the extended build
+        """
+        manager = self.__result.manager
+
+        # The imports are resolved from the directories of the project, like in a build of the project
+        manager.search_paths = compute_search_paths(sources, self.__options, manager.data_dir)
+        manager.source_set = BuildSourceSet(sources)
+        manager.find_module_cache = FindModuleCache(
+            manager.search_paths, manager.fscache, self.__options, source_set=manager.source_set
+        )
+
+        graph = mypy_build.load_graph(sources, manager, old_graph=dict(self.__result.graph))
+        for component in mypy_build.sorted_components(graph):
+            if component.isdisjoint(self.__result.graph):
+                mypy_build.process_stale_scc(graph, mypy_build.order_ascc(graph, component), manager)
+
+        return mypy_build.BuildResult(manager, graph)
+
+    def __take_snapshot(self) -> dict[str, tuple[int, int]]:
+        """
+        Take the modification times and sizes of the mypy config and the modules of the build.
+
+        :return: The modification time and size of each file, or an empty snapshot, if a file can't be read
+        """
+        paths = [self.__config_file] + [state.path for state in self.__result.graph.values() if state.path]
+
+        try:
+            return {path: (os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in paths}
+        except OSError:
+            return {}
+
+
+def serve(address: str, config_file: str, ready: Connection):
+    """
+    Analyze the modules every project imports, and check the projects sent to the socket, each in a forked process.
+    Executed in the daemon process.
+
+    :param address: The address of the socket.
+    :type address: str
+    :param config_file: The mypy config.
+    :type config_file: str
+    :param ready: The connection to report to, once the daemon is ready - with None, or the reason it failed.
+    :type ready: Connection
+    """
+    try:
+        build = SharedBuild(config_file)
+        listener = Listener(address, family="AF_UNIX", authkey=multiprocessing.current_process().authkey)
+    except (CompileError, OSError, SystemExit) as error:
+        ready.send(f"Failed to analyze the shared modules: {error}")
+        return
+
+    ready.send(None)
+    ready.close()
+
+    with listener:
+        while True:
+            try:
+                connection = listener.accept()
+            except (OSError, multiprocessing.AuthenticationError):
+                continue
+
+            reap_children()
+            if build.is_stale():
+                build = SharedBuild(config_file)
+
+            if os.fork() == 0:
+                # The forked process exits without closing the listener, which would remove the socket
+                exitcode = 1
+                try:
+                    handle_check(connection, build)
+                    exitcode = 0
+                finally:
+                    os._exit(exitcode)  # pylint: disable=protected-access
+
+            connection.close()
+
+
+def handle_check(connection: Connection, build: SharedBuild):
+    """
+    Receive a project from a check, check it, and send the blocking errors back. Executed in a forked process.
+    If mypy crashes, nothing is sent, and the check gets the closed connection.
+
+    :param connection: The connection to the check.
+    :type connection: Connection
+    :param build: The shared build.
+    :type build: SharedBuild
+    """
+    with connection:
+        source_files, reports_dir = connection.recv()
+        connection.send(build.check(source_files, reports_dir))
+
+
+def reap_children():
+    """
+    Reap the forked processes which have finished their checks.
+    """
+    try:
+        while os.waitpid(-1, os.WNOHANG)[0] != 0:
+            pass
+    except ChildProcessError:
+        pass
+
+
+def check_project(address: str, source_files: list[str], reports_dir: str) -> list[str]:
+    """
+    Check a project with the mypy daemon, which writes the linecount report of the project.
+    While the daemon is restarted, the connection is retried for a while.
+
+    :param address: The address of the socket of the daemon.
+    :type address: str
+    :param source_files: The source files of the project.
+    :type source_files: list[str]
+    :param reports_dir: The directory to write the report to.
+    :type reports_dir: str
+    :raises MypyDaemonError: If the daemon can't be reached, or fails while checking the project.
+    :return: The blocking errors of mypy, if any - mypy writes no report for them.
+    :rtype: list[str]
+    """
+    deadline = time.monotonic() + const.MYPY_DAEMON_CONNECT_TIMEOUT
+    authkey = multiprocessing.current_process().authkey
+
+    while True:
+        try:
+            connection = Client(address, family="AF_UNIX", authkey=authkey)
+            break
+        except (OSError, EOFError) as error:
+            # The daemon is restarting, or has exited while accepting the connection
+            if time.monotonic() >= deadline:
+                raise MypyDaemonError(f"Failed to connect to the mypy daemon: {error}") from error
+            time.sleep(const.MYPY_DAEMON_POLL_INTERVAL)
+        except multiprocessing.AuthenticationError as error:
+            raise MypyDaemonError(f"Failed to connect to the mypy daemon: {error}") from error
+
+    with connection:
+        try:
+            connection.send(
+                ([os.path.abspath(source_file) for source_file in source_files], os.path.abspath(reports_dir))
+            )
+            return connection.recv()
+        except (OSError, EOFError) as error:
+            raise MypyDaemonError("The mypy daemon failed while checking the project") from error
+
+
+def is_mypy_daemon_supported() -> bool:
+    """
+    Check if the mypy daemon is supported on this platform - it forks a process for each project.
+
+    :return: True if the daemon is supported, False otherwise.
+    :rtype: bool
+    """
+    return hasattr(os, "fork") and hasattr(socket, "AF_UNIX")
+
+
+class MypyDaemonError(Exception):
+    """
+    Exception raised when the mypy daemon can't be started or can't check a project.
+    """
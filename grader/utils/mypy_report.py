@@ -0,0 +1,45 @@
+"""
+Module containing the linecount report of the modules mypy has analyzed in the grader process.
+Mypy ignores its cache whenever it writes a report, so the grader writes the report itself, with the reporter of mypy,
+from the modules of a build.
+"""
+
+import os
+
+from mypy import build as mypy_build
+from mypy.report import Reports
+from mypy.util import decode_python_encoding
+
+
+def write_linecount_report(sources: list[mypy_build.BuildSource], reports_dir: str, result: mypy_build.BuildResult):
+    """
+    Write the mypy linecount report of the source modules, the same way mypy does - from the analyzed modules,
+    each with its own options, including its inline configuration comments.
+
+    :param sources: The source modules
+    :param reports_dir: The directory to write the report to
+    :param result: The result of the mypy build
+    """
+    os.makedirs(reports_dir, exist_ok=True)
+    reports = Reports(mypy_build.default_data_dir(), {"linecount": reports_dir})
+
+    for source in sources:
+        # Like mypy, only the modules which have been analyzed are reported
+        state = result.graph.get(source.module)
+        if source.path is None or state is None or state.tree is None:
+            continue
+
+        reports.file(state.tree, result.files, result.types, state.options)
+
+    reports.finish()
+
+
+def read_module(file_path: str) -> str:
+    """
+    Read the source of a module, decoded the same way mypy decodes it.
+
+    :param file_path: The path to the module
+    :return: The source of the module
+    """
+    with open(file_path, "rb") as module_file:
+        return decode_python_encoding(module_file.read())
@@ -2,16 +2,41 @@
 Module containing a wrapper for launching shell commands
 """
 
+import asyncio
+import contextvars
+import locale
 import logging
+import os
 import subprocess
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Generator, Optional, TypeVar
 
 # from grader.utils.logger import VERBOSE
 
 logger = logging.getLogger("grader")
 
+T = TypeVar("T")
 
-def run(command: list[str], current_directory: Optional[str] = None) -> subprocess.CompletedProcess[str]:
+
+@dataclass(frozen=True)
+class Command:
+    """
+    A command to run, with its working directory and the environment variables to set on top of the current ones.
+    """
+
+    args: list[str]
+    current_directory: Optional[str] = None
+    env: Optional[dict[str, str]] = None
+
+
+# A generator, which yields the commands to run at the same time, is sent their outputs, and returns its result
+Steps = Generator[list[Command], list[subprocess.CompletedProcess[str]], T]
+
+
+def run(
+    command: list[str], current_directory: Optional[str] = None, env: Optional[dict[str, str]] = None
+) -> subprocess.CompletedProcess[str]:
     """
     Execute a command in the terminal.
     Wraps the subprocess.run function, with the check=False, capture_output=True and text=True flags.
@@ -20,13 +45,197 @@ def run(command: list[str], current_directory: Optional[str] = None) -> subproce
     If the command fails, log the returncode, stdout and stderr.
 
     :param command: The command to execute
+    :param current_directory: The working directory of the command, defaults to None
+    :param env: Environment variables to set for the command, on top of the current ones, defaults to None
+    :return: The output of the command (returncode, stdout, stderr)
+    """
+    logger.debug("Running command: %s", command)
+    output = subprocess.run(
+        command, check=False, capture_output=True, text=True, cwd=current_directory, env=build_environment(env)
+    )
+
+    log_output(output)
+    return output
+
+
+async def run_async(
+    command: list[str], current_directory: Optional[str] = None, env: Optional[dict[str, str]] = None
+) -> subprocess.CompletedProcess[str]:
+    """
+    Execute a command in the terminal, without blocking the event loop.
+    The asyncio counterpart of run - the output is captured, decoded and logged the same way.
+    If the awaiting task is cancelled, the command is killed.
+
+    :param command: The command to execute
+    :param current_directory: The working directory of the command, defaults to None
+    :param env: Environment variables to set for the command, on top of the current ones, defaults to None
     :return: The output of the command (returncode, stdout, stderr)
     """
     logger.debug("Running command: %s", command)
-    output = subprocess.run(command, check=False, capture_output=True, text=True, cwd=current_directory)
+    child = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=current_directory,
+        env=build_environment(env),
+    )
+
+    try:
+        stdout, stderr = await child.communicate()
+    except asyncio.CancelledError:
+        child.kill()
+        await child.wait()
+        raise
+
+    # The return code is always set, once the output is read
+    returncode = child.returncode if child.returncode is not None else -1
+    output = subprocess.CompletedProcess(command, returncode, decode_output(stdout), decode_output(stderr))
+
+    log_output(output)
+    return output
+
+
+def run_steps(steps: Steps[T]) -> T:
+    """
+    Run the steps of a generator to completion, blocking on its commands.
+    The commands yielded together are run at the same time, each in a thread of its own.
+    If running a command fails, the error is raised in the generator, where the command was yielded.
+
+    :param steps: The generator
+    :return: The result of the generator
+    """
+    commands, result = advance(steps)
+    while commands is not None:
+        try:
+            if len(commands) == 1:
+                outputs = [run_command(commands[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=len(commands)) as executor:
+                    # The commands log on behalf of the caller, e.g. into the log file of its student
+                    futures = [
+                        executor.submit(contextvars.copy_context().run, run_command, command) for command in commands
+                    ]
+                    outputs = [future.result() for future in futures]
+        except (OSError, ValueError) as error:
+            commands, result = advance(steps, error=error)
+        else:
+            commands, result = advance(steps, outputs)
+
+    return result
+
+
+async def run_steps_async(steps: Steps[T], semaphore: Optional[asyncio.Semaphore] = None) -> T:
+    """
+    Run the steps of a generator to completion on the event loop, awaiting its commands.
+    The steps between the commands are run in a worker thread, so they don't block the event loop, while the commands
+    are awaited on the event loop itself - no thread waits for them.
+    If running a command fails, the error is raised in the generator, and the other commands yielded with it are killed.
+
+    :param steps: The generator
+    :param semaphore: Semaphore bounding the commands running at the same time, e.g. shared by the checks of many
+        projects, defaults to None (unbounded)
+    :return: The result of the generator
+    """
+    commands, result = await asyncio.to_thread(advance, steps)
+    while commands is not None:
+        tasks = [asyncio.ensure_future(run_command_async(command, semaphore)) for command in commands]
+        try:
+            outputs = list(await asyncio.gather(*tasks))
+        except (OSError, ValueError) as error:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            commands, result = await asyncio.to_thread(advance, steps, error=error)
+        else:
+            commands, result = await asyncio.to_thread(advance, steps, outputs)
+
+    return result
+
 
+def advance(
+    steps: Steps[T],
+    outputs: Optional[list[subprocess.CompletedProcess[str]]] = None,
+    error: Optional[Exception] = None,
+) -> tuple[Optional[list[Command]], Any]:
+    """
+    Advance a generator to its next commands - sending it the outputs of the previous ones, or raising their error.
+
+    :param steps: The generator
+    :param outputs: The outputs of the previous commands, defaults to None (the generator is started)
+    :param error: The error, raised by running the previous commands, defaults to None
+    :return: The next commands, or None once the generator is done, and its result
+    """
+    try:
+        if error is not None:
+            return steps.throw(error), None
+        if outputs is not None:
+            return steps.send(outputs), None
+
+        return next(steps), None
+    except StopIteration as stop:
+        return None, stop.value
+
+
+def run_command(command: Command) -> subprocess.CompletedProcess[str]:
+    """
+    Execute a command in the terminal, in its working directory and with its environment.
+
+    :param command: The command to execute
+    :return: The output of the command (returncode, stdout, stderr)
+    """
+    return run(command.args, current_directory=command.current_directory, env=command.env)
+
+
+async def run_command_async(
+    command: Command, semaphore: Optional[asyncio.Semaphore] = None
+) -> subprocess.CompletedProcess[str]:
+    """
+    Execute a command in the terminal, in its working directory and with its environment, without blocking the
+    event loop. The command waits for the semaphore first.
+
+    :param command: The command to execute
+    :param semaphore: Semaphore bounding the commands running at the same time, defaults to None (unbounded)
+    :return: The output of the command (returncode, stdout, stderr)
+    """
+    if semaphore is None:
+        return await run_async(command.args, current_directory=command.current_directory, env=command.env)
+
+    async with semaphore:
+        return await run_async(command.args, current_directory=command.current_directory, env=command.env)
+
+
+def decode_output(data: bytes) -> str:
+    """
+    Decode the raw output of a command, the same way subprocess.run does with text=True.
+
+    :param data: The raw output
+    :return: The decoded output, with universal newlines
+    """
+    text = data.decode(locale.getpreferredencoding(False))
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def build_environment(env: Optional[dict[str, str]] = None) -> Optional[dict[str, str]]:
+    """
+    Build the environment of a command, from the current environment and the variables to set.
+
+    :param env: Environment variables to set, defaults to None
+    :return: The full environment, or None to inherit the current environment as it is
+    """
+    if not env:
+        return None
+
+    return {**os.environ, **env}
+
+
+def log_output(output: subprocess.CompletedProcess[str]):
+    """
+    Log the result of a command.
+
+    :param output: The output of the command
+    """
     if output.returncode != 0:
         logger.debug("Command failed: %d %s %s", output.returncode, output.stdout, output.stderr)
     else:
         logger.debug("Command succeeded: %s", output.stdout)
-    return output
@@ -0,0 +1,169 @@
+"""
+Module containing the pylint result cache.
+The pylint results of each file are stored, and reused while the project is the same -
+regrades, and the submissions linted ahead of grading.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import uuid
+from typing import Any, Optional
+
+import pylint
+
+import grader.utils.constants as const
+
+logger = logging.getLogger("grader")
+
+
+class PylintCache:
+    """
+    Content-addressed cache of per-file pylint results.
+
+    Each entry is keyed by a hash of the file content and its path within the project, the pylintrc,
+    the pylint and Python versions, the project's requirements (which decide the import errors)
+    and the content of all project files - the messages of a file depend on the modules it imports
+    (inference, no-member, no-name-in-module) and on the other files (duplicate-code).
+    So any change to the project invalidates the entries of all its files.
+    An entry holds the messages of the file, and its statistics - enough to compute the score of a whole project.
+
+    Entries are written atomically, so the cache can be shared between processes.
+    """
+
+    def __init__(self, cache_dir: str):
+        self._cache_dir = os.path.abspath(cache_dir)
+
+    @property
+    def cache_dir(self) -> str:
+        """
+        :returns: The directory, containing the cache entries.
+        :rtype: str
+        """
+        return self._cache_dir
+
+    @staticmethod
+    def compute_context(rcfile_path: Optional[str], requirements: list[str], project_digest: str) -> str:
+        """
+        Compute the part of the cache key, shared by all files of a project.
+
+        :param rcfile_path: The path to the pylintrc, or None if pylint is run without one.
+        :type rcfile_path: Optional[str]
+        :param requirements: The normalized requirements of the project.
+        :type requirements: list[str]
+        :param project_digest: The digest of all project files, as returned by hash_files.
+        :type project_digest: str
+        :return: The context of the cache keys.
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+
+        rcfile_hash = hash_file(rcfile_path) if rcfile_path is not None else ""
+        for part in [pylint.__version__, sys.version, rcfile_hash, project_digest, *requirements]:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def compute_key(file_path: str, relative_path: str, context: str) -> str:
+        """
+        Compute the cache key for a file.
+
+        :param file_path: The path to the file.
+        :type file_path: str
+        :param relative_path: The path to the file, relative to the project root.
+        :type relative_path: str
+        :param context: The context of the project, as returned by compute_context.
+        :type context: str
+        :return: The cache key.
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+
+        for part in [context, relative_path.replace(os.sep, "/"), hash_file(file_path)]:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+
+        return digest.hexdigest()[: const.PYLINT_CACHE_KEY_LENGTH]
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """
+        Look up the results of a file in the cache.
+
+        :param key: The cache key.
+        :type key: str
+        :return: The cached results, or None if they are not cached.
+        :rtype: Optional[dict[str, Any]]
+        """
+        try:
+            with open(self.__entry_path(key), "r", encoding="utf-8") as entry_file:
+                return json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, results: dict[str, Any]):
+        """
+        Store the results of a file in the cache.
+
+        :param key: The cache key.
+        :type key: str
+        :param results: The results of the file - its messages and statistics.
+        :type results: dict[str, Any]
+        """
+        entry_path = self.__entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        temp_entry_path = f"{entry_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_entry_path, "w", encoding="utf-8") as entry_file:
+                json.dump(results, entry_file)
+
+            os.replace(temp_entry_path, entry_path)
+        except OSError as error:
+            logger.debug("Failed to store the pylint results %s: %s", key, error)
+            if os.path.exists(temp_entry_path):
+                os.remove(temp_entry_path)
+
+    def __entry_path(self, key: str) -> str:
+        """
+        :return: The path to the entry file. Entries are spread over subdirectories, by the start of the key.
+        """
+        return os.path.join(self._cache_dir, key[:2], key + ".json")
+
+
+def hash_file(file_path: str) -> str:
+    """
+    Hash the content of a file.
+
+    :param file_path: The path to the file
+    :return: The SHA-256 hash of the file content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def hash_files(file_paths: list[str], root: str) -> str:
+    """
+    Hash the paths, relative to the root, and the content of many files.
+
+    :param file_paths: The paths to the files
+    :param root: The directory, the paths are hashed relative to
+    :return: The SHA-256 hash of all files, independent of their order
+    """
+    digest = hashlib.sha256()
+    for relative_path, file_path in sorted(
+        (os.path.relpath(path, root).replace(os.sep, "/"), path) for path in file_paths
+    ):
+        digest.update(relative_path.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(hash_file(file_path).encode("utf-8"))
+        digest.update(b"\0")
+
+    return digest.hexdigest()
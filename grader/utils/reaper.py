@@ -0,0 +1,113 @@
+"""
+Module containing the background directory reaper.
+Deleting a virtual environment touches tens of thousands of files, so it is done in the background,
+instead of blocking the grading of the next project.
+"""
+
+import logging
+import os
+import queue
+import shutil
+import threading
+import uuid
+from typing import Optional
+
+import grader.utils.constants as const
+
+logger = logging.getLogger("grader")
+
+
+class Reaper:
+    """
+    Deletes directories in a background thread.
+
+    A directory is renamed first, so that its path is free to use again right away,
+    and is then deleted by the worker thread. The backlog of directories waiting for deletion is bounded -
+    once it is full, handing over another directory waits until the worker catches up.
+
+    The worker thread is started when there is something to delete, and stops once the backlog is empty.
+    It is not a daemon thread, so the process waits for the backlog to be deleted before it exits.
+    """
+
+    def __init__(self, max_backlog: int = const.REAPER_MAX_BACKLOG):
+        self._queue: queue.Queue[str] = queue.Queue(maxsize=max_backlog)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def remove(self, path: str):
+        """
+        Hand a directory over for deletion.
+
+        :param path: The path to the directory.
+        :type path: str
+        """
+        parent_dir, name = os.path.split(os.path.abspath(path))
+        reaped_path = os.path.join(parent_dir, f".{name}.reaped-{uuid.uuid4().hex}")
+
+        try:
+            os.rename(path, reaped_path)
+        except FileNotFoundError:
+            return
+        except OSError as error:
+            logger.debug("Failed to rename %s, deleting it right away: %s", path, error)
+            shutil.rmtree(path, ignore_errors=True)
+            return
+
+        self._queue.put(reaped_path)
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.__work, name="reaper")
+                self._thread.start()
+
+    def flush(self):
+        """
+        Wait until every directory handed over so far is deleted.
+        """
+        self._queue.join()
+
+    def __work(self):
+        """
+        Delete the directories in the backlog, until it is empty.
+        """
+        while True:
+            with self._lock:
+                try:
+                    path = self._queue.get_nowait()
+                except queue.Empty:
+                    self._thread = None
+                    return
+
+            try:
+                shutil.rmtree(path, ignore_errors=True)
+            finally:
+                self._queue.task_done()
+
+
+_reaper: Optional[Reaper] = None
+
+
+def get_reaper() -> Reaper:
+    """
+    Get the reaper of the current process.
+
+    :return: The reaper
+    """
+    global _reaper  # pylint: disable=global-statement
+
+    if _reaper is None:
+        _reaper = Reaper()
+
+    return _reaper
+
+
+def reset_reaper():
+    """
+    Forget the reaper inherited from the parent process - its worker thread doesn't exist in a forked child.
+    """
+    global _reaper  # pylint: disable=global-statement
+    _reaper = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_reaper)
@@ -0,0 +1,205 @@
+"""
+Module containing the requirements.txt parsing functions.
+"""
+
+import codecs
+import locale
+import os
+import re
+from typing import Optional
+
+COMMENT_PATTERN = re.compile(r"(^|\s+)#.*$")
+REQUIREMENT_PATTERN = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)(.*)$")
+OPERATOR_PATTERN = re.compile(r"\s*(===|==|~=|!=|>=|<=|<|>|,)\s*")
+ENCODING_PATTERN = re.compile(rb"coding[:=]\s*([-\w.]+)")
+
+# The byte order marks pip detects in a requirements file - the UTF-32 ones first, as they start with the UTF-16 ones
+BYTE_ORDER_MARKS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+]
+
+# Requirement lines referring to other files or local paths. Their content is not part of the requirements file.
+LOCAL_REFERENCE_PREFIXES = (
+    "-r",
+    "--requirement",
+    "-c",
+    "--constraint",
+    "-e",
+    "--editable",
+    "-f",
+    "--find-links",
+    ".",
+    "/",
+    "~",
+    "file:",
+)
+
+
+def read_requirements(requirements_path: str) -> list[str]:
+    """
+    Read a requirements file and normalize its content.
+    A missing requirements file is treated as an empty one.
+
+    :param requirements_path: The path to the requirements file
+    :raises RequirementsError: If the requirements file can't be decoded
+    :return: The normalized requirements, sorted
+    """
+    if not os.path.exists(requirements_path):
+        return []
+
+    with open(requirements_path, "rb") as requirements_file:
+        content = decode_requirements(requirements_file.read())
+
+    # Lines ending with a backslash continue on the next line
+    content = content.replace("\\\n", " ")
+
+    requirements = (normalize_requirement(line) for line in content.splitlines())
+    return sorted(requirement for requirement in requirements if requirement)
+
+
+def decode_requirements(data: bytes) -> str:
+    """
+    Decode the content of a requirements file, the same way pip does - by its byte order mark, its coding comment
+    in the first two lines, or the encoding of the locale.
+
+    :param data: The raw content of the requirements file
+    :raises RequirementsError: If the content can't be decoded
+    :return: The decoded content
+    """
+    encoding = locale.getpreferredencoding(False) or "utf-8"
+    for byte_order_mark, bom_encoding in BYTE_ORDER_MARKS:
+        if data.startswith(byte_order_mark):
+            encoding = bom_encoding
+            break
+    else:
+        match = next(filter(None, (ENCODING_PATTERN.search(line) for line in data.split(b"\n")[:2])), None)
+        if match is not None:
+            encoding = match.group(1).decode("ascii")
+
+    try:
+        return data.decode(encoding)
+    except (UnicodeDecodeError, LookupError) as error:
+        raise RequirementsError(f"Failed to decode the requirements as {encoding}: {error}") from error
+
+
+def normalize_requirement(line: str) -> str:
+    """
+    Normalize a single requirements line.
+    Comments and redundant whitespace are removed, and the project name is canonicalized (PEP 503).
+    Two lines that pip treats the same way, normalize to the same string.
+
+    :param line: A line from a requirements file
+    :return: The normalized line, or an empty string if the line has no requirement in it
+    """
+    line = COMMENT_PATTERN.sub("", line).strip()
+
+    if not line or line.startswith("-"):
+        return " ".join(line.split())
+
+    match = REQUIREMENT_PATTERN.match(line)
+    if match is None:
+        return line
+
+    name, rest = match.groups()
+    name = canonicalize_name(name)
+    rest = OPERATOR_PATTERN.sub(r"\1", " ".join(rest.split()))
+
+    return name + rest
+
+
+def canonicalize_name(name: str) -> str:
+    """
+    Canonicalize a project name, as described in PEP 503.
+
+    :param name: The project name
+    :return: The canonical project name
+    """
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def get_requirement_name(requirement: str) -> Optional[str]:
+    """
+    Get the canonical project name of a requirement.
+
+    :param requirement: A normalized requirement
+    :return: The canonical project name, or None if the requirement is an option or a reference
+    """
+    if requirement.startswith(LOCAL_REFERENCE_PREFIXES) or requirement.startswith("-"):
+        return None
+
+    match = REQUIREMENT_PATTERN.match(requirement)
+    if match is None:
+        return None
+
+    # The name is followed by extras, a version specifier, a marker or a URL - none of them match the name pattern
+    return canonicalize_name(match.group(1))
+
+
+def get_conflicting_names(requirements: list[str], other_requirements: list[str]) -> list[str]:
+    """
+    Get the projects, which are required by both sets of requirements.
+
+    :param requirements: The normalized requirements
+    :param other_requirements: The other normalized requirements
+    :return: The sorted canonical names of the projects in both
+    """
+    names = {get_requirement_name(requirement) for requirement in requirements}
+    other_names = {get_requirement_name(requirement) for requirement in other_requirements}
+
+    return sorted(name for name in names & other_names if name is not None)
+
+
+def has_local_references(requirements: list[str]) -> bool:
+    """
+    Check if the requirements refer to other files or local paths.
+    Such requirements can't be identified by their content alone.
+
+    :param requirements: The normalized requirements
+    :return: True if any requirement refers to a file or a local path, False otherwise
+    """
+    return any(requirement.startswith(LOCAL_REFERENCE_PREFIXES) for requirement in requirements)
+
+
+def get_requirements_delta(requirements: list[str], base_requirements: list[str]) -> tuple[list[str], list[str]]:
+    """
+    Compare a project's requirements to the requirements an environment was built with.
+
+    :param requirements: The normalized project requirements
+    :param base_requirements: The normalized requirements of the environment
+    :return: The requirements missing from the environment (or with another version specifier),
+    and the canonical names of the projects in the environment, which are not required anymore
+    """
+    base_requirements_set = set(base_requirements)
+    missing = [requirement for requirement in requirements if requirement not in base_requirements_set]
+
+    names = {get_requirement_name(requirement) or "" for requirement in requirements}
+    base_names = {get_requirement_name(requirement) or "" for requirement in base_requirements}
+    extra = sorted(base_names - names - {""})
+
+    return missing, extra
+
+
+def read_installed_distributions(site_packages: str) -> set[str]:
+    """
+    Get the projects installed in a site-packages directory.
+
+    :param site_packages: The path to the site-packages directory
+    :return: The canonical names of the installed projects
+    """
+    if not os.path.isdir(site_packages):
+        return set()
+
+    # The directories are named <name>-<version>.dist-info, where the dashes in the name are escaped
+    return {
+        canonicalize_name(entry.split("-", 1)[0]) for entry in os.listdir(site_packages) if entry.endswith(".dist-info")
+    }
+
+
+class RequirementsError(Exception):
+    """
+    Exception raised when a requirements file can't be read.
+    """
@@ -0,0 +1,58 @@
+"""
+Module containing the shared tool environment.
+Projects without any requirements of their own all need the same virtual environment - one with only the grader
+dependencies in it. It is built once, and shared between them, instead of creating a venv for each one.
+"""
+
+import logging
+from typing import Callable
+
+import grader.utils.constants as const
+
+from grader.utils.logger import VERBOSE
+from grader.utils.requirements import read_requirements
+from grader.utils.venv_cache import VenvCache
+
+logger = logging.getLogger("grader")
+
+
+class SharedVenv:
+    """
+    Shared tool environments, one per Python version, grader requirements and variant (e.g. the tool layer).
+
+    The environment is linked into each project without requirements, and used by all of them at the same time.
+    It is treated as read-only - nothing is installed into it once it is built.
+    """
+
+    def __init__(self, shared_dir: str):
+        self._cache = VenvCache(shared_dir)
+
+    def get_or_create(self, create: Callable[[str], None], variant: str = "") -> str:
+        """
+        Get the path to the shared environment. If it doesn't exist yet, create it.
+
+        :param create: Function creating a virtual environment with the grader dependencies at the given path.
+        :type create: Callable[[str], None]
+        :param variant: Anything else the content of the environment depends on, defaults to ""
+        :type variant: str
+        :return: The path to the shared environment.
+        :rtype: str
+        """
+        key = self._cache.compute_key([], read_requirements(const.GRADER_REQUIREMENTS), variant=variant)
+        venv_path = self._cache.get_or_create(key, create)
+
+        logger.log(VERBOSE, "Using the shared tool environment %s", venv_path)
+        return venv_path
+
+    @staticmethod
+    def is_supported(requirements: list[str]) -> bool:
+        """
+        Check if the shared environment can be used for a project.
+        It can only be used when the project has no requirements - the shared environment is never modified.
+
+        :param requirements: The normalized requirements of the project.
+        :type requirements: list[str]
+        :return: True if the shared environment can be used, False otherwise.
+        :rtype: bool
+        """
+        return not requirements
@@ -0,0 +1,158 @@
+"""
+Module containing the shared grader tool layer.
+The grader tools (pylint, coverage, pytest, ...) are installed once into a shared base environment,
+which is then layered into each student's virtual environment, instead of being reinstalled there.
+"""
+
+import glob
+import logging
+import os
+from typing import Callable, Optional
+
+import grader.utils.constants as const
+
+from grader.utils.logger import VERBOSE
+from grader.utils.requirements import get_conflicting_names, read_requirements
+from grader.utils.venv_cache import VenvCache
+
+logger = logging.getLogger("grader")
+
+
+class ToolLayer:
+    """
+    Shared base environment, containing the grader dependencies.
+
+    The base environment is built once per Python version and grader requirements, and stored in the layer directory.
+    It is treated as read-only - student environments only refer to it, and never install anything into it.
+    """
+
+    def __init__(self, layer_dir: str):
+        self._cache = VenvCache(layer_dir)
+
+    def get_or_create(self, create: Callable[[str], None]) -> str:
+        """
+        Get the path to the base environment. If it doesn't exist yet, create it.
+
+        :param create: Function creating a virtual environment with the grader dependencies at the given path.
+        :type create: Callable[[str], None]
+        :return: The path to the base environment.
+        :rtype: str
+        """
+        key = self._cache.compute_key([], read_requirements(const.GRADER_REQUIREMENTS))
+        return self._cache.get_or_create(key, create)
+
+    @staticmethod
+    def is_supported(requirements: list[str]) -> bool:
+        """
+        Check if the tool layer can be used for a student's environment.
+
+        The layer can't be used on Windows, where the console scripts are executables which can't be relocated.
+        It can't be used when the student requires one of the grader dependencies either -
+        the student's version would shadow the version the tools were installed with.
+
+        :param requirements: The normalized student requirements.
+        :type requirements: list[str]
+        :return: True if the layer can be used, False otherwise.
+        :rtype: bool
+        """
+        if os.name == "nt":
+            return False
+
+        conflicts = get_conflicting_names(requirements, read_requirements(const.GRADER_REQUIREMENTS))
+        if conflicts:
+            logger.log(VERBOSE, "Student requirements overlap with the grader tools: %s", conflicts)
+            return False
+
+        return True
+
+    @staticmethod
+    def apply(base_venv_path: str, venv_path: str):
+        """
+        Layer the base environment into a student's environment.
+
+        The base site-packages are added to the student's environment with a .pth file, using site.addsitedir,
+        so that the .pth files of the base environment are processed as well.
+        They come after the student's own site-packages, so the student's packages take precedence.
+        The console scripts of the base environment are copied, pointing them to the student's interpreter.
+
+        :param base_venv_path: The path to the base environment.
+        :type base_venv_path: str
+        :param venv_path: The path to the student's environment.
+        :type venv_path: str
+        :raises ToolLayerError: If the site-packages directory of either environment can't be found.
+        """
+        base_site_packages = find_site_packages(base_venv_path)
+        site_packages = find_site_packages(venv_path)
+
+        if base_site_packages is None or site_packages is None:
+            logger.error("Failed to find the site-packages directory of the environments")
+            raise ToolLayerError("Failed to find the site-packages directory of the environments")
+
+        pth_path = os.path.join(site_packages, const.TOOL_LAYER_PTH_FILENAME)
+        with open(pth_path, "w", encoding="utf-8") as pth_file:
+            pth_file.write(f"import site; site.addsitedir({base_site_packages!r})\n")
+
+        base_bin_path = os.path.join(base_venv_path, const.VENV_BIN_DIR)
+        bin_path = os.path.join(venv_path, const.VENV_BIN_DIR)
+
+        for script_name in os.listdir(base_bin_path):
+            script_path = os.path.join(bin_path, script_name)
+            if os.path.lexists(script_path):
+                continue
+
+            copy_script(os.path.join(base_bin_path, script_name), script_path, base_bin_path, bin_path)
+
+        logger.log(VERBOSE, "Layered the grader tools from %s", base_venv_path)
+
+
+def find_site_packages(venv_path: str) -> Optional[str]:
+    """
+    Find the site-packages directory of a virtual environment.
+
+    :param venv_path: The path to the virtual environment
+    :return: The absolute path to the site-packages directory, or None if it is not found
+    """
+    if os.name == "nt":
+        candidates = [os.path.join(venv_path, "Lib", "site-packages")]
+    else:
+        candidates = glob.glob(os.path.join(venv_path, "lib", "python*", "site-packages"))
+
+    for candidate in candidates:
+        if os.path.isdir(candidate):
+            return os.path.abspath(candidate)
+
+    return None
+
+
+def copy_script(source_path: str, target_path: str, source_bin_path: str, target_bin_path: str):
+    """
+    Copy a console script to another virtual environment.
+    The interpreter path in the script is replaced, so that the script runs with the other environment's interpreter.
+    Files which are not scripts are skipped.
+
+    :param source_path: The path to the script
+    :param target_path: The path to the copy
+    :param source_bin_path: The bin directory of the source environment
+    :param target_bin_path: The bin directory of the target environment
+    """
+    try:
+        with open(source_path, "r", encoding="utf-8") as script_file:
+            content = script_file.read()
+    except (OSError, UnicodeDecodeError):
+        return
+
+    if not content.startswith("#!"):
+        return
+
+    content = content.replace(os.path.abspath(source_bin_path), os.path.abspath(target_bin_path))
+
+    with open(target_path, "w", encoding="utf-8") as script_file:
+        script_file.write(content)
+
+    os.chmod(target_path, 0o755)
+
+
+class ToolLayerError(Exception):
+    """
+    Exception raised when an error occurs while layering the grader tools.
+    """
@@ -0,0 +1,403 @@
+"""
+Module containing the virtual environment cache.
+Ready virtual environments are stored outside of the project tree, and reused by projects with the same requirements.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+import grader.utils.constants as const
+
+from grader.utils.logger import VERBOSE
+from grader.utils.process import run
+from grader.utils.reaper import get_reaper
+
+logger = logging.getLogger("grader")
+
+
+class VenvCache:
+    """
+    Content-addressed cache of virtual environments.
+    Each entry is keyed by a hash of the Python version, the student requirements and the grader requirements.
+    Once the cache grows over its size budget, the least recently used entries are evicted.
+
+    The cache can be shared between processes - entries are built under a lock file,
+    and only become visible once they are complete.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = const.VENV_CACHE_MAX_SIZE):
+        self._cache_dir = os.path.abspath(cache_dir)
+        self._max_size = max_size
+        self._python_version: Optional[str] = None
+
+    @property
+    def cache_dir(self) -> str:
+        """
+        :returns: The directory, containing the cache entries.
+        :rtype: str
+        """
+        return self._cache_dir
+
+    @property
+    def python_version(self) -> str:
+        """
+        The full version of the Python interpreter the virtual environments are created with.
+
+        :returns: The output of sys.version for the interpreter.
+        :rtype: str
+        """
+        if self._python_version is None:
+            self._python_version = get_python_version()
+
+        return self._python_version
+
+    def compute_key(self, requirements: list[str], grader_requirements: list[str], variant: str = "") -> str:
+        """
+        Compute the cache key for a virtual environment.
+
+        :param requirements: The normalized student requirements.
+        :type requirements: list[str]
+        :param grader_requirements: The normalized grader requirements.
+        :type grader_requirements: list[str]
+        :param variant: Anything else the content of the venv depends on, defaults to ""
+        :type variant: str
+        :return: The cache key.
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+
+        # The empty part separates the student requirements from the grader requirements
+        for part in [self.python_version, variant, *requirements, "", *grader_requirements]:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+
+        return digest.hexdigest()[: const.VENV_CACHE_KEY_LENGTH]
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a complete virtual environment in the cache, and mark it as recently used.
+
+        :param key: The cache key.
+        :type key: str
+        :return: The path to the cached virtual environment, or None if it is not cached.
+        :rtype: Optional[str]
+        """
+        metadata_path = self.__metadata_path(key)
+
+        try:
+            os.utime(metadata_path)
+        except FileNotFoundError:
+            return None
+
+        return self.__venv_path(key)
+
+    def get_or_create(self, key: str, create: Callable[[str], None], metadata: Optional[dict[str, Any]] = None) -> str:
+        """
+        Look up a virtual environment in the cache. If it is missing, create and store it.
+
+        :param key: The cache key.
+        :type key: str
+        :param create: Function creating a virtual environment at the given path.
+        :type create: Callable[[str], None]
+        :param metadata: Additional metadata, stored with a newly created entry, defaults to None
+        :type metadata: Optional[dict[str, Any]]
+        :return: The path to the cached virtual environment.
+        :rtype: str
+        """
+        venv_path = self.get(key)
+        if venv_path is not None:
+            logger.log(VERBOSE, "Using cached venv %s", key)
+            return venv_path
+
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+        with self.__lock(key):
+            # Another process might have created the entry while we were waiting for the lock
+            venv_path = self.get(key)
+            if venv_path is not None:
+                logger.log(VERBOSE, "Using cached venv %s", key)
+                return venv_path
+
+            logger.log(VERBOSE, "Creating cached venv %s", key)
+            entry_path = self.__entry_path(key)
+            if os.path.exists(entry_path):
+                shutil.rmtree(entry_path)
+
+            venv_path = self.__venv_path(key)
+            try:
+                create(venv_path)
+            except BaseException:
+                shutil.rmtree(entry_path, ignore_errors=True)
+                raise
+
+            self.__write_metadata(key, metadata or {})
+
+        self.evict(keep=key)
+
+        return venv_path
+
+    def find_nearest(self, requirements: list[str], family: str) -> Optional[tuple[str, list[str]]]:
+        """
+        Find the cached virtual environment with the requirements closest to the given ones,
+        among the entries of the same family. The entry found is marked as recently used.
+
+        :param requirements: The normalized student requirements.
+        :type requirements: list[str]
+        :param family: The family of the entry, stored in its metadata.
+        :type family: str
+        :return: The path to the cached virtual environment and its requirements, or None if there is no such entry.
+        :rtype: Optional[tuple[str, list[str]]]
+        """
+        requirements_set = set(requirements)
+        candidates = []
+
+        for key, _, last_used in self.__list_entries():
+            metadata = self.__read_metadata(key)
+            if metadata is None or metadata.get("family") != family or "requirements" not in metadata:
+                continue
+
+            distance = len(requirements_set.symmetric_difference(metadata["requirements"]))
+            candidates.append((distance, -last_used, key, metadata["requirements"]))
+
+        if not candidates:
+            return None
+
+        # The most recently used entry wins the ties
+        _, _, key, nearest_requirements = min(candidates)
+        venv_path = self.get(key)
+        if venv_path is None:
+            return None
+
+        return venv_path, nearest_requirements
+
+    def evict(self, keep: Optional[str] = None):
+        """
+        Remove the least recently used entries, until the cache fits in its size budget.
+        Entries used within the eviction grace period are kept, since they might still be in use.
+
+        :param keep: Key of an entry which should never be evicted, defaults to None
+        :type keep: Optional[str]
+        """
+        entries = self.__list_entries()
+        total_size = sum(size for _, size, _ in entries)
+        now = time.time()
+
+        for key, size, last_used in sorted(entries, key=lambda entry: entry[2]):
+            if total_size <= self._max_size:
+                break
+
+            if key == keep or now - last_used < const.VENV_CACHE_EVICTION_GRACE_PERIOD:
+                continue
+
+            logger.log(VERBOSE, "Evicting cached venv %s", key)
+            self.__remove_entry(key)
+            total_size -= size
+
+    def __list_entries(self) -> list[tuple[str, int, float]]:
+        """
+        List the complete entries in the cache.
+
+        :return: A list of (key, size in bytes, last used timestamp) tuples.
+        """
+        if not os.path.isdir(self._cache_dir):
+            return []
+
+        entries = []
+        for key in os.listdir(self._cache_dir):
+            # Entries being removed are renamed to hidden directories
+            if key.startswith("."):
+                continue
+
+            metadata_path = self.__metadata_path(key)
+            try:
+                with open(metadata_path, "r", encoding="utf-8") as metadata_file:
+                    size = json.load(metadata_file)["size"]
+                last_used = os.path.getmtime(metadata_path)
+            except (OSError, ValueError, KeyError):
+                continue
+
+            entries.append((key, size, last_used))
+
+        return entries
+
+    def __remove_entry(self, key: str):
+        """
+        Remove an entry from the cache.
+        The entry is renamed first, so that it disappears at once for other processes, and deleted in the background.
+
+        :param key: The cache key.
+        """
+        evicted_path = os.path.join(self._cache_dir, f".evicted-{key}-{uuid.uuid4().hex}")
+
+        try:
+            os.rename(self.__entry_path(key), evicted_path)
+        except OSError as error:
+            logger.debug("Failed to evict cached venv %s: %s", key, error)
+            return
+
+        get_reaper().remove(evicted_path)
+
+    def __read_metadata(self, key: str) -> Optional[dict[str, Any]]:
+        """
+        Read the metadata of an entry.
+
+        :param key: The cache key.
+        :return: The metadata, or None if the entry is not complete.
+        """
+        try:
+            with open(self.__metadata_path(key), "r", encoding="utf-8") as metadata_file:
+                return json.load(metadata_file)
+        except (OSError, ValueError):
+            return None
+
+    def __write_metadata(self, key: str, extra_metadata: dict[str, Any]):
+        """
+        Write the metadata of a newly created entry. This marks the entry as complete.
+
+        :param key: The cache key.
+        :param extra_metadata: Additional metadata to store.
+        """
+        metadata = {
+            **extra_metadata,
+            "size": get_directory_size(self.__venv_path(key)),
+            "python_version": self.python_version,
+        }
+
+        temp_metadata_path = self.__metadata_path(key) + ".tmp"
+        with open(temp_metadata_path, "w", encoding="utf-8") as metadata_file:
+            json.dump(metadata, metadata_file)
+
+        os.replace(temp_metadata_path, self.__metadata_path(key))
+
+    @contextmanager
+    def __lock(self, key: str) -> Iterator[None]:
+        """
+        Hold the lock of an entry. Waits until other processes release it.
+        While the lock is held, its modification time is refreshed in the background, so that a slow build keeps
+        it - only locks which haven't been refreshed for longer than the lock timeout are considered abandoned,
+        and are broken.
+
+        :param key: The cache key.
+        """
+        lock_path = os.path.join(self._cache_dir, key + ".lock")
+
+        while True:
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    is_stale = time.time() - os.path.getmtime(lock_path) > const.VENV_CACHE_LOCK_TIMEOUT
+                except FileNotFoundError:
+                    continue
+
+                if is_stale:
+                    logger.warning("Breaking abandoned venv cache lock %s", lock_path)
+                    remove_file(lock_path)
+                    continue
+
+                time.sleep(const.VENV_CACHE_LOCK_POLL_INTERVAL)
+
+        released = threading.Event()
+        heartbeat = threading.Thread(
+            target=refresh_lock, args=(lock_path, released), name="venv-cache-lock-heartbeat", daemon=True
+        )
+        heartbeat.start()
+
+        try:
+            yield
+        finally:
+            released.set()
+            heartbeat.join()
+            remove_file(lock_path)
+
+    def __entry_path(self, key: str) -> str:
+        """
+        :return: The directory of the entry, containing the venv and its metadata.
+        """
+        return os.path.join(self._cache_dir, key)
+
+    def __venv_path(self, key: str) -> str:
+        """
+        :return: The path to the venv of the entry.
+        """
+        return os.path.join(self._cache_dir, key, const.VENV_NAME)
+
+    def __metadata_path(self, key: str) -> str:
+        """
+        :return: The path to the metadata file of the entry.
+        """
+        return os.path.join(self._cache_dir, key, const.VENV_CACHE_METADATA_FILENAME)
+
+
+def refresh_lock(lock_path: str, released: threading.Event):
+    """
+    Refresh the modification time of a held lock, until it is released.
+
+    :param lock_path: The path to the lock file
+    :param released: Event, set once the lock is released
+    """
+    while not released.wait(const.VENV_CACHE_LOCK_HEARTBEAT_INTERVAL):
+        try:
+            os.utime(lock_path)
+        except OSError as error:
+            logger.warning("Failed to refresh the venv cache lock %s: %s", lock_path, error)
+
+
+def get_python_version() -> str:
+    """
+    Get the full version of the Python interpreter the virtual environments are created with.
+
+    :return: The output of sys.version for the interpreter
+    :raises VenvCacheError: If the interpreter can't be run
+    """
+    output = run([const.PYTHON_BIN, "-c", "import sys; print(sys.version)"])
+    if output.returncode != 0:
+        logger.error("Failed to determine the Python version")
+        raise VenvCacheError("Failed to determine the Python version")
+
+    return output.stdout.strip()
+
+
+def get_directory_size(directory: str) -> int:
+    """
+    Calculate the total size of the files under a directory. Symbolic links are not followed.
+
+    :param directory: The directory
+    :return: The total size, in bytes
+    """
+    total_size = 0
+    for root, _, files in os.walk(directory):
+        for file in files:
+            try:
+                total_size += os.lstat(os.path.join(root, file)).st_size
+            except OSError:
+                continue
+
+    return total_size
+
+
+def remove_file(path: str):
+    """
+    Remove a file, if it exists.
+
+    :param path: The path to the file
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class VenvCacheError(Exception):
+    """
+    Exception raised when an error occurs while using the virtual environment cache.
+    """
@@ -0,0 +1,391 @@
+"""
+Module containing the pre-warmed virtual environment pool.
+Clean virtual environments, with only the grader dependencies in them, are built ahead of time in the background,
+and each project takes one from the pool, instead of creating its own.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+import grader.utils.constants as const
+
+from grader.utils.logger import VERBOSE
+from grader.utils.reaper import get_reaper
+from grader.utils.requirements import read_requirements
+from grader.utils.venv_cache import get_python_version
+
+logger = logging.getLogger("grader")
+
+
+class VenvPool:
+    """
+    Directory of ready virtual environments, which can be shared between processes.
+
+    Virtual environments can't be moved once created, so each one is built in its own entry directory,
+    and stays there until it is used up. The state of an entry is kept in a marker file next to the venv:
+    an entry without a marker is still being built, the ready marker makes it available,
+    and renaming the ready marker to the claimed marker hands it out - at most once, even between processes.
+    The claimed marker holds the process ID of its owner, so that a venv in use is never removed as stale.
+
+    Entries are keyed by the Python version, the grader requirements and a variant (e.g. the tool layer in use),
+    so that a pool directory can outlive a change in any of them.
+    """
+
+    def __init__(self, pool_dir: str, size: int = const.VENV_POOL_SIZE):
+        self._pool_dir = os.path.abspath(pool_dir)
+        self._size = size
+        self._python_version: Optional[str] = None
+
+    @property
+    def pool_dir(self) -> str:
+        """
+        :returns: The directory, containing the pool entries.
+        :rtype: str
+        """
+        return self._pool_dir
+
+    @property
+    def size(self) -> int:
+        """
+        :returns: The amount of virtual environments kept ready (or being built).
+        :rtype: int
+        """
+        return self._size
+
+    def compute_key(self, variant: str = "") -> str:
+        """
+        Compute the key of the pool entries.
+
+        :param variant: Anything else the content of the venvs depends on, defaults to ""
+        :type variant: str
+        :return: The pool key.
+        :rtype: str
+        """
+        if self._python_version is None:
+            self._python_version = get_python_version()
+
+        digest = hashlib.sha256()
+        for part in [self._python_version, variant, *read_requirements(const.GRADER_REQUIREMENTS)]:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+
+        return digest.hexdigest()[: const.VENV_CACHE_KEY_LENGTH]
+
+    def acquire(self, key: str) -> Optional[str]:
+        """
+        Take a ready virtual environment out of the pool.
+        The venv belongs to the caller from then on, and must be given back with release once it is not needed.
+
+        :param key: The pool key.
+        :type key: str
+        :return: The path to the virtual environment, or None if none is ready.
+        :rtype: Optional[str]
+        """
+        for entry_name in self.__list_entries(key):
+            entry_path = os.path.join(self._pool_dir, entry_name)
+
+            try:
+                os.rename(
+                    os.path.join(entry_path, const.VENV_POOL_READY_MARKER),
+                    os.path.join(entry_path, const.VENV_POOL_CLAIMED_MARKER),
+                )
+            except FileNotFoundError:
+                # Still being built, or claimed by someone else in the meantime
+                continue
+
+            self.__write_owner(entry_path)
+            logger.log(VERBOSE, "Using pooled venv %s", entry_name)
+            return os.path.join(entry_path, const.VENV_NAME)
+
+        logger.log(VERBOSE, "No pooled venv is ready")
+        return None
+
+    def release(self, venv_path: str):
+        """
+        Remove a virtual environment, taken out of the pool.
+        It is not put back - the project might have installed anything in it. It is deleted in the background.
+
+        :param venv_path: The path to the virtual environment, as returned by acquire.
+        :type venv_path: str
+        """
+        get_reaper().remove(os.path.dirname(venv_path))
+
+    def is_full(self, key: str) -> bool:
+        """
+        Check if the pool has enough virtual environments ready, or being built.
+
+        :param key: The pool key.
+        :type key: str
+        :return: True if no more venvs need to be built, False otherwise.
+        :rtype: bool
+        """
+        available = 0
+        for entry_name in self.__list_entries(key):
+            entry_path = os.path.join(self._pool_dir, entry_name)
+            if not os.path.exists(os.path.join(entry_path, const.VENV_POOL_CLAIMED_MARKER)):
+                available += 1
+
+        return available >= self._size
+
+    def add(self, key: str, create: Callable[[str], None]):
+        """
+        Build one more virtual environment, and make it available in the pool.
+        Abandoned and outdated entries are removed beforehand.
+
+        :param key: The pool key.
+        :type key: str
+        :param create: Function creating a virtual environment at the given path.
+        :type create: Callable[[str], None]
+        """
+        self.remove_stale_entries(key)
+
+        entry_name = f"{key}-{uuid.uuid4().hex}"
+        entry_path = os.path.join(self._pool_dir, entry_name)
+        os.makedirs(entry_path)
+
+        logger.log(VERBOSE, "Building pooled venv %s", entry_name)
+        try:
+            create(os.path.join(entry_path, const.VENV_NAME))
+        except BaseException:
+            shutil.rmtree(entry_path, ignore_errors=True)
+            raise
+
+        with open(os.path.join(entry_path, const.VENV_POOL_READY_MARKER), "w", encoding="utf-8"):
+            pass
+
+    def remove_stale_entries(self, key: Optional[str] = None):
+        """
+        Remove the entries which haven't changed state for longer than the stale timeout.
+        Those are left over from processes that stopped while building or using them,
+        or were built for another key and are no longer used.
+
+        The ready entries of the given key are kept - they are still handed out. Other ready entries are claimed
+        first, so that no other process takes them while they are removed, and claimed entries are only removed
+        once their owner has exited. Entries are renamed to a hidden name before they are deleted in the background.
+
+        :param key: The pool key in use, defaults to None
+        :type key: Optional[str]
+        """
+        if not os.path.isdir(self._pool_dir):
+            return
+
+        now = time.time()
+        for entry_name in os.listdir(self._pool_dir):
+            if entry_name.startswith("."):
+                continue
+
+            entry_path = os.path.join(self._pool_dir, entry_name)
+
+            try:
+                last_changed = max(os.path.getmtime(entry_path), *self.__get_marker_times(entry_path))
+            except OSError:
+                continue
+
+            if now - last_changed <= const.VENV_POOL_STALE_TIMEOUT:
+                continue
+
+            if os.path.exists(os.path.join(entry_path, const.VENV_POOL_READY_MARKER)):
+                if key is not None and entry_name.startswith(key + "-"):
+                    continue
+
+                if not self.__claim(entry_path):
+                    continue
+            elif os.path.exists(os.path.join(entry_path, const.VENV_POOL_CLAIMED_MARKER)):
+                if self.__is_owner_alive(entry_path):
+                    continue
+
+            logger.log(VERBOSE, "Removing stale pooled venv %s", entry_name)
+            self.__remove_entry(entry_name)
+
+    def __remove_entry(self, entry_name: str):
+        """
+        Remove an entry from the pool.
+        The entry is renamed first, so that it disappears at once for other processes, and deleted in the background.
+
+        :param entry_name: The name of the entry directory.
+        """
+        stale_path = os.path.join(self._pool_dir, f".stale-{entry_name}-{uuid.uuid4().hex}")
+
+        try:
+            os.rename(os.path.join(self._pool_dir, entry_name), stale_path)
+        except OSError as error:
+            logger.debug("Failed to remove stale pooled venv %s: %s", entry_name, error)
+            return
+
+        get_reaper().remove(stale_path)
+
+    def __claim(self, entry_path: str) -> bool:
+        """
+        Claim a ready entry, the same way acquire does.
+
+        :param entry_path: The path to the entry directory.
+        :return: True if the entry was claimed, False if someone else claimed it first.
+        """
+        try:
+            os.rename(
+                os.path.join(entry_path, const.VENV_POOL_READY_MARKER),
+                os.path.join(entry_path, const.VENV_POOL_CLAIMED_MARKER),
+            )
+        except FileNotFoundError:
+            return False
+
+        self.__write_owner(entry_path)
+        return True
+
+    @staticmethod
+    def __write_owner(entry_path: str):
+        """
+        Write the process ID of the current process into the claimed marker of an entry.
+
+        :param entry_path: The path to the entry directory.
+        """
+        try:
+            with open(os.path.join(entry_path, const.VENV_POOL_CLAIMED_MARKER), "w", encoding="utf-8") as marker:
+                marker.write(str(os.getpid()))
+        except OSError as error:
+            logger.debug("Failed to write the owner of pooled venv %s: %s", entry_path, error)
+
+    @staticmethod
+    def __is_owner_alive(entry_path: str) -> bool:
+        """
+        Check if the process, which claimed an entry, is still running.
+
+        :param entry_path: The path to the entry directory.
+        :return: True if the owner is running (or unknown), False if it has exited.
+        """
+        try:
+            with open(os.path.join(entry_path, const.VENV_POOL_CLAIMED_MARKER), "r", encoding="utf-8") as marker:
+                owner_pid = int(marker.read().strip())
+        except (OSError, ValueError):
+            # Claimed before the owner was written, or by an older grader - only the stale timeout applies
+            return False
+
+        return is_process_alive(owner_pid)
+
+    def __list_entries(self, key: str) -> list[str]:
+        """
+        List the entries of the pool with the given key, oldest first.
+
+        :param key: The pool key.
+        :return: The names of the entry directories.
+        """
+        if not os.path.isdir(self._pool_dir):
+            return []
+
+        entries = []
+        for entry_name in os.listdir(self._pool_dir):
+            if not entry_name.startswith(key + "-"):
+                continue
+
+            try:
+                entries.append((os.path.getmtime(os.path.join(self._pool_dir, entry_name)), entry_name))
+            except OSError:
+                continue
+
+        return [entry_name for _, entry_name in sorted(entries)]
+
+    @staticmethod
+    def __get_marker_times(entry_path: str) -> list[float]:
+        """
+        :return: The modification times of the marker files of an entry.
+        """
+        times = []
+        for marker in [const.VENV_POOL_READY_MARKER, const.VENV_POOL_CLAIMED_MARKER]:
+            marker_path = os.path.join(entry_path, marker)
+            if os.path.exists(marker_path):
+                times.append(os.path.getmtime(marker_path))
+
+        return times
+
+
+def is_process_alive(pid: int) -> bool:
+    """
+    Check if a process is running.
+
+    :param pid: The process ID.
+    :type pid: int
+    :return: True if the process is running, or if it can't be checked, False otherwise.
+    :rtype: bool
+    """
+    # On Windows, signal 0 is CTRL_C_EVENT - the process can't be checked without interrupting it
+    if os.name == "nt":
+        return True
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Running, but owned by another user
+        return True
+
+    return True
+
+
+class VenvPoolReplenisher:
+    """
+    Background thread, keeping a virtual environment pool full.
+    Acts as a context manager - the pool is replenished while the context is active.
+
+    Venvs taken out of the pool from other processes are noticed when the pool is polled next.
+    On exit, the venv being built is finished, but no new ones are started.
+    """
+
+    def __init__(
+        self,
+        pool: VenvPool,
+        key: str,
+        create: Callable[[str], None],
+        poll_interval: float = const.VENV_POOL_POLL_INTERVAL,
+    ):
+        self._pool = pool
+        self._key = key
+        self._create = create
+        self._poll_interval = poll_interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        """
+        Start replenishing the pool in the background.
+        """
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.__replenish, name="venv-pool-replenisher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop replenishing the pool, and wait for the venv being built.
+        """
+        self._stop_event.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __replenish(self):
+        """
+        Build venvs until the pool is full, then poll it until stopped.
+        """
+        while not self._stop_event.is_set():
+            try:
+                if not self._pool.is_full(self._key):
+                    self._pool.add(self._key, self._create)
+                    continue
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                logger.error("Failed to build a pooled venv: %s", error)
+
+            self._stop_event.wait(self._poll_interval)
@@ -0,0 +1,134 @@
+"""
+Module containing the virtual environment template.
+A template is a clean virtual environment with the grader dependencies in it, built once.
+Student environments are cloned from it with hard links, instead of being created and installed from scratch.
+"""
+
+import logging
+import os
+import shutil
+from typing import Callable
+
+import grader.utils.constants as const
+
+from grader.utils.logger import VERBOSE
+from grader.utils.requirements import read_requirements
+from grader.utils.venv_cache import VenvCache
+
+logger = logging.getLogger("grader")
+
+
+class VenvTemplate:
+    """
+    Shared template environments, one per Python version, grader requirements and variant (e.g. the tool layer).
+
+    A clone shares the files of the template through hard links, so cloning only creates directory entries.
+    That is safe as long as files are replaced, rather than modified in place - which is what pip does
+    when it installs or uninstalls a package, and what Python does when it writes bytecode.
+    The files which refer to the template's own path are copied and rewritten instead.
+    """
+
+    def __init__(self, template_dir: str):
+        self._cache = VenvCache(template_dir)
+
+    def get_or_create(self, create: Callable[[str], None], variant: str = "") -> str:
+        """
+        Get the path to the template environment. If it doesn't exist yet, create it.
+
+        :param create: Function creating a virtual environment with the grader dependencies at the given path.
+        :type create: Callable[[str], None]
+        :param variant: Anything else the content of the template depends on, defaults to ""
+        :type variant: str
+        :return: The path to the template environment.
+        :rtype: str
+        """
+        key = self._cache.compute_key([], read_requirements(const.GRADER_REQUIREMENTS), variant=variant)
+        return self._cache.get_or_create(key, create)
+
+    @staticmethod
+    def is_supported() -> bool:
+        """
+        Check if environments can be cloned.
+        On Windows, the console scripts are executables with the interpreter path built in, which can't be rewritten.
+
+        :return: True if environments can be cloned, False otherwise.
+        :rtype: bool
+        """
+        return os.name != "nt"
+
+    @staticmethod
+    def clone(template_path: str, venv_path: str):
+        """
+        Clone the template environment to the given path.
+
+        Regular files are hard linked, falling back to a copy if the template is on another file system.
+        Symbolic links are recreated, pointing to the clone if they pointed into the template.
+        The pyvenv.cfg file and the scripts in the bin directory are rewritten to refer to the clone.
+
+        :param template_path: The path to the template environment.
+        :type template_path: str
+        :param venv_path: The path to the clone.
+        :type venv_path: str
+        """
+        template_path = os.path.abspath(template_path)
+        venv_path = os.path.abspath(venv_path)
+        template_bin_path = os.path.join(template_path, const.VENV_BIN_DIR)
+
+        for root, dirs, files in os.walk(template_path):
+            target_root = os.path.join(venv_path, os.path.relpath(root, template_path))
+            os.makedirs(target_root, exist_ok=True)
+
+            for name in dirs + files:
+                source_path = os.path.join(root, name)
+                target_path = os.path.join(target_root, name)
+
+                if os.path.islink(source_path):
+                    link_target = os.readlink(source_path)
+                    if link_target == template_path or link_target.startswith(template_path + os.sep):
+                        relative_target = os.path.relpath(link_target, template_path)
+                        link_target = os.path.normpath(os.path.join(venv_path, relative_target))
+
+                    os.symlink(link_target, target_path)
+                elif name in dirs:
+                    continue
+                elif root == template_bin_path or source_path == os.path.join(template_path, "pyvenv.cfg"):
+                    rewrite_file(source_path, target_path, template_path, venv_path)
+                else:
+                    link_file(source_path, target_path)
+
+        logger.log(VERBOSE, "Cloned venv from %s", template_path)
+
+
+def link_file(source_path: str, target_path: str):
+    """
+    Hard link a file, or copy it if it can't be linked (e.g. it is on another file system).
+
+    :param source_path: The path to the file
+    :param target_path: The path to the link
+    """
+    try:
+        os.link(source_path, target_path)
+    except OSError:
+        shutil.copy2(source_path, target_path)
+
+
+def rewrite_file(source_path: str, target_path: str, old_path: str, new_path: str):
+    """
+    Copy a file, replacing a path in it. Binary files are hard linked unchanged.
+
+    :param source_path: The path to the file
+    :param target_path: The path to the copy
+    :param old_path: The path to replace
+    :param new_path: The path to replace it with
+    """
+    try:
+        with open(source_path, "r", encoding="utf-8") as source_file:
+            content = source_file.read()
+    except UnicodeDecodeError:
+        link_file(source_path, target_path)
+        return
+
+    with open(target_path, "w", encoding="utf-8") as target_file:
+        target_file.write(content.replace(old_path, new_path))
+
+    shutil.copymode(source_path, target_path)
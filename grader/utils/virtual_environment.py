@@ -5,35 +5,94 @@ Module containing the virtual environment class.
 import logging
 import os
 import shutil
+import threading
+from typing import Optional
 
 import grader.utils.constants as const
 
 from grader.utils.logger import VERBOSE
 from grader.utils.process import run
+from grader.utils.reaper import get_reaper
+from grader.utils.requirements import (
+    get_conflicting_names,
+    get_requirements_delta,
+    has_local_references,
+    read_installed_distributions,
+    read_requirements,
+    RequirementsError,
+)
+from grader.utils.shared_venv import SharedVenv
+from grader.utils.tool_layer import ToolLayer, find_site_packages
+from grader.utils.venv_cache import VenvCache
+from grader.utils.venv_pool import VenvPool, VenvPoolReplenisher
+from grader.utils.venv_template import VenvTemplate
 
 logger = logging.getLogger("grader")
 
 
-class VirtualEnvironment:
+class VirtualEnvironment:  # pylint: disable=too-many-instance-attributes
     """
     Class that handles the creation and deletion of a virtual environment.
     Acts as a context manager. Everything executed within it, can assume that the venv is setup.
+
+    If a cache is given, the venv is taken from the cache (and created there on a miss),
+    and linked into the project instead of being created inside of it.
+    If a tool layer is given, the grader dependencies are layered from it, instead of being installed in the venv.
+    If a pool is given, a pre-warmed venv is taken from it, and only the student's requirements are installed in it.
+    Projects requiring one of the grader dependencies don't use it, so their version doesn't replace the grader's.
+    The cache takes precedence over the pool, the pool is used for the venvs which can't be cached.
+    If a template is given, new venvs are cloned from it, instead of being created from scratch.
+    Projects requiring one of the grader dependencies are created from scratch, like with the pool.
+    With incremental installs, a cache miss clones the cached venv with the closest requirements,
+    and only installs the difference - unless the project requires one of the grader dependencies.
+    The pip options are passed to every pip install, e.g. to install from a local wheelhouse.
+    If a venv path is given, the venv is placed there, and the project directory is left untouched.
+    If a shared environment is given, projects without requirements use it, instead of getting a venv of their own.
+    It takes precedence over everything else.
+    The venvs of several projects can be set up at the same time - it is initialized as long as any of them is.
     """
 
     is_initialized = False
+    __active_count = 0
+    __active_lock = threading.Lock()
 
-    def __init__(self, project_path: str):
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        project_path: str,
+        *,
+        cache: Optional[VenvCache] = None,
+        tool_layer: Optional[ToolLayer] = None,
+        pip_options: Optional[list[str]] = None,
+        pool: Optional[VenvPool] = None,
+        template: Optional[VenvTemplate] = None,
+        incremental: bool = False,
+        venv_path: Optional[str] = None,
+        shared: Optional[SharedVenv] = None,
+    ):
         self._project_path = project_path
-        self._venv_path = os.path.join(project_path, const.VENV_NAME)
+        self._venv_path = venv_path or os.path.join(project_path, const.VENV_NAME)
+        self._is_venv_in_project = venv_path is None
+        self._cache = cache
+        self._tool_layer = tool_layer
+        self._pip_options = pip_options or []
+        self._pool = pool
+        self._pooled_venv_path: Optional[str] = None
+        self._template = template
+        self._incremental = incremental
+        self._shared = shared
 
     def __enter__(self):
         self.setup()
-        VirtualEnvironment.is_initialized = True
+        with VirtualEnvironment.__active_lock:
+            VirtualEnvironment.__active_count += 1
+            VirtualEnvironment.is_initialized = True
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.teardown()
-        VirtualEnvironment.is_initialized = False
+        with VirtualEnvironment.__active_lock:
+            VirtualEnvironment.__active_count -= 1
+            VirtualEnvironment.is_initialized = VirtualEnvironment.__active_count > 0
 
     def setup(self):
         """
@@ -42,51 +101,321 @@ class VirtualEnvironment:
         Check if there is a requirements.txt file.
         Create a new venv and install the requirements.
         Install the grader dependencies as well.
+        If a cache is used, the venv is taken from the cache, and only created on a cache miss.
+        Otherwise, if a pool is used and has a venv ready, the venv is taken from the pool.
+        A project without requirements uses the shared environment, if there is one.
+        A requirements file, which can't be read, is left to pip, in a venv of the project's own.
         """
-        # Check for existing venv
-        possible_venv_paths = [os.path.join(self._project_path, venv_path) for venv_path in const.POSSIBLE_VENV_DIRS]
+        self.__remove_existing_venvs()
+
+        # Check for requirements.txt
+        requirements_path = os.path.join(self._project_path, const.REQUIREMENTS_FILENAME)
+
+        if not os.path.exists(requirements_path):
+            logger.error("No requirements.txt file found in the project directory")
+
+        try:
+            requirements = read_requirements(requirements_path)
+        except RequirementsError as error:
+            # Without its normalized requirements, the venv can't be shared, cached or layered - pip reads the file
+            logger.warning("Failed to read requirements.txt, installing it as it is: %s", error)
+            self.__build(self._venv_path, requirements_path)
+            return
+
+        base_venv_path = self.__get_base_venv_path(requirements)
+
+        def create(venv_path: str):
+            self.__build(venv_path, requirements_path, base_venv_path)
+
+        if self._shared is not None and SharedVenv.is_supported(requirements):
+
+            def create_shared(venv_path: str):
+                self.__build(venv_path, base_venv_path=base_venv_path)
+
+            shared_venv_path = self._shared.get_or_create(create_shared, variant=base_venv_path or "")
+            VirtualEnvironment.__link(shared_venv_path, self._venv_path)
+            return
+
+        if self._cache is not None:
+            if has_local_references(requirements):
+                logger.log(VERBOSE, "requirements.txt refers to local files, the venv cache is not used")
+            else:
+                grader_requirements = read_requirements(const.GRADER_REQUIREMENTS)
+                key = self._cache.compute_key(requirements, grader_requirements, variant=base_venv_path or "")
+                # Entries of the same family differ only in the student requirements
+                family = self._cache.compute_key([], grader_requirements, variant=base_venv_path or "")
+
+                def create_cached(venv_path: str):
+                    if not self._incremental or not self.__build_incremental(venv_path, requirements, family):
+                        create(venv_path)
+
+                cached_venv_path = self._cache.get_or_create(
+                    key, create_cached, metadata={"family": family, "requirements": requirements}
+                )
+                VirtualEnvironment.__link(cached_venv_path, self._venv_path)
+                return
+
+        # The pooled venvs have the tool layer applied, if there is one. A new venv installs the grader dependencies
+        # after the student's requirements, so they aren't replaced by the student's versions.
+        if (
+            self._pool is not None
+            and (self._tool_layer is None or base_venv_path is not None)
+            and not VirtualEnvironment.__conflicts_with_grader(requirements)
+        ):
+            pooled_venv_path = self._pool.acquire(self._pool.compute_key(base_venv_path or ""))
+
+            if pooled_venv_path is not None:
+                if os.path.exists(requirements_path):
+                    logger.log(VERBOSE, "Installing requirements")
+                    try:
+                        self.__install_requirements(pooled_venv_path, requirements_path)
+                    except VirtualEnvironmentError:
+                        self._pool.release(pooled_venv_path)
+                        raise
+
+                self._pooled_venv_path = pooled_venv_path
+                VirtualEnvironment.__link(pooled_venv_path, self._venv_path)
+                return
+
+        create(self._venv_path)
+
+    def teardown(self):
+        """
+        Delete the virtual environment. The deletion itself happens in the background.
+        A venv linked from the cache (or the shared environment) is only unlinked, the linked venv is kept.
+        A venv taken from the pool is removed from the pool.
+        """
+        if os.path.islink(self._venv_path):
+            os.unlink(self._venv_path)
+        else:
+            get_reaper().remove(self._venv_path)
+
+        if self._pool is not None and self._pooled_venv_path is not None:
+            self._pool.release(self._pooled_venv_path)
+            self._pooled_venv_path = None
+
+    def create_pool_replenisher(self) -> Optional[VenvPoolReplenisher]:
+        """
+        Create the background replenisher of the venv pool.
+        The pooled venvs are created the same way as the venv of a project without requirements.
+        :return: The replenisher, or None if no pool is used.
+        :rtype: Optional[VenvPoolReplenisher]
+        """
+        if self._pool is None:
+            return None
+
+        base_venv_path = self.__get_base_venv_path([])
+
+        def create(venv_path: str):
+            self.__build(venv_path, base_venv_path=base_venv_path)
+
+        return VenvPoolReplenisher(self._pool, self._pool.compute_key(base_venv_path or ""), create)
+
+    def __remove_existing_venvs(self):
+        """
+        Delete the venvs left over in the project directory, or at the venv path.
+        """
+        if self._is_venv_in_project:
+            possible_venv_paths = [
+                os.path.join(self._project_path, venv_path) for venv_path in const.POSSIBLE_VENV_DIRS
+            ]
+        else:
+            possible_venv_paths = [self._venv_path]
 
         for path in possible_venv_paths:
-            if os.path.exists(path):
+            if os.path.islink(path):
+                # Left over from a cached venv
+                logger.log(VERBOSE, "Found existing venv link at %s", path)
+                os.unlink(path)
+            elif os.path.exists(path):
                 logger.log(VERBOSE, "Found existing venv at %s", path)
                 shutil.rmtree(path)
 
-        # Check for requirements.txt
-        requirements_path = os.path.join(self._project_path, const.REQUIREMENTS_FILENAME)
+    def __get_base_venv_path(self, requirements: list[str]) -> Optional[str]:
+        """
+        Get the tool layer base environment, creating it if needed.
+        :param requirements: The normalized student requirements.
+        :type requirements: list[str]
+        :return: The path to the base environment, or None if the tool layer is not used.
+        :rtype: Optional[str]
+        """
+        if self._tool_layer is None or not ToolLayer.is_supported(requirements):
+            return None
 
-        does_requirements_exist = os.path.exists(requirements_path)
-        if not does_requirements_exist:
-            logger.error("No requirements.txt file found in the project directory")
+        return self._tool_layer.get_or_create(self.__create)
 
+    def __build_incremental(self, venv_path: str, requirements: list[str], family: str) -> bool:
+        """
+        Build a new virtual environment from the cached venv with the closest requirements.
+        The cached venv is cloned, the requirements it doesn't need are uninstalled,
+        and only the missing requirements are installed.
+        :param venv_path: The path to the virtual environment.
+        :type venv_path: str
+        :param requirements: The normalized student requirements.
+        :type requirements: list[str]
+        :param family: The family of the cache entries the venv can be built from.
+        :type family: str
+        :return: True if the venv was built, False if it has to be built in full instead.
+        :rtype: bool
+        """
+        # Options can't be passed to pip install as requirements
+        if self._cache is None or not VenvTemplate.is_supported() or any(req.startswith("-") for req in requirements):
+            return False
+
+        # The cached venvs have the grader tools, which the student's versions would replace
+        if VirtualEnvironment.__conflicts_with_grader(requirements):
+            return False
+
+        nearest = self._cache.find_nearest(requirements, family)
+        if nearest is None:
+            return False
+
+        nearest_venv_path, nearest_requirements = nearest
+        missing, extra = get_requirements_delta(requirements, nearest_requirements)
+        logger.log(VERBOSE, "Building venv from %s, installing %s, removing %s", nearest_venv_path, missing, extra)
+
+        VenvTemplate.clone(nearest_venv_path, venv_path)
+
+        # Only the distributions of the clone itself are removed - never the ones from the tool layer,
+        # nor the grader dependencies, which the nearest venv's student might have required as well
+        installed = read_installed_distributions(find_site_packages(venv_path) or "")
+        grader_names = get_conflicting_names(extra, read_requirements(const.GRADER_REQUIREMENTS))
+        extra = [name for name in extra if name in installed and name not in grader_names]
+        pip_path = os.path.join(venv_path, const.PIP_PATH)
+
+        try:
+            if extra:
+                self.__run_pip([pip_path, "uninstall", "-y"] + extra, "Failed to uninstall " + ", ".join(extra))
+            if missing:
+                self.__run_pip(
+                    [pip_path, "install"] + self._pip_options + missing, "Failed to install " + ", ".join(missing)
+                )
+        except VirtualEnvironmentError:
+            logger.log(VERBOSE, "Incremental install failed, building the venv in full")
+            shutil.rmtree(venv_path, ignore_errors=True)
+            return False
+
+        return True
+
+    def __build(self, venv_path: str, requirements_path: Optional[str] = None, base_venv_path: Optional[str] = None):
+        """
+        Build a new virtual environment, by cloning the template if one is used, or from scratch otherwise.
+        :param venv_path: The path to the virtual environment.
+        :type venv_path: str
+        :param requirements_path: The path to the student's requirements file. It is skipped if it doesn't exist.
+        :type requirements_path: Optional[str]
+        :param base_venv_path: The path to the tool layer base environment, defaults to None
+        :type base_venv_path: Optional[str]
+        :raises VirtualEnvironmentError: If the creation of the venv or the installation of requirements fails.
+        """
+        # The template has the grader tools, which the student's versions would replace
+        if (
+            self._template is None
+            or not VenvTemplate.is_supported()
+            or VirtualEnvironment.__requires_grader_tools(requirements_path)
+        ):
+            self.__create(venv_path, requirements_path, base_venv_path)
+            return
+
+        def create_template(template_path: str):
+            self.__create(template_path, base_venv_path=base_venv_path)
+
+        template_path = self._template.get_or_create(create_template, variant=base_venv_path or "")
+        VenvTemplate.clone(template_path, venv_path)
+
+        if requirements_path is not None and os.path.exists(requirements_path):
+            logger.log(VERBOSE, "Installing requirements")
+            self.__install_requirements(venv_path, requirements_path)
+
+    def __create(self, venv_path: str, requirements_path: Optional[str] = None, base_venv_path: Optional[str] = None):
+        """
+        Create a new virtual environment, and install the requirements and the grader dependencies in it.
+        :param venv_path: The path to the virtual environment.
+        :type venv_path: str
+        :param requirements_path: The path to the student's requirements file. It is skipped if it doesn't exist.
+        :type requirements_path: Optional[str]
+        :param base_venv_path: The path to the tool layer base environment. If given, the grader dependencies
+        are layered from it, instead of being installed.
+        :type base_venv_path: Optional[str]
+        :raises VirtualEnvironmentError: If the creation of the venv or the installation of requirements fails.
+        """
         # Create new venv
         logger.log(VERBOSE, "Creating new venv")
 
-        create_venv_result = run([const.PYTHON_BIN, "-m", "venv", self._venv_path])
+        create_venv_result = run([const.PYTHON_BIN, "-m", "venv", venv_path])
         if create_venv_result.returncode != 0:
             logger.error("Failed to create virtual environment")
             raise VirtualEnvironmentError("Failed to create virtual environment")
 
         # Install requirements
-        if does_requirements_exist:
+        if requirements_path is not None and os.path.exists(requirements_path):
             logger.log(VERBOSE, "Installing requirements")
-            VirtualEnvironment.__install_requirements(self._venv_path, requirements_path)
+            self.__install_requirements(venv_path, requirements_path)
+
+        if base_venv_path is not None:
+            ToolLayer.apply(base_venv_path, venv_path)
+            return
 
         # Install grader dependencies
         logger.log(VERBOSE, "Installing grader dependencies")
 
         grader_requirements_path = const.GRADER_REQUIREMENTS
-        VirtualEnvironment.__install_requirements(self._venv_path, grader_requirements_path)
+        self.__install_requirements(venv_path, grader_requirements_path)
 
-    def teardown(self):
+    @staticmethod
+    def __conflicts_with_grader(requirements: list[str]) -> bool:
+        """
+        Check if the student requires one of the grader dependencies.
+        Installed into a venv, which already has the grader tools, the student's version would replace the grader's.
+        :param requirements: The normalized student requirements.
+        :type requirements: list[str]
+        :return: True if the requirements overlap with the grader dependencies, False otherwise.
+        :rtype: bool
+        """
+        conflicts = get_conflicting_names(requirements, read_requirements(const.GRADER_REQUIREMENTS))
+        if conflicts:
+            logger.log(VERBOSE, "Student requirements overlap with the grader tools: %s", conflicts)
+
+        return bool(conflicts)
+
+    @staticmethod
+    def __requires_grader_tools(requirements_path: Optional[str]) -> bool:
         """
-        Delete the virtual environment.
+        Check if a requirements file requires one of the grader dependencies.
+        :param requirements_path: The path to the student's requirements file, defaults to None
+        :type requirements_path: Optional[str]
+        :return: True if the requirements overlap with the grader dependencies, or can't be read, False otherwise.
+        :rtype: bool
         """
-        shutil.rmtree(self._venv_path)
+        if requirements_path is None or not os.path.exists(requirements_path):
+            return False
+
+        try:
+            return VirtualEnvironment.__conflicts_with_grader(read_requirements(requirements_path))
+        except RequirementsError:
+            # Pip might find any of them in the file
+            return True
 
     @staticmethod
-    def __install_requirements(venv_path: str, requirements_path: str):
+    def __link(cached_venv_path: str, venv_path: str):
+        """
+        Make a cached virtual environment available at the given path.
+        A symbolic link is used where possible, otherwise the venv is copied.
+        :param cached_venv_path: The path to the cached virtual environment.
+        :type cached_venv_path: str
+        :param venv_path: The path, where the virtual environment is expected.
+        :type venv_path: str
+        """
+        try:
+            os.symlink(cached_venv_path, venv_path, target_is_directory=True)
+        except OSError as error:
+            logger.debug("Failed to link the cached venv, copying it instead: %s", error)
+            shutil.copytree(cached_venv_path, venv_path, symlinks=True)
+
+    def __install_requirements(self, venv_path: str, requirements_path: str):
         """
         Install the requirements specified in the requirements file into the virtual environment.
+        The pip options of the virtual environment are passed to pip.
         :param venv_path: The path to the virtual environment.
         :type venv_path: str
         :param requirements_path: The path to the requirements file.
@@ -98,11 +427,26 @@ class VirtualEnvironment:
 
         pip_path = os.path.join(venv_path, const.PIP_PATH)
 
-        output = run([pip_path, "install", "-r", requirements_path])
+        self.__run_pip(
+            [pip_path, "install"] + self._pip_options + ["-r", requirements_path],
+            f"Failed to install requirements from {requirements_path}",
+        )
+
+    @staticmethod
+    def __run_pip(command: list[str], error_message: str):
+        """
+        Run a pip command in the virtual environment.
+        :param command: The pip command.
+        :type command: list[str]
+        :param error_message: The message to log and raise, if the command fails.
+        :type error_message: str
+        :raises VirtualEnvironmentError: If the command fails.
+        """
+        output = run(command)
 
         if output.returncode != 0:
-            logger.error("Failed to install requirements from %s", requirements_path)
-            raise VirtualEnvironmentError(f"Failed to install requirements from {requirements_path}")
+            logger.error(error_message)
+            raise VirtualEnvironmentError(error_message)
 
 
 class VirtualEnvironmentError(Exception):
@@ -0,0 +1,99 @@
+"""
+Module containing the local wheelhouse.
+The wheelhouse is a directory of pre-built wheels, used to install requirements without network access.
+"""
+
+import logging
+import os
+from typing import Optional
+
+import grader.utils.constants as const
+
+from grader.utils.logger import VERBOSE
+from grader.utils.process import run
+
+logger = logging.getLogger("grader")
+
+
+class Wheelhouse:
+    """
+    Local directory of wheels, for the grader requirements and the requirements common for the course.
+    Once built, virtual environments can be set up with no network access, using only the wheels in it.
+    """
+
+    def __init__(self, wheelhouse_dir: str):
+        self._wheelhouse_dir = os.path.abspath(wheelhouse_dir)
+
+    @property
+    def wheelhouse_dir(self) -> str:
+        """
+        :returns: The directory, containing the wheels.
+        :rtype: str
+        """
+        return self._wheelhouse_dir
+
+    def build(self, requirements_paths: list[str], pip_cache_dir: Optional[str] = None):
+        """
+        Fetch (or build, for packages without a wheel) the wheels for all requirements and their dependencies.
+        The wheels are built with the same interpreter the virtual environments are created with.
+
+        :param requirements_paths: The paths to the requirements files.
+        :type requirements_paths: list[str]
+        :param pip_cache_dir: The pip cache directory to use, defaults to None (pip's default)
+        :type pip_cache_dir: Optional[str]
+        :raises WheelhouseError: If fetching the wheels for any of the requirements files fails.
+        """
+        os.makedirs(self._wheelhouse_dir, exist_ok=True)
+
+        for requirements_path in requirements_paths:
+            logger.log(VERBOSE, "Fetching wheels for %s", requirements_path)
+
+            command = [const.PYTHON_BIN, "-m", "pip", "wheel", "--wheel-dir", self._wheelhouse_dir]
+            command += get_pip_cache_args(pip_cache_dir)
+            command += ["-r", requirements_path]
+
+            output = run(command)
+            if output.returncode != 0:
+                logger.error("Failed to fetch the wheels for %s", requirements_path)
+                raise WheelhouseError(f"Failed to fetch the wheels for {requirements_path}")
+
+        logger.info("Wheelhouse %s contains %d wheels", self._wheelhouse_dir, len(self.list_wheels()))
+
+    def list_wheels(self) -> list[str]:
+        """
+        :returns: The file names of the wheels in the wheelhouse, sorted.
+        :rtype: list[str]
+        """
+        if not os.path.isdir(self._wheelhouse_dir):
+            return []
+
+        return sorted(file for file in os.listdir(self._wheelhouse_dir) if file.endswith(".whl"))
+
+    def get_install_args(self) -> list[str]:
+        """
+        Get the pip install arguments for installing only from the wheelhouse.
+        The pip version check is disabled as well, since it would try to reach the package index.
+
+        :returns: The arguments for pip install.
+        :rtype: list[str]
+        """
+        return ["--no-index", "--find-links", self._wheelhouse_dir, "--disable-pip-version-check"]
+
+
+def get_pip_cache_args(pip_cache_dir: Optional[str] = None) -> list[str]:
+    """
+    Get the pip arguments for using a shared cache directory.
+
+    :param pip_cache_dir: The pip cache directory, defaults to None (pip's default)
+    :return: The arguments for pip, empty if no cache directory is given
+    """
+    if pip_cache_dir is None:
+        return []
+
+    return ["--cache-dir", os.path.abspath(pip_cache_dir)]
+
+
+class WheelhouseError(Exception):
+    """
+    Exception raised when an error occurs while building the wheelhouse.
+    """
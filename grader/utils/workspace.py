@@ -0,0 +1,133 @@
+"""
+Module containing the grading workspace.
+The workspace holds the scratch artifacts of a grading job - the venv, the reports, the coverage data and the caches.
+"""
+
+import logging
+import os
+import tempfile
+from typing import Optional
+
+import grader.utils.constants as const
+
+from grader.utils.logger import VERBOSE
+from grader.utils.reaper import get_reaper
+
+logger = logging.getLogger("grader")
+
+
+class Workspace:
+    """
+    Scratch space of a single grading job. Acts as a context manager.
+
+    By default, the artifacts are placed the way the tools place them - the venv and the coverage data
+    in the project directory, the reports in the shared reports directory (in a directory of each check run).
+    If a workspace directory is given (e.g. /dev/shm), the job gets its own directory under it instead,
+    holding all artifacts, and nothing is written to the project directory. It is removed once the job is done.
+    """
+
+    def __init__(self, project_root: str, workspace_dir: Optional[str] = None):
+        self._project_root = project_root
+        self._workspace_dir = workspace_dir
+        self._job_dir: Optional[str] = None
+
+    def __enter__(self):
+        self.setup()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.teardown()
+
+    def setup(self):
+        """
+        Create the job directory, if a workspace directory is used.
+        """
+        if self._workspace_dir is None:
+            return
+
+        os.makedirs(self._workspace_dir, exist_ok=True)
+
+        job_name = os.path.basename(os.path.normpath(self._project_root))
+        self._job_dir = tempfile.mkdtemp(prefix=f"{job_name}-", dir=self._workspace_dir)
+        os.makedirs(self.reports_dir)
+
+        logger.log(VERBOSE, "Using workspace %s", self._job_dir)
+
+    def teardown(self):
+        """
+        Remove the job directory, with everything in it. The deletion itself happens in the background.
+        """
+        if self._job_dir is None:
+            return
+
+        get_reaper().remove(self._job_dir)
+        self._job_dir = None
+
+    @property
+    def is_isolated(self) -> bool:
+        """
+        :returns: True if the artifacts are placed in a job directory, outside of the project.
+        :rtype: bool
+        """
+        return self._job_dir is not None
+
+    @property
+    def venv_path(self) -> str:
+        """
+        :returns: The path to the virtual environment.
+        :rtype: str
+        """
+        return os.path.join(self._job_dir or self._project_root, const.VENV_NAME)
+
+    @property
+    def reports_dir(self) -> str:
+        """
+        :returns: The directory, containing the reports of the tools.
+        :rtype: str
+        """
+        if self._job_dir is None:
+            return const.REPORTS_TEMP_DIR
+
+        return os.path.join(self._job_dir, const.WORKSPACE_REPORTS_DIR)
+
+    @property
+    def pytest_cache_dir(self) -> Optional[str]:
+        """
+        :returns: The pytest cache directory, or None for the default one, in the project directory.
+        :rtype: Optional[str]
+        """
+        return self.__get_job_path(const.WORKSPACE_PYTEST_CACHE_DIR)
+
+    @property
+    def mypy_cache_dir(self) -> Optional[str]:
+        """
+        :returns: The mypy cache directory, or None for the default one, in the working directory.
+        :rtype: Optional[str]
+        """
+        return self.__get_job_path(const.WORKSPACE_MYPY_CACHE_DIR)
+
+    def get_environment(self) -> Optional[dict[str, str]]:
+        """
+        Get the environment variables for the tools run on the project.
+        In a job directory, the coverage data and the bytecode of the project are written there as well,
+        instead of next to the sources.
+
+        :returns: The environment variables to set, or None if nothing needs to be changed.
+        :rtype: Optional[dict[str, str]]
+        """
+        if self._job_dir is None:
+            return None
+
+        return {
+            "COVERAGE_FILE": os.path.join(self._job_dir, const.WORKSPACE_COVERAGE_DATA_FILE),
+            "PYTHONPYCACHEPREFIX": os.path.join(self._job_dir, const.WORKSPACE_PYCACHE_DIR),
+        }
+
+    def __get_job_path(self, name: str) -> Optional[str]:
+        """
+        :return: The path to an artifact in the job directory, or None if no job directory is used.
+        """
+        if self._job_dir is None:
+            return None
+
+        return os.path.join(self._job_dir, name)
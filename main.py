@@ -3,19 +3,75 @@ Main entry point of the program.
 Calls all the checks, and stores their results
 """
 
+import asyncio
 import os
 import sys
+import time
+from contextlib import nullcontext
+from typing import Any
+
 import grader.utils.constants as const
 
-from grader.checks.abstract_check import CheckError
-from grader.checks.checks_factory import create_checks
-from grader.utils.cli import get_args
+from grader.batch import (
+    batch_lint,
+    batch_mypy_daemon,
+    discover_submissions,
+    grade_submissions,
+    grade_submissions_async,
+    report_results,
+)
+from grader.runner import grade_project
+from grader.utils.cli import get_args, get_batch_args, get_wheelhouse_args, is_batch_mode, is_wheelhouse_mode
 from grader.utils.config import load_config
-from grader.utils.files import get_tests_directory_name
 from grader.utils.logger import setup_logger
+from grader.utils.shared_venv import SharedVenv
+from grader.utils.tool_layer import ToolLayer
+from grader.utils.venv_cache import VenvCache
+from grader.utils.venv_pool import VenvPool
+from grader.utils.venv_template import VenvTemplate
 from grader.utils.virtual_environment import VirtualEnvironment
+from grader.utils.wheelhouse import Wheelhouse, WheelhouseError, get_pip_cache_args
 
-if __name__ == "__main__":
+
+def build_venv_options(args: dict[str, Any]) -> dict[str, Any]:
+    """
+    Build the keyword arguments for the VirtualEnvironment of each project, from the CLI arguments.
+
+    :param args: The parsed CLI arguments
+    :return: The keyword arguments for VirtualEnvironment
+    """
+    venv_options: dict[str, Any] = {}
+
+    if args["venv_cache_dir"] is not None:
+        venv_options["cache"] = VenvCache(args["venv_cache_dir"], args["venv_cache_size"] * 1024 * 1024)
+        venv_options["incremental"] = args["incremental_install"]
+
+    if args["venv_pool_dir"] is not None:
+        venv_options["pool"] = VenvPool(args["venv_pool_dir"], args["venv_pool_size"])
+
+    if args["venv_template_dir"] is not None:
+        venv_options["template"] = VenvTemplate(args["venv_template_dir"])
+
+    if args["shared_venv_dir"] is not None:
+        venv_options["shared"] = SharedVenv(args["shared_venv_dir"])
+
+    if args["tool_layer_dir"] is not None:
+        venv_options["tool_layer"] = ToolLayer(args["tool_layer_dir"])
+
+    pip_options = get_pip_cache_args(args["pip_cache_dir"])
+    if args["wheelhouse_dir"] is not None:
+        pip_options += Wheelhouse(args["wheelhouse_dir"]).get_install_args()
+
+    if pip_options:
+        venv_options["pip_options"] = pip_options
+
+    return venv_options
+
+
+def run_single():
+    """
+    Grade a single project, passed as a CLI argument.
+    """
     args = get_args()
     student_id = args["student_id"]
     logger = setup_logger(student_id, verbosity=args["verbosity"])
@@ -39,31 +95,97 @@ if __name__ == "__main__":
         logger.error("Project root directory does not exist")
         sys.exit(1)
 
-    tests_directory = get_tests_directory_name(project_root)
-    if tests_directory is None:
-        logger.warning("No tests directory found in the project directory. Either it is missing or named differently.")
+    venv_options = build_venv_options(args)
+    replenisher = VirtualEnvironment(project_root, **venv_options).create_pool_replenisher()
 
-    scores = []
-    non_venv_checks, venv_checks = create_checks(config, project_root)
+    with replenisher or nullcontext():
+        scores = grade_project(
+            config, project_root, args["max_parallel_checks"], venv_options, workspace_dir=args["workspace_dir"]
+        )
 
-    for check in non_venv_checks:
-        try:
-            check_score = check.run()
-        except CheckError as error:
-            logger.error("Check failed: %s", error)
-            check_score = 0.0
+    for name, score, max_score in scores:
+        logger.info("Check: %s, Score: %s/%s", name, score, max_score)
 
-        scores.append((check.name, check_score, check.max_points))
 
-    with VirtualEnvironment(project_root) as venv:
-        for check in venv_checks:
-            try:
-                check_score = check.run()
-            except CheckError as error:
-                logger.error("Check failed: %s", error)
-                check_score = 0.0
+def run_batch():
+    """
+    Grade every project in a submissions directory, using a pool of worker processes.
+    """
+    args = get_batch_args()
+    logger = setup_logger(verbosity=args["verbosity"])
 
-            scores.append((check.name, check_score, check.max_points))
+    logger.info("Python project grader, %s", const.VERSION)
 
-    for name, score, max_score in scores:
-        logger.info("Check: %s, Score: %s/%s", name, score, max_score)
+    try:
+        config = load_config(args["config"])
+    except FileNotFoundError as exc:
+        logger.error("Configuration file not found")
+        logger.debug("Exception: %s", exc)
+        sys.exit(1)
+
+    logger.debug("Arguments: %s", args)
+
+    submissions_dir = args["submissions_dir"]
+
+    if not os.path.isdir(submissions_dir):
+        logger.error("Submissions directory does not exist")
+        sys.exit(1)
+
+    submissions = discover_submissions(submissions_dir)
+    logger.info("Found %d submissions, grading with %d workers", len(submissions), args["jobs"])
+
+    venv_options = build_venv_options(args)
+    replenisher = VirtualEnvironment(submissions_dir, **venv_options).create_pool_replenisher()
+
+    linter = batch_lint(config, submissions, args["jobs"], venv_options) if args["batch_lint"] else nullcontext(config)
+
+    start_time = time.monotonic()
+    with replenisher or nullcontext(), linter as linted_config:
+        daemon = batch_mypy_daemon(linted_config) if args["mypy_daemon"] else nullcontext(linted_config)
+
+        with daemon as batch_config:
+            if args["asyncio"]:
+                results = asyncio.run(
+                    grade_submissions_async(
+                        batch_config, submissions, args["jobs"], venv_options, workspace_dir=args["workspace_dir"]
+                    )
+                )
+            else:
+                results = grade_submissions(
+                    batch_config,
+                    submissions,
+                    args["jobs"],
+                    args["max_parallel_checks"],
+                    venv_options,
+                    workspace_dir=args["workspace_dir"],
+                    forkserver=args["forkserver"],
+                )
+    report_results(results, time.monotonic() - start_time)
+
+
+def run_wheelhouse():
+    """
+    Build the local wheelhouse, used for installing the requirements without network access.
+    """
+    args = get_wheelhouse_args()
+    logger = setup_logger(verbosity=args["verbosity"])
+
+    logger.info("Python project grader, %s", const.VERSION)
+    logger.debug("Arguments: %s", args)
+
+    requirements_paths = [const.GRADER_REQUIREMENTS] + args["requirements"]
+
+    try:
+        Wheelhouse(args["wheelhouse_dir"]).build(requirements_paths, args["pip_cache_dir"])
+    except WheelhouseError as error:
+        logger.error("Building the wheelhouse failed: %s", error)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    if is_batch_mode():
+        run_batch()
+    elif is_wheelhouse_mode():
+        run_wheelhouse()
+    else:
+        run_single()
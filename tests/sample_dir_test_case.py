@@ -0,0 +1,32 @@
+"""
+Base test case for the tests working in a sample directory.
+"""
+
+import os
+import shutil
+import unittest
+
+
+class SampleDirTestCase(unittest.TestCase):
+    """
+    Test case, creating an empty sample directory before each test and removing it after.
+    """
+
+    sample_dir_name = "sample_dir"
+
+    def setUp(self):
+        """
+        Set up the test environment, with an empty sample directory.
+        """
+        self.sample_dir = os.path.abspath(self.sample_dir_name)
+        os.makedirs(self.sample_dir)
+        return super().setUp()
+
+    def tearDown(self):
+        """
+        Tear down the test environment, removing the sample directory.
+        """
+        if os.path.exists(self.sample_dir):
+            shutil.rmtree(self.sample_dir)
+
+        return super().tearDown()
@@ -0,0 +1,123 @@
+"""
+Unit tests for the AstroidCache class.
+"""
+
+import os
+import shutil
+import unittest
+
+from astroid import MANAGER
+
+import grader.utils.constants as const
+from grader.utils.astroid_cache import AstroidCache, get_astroid_cache, get_cacheable_modules
+
+
+class TestAstroidCache(unittest.TestCase):
+    """
+    Test cases for the AstroidCache class.
+    """
+
+    def __init__(self, methodName="runTest"):
+        """
+        Initialize the test case.
+
+        :param methodName: The name of the test method to run.
+        :type methodName: str
+        """
+        self.__sample_cache_dir = os.path.abspath("sample_astroid_cache_dir")
+        super().__init__(methodName)
+
+    def tearDown(self):
+        """
+        Tear down the test environment.
+        """
+        if os.path.exists(self.__sample_cache_dir):
+            shutil.rmtree(self.__sample_cache_dir)
+
+        return super().tearDown()
+
+    def test_01_cache_path(self):
+        """
+        Verify that the cache file is keyed by the versions, and the cache is shared within the process.
+        """
+        # Arrange
+        cache = AstroidCache(self.__sample_cache_dir)
+
+        # Act
+        cache_path = cache.cache_path
+
+        # Assert
+        self.assertEqual(AstroidCache.compute_key(), AstroidCache.compute_key())
+        self.assertEqual(
+            os.path.join(self.__sample_cache_dir, AstroidCache.compute_key() + const.ASTROID_CACHE_EXTENSION),
+            cache_path,
+        )
+        self.assertIs(get_astroid_cache(self.__sample_cache_dir), get_astroid_cache(self.__sample_cache_dir))
+
+    def test_02_save_and_load(self):
+        """
+        Verify that the saved trees are loaded into astroid by another cache, only once.
+        """
+        # Arrange
+        module = MANAGER.ast_from_module_name("textwrap")
+        AstroidCache(self.__sample_cache_dir).save({"textwrap": module})
+        del MANAGER.astroid_cache["textwrap"]
+        cache = AstroidCache(self.__sample_cache_dir)
+
+        # Act
+        loaded_count = cache.load()
+        second_loaded_count = cache.load()
+
+        # Assert
+        self.assertEqual(1, loaded_count)
+        self.assertEqual(0, second_loaded_count)
+        self.assertIsNot(module, MANAGER.astroid_cache["textwrap"])
+        self.assertEqual(module.file, MANAGER.astroid_cache["textwrap"].file)
+
+    def test_03_save_only_new_modules(self):
+        """
+        Verify that the cache file is only written again, when there are modules which aren't in it yet.
+        """
+        # Arrange
+        cache = AstroidCache(self.__sample_cache_dir)
+        modules = {"textwrap": MANAGER.ast_from_module_name("textwrap")}
+
+        # Act
+        is_saved = cache.save(modules)
+        is_saved_again = cache.save(modules)
+
+        # Assert
+        self.assertTrue(is_saved)
+        self.assertFalse(is_saved_again)
+        self.assertEqual([os.path.basename(cache.cache_path)], os.listdir(self.__sample_cache_dir))
+
+    def test_04_corrupt_cache(self):
+        """
+        Verify that a corrupt cache file is ignored.
+        """
+        # Arrange
+        cache = AstroidCache(self.__sample_cache_dir)
+        os.makedirs(self.__sample_cache_dir)
+        with open(cache.cache_path, "wb") as cache_file:
+            cache_file.write(b"not a cache")
+
+        # Act
+        loaded_count = cache.load()
+
+        # Assert
+        self.assertEqual(0, loaded_count)
+
+    def test_05_cacheable_modules(self):
+        """
+        Verify that only the pure python modules can be saved.
+        """
+        # Arrange
+        MANAGER.ast_from_module_name("textwrap")
+        MANAGER.ast_from_module_name("sys")
+
+        # Act
+        modules = get_cacheable_modules()
+
+        # Assert
+        self.assertIn("textwrap", modules)
+        self.assertNotIn("sys", modules)
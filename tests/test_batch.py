@@ -0,0 +1,325 @@
+"""
+Unit tests for the batch module.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import unittest
+from unittest.mock import MagicMock, patch
+
+from pylint import lint
+
+import grader.utils.constants as const
+from grader.batch import (
+    SubmissionResult,
+    batch_lint,
+    batch_mypy_daemon,
+    calculate_throughput,
+    discover_submissions,
+    grade_submission,
+    grade_submissions,
+    grade_submissions_async,
+)
+from grader.checks.pylint_check import PylintCheck
+from grader.utils.mypy_daemon import is_mypy_daemon_supported
+from grader.utils.reaper import get_reaper
+
+
+class TestBatch(unittest.TestCase):
+    """
+    Test cases for the batch module.
+    """
+
+    def __init__(self, methodName="runTest"):
+        """
+        Initialize the test case.
+
+        :param methodName: The name of the test method to run.
+        :type methodName: str
+        """
+        self.__sample_submissions_dir = "sample_submissions_dir"
+        super().__init__(methodName)
+
+    def setUp(self):
+        """
+        Set up the test environment.
+        """
+        os.makedirs(self.__sample_submissions_dir, exist_ok=True)
+
+        # The submissions are linted ahead against a venv with a sample package, instead of the grader requirements
+        venv_patcher = patch("grader.batch.VirtualEnvironment", side_effect=self.__create_sample_venv)
+        venv_patcher.start()
+        self.addCleanup(venv_patcher.stop)
+
+        return super().setUp()
+
+    def tearDown(self):
+        """
+        Tear down the test environment.
+        """
+        if os.path.exists(self.__sample_submissions_dir):
+            shutil.rmtree(self.__sample_submissions_dir)
+
+        for log_file in ("12345.log", "67890.log"):
+            if os.path.exists(log_file):
+                os.remove(log_file)
+
+        return super().tearDown()
+
+    def test_01_discover_submissions(self):
+        """
+        Test that every non-hidden directory is discovered, with its name used as the student id.
+        """
+        # Arrange
+        for directory in ("67890", "12345", ".git"):
+            os.makedirs(os.path.join(self.__sample_submissions_dir, directory))
+
+        with open(os.path.join(self.__sample_submissions_dir, "notes.txt"), "w", encoding="utf-8") as file:
+            file.write("not a submission")
+
+        submissions_dir = os.path.abspath(self.__sample_submissions_dir)
+        expected = [
+            ("12345", os.path.join(submissions_dir, "12345")),
+            ("67890", os.path.join(submissions_dir, "67890")),
+        ]
+
+        # Act
+        submissions = discover_submissions(self.__sample_submissions_dir)
+
+        # Assert
+        self.assertEqual(expected, submissions)
+
+    @patch("grader.batch.grade_project")
+    def test_02_grade_submission_success(self, mocked_grade_project: MagicMock):
+        """
+        Test that the scores of a successful grading are returned.
+        """
+        # Arrange
+        mocked_grade_project.return_value = [("pylint", 1.0, 2)]
+
+        # Act
+        result = grade_submission({}, "12345", "dummy")
+
+        # Assert
+        self.assertEqual("12345", result.student_id)
+        self.assertEqual([("pylint", 1.0, 2)], result.scores)
+        self.assertIsNone(result.error)
+        self.assertTrue(os.path.exists("12345.log"))
+
+    @patch("grader.batch.grade_project")
+    def test_03_grade_submission_failure(self, mocked_grade_project: MagicMock):
+        """
+        Test that an exception while grading is recorded in the result instead of being raised.
+        """
+        # Arrange
+        mocked_grade_project.side_effect = RuntimeError("Broken submission")
+
+        # Act
+        with self.assertLogs("grader", level="ERROR"):
+            result = grade_submission({}, "67890", "dummy")
+
+        # Assert
+        self.assertEqual(SubmissionResult("67890", error="Broken submission", elapsed=result.elapsed), result)
+
+    def test_04_calculate_throughput(self):
+        """
+        Test that the throughput is calculated in submissions per minute.
+        """
+        # Act & Assert
+        self.assertEqual(120.0, calculate_throughput(60, 30.0))
+        self.assertEqual(0.0, calculate_throughput(10, 0.0))
+
+    def test_05_batch_lint(self):
+        """
+        Test that only the submissions without requirements are linted ahead, into a temporary pylint cache.
+        """
+        # Arrange
+        for student_id, requirements in (("12345", ""), ("67890", "requests\n")):
+            project_root = os.path.join(self.__sample_submissions_dir, student_id)
+            os.makedirs(project_root)
+            with open(os.path.join(project_root, "calc.py"), "w", encoding="utf-8") as file:
+                file.write('"""\nSample module.\n"""\n\nVALUE = 1\n')
+            with open(os.path.join(project_root, "requirements.txt"), "w", encoding="utf-8") as file:
+                file.write(requirements)
+
+        config = {"checks": [{"name": "requirements", "max_points": 1}, {"name": "pylint", "max_points": 2}]}
+
+        # Act
+        with batch_lint(config, discover_submissions(self.__sample_submissions_dir), 2) as batch_config:
+            cache_dir = batch_config["checks"][1]["options"]["cache_dir"]
+            cache_entries = [name for _, _, names in os.walk(cache_dir) for name in names]
+
+        get_reaper().flush()
+
+        # Assert
+        self.assertEqual(config["checks"][0], batch_config["checks"][0])
+        self.assertNotIn("options", config["checks"][1])
+        self.assertEqual(1, len(cache_entries))
+        self.assertFalse(os.path.exists(cache_dir))
+
+    def test_06_batch_lint_without_pylint(self):
+        """
+        Test that nothing is linted ahead, if the pylint check is not configured.
+        """
+        # Arrange
+        config = {"checks": [{"name": "requirements", "max_points": 1}]}
+
+        # Act
+        with batch_lint(config, [("12345", "dummy")], 2) as batch_config:
+            # Assert
+            self.assertIs(config, batch_config)
+
+    def test_07_grade_submissions_forkserver(self):
+        """
+        Test that the submissions are graded in workers forked from the forkserver.
+        """
+        # Arrange
+        submissions = [("12345", os.path.abspath("dummy")), ("67890", os.path.abspath("dummy"))]
+
+        # Act
+        results = grade_submissions({}, submissions, 2, forkserver=True)
+
+        # Assert
+        self.assertEqual(["12345", "67890"], [result.student_id for result in results])
+        self.assertEqual(["No checks found in the configuration file"] * 2, [result.error for result in results])
+
+    def test_08_batch_lint_unreadable_requirements(self):
+        """
+        Test that a submission with unreadable requirements is left to be linted while grading, and the rest are still
+        linted ahead.
+        """
+        # Arrange
+        for student_id, requirements in (("12345", b""), ("67890", b"requests # \xff\xfe\xfa\n")):
+            project_root = os.path.join(self.__sample_submissions_dir, student_id)
+            os.makedirs(project_root)
+            with open(os.path.join(project_root, "calc.py"), "w", encoding="utf-8") as file:
+                file.write('"""\nSample module.\n"""\n\nVALUE = 1\n')
+            with open(os.path.join(project_root, "requirements.txt"), "wb") as file:
+                file.write(requirements)
+
+        config = {"checks": [{"name": "pylint", "max_points": 2}]}
+
+        # Act
+        with self.assertLogs("grader", level="WARNING") as log:
+            with batch_lint(config, discover_submissions(self.__sample_submissions_dir), 2) as batch_config:
+                cache_dir = batch_config["checks"][0]["options"]["cache_dir"]
+                cache_entries = [name for _, _, names in os.walk(cache_dir) for name in names]
+
+        get_reaper().flush()
+
+        # Assert
+        self.assertEqual(1, len(cache_entries))
+        self.assertTrue(any("Failed to read the requirements" in output for output in log.output))
+
+    def test_09_batch_lint_matches_grading(self):
+        """
+        Test that a submission is linted ahead against the venv it gets while grading - the packages of the venv are
+        found, the packages of the grader aren't - and its score is the same as when it is linted while grading.
+        """
+        # Arrange
+        project_root = os.path.join(self.__sample_submissions_dir, "12345")
+        os.makedirs(project_root)
+        with open(os.path.join(project_root, "app.py"), "w", encoding="utf-8") as file:
+            # Pylint is installed for the grader, and not in the venv
+            file.write('"""\nSample app.\n"""\n\nimport helpers\nimport pylint\n\n')
+            file.write("".join(f"print(helpers.VALUE, pylint, {index})\n" for index in range(20)))
+
+        config = {"checks": [{"name": "pylint", "max_points": 100}]}
+
+        # Act
+        with batch_lint(config, discover_submissions(self.__sample_submissions_dir), 1) as batch_config:
+            # The venv of the submission is only set up while grading, after it is linted ahead
+            self.__create_sample_venv(project_root)
+            expected_score = PylintCheck("pylint", 100, project_root, in_process=True).run()
+
+            options = batch_config["checks"][0]["options"]
+            with patch.object(lint.PyLinter, "check") as mocked_check:
+                actual_score = PylintCheck("pylint", 100, project_root, **options).run()
+
+        get_reaper().flush()
+
+        # Assert
+        mocked_check.assert_not_called()
+        self.assertLess(expected_score, 100)
+        self.assertEqual(expected_score, actual_score)
+
+    @staticmethod
+    def __create_sample_venv(project_root: str, **_) -> MagicMock:
+        """
+        Create a sample venv in a project, with a single package in its site-packages.
+
+        :param project_root: The root of the project.
+        :type project_root: str
+        :return: The mocked virtual environment.
+        :rtype: MagicMock
+        """
+        package_dir = os.path.join(project_root, const.VENV_NAME, "lib", "python3", "site-packages", "helpers")
+        os.makedirs(package_dir, exist_ok=True)
+        with open(os.path.join(package_dir, "__init__.py"), "w", encoding="utf-8") as file:
+            file.write("VALUE = 1\n")
+
+        return MagicMock()
+
+    @patch("grader.batch.grade_project_async")
+    def test_10_grade_submissions_async(self, mocked_grade_project: MagicMock):
+        """
+        Test that the submissions graded on the event loop get their own results and log files,
+        even though their gradings interleave.
+        """
+
+        # Arrange
+        async def fake_grade_project(_, project_root: str, *__, **___) -> list:
+            logging.getLogger("grader").info("Started %s", project_root)
+            await asyncio.sleep(0.01)
+            logging.getLogger("grader").info("Finished %s", project_root)
+            if project_root == "broken":
+                raise RuntimeError("Broken submission")
+            return [("pylint", 1.0, 2)]
+
+        mocked_grade_project.side_effect = fake_grade_project
+        submissions = [("67890", "broken"), ("12345", "working")]
+
+        # Act
+        with self.assertLogs("grader", level="INFO"):
+            results = asyncio.run(grade_submissions_async({}, submissions, 2))
+
+        with open("12345.log", encoding="utf-8") as first_log, open("67890.log", encoding="utf-8") as second_log:
+            first_log_content = first_log.read()
+            second_log_content = second_log.read()
+
+        # Assert
+        self.assertEqual(["12345", "67890"], [result.student_id for result in results])
+        self.assertEqual([[("pylint", 1.0, 2)], []], [result.scores for result in results])
+        self.assertEqual([None, "Broken submission"], [result.error for result in results])
+        self.assertIn("Finished working", first_log_content)
+        self.assertNotIn("broken", first_log_content)
+        self.assertIn("Finished broken", second_log_content)
+        self.assertNotIn("working", second_log_content)
+
+    @unittest.skipUnless(is_mypy_daemon_supported(), "The mypy daemon is not supported on this platform")
+    def test_11_batch_mypy_daemon(self):
+        """
+        Test that the type hints check uses the daemon of the batch while the context is active, and the daemon is
+        stopped afterwards - but not with the native engine.
+        """
+        # Arrange
+        config = {"checks": [{"name": "pylint"}, {"name": "type-hints", "options": {"in_process": True}}]}
+        native_config = {"checks": [{"name": "type-hints", "options": {"engine": const.TYPE_HINTS_ENGINE_NATIVE}}]}
+
+        # Act
+        with batch_mypy_daemon(config) as batch_config:
+            address = batch_config["checks"][1]["options"]["daemon"]
+            is_daemon_listening = os.path.exists(address)
+
+        with batch_mypy_daemon(native_config) as batch_native_config:
+            pass
+
+        # Assert
+        self.assertTrue(is_daemon_listening)
+        self.assertFalse(os.path.exists(address))
+        self.assertEqual({"name": "pylint"}, batch_config["checks"][0])
+        self.assertEqual({"in_process": True, "daemon": address}, batch_config["checks"][1]["options"])
+        self.assertEqual({"in_process": True}, config["checks"][1]["options"])
+        self.assertIs(native_config, batch_native_config)
@@ -1,5 +1,8 @@
 import unittest
+from unittest.mock import patch, MagicMock
+
 from grader.checks.checks_factory import create_checks, InvalidCheckError
+from grader.checks.pylint_check import PylintCheck
 from grader.utils.config import InvalidConfigError
 
 
@@ -97,3 +100,70 @@ class TestChecksFactory(unittest.TestCase):
         # Assert
         self.assertEqual(len(non_venv_checks), 1)
         self.assertEqual(len(venv_checks), 0)
+
+    def test_08_check_options(self):
+        """
+        Test that the options of a check are passed to it.
+        """
+        # Arrange
+        config = {"checks": [{"name": "pylint", "max_points": 10, "options": {"in_process": True}}]}
+        project_root = "test_project"
+
+        # Act
+        non_venv_checks, _ = create_checks(config, project_root)
+
+        # Assert
+        self.assertIsInstance(non_venv_checks[0], PylintCheck)
+        self.assertTrue(non_venv_checks[0]._PylintCheck__in_process)
+
+    def test_09_invalid_check_options(self):
+        """
+        Test that unknown options of a check raise an InvalidConfigError.
+        """
+        # Arrange
+        config = {"checks": [{"name": "coverage", "max_points": 10, "options": {"unknown": True}}]}
+        project_root = "test_project"
+
+        # Act
+        with self.assertRaises(InvalidConfigError):
+            create_checks(config, project_root)
+
+    def test_10_invalid_option_value(self):
+        """
+        Test that an error in the constructor of a check, from a bad option value, raises an InvalidConfigError.
+        """
+        # Arrange
+        config = {"checks": [{"name": "pylint", "max_points": 10, "options": {"shards": "3"}}]}
+        project_root = "test_project"
+
+        # Act
+        with self.assertRaises(InvalidConfigError) as cm:
+            create_checks(config, project_root)
+
+        # Assert
+        self.assertIn("Invalid configuration of the pylint check", str(cm.exception))
+        self.assertIsInstance(cm.exception.__cause__, TypeError)
+
+    def test_11_check_without_workspace(self):
+        """
+        Test that the workspace is only passed to the checks which take one.
+        """
+        # Arrange
+        created = []
+
+        class LegacyCheck:  # pylint: disable=too-few-public-methods
+            """
+            A check, which doesn't take a workspace.
+            """
+
+            def __init__(self, name: str, max_points: int, project_root: str):
+                created.append((name, max_points, project_root))
+
+        config = {"checks": [{"name": "legacy", "max_points": 10}]}
+
+        # Act
+        with patch.dict("grader.checks.checks_factory.NAME_TO_CHECK", {"legacy": LegacyCheck}):
+            create_checks(config, "test_project", workspace=MagicMock())
+
+        # Assert
+        self.assertEqual([("legacy", 10, "test_project")], created)
@@ -1,6 +1,6 @@
 import unittest
 from unittest.mock import patch
-from grader.utils.cli import get_args
+from grader.utils.cli import get_args, get_batch_args, get_wheelhouse_args, is_batch_mode, is_wheelhouse_mode
 
 # FILE: grader/utils/test_cli.py
 
@@ -15,7 +15,24 @@ class TestGetArgs(unittest.TestCase):
         """
         Test that the required argument is parsed correctly.
         """
-        expected = {"project_root": "path/to/project", "config": None, "student_id": None, "verbosity": 0}
+        expected = {
+            "project_root": "path/to/project",
+            "config": None,
+            "student_id": None,
+            "max_parallel_checks": 1,
+            "venv_cache_dir": None,
+            "venv_cache_size": 10240,
+            "incremental_install": False,
+            "venv_pool_dir": None,
+            "venv_pool_size": 4,
+            "venv_template_dir": None,
+            "shared_venv_dir": None,
+            "tool_layer_dir": None,
+            "workspace_dir": None,
+            "wheelhouse_dir": None,
+            "pip_cache_dir": None,
+            "verbosity": 0,
+        }
         self.assertEqual(get_args(), expected)
 
     @patch("sys.argv", ["cli.py", "path/to/project", "-c", "path/to/config"])
@@ -23,7 +40,24 @@ class TestGetArgs(unittest.TestCase):
         """
         Test that the optional config argument is parsed correctly.
         """
-        expected = {"project_root": "path/to/project", "config": "path/to/config", "student_id": None, "verbosity": 0}
+        expected = {
+            "project_root": "path/to/project",
+            "config": "path/to/config",
+            "student_id": None,
+            "max_parallel_checks": 1,
+            "venv_cache_dir": None,
+            "venv_cache_size": 10240,
+            "incremental_install": False,
+            "venv_pool_dir": None,
+            "venv_pool_size": 4,
+            "venv_template_dir": None,
+            "shared_venv_dir": None,
+            "tool_layer_dir": None,
+            "workspace_dir": None,
+            "wheelhouse_dir": None,
+            "pip_cache_dir": None,
+            "verbosity": 0,
+        }
         self.assertEqual(get_args(), expected)
 
     @patch("sys.argv", ["cli.py", "path/to/project", "--student-id", "12345"])
@@ -31,7 +65,24 @@ class TestGetArgs(unittest.TestCase):
         """
         Test that the optional student ID argument is parsed correctly.
         """
-        expected = {"project_root": "path/to/project", "config": None, "student_id": "12345", "verbosity": 0}
+        expected = {
+            "project_root": "path/to/project",
+            "config": None,
+            "student_id": "12345",
+            "max_parallel_checks": 1,
+            "venv_cache_dir": None,
+            "venv_cache_size": 10240,
+            "incremental_install": False,
+            "venv_pool_dir": None,
+            "venv_pool_size": 4,
+            "venv_template_dir": None,
+            "shared_venv_dir": None,
+            "tool_layer_dir": None,
+            "workspace_dir": None,
+            "wheelhouse_dir": None,
+            "pip_cache_dir": None,
+            "verbosity": 0,
+        }
         self.assertEqual(get_args(), expected)
 
     @patch("sys.argv", ["cli.py", "path/to/project", "-v"])
@@ -39,7 +90,24 @@ class TestGetArgs(unittest.TestCase):
         """
         Test that the verbosity argument is parsed correctly.
         """
-        expected = {"project_root": "path/to/project", "config": None, "student_id": None, "verbosity": 1}
+        expected = {
+            "project_root": "path/to/project",
+            "config": None,
+            "student_id": None,
+            "max_parallel_checks": 1,
+            "venv_cache_dir": None,
+            "venv_cache_size": 10240,
+            "incremental_install": False,
+            "venv_pool_dir": None,
+            "venv_pool_size": 4,
+            "venv_template_dir": None,
+            "shared_venv_dir": None,
+            "tool_layer_dir": None,
+            "workspace_dir": None,
+            "wheelhouse_dir": None,
+            "pip_cache_dir": None,
+            "verbosity": 1,
+        }
         self.assertEqual(get_args(), expected)
 
     @patch("sys.argv", ["cli.py", "path/to/project", "-vv"])
@@ -47,9 +115,79 @@ class TestGetArgs(unittest.TestCase):
         """
         Test that multiple verbosity arguments are parsed correctly.
         """
-        expected = {"project_root": "path/to/project", "config": None, "student_id": None, "verbosity": 2}
+        expected = {
+            "project_root": "path/to/project",
+            "config": None,
+            "student_id": None,
+            "max_parallel_checks": 1,
+            "venv_cache_dir": None,
+            "venv_cache_size": 10240,
+            "incremental_install": False,
+            "venv_pool_dir": None,
+            "venv_pool_size": 4,
+            "venv_template_dir": None,
+            "shared_venv_dir": None,
+            "tool_layer_dir": None,
+            "workspace_dir": None,
+            "wheelhouse_dir": None,
+            "pip_cache_dir": None,
+            "verbosity": 2,
+        }
         self.assertEqual(get_args(), expected)
 
+    @patch("sys.argv", ["cli.py", "batch", "path/to/submissions", "-j", "4"])
+    def test_batch_arguments(self):
+        """
+        Test that the batch mode is detected and its arguments are parsed correctly.
+        """
+        expected = {
+            "submissions_dir": "path/to/submissions",
+            "config": None,
+            "jobs": 4,
+            "forkserver": False,
+            "asyncio": False,
+            "batch_lint": False,
+            "mypy_daemon": False,
+            "max_parallel_checks": 1,
+            "venv_cache_dir": None,
+            "venv_cache_size": 10240,
+            "incremental_install": False,
+            "venv_pool_dir": None,
+            "venv_pool_size": 4,
+            "venv_template_dir": None,
+            "shared_venv_dir": None,
+            "tool_layer_dir": None,
+            "workspace_dir": None,
+            "wheelhouse_dir": None,
+            "pip_cache_dir": None,
+            "verbosity": 0,
+        }
+        self.assertTrue(is_batch_mode())
+        self.assertEqual(get_batch_args(), expected)
+
+    @patch("sys.argv", ["cli.py", "path/to/project"])
+    def test_not_batch_mode(self):
+        """
+        Test that a project path is not detected as batch mode.
+        """
+        self.assertFalse(is_batch_mode())
+
+    @patch("sys.argv", ["cli.py", "wheelhouse", "build", "path/to/wheelhouse", "-r", "course.txt"])
+    def test_wheelhouse_arguments(self):
+        """
+        Test that the wheelhouse command is detected and its arguments are parsed correctly.
+        """
+        expected = {
+            "action": "build",
+            "wheelhouse_dir": "path/to/wheelhouse",
+            "requirements": ["course.txt"],
+            "pip_cache_dir": None,
+            "verbosity": 0,
+        }
+        self.assertTrue(is_wheelhouse_mode())
+        self.assertFalse(is_batch_mode())
+        self.assertEqual(get_wheelhouse_args(), expected)
+
 
 if __name__ == "__main__":
     unittest.main()
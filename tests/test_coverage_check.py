@@ -2,12 +2,16 @@
 Unit tests for the CoverageCheck class in the coverage_check module.
 """
 
+import json
+import os
 import unittest
 from subprocess import CompletedProcess
 from unittest.mock import patch, MagicMock
 
+import grader.utils.constants as const
 from grader.checks.abstract_check import CheckError
 from grader.checks.coverage_check import CoverageCheck
+from grader.checks.coverage_plugins.grader_coverage_runner import ShardPlugin
 
 
 class TestCoverageCheck(unittest.TestCase):
@@ -47,13 +51,8 @@ class TestCoverageCheck(unittest.TestCase):
         """
 
         # Arrange
-        def mocked_run_side_effect(*args, **kwargs):
-            if "run" in args[0]:
-                return CompletedProcess(args=["coverage", "run"], returncode=0)
-            if "report" in args[0]:
-                return CompletedProcess(args=["coverage", "report"], returncode=1)
+        mocked_run.return_value = CompletedProcess(args=["python"], returncode=const.COVERAGE_RUNNER_REPORT_ERROR)
 
-        mocked_run.side_effect = mocked_run_side_effect
         # Act
         with self.assertLogs("grader", level="ERROR") as log:
             with self.assertRaises(CheckError):
@@ -70,7 +69,7 @@ class TestCoverageCheck(unittest.TestCase):
         Test that a coverage report of 0 translates to a score of 0.
         """
         # Arrange
-        mocked_run.return_value = True
+        mocked_run.return_value = iter([])
         mocked_report.return_value = 0
         expected_score = 0
 
@@ -87,7 +86,7 @@ class TestCoverageCheck(unittest.TestCase):
         Test that a coverage report inside the first range translates to a score of 0.
         """
         # Arrange
-        mocked_run.return_value = True
+        mocked_run.return_value = iter([])
         mocked_report.return_value = 22
         expected_score = 0
 
@@ -104,7 +103,7 @@ class TestCoverageCheck(unittest.TestCase):
         Test that a coverage report at the right bound of the first range translates to a score of 1.
         """
         # Arrange
-        mocked_run.return_value = True
+        mocked_run.return_value = iter([])
         mocked_report.return_value = 100 / 3
         expected_score = 1
 
@@ -121,7 +120,7 @@ class TestCoverageCheck(unittest.TestCase):
         Test that a coverage report at the left bound of the second range translates to a score of 1.
         """
         # Arrange
-        mocked_run.return_value = True
+        mocked_run.return_value = iter([])
         mocked_report.return_value = 100 / 3 + 1
         expected_score = 1
 
@@ -138,7 +137,7 @@ class TestCoverageCheck(unittest.TestCase):
         Test that a coverage report inside the second range translates to a score of 1.
         """
         # Arrange
-        mocked_run.return_value = True
+        mocked_run.return_value = iter([])
         mocked_report.return_value = 50
         expected_score = 1
 
@@ -155,7 +154,7 @@ class TestCoverageCheck(unittest.TestCase):
         Test that a coverage report at the right bound of the second range translates to a score of 2.
         """
         # Arrange
-        mocked_run.return_value = True
+        mocked_run.return_value = iter([])
         mocked_report.return_value = 100 / 3 * 2
         expected_score = 2
 
@@ -172,7 +171,7 @@ class TestCoverageCheck(unittest.TestCase):
         Test that a coverage report inside the third range translates to a score of 2.
         """
         # Arrange
-        mocked_run.return_value = True
+        mocked_run.return_value = iter([])
         mocked_report.return_value = 75
         expected_score = 2
 
@@ -189,7 +188,7 @@ class TestCoverageCheck(unittest.TestCase):
         Test that a coverage report of 100 translates to a score of 2.
         """
         # Arrange
-        mocked_run.return_value = True
+        mocked_run.return_value = iter([])
         mocked_report.return_value = 100
         expected_score = 2
 
@@ -206,11 +205,12 @@ class TestCoverageCheck(unittest.TestCase):
         """
 
         # Arrange
-        def mocked_run_side_effect(*args, **kwargs):
-            if "run" in args[0]:
-                return CompletedProcess(args=["coverage", "run"], returncode=0)
-            if "report" in args[0]:
-                return CompletedProcess(args=["coverage", "report"], returncode=0, stdout="100")
+        def mocked_run_side_effect(command: list[str], **_) -> CompletedProcess:
+            report_path = command[command.index("--report") + 1]
+            with open(report_path, "w", encoding="utf-8") as report_file:
+                json.dump({"totals": {"percent_covered": 100.0, "percent_covered_display": "100"}}, report_file)
+
+            return CompletedProcess(args=command, returncode=0)
 
         mocked_run.side_effect = mocked_run_side_effect
         # Act
@@ -218,3 +218,70 @@ class TestCoverageCheck(unittest.TestCase):
 
         # Assert
         self.assertEqual(2, result)
+
+    @patch("subprocess.run")
+    def test_12_single_runner_process(self, mocked_run: MagicMock):
+        """
+        Test that the tests are run and reported on by a single runner process, with the python of the venv.
+        """
+
+        # Arrange
+        def mocked_run_side_effect(command: list[str], **_) -> CompletedProcess:
+            report_path = command[command.index("--report") + 1]
+            with open(report_path, "w", encoding="utf-8") as report_file:
+                json.dump({"totals": {"percent_covered": 33.5, "percent_covered_display": "34"}}, report_file)
+
+            return CompletedProcess(args=command, returncode=0)
+
+        mocked_run.side_effect = mocked_run_side_effect
+
+        # Act
+        result = self.coverage_check.run()
+        command = mocked_run.call_args.args[0]
+
+        # Assert
+        mocked_run.assert_called_once()
+        self.assertEqual(1, result)
+        self.assertEqual(const.PYTHON_BIN, os.path.basename(command[0]))
+        self.assertEqual(const.COVERAGE_RUNNER, os.path.basename(command[1]))
+        self.assertEqual("sample_dir", command[-1])
+        self.assertFalse(os.path.exists(os.path.dirname(command[command.index("--report") + 1])))
+
+    @patch("subprocess.run")
+    def test_13_sharded_run(self, mocked_run: MagicMock):
+        """
+        Test that the number of shards is passed to the runner.
+        """
+        # Arrange
+        coverage_check = CoverageCheck("Coverage", 2, "sample_dir", shards=4)
+        mocked_run.return_value = CompletedProcess(args=["python"], returncode=1)
+
+        # Act
+        with self.assertLogs("grader", level="ERROR"):
+            with self.assertRaises(CheckError):
+                coverage_check.run()
+        command = mocked_run.call_args.args[0]
+
+        # Assert
+        self.assertEqual("4", command[command.index("--shards") + 1])
+        self.assertLess(command.index("--shards"), command.index("--"))
+
+    def test_14_shards_split_tests(self):
+        """
+        Test that every collected test is kept by exactly one shard, in contiguous parts of about the same size.
+        """
+        # Arrange
+        tests = [f"test_{index}" for index in range(10)]
+        config = MagicMock()
+
+        # Act
+        kept = []
+        for shard in range(3):
+            items = list(tests)
+            ShardPlugin(shard, 3).pytest_collection_modifyitems(config, items)
+            kept.append(items)
+
+        # Assert
+        self.assertEqual(tests, [test for items in kept for test in items])
+        self.assertEqual([3, 3, 4], [len(items) for items in kept])
+        self.assertEqual(3, config.hook.pytest_deselected.call_count)
@@ -0,0 +1,43 @@
+"""
+Unit tests for the forkserver module.
+"""
+
+import subprocess
+import sys
+import unittest
+
+import grader.utils.constants as const
+from grader.utils.forkserver import get_worker_context
+
+
+class TestForkserver(unittest.TestCase):
+    """
+    Test cases for the forkserver module.
+    """
+
+    def test_01_worker_context(self):
+        """
+        Verify that the workers are started from the forkserver, where it is supported.
+        """
+        # Act
+        context = get_worker_context()
+
+        # Assert
+        if sys.platform != "win32":
+            self.assertEqual("forkserver", context.get_start_method())
+
+    def test_02_preload(self):
+        """
+        Verify that the preload module imports the tooling, and freezes it.
+        """
+        # Arrange
+        script = (
+            f"import gc, sys; import {const.FORKSERVER_PRELOAD_MODULE}; "
+            "print(gc.get_freeze_count() > 0, 'pylint.lint' in sys.modules)"
+        )
+
+        # Act
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+
+        # Assert
+        self.assertEqual("True True", output.strip())
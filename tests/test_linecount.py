@@ -0,0 +1,357 @@
+"""
+Unit tests for the native linecount engine.
+"""
+
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+from grader.utils import linecount
+
+
+class TestLinecount(unittest.TestCase):
+    """
+    Test cases for the native linecount engine.
+    """
+
+    def __init__(self, methodName="runTest"):
+        """
+        Initialize the test case.
+
+        :param methodName: The name of the test method to run.
+        :type methodName: str
+        """
+        self.__sample_project_dir = os.path.abspath("sample_linecount_project")
+        super().__init__(methodName)
+
+    def setUp(self):
+        """
+        Set up the test environment.
+        """
+        os.makedirs(self.__sample_project_dir, exist_ok=True)
+        return super().setUp()
+
+    def tearDown(self):
+        """
+        Tear down the test environment.
+        """
+        shutil.rmtree(self.__sample_project_dir, ignore_errors=True)
+        return super().tearDown()
+
+    def __write_module(self, relative_path: str, source: str) -> str:
+        """
+        Write a module into the sample project.
+
+        :param relative_path: The path to the module, relative to the sample project.
+        :type relative_path: str
+        :param source: The source code of the module.
+        :type source: str
+        :return: The path to the module.
+        :rtype: str
+        """
+        module_path = os.path.join(self.__sample_project_dir, relative_path)
+        os.makedirs(os.path.dirname(module_path), exist_ok=True)
+
+        with open(module_path, "w", encoding="utf-8") as module_file:
+            module_file.write(source)
+
+        return module_path
+
+    def test_01_functions(self):
+        """
+        Verify that the functions and methods are counted, but not the functions nested in them.
+        """
+        # Arrange
+        module_path = self.__write_module(
+            "functions.py",
+            "def outer(a: int) -> None:\n"
+            "    def inner(b):\n"
+            "        pass\n"
+            "class Shape:\n"
+            "    def area(self):\n"
+            "        pass\n"
+            "    async def draw(self, *, color: str):\n"
+            "        pass\n"
+            "def legacy(a, b):\n"
+            "    # type: (int, int) -> int\n"
+            "    return a\n",
+        )
+
+        # Act
+        counts = linecount.count_file(module_path)
+
+        # Assert
+        self.assertEqual((8, 11, 3, 4), counts)
+
+    def test_02_plugin_methods(self):
+        """
+        Verify that the methods mypy adds to dataclasses and total_ordering classes are counted.
+        """
+        # Arrange
+        module_path = self.__write_module(
+            "plugins.py",
+            "import dataclasses as dc\n"
+            "from functools import total_ordering\n"
+            "@dc.dataclass(order=True)\n"
+            "class Point:\n"
+            "    x: int\n"
+            "@total_ordering\n"
+            "class Version:\n"
+            "    def __lt__(self, other: object) -> bool:\n"
+            "        return True\n",
+        )
+
+        # Act
+        _, _, annotated_funcs, total_funcs = linecount.count_file(module_path)
+
+        # Assert
+        # The dataclass gets __init__, the internal replace method and 4 comparison methods, the other class 3 more
+        self.assertEqual(1 + 6 + 3, total_funcs)
+        self.assertEqual(total_funcs, annotated_funcs)
+
+    def test_03_ignore_errors(self):
+        """
+        Verify that the functions of a module ignoring its errors are not counted as annotated.
+        """
+        # Arrange
+        module_path = self.__write_module(
+            "ignored.py", "# mypy: ignore-errors\ndef add(a: int) -> int:\n    return a\n"
+        )
+        config_path = self.__write_module("mypy.ini", "[mypy]\n\n[mypy-legacy.*]\nignore_errors = True\n")
+
+        # Act
+        counts = linecount.count_file(module_path)
+        ignored = linecount.read_ignored_modules(config_path)
+
+        # Assert
+        self.assertEqual((0, 3, 0, 1), counts)
+        self.assertEqual(["legacy.*"], ignored)
+        self.assertTrue(linecount.is_module_ignored("legacy", ignored))
+        self.assertTrue(linecount.is_module_ignored("legacy.models", ignored))
+        self.assertFalse(linecount.is_module_ignored("legacy_models", ignored))
+
+    def test_04_module_names(self):
+        """
+        Verify that the modules are named like mypy names them, through the packages and namespace packages.
+        """
+        # Arrange
+        top_level = self.__write_module("main.py", "")
+        package = self.__write_module(os.path.join("package", "__init__.py"), "")
+        namespaced = self.__write_module(os.path.join("package", "namespace", "module.py"), "")
+        outside = self.__write_module(os.path.join("scripts", "run.py"), "")
+
+        # Act
+        names = [linecount.get_module_name(path) for path in [top_level, package, namespaced, outside]]
+
+        # Assert
+        self.assertEqual(["main", "package", "package.namespace.module", "run"], names)
+
+    def test_05_count_files_in_pool(self):
+        """
+        Verify that the modules are counted the same way in a process pool, and the report is written like mypy's.
+        """
+        # Arrange
+        module_paths = [
+            self.__write_module(f"module_{index}.py", "def add(a: int) -> int:\n    return a\n" * index)
+            for index in range(1, 5)
+        ]
+
+        # Act
+        counts = linecount.count_files(module_paths)
+        with patch("grader.utils.constants.LINECOUNT_PARALLEL_MIN_FILES", 2):
+            pool_counts = linecount.count_files(module_paths, jobs=2)
+        linecount.write_report(counts, self.__sample_project_dir)
+
+        with open(os.path.join(self.__sample_project_dir, "linecount.txt"), "r", encoding="utf-8") as report_file:
+            report = report_file.read().splitlines()
+
+        # Assert
+        self.assertEqual(counts, pool_counts)
+        self.assertEqual("     20      20     10     10 total", report[0])
+        self.assertEqual("      8       8      4      4 module_4", report[1])
+
+    def test_06_syntax_error(self):
+        """
+        Verify that an error is raised for a module which can't be parsed.
+        """
+        # Arrange
+        module_path = self.__write_module("broken.py", "def broken(:\n")
+
+        # Act & Assert
+        with self.assertRaises(linecount.LinecountError):
+            linecount.count_file(module_path)
+
+    def test_07_read_report(self):
+        """
+        Verify that the whole report is read back into the totals, and the table of the modules.
+        """
+        # Arrange
+        counts = {"calc": (3, 6, 1, 2), "package.shapes": (6, 6, 2, 2)}
+        linecount.write_report(counts, self.__sample_project_dir)
+
+        # Act
+        totals, read_counts = linecount.read_report(self.__sample_project_dir)
+
+        # Assert
+        self.assertEqual((9, 12, 3, 4), totals)
+        self.assertEqual(counts, read_counts)
+        self.assertEqual(totals, linecount.sum_counts(read_counts.values()))
+
+    def test_08_inherited_fields_across_modules(self):
+        """
+        Verify that a dataclass inherits the fields of its bases from the other modules, like mypy resolves them.
+        """
+        # Arrange
+        package_path = self.__write_module(os.path.join("package", "__init__.py"), "from .base import Base\n")
+        base_path = self.__write_module(
+            os.path.join("package", "base.py"),
+            "from dataclasses import dataclass\n@dataclass\nclass Base:\n    x: int\n",
+        )
+        child_path = self.__write_module(
+            os.path.join("package", "child.py"),
+            "from dataclasses import dataclass\n"
+            "from .base import Base\n"
+            "@dataclass\n"
+            "class Child(Base):\n"
+            "    def describe(self):\n"
+            "        pass\n",
+        )
+        main_path = self.__write_module(
+            "main.py",
+            "from dataclasses import dataclass\n"
+            "from package import Base\n"
+            "@dataclass\n"
+            "class Leaf(Base):\n"
+            "    pass\n",
+        )
+
+        # Act
+        project_files = [package_path, base_path, child_path, main_path]
+        counts = linecount.count_files([child_path, main_path], project_files=project_files)
+
+        # Assert
+        # Both get __init__ for the inherited field, and the internal replace method - through the re-export as well
+        self.assertEqual({"package.child": (4, 6, 2, 3), "main": (5, 5, 2, 2)}, counts)
+
+    def test_09_parity_with_mypy(self):
+        """
+        Verify that the native counts match the linecount report of mypy, module by module, on a project using every
+        construct the native engine counts.
+        """
+        # Arrange
+        project_files = [
+            self.__write_module(
+                "functions.py",
+                "from typing import overload\n"
+                "def outer(a: int) -> None:\n"
+                "    def inner(b):\n"
+                "        pass\n"
+                "class Shape:\n"
+                "    class Inner:\n"
+                "        def size(self): pass\n"
+                "    @property\n"
+                "    def area(self):\n"
+                "        pass\n"
+                "    async def draw(self, *, color: str):\n"
+                "        pass\n"
+                "def legacy(a, b):\n"
+                "    # type: (int, int) -> int\n"
+                "    return a\n"
+                "@overload\n"
+                "def convert(x: int) -> int: ...\n"
+                "@overload\n"
+                "def convert(x: str) -> str: ...\n"
+                "def convert(x):\n"
+                "    return x\n",
+            ),
+            self.__write_module(
+                "plugins.py",
+                "import dataclasses as dc\n"
+                "from functools import total_ordering\n"
+                "from typing import ClassVar\n"
+                "@dc.dataclass(order=True)\n"
+                "class Point:\n"
+                "    x: int\n"
+                "    count: ClassVar[int] = 0\n"
+                "    def __post_init__(self):\n"
+                "        pass\n"
+                "@dc.dataclass(init=False, frozen=True)\n"
+                "class Empty:\n"
+                "    pass\n"
+                "@total_ordering\n"
+                "class Version:\n"
+                "    def __lt__(self, other: object) -> bool:\n"
+                "        return True\n",
+            ),
+            self.__write_module("legacy.py", "def add(a: int) -> int:\n    return a\n"),
+            self.__write_module(os.path.join("package", "__init__.py"), "from .base import Base\n"),
+            self.__write_module(
+                os.path.join("package", "base.py"),
+                "from dataclasses import dataclass\n@dataclass\nclass Base:\n    x: int\n",
+            ),
+            self.__write_module(
+                os.path.join("package", "child.py"),
+                "from dataclasses import dataclass\n"
+                "from .base import Base\n"
+                "@dataclass\n"
+                "class Child(Base):\n"
+                "    def describe(self):\n"
+                "        pass\n",
+            ),
+            self.__write_module(
+                "main.py",
+                "from dataclasses import dataclass\n"
+                "from package import Base\n"
+                "@dataclass\n"
+                "class Leaf(Base):\n"
+                "    pass\n",
+            ),
+        ]
+        if importlib.util.find_spec("attr") is not None:
+            project_files.append(
+                self.__write_module(
+                    "records.py",
+                    "import attr\n"
+                    "import attrs\n"
+                    "@attr.s\n"
+                    "class Record:\n"
+                    "    x = attr.ib()\n"
+                    "@attr.s(eq=False)\n"
+                    "class Unordered:\n"
+                    "    def __init__(self):\n"
+                    "        pass\n"
+                    "@attrs.frozen(cmp=True)\n"
+                    "class Key:\n"
+                    "    x: int\n",
+                )
+            )
+        config_path = self.__write_module("mypy.ini", "[mypy]\n\n[mypy-legacy]\nignore_errors = True\n")
+        reports_dir = os.path.join(self.__sample_project_dir, "reports")
+
+        # Act
+        counts = linecount.count_files(project_files, config_file=config_path)
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "mypy",
+                "--config-file",
+                config_path,
+                "--cache-dir",
+                os.path.join(self.__sample_project_dir, ".mypy_cache"),
+                "--linecount-report",
+                reports_dir,
+                *project_files,
+            ],
+            cwd=self.__sample_project_dir,
+            capture_output=True,
+            check=False,
+        )
+        _, mypy_counts = linecount.read_report(reports_dir)
+
+        # Assert
+        self.assertEqual(mypy_counts, counts)
@@ -0,0 +1,241 @@
+"""
+Unit tests for the mypy daemon.
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import unittest
+from typing import Optional
+from unittest.mock import patch
+
+import grader.utils.constants as const
+from grader.utils import linecount
+from grader.utils.mypy_daemon import MypyDaemon, MypyDaemonError, check_project, is_mypy_daemon_supported
+from tests.sample_dir_test_case import SampleDirTestCase
+
+SHAPES_MODULE = (
+    "from dataclasses import dataclass\n"
+    "from functools import total_ordering\n"
+    "from package import Base\n"
+    "@dataclass(order=True)\n"
+    "class Point(Base):\n"
+    "    y: int\n"
+    "    def norm(self) -> int:\n"
+    "        return self.x + self.y\n"
+    "@total_ordering\n"
+    "class Version:\n"
+    "    def __lt__(self, other: object) -> bool:\n"
+    "        return True\n"
+    "def helper(a, b):\n"
+    "    return a\n"
+)
+BASE_MODULE = "from dataclasses import dataclass\n@dataclass\nclass Base:\n    x: int\n"
+LEGACY_MODULE = "# mypy: ignore-errors\ndef add(a: int, b: int) -> int:\n    return a + b\n"
+
+
+@unittest.skipUnless(is_mypy_daemon_supported(), "The mypy daemon is not supported on this platform")
+class TestMypyDaemon(SampleDirTestCase):
+    """
+    Test cases for the mypy daemon.
+    """
+
+    sample_dir_name = "sample_mypy_daemon_dir"
+    daemon: MypyDaemon
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Start the daemon, shared by the tests.
+        """
+        cls.daemon = MypyDaemon(const.MYPY_TYPE_HINT_CONFIG)
+        cls.daemon.start()
+        return super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Stop the shared daemon.
+        """
+        cls.daemon.stop()
+        return super().tearDownClass()
+
+    def __write_project(self, project_name: str, modules: dict[str, str]) -> list[str]:
+        """
+        Write a project into the sample directory.
+
+        :param project_name: The name of the project directory.
+        :type project_name: str
+        :param modules: The source code of each module, by its path, relative to the project.
+        :type modules: dict[str, str]
+        :return: The paths to the modules.
+        :rtype: list[str]
+        """
+        module_paths = []
+        for relative_path, source in modules.items():
+            module_path = os.path.join(self.sample_dir, project_name, relative_path)
+            os.makedirs(os.path.dirname(module_path), exist_ok=True)
+            with open(module_path, "w", encoding="utf-8") as module_file:
+                module_file.write(source)
+            module_paths.append(module_path)
+
+        return module_paths
+
+    def __check_with_daemon(
+        self, source_files: list[str], daemon: Optional[MypyDaemon] = None
+    ) -> tuple[list[str], Optional[dict[str, linecount.LineCount]]]:
+        """
+        Check the source files with the daemon.
+
+        :param source_files: The source files of the project.
+        :type source_files: list[str]
+        :param daemon: The daemon, defaults to None (the shared daemon)
+        :type daemon: Optional[MypyDaemon]
+        :return: The blocking errors, and the counts of each module - or None, if no report is written.
+        :rtype: tuple[list[str], Optional[dict[str, linecount.LineCount]]]
+        """
+        reports_dir = os.path.join(self.sample_dir, f"daemon_reports_{len(os.listdir(self.sample_dir))}")
+        messages = check_project((daemon or self.daemon).address, source_files, reports_dir)
+
+        if not os.path.exists(os.path.join(reports_dir, const.MYPY_LINE_COUNT_REPORT_NAME)):
+            return messages, None
+        return messages, linecount.read_report(reports_dir)[1]
+
+    def __check_with_mypy(
+        self, source_files: list[str], config_file: str = const.MYPY_TYPE_HINT_CONFIG
+    ) -> Optional[dict[str, linecount.LineCount]]:
+        """
+        Check the source files with a mypy process.
+
+        :param source_files: The source files of the project.
+        :type source_files: list[str]
+        :param config_file: The mypy config, defaults to the config of the type hints check
+        :type config_file: str
+        :return: The counts of each module, or None if no report is written.
+        :rtype: Optional[dict[str, linecount.LineCount]]
+        """
+        reports_dir = os.path.join(self.sample_dir, f"mypy_reports_{len(os.listdir(self.sample_dir))}")
+        command = [sys.executable, "-m", "mypy", "--config-file", config_file, "--linecount-report", reports_dir]
+        command += ["--cache-dir", os.path.join(self.sample_dir, ".mypy_cache")]
+        subprocess.run(command + source_files, cwd=self.sample_dir, capture_output=True, check=False)
+
+        if not os.path.exists(os.path.join(reports_dir, const.MYPY_LINE_COUNT_REPORT_NAME)):
+            return None
+        return linecount.read_report(reports_dir)[1]
+
+    def test_01_matches_mypy_process(self):
+        """
+        Test that the daemon counts each project like a mypy process - with the methods the plugins add to the
+        dataclasses, also with bases in other modules, and without the modules ignoring their errors inline.
+        The projects use the same module names, and none of them sees the modules of another.
+        """
+        # Arrange
+        first_project = self.__write_project(
+            "first",
+            {
+                "shapes.py": SHAPES_MODULE,
+                "legacy.py": LEGACY_MODULE,
+                os.path.join("package", "__init__.py"): "from .base import Base\n",
+                os.path.join("package", "base.py"): BASE_MODULE,
+            },
+        )
+        second_project = self.__write_project(
+            "second",
+            {
+                "shapes.py": "class Point:\n    def norm(self):\n        pass\n",
+                "legacy.py": "def add(a: int) -> int:\n    return a\n",
+            },
+        )
+
+        # Act
+        first_results = [self.__check_with_daemon(first_project) for _ in range(2)]
+        second_result = self.__check_with_daemon(second_project)
+        third_result = self.__check_with_daemon(first_project)
+
+        # Assert
+        first_counts = self.__check_with_mypy(first_project)
+        self.assertIsNotNone(first_counts)
+        self.assertEqual([([], first_counts)] * 3, first_results + [third_result])
+        self.assertEqual(([], self.__check_with_mypy(second_project)), second_result)
+
+    def test_02_blocking_errors(self):
+        """
+        Test that the blocking errors are returned, without a report, like mypy doesn't write one - for a syntax error,
+        and for a module shadowing a module the daemon has analyzed for all projects.
+        """
+        # Arrange
+        broken_project = self.__write_project("broken", {"broken.py": "def broken(:\n"})
+        shadowing_project = self.__write_project("shadowing", {"types.py": "def f(x):\n    return x\n"})
+
+        # Act
+        broken_messages, broken_counts = self.__check_with_daemon(broken_project)
+        shadowing_messages, shadowing_counts = self.__check_with_daemon(shadowing_project)
+
+        # Assert
+        self.assertTrue(broken_messages)
+        self.assertIsNone(broken_counts)
+        self.assertTrue(any('shadows library module "types"' in message for message in shadowing_messages))
+        self.assertIsNone(shadowing_counts)
+        self.assertIsNone(self.__check_with_mypy(shadowing_project))
+
+    def test_03_restart_after_crash(self):
+        """
+        Test that the daemon is restarted when it exits, and the next project is checked by the restarted daemon.
+        """
+        # Arrange
+        project = self.__write_project(
+            "project", {"shapes.py": SHAPES_MODULE, os.path.join("package", "__init__.py"): BASE_MODULE}
+        )
+        crashed_pid = self.daemon.pid
+
+        # Act
+        with self.assertLogs("grader", level="WARNING") as log:
+            os.kill(crashed_pid, signal.SIGKILL)
+            result = self.__check_with_daemon(project)
+
+        # Assert
+        self.assertEqual(([], self.__check_with_mypy(project)), result)
+        self.assertNotEqual(crashed_pid, self.daemon.pid)
+        self.assertTrue(self.daemon.is_running())
+        self.assertIn("WARNING:grader:The mypy daemon exited with code -9, restarting it", log.output)
+
+    def test_04_stale_config(self):
+        """
+        Test that the daemon analyzes the projects with the mypy config, as it is when they are checked.
+        """
+        # Arrange
+        config_file = os.path.join(self.sample_dir, "mypy.ini")
+        with open(config_file, "w", encoding="utf-8") as config:
+            config.write("[mypy]\n")
+        project = self.__write_project("project", {"legacy.py": "def add(a: int) -> int:\n    return a\n"})
+
+        # Act
+        with MypyDaemon(config_file) as daemon:
+            _, counts_before = self.__check_with_daemon(project, daemon)
+            with open(config_file, "a", encoding="utf-8") as config:
+                config.write("\n[mypy-legacy]\nignore_errors = True\n")
+            _, counts_after = self.__check_with_daemon(project, daemon)
+
+        # Assert
+        self.assertEqual({"legacy": (2, 2, 1, 1)}, counts_before)
+        self.assertEqual(self.__check_with_mypy(project, config_file), counts_after)
+        self.assertEqual({"legacy": (0, 2, 0, 1)}, counts_after)
+
+    def test_05_stop(self):
+        """
+        Test that a stopped daemon can't be reached, and its socket is removed.
+        """
+        # Arrange
+        daemon = MypyDaemon(const.MYPY_TYPE_HINT_CONFIG)
+        daemon.start()
+        address = daemon.address
+
+        # Act
+        daemon.stop()
+
+        # Assert
+        self.assertFalse(daemon.is_running())
+        self.assertFalse(os.path.exists(os.path.dirname(address)))
+        with patch("grader.utils.constants.MYPY_DAEMON_CONNECT_TIMEOUT", 0), self.assertRaises(MypyDaemonError):
+            check_project(address, [], self.sample_dir)
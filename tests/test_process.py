@@ -2,11 +2,31 @@
 Unit tests for the process module.
 """
 
+import asyncio
 import subprocess
+import sys
 import unittest
 from unittest.mock import MagicMock, patch
 
-from grader.utils.process import run
+from grader.utils.process import Command, Steps, run, run_async, run_steps, run_steps_async
+
+
+def sample_steps() -> Steps[tuple[list[str], bool]]:
+    """
+    Run two commands at the same time, and then a command which can't be started.
+
+    :return: The outputs of the two commands, and whether starting the last one failed.
+    :rtype: Steps[tuple[list[str], bool]]
+    """
+    outputs = yield [Command([sys.executable, "-c", "print(1)"]), Command([sys.executable, "-c", "print(2)"])]
+
+    try:
+        yield [Command(["missing-grader-command"])]
+        failed = False
+    except OSError:
+        failed = True
+
+    return [output.stdout for output in outputs], failed
 
 
 class TestRunProcess(unittest.TestCase):
@@ -46,7 +66,7 @@ class TestRunProcess(unittest.TestCase):
         self.assertTrue(is_command_name_logged)
         self.assertTrue(is_additional_information_logged)
         mocked_subprocess.assert_called_once_with(
-            [expected_command], check=False, capture_output=True, text=True, cwd=None
+            [expected_command], check=False, capture_output=True, text=True, cwd=None, env=None
         )
 
     @patch("subprocess.run")
@@ -60,9 +80,7 @@ class TestRunProcess(unittest.TestCase):
         expected_returncode = 0
         expected_stdout = "stdout"
 
-        expected_subprocess_result = subprocess.CompletedProcess(
-            expected_command, expected_returncode, expected_stdout
-        )
+        expected_subprocess_result = subprocess.CompletedProcess(expected_command, expected_returncode, expected_stdout)
 
         mocked_subprocess.return_value = expected_subprocess_result
 
@@ -78,5 +96,68 @@ class TestRunProcess(unittest.TestCase):
         self.assertTrue(is_command_name_logged)
         self.assertTrue(is_additional_information_logged)
         mocked_subprocess.assert_called_once_with(
-            [expected_command], check=False, capture_output=True, text=True, cwd=None
+            [expected_command], check=False, capture_output=True, text=True, cwd=None, env=None
+        )
+
+    def test_03_run_async(self):
+        """
+        Test that the run_async function captures, decodes and logs the output like the run function.
+        """
+        # Arrange
+        command = [sys.executable, "-c", "import sys; print('out'); sys.stderr.write('err'); sys.exit(3)"]
+
+        # Act
+        with self.assertLogs("grader", level="DEBUG") as log:
+            actual_result = asyncio.run(run_async(command))
+
+        # Assert
+        self.assertEqual(
+            (command, 3, "out\n", "err"),
+            (actual_result.args, actual_result.returncode, actual_result.stdout, actual_result.stderr),
         )
+        self.assertIn(f"DEBUG:grader:Running command: {command}", log.output)
+        self.assertIn("DEBUG:grader:Command failed: 3 out\n err", log.output)
+
+    def test_04_run_steps(self):
+        """
+        Test that the steps run the same way, whether their commands are blocked on or awaited - the outputs are sent
+        in the order of the commands, and the errors are raised where the commands were yielded.
+        """
+        # Act
+        result = run_steps(sample_steps())
+        async_result = asyncio.run(run_steps_async(sample_steps()))
+
+        # Assert
+        self.assertEqual((["1\n", "2\n"], True), result)
+        self.assertEqual(result, async_result)
+
+    def test_05_run_steps_async_bounded(self):
+        """
+        Test that the semaphore bounds the commands running at the same time on the event loop.
+        """
+        # Arrange
+        running = []
+        max_running = []
+
+        async def fake_run_async(command: list[str], **_) -> subprocess.CompletedProcess:
+            running.append(command)
+            max_running.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(command)
+            return subprocess.CompletedProcess(command, 0, "", "")
+
+        def steps() -> Steps[int]:
+            outputs = yield [Command([str(index)]) for index in range(5)]
+            return len(outputs)
+
+        async def run_all() -> list[int]:
+            semaphore = asyncio.Semaphore(2)
+            return list(await asyncio.gather(run_steps_async(steps(), semaphore), run_steps_async(steps(), semaphore)))
+
+        # Act
+        with patch("grader.utils.process.run_async", side_effect=fake_run_async):
+            results = asyncio.run(run_all())
+
+        # Assert
+        self.assertEqual([5, 5], results)
+        self.assertEqual(2, max(max_running))
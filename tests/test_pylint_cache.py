@@ -0,0 +1,122 @@
+"""
+Unit tests for the PylintCache class.
+"""
+
+import os
+
+from grader.utils.pylint_cache import PylintCache, hash_files
+from tests.sample_dir_test_case import SampleDirTestCase
+
+
+class TestPylintCache(SampleDirTestCase):
+    """
+    Test cases for the PylintCache class.
+    """
+
+    sample_dir_name = "sample_pylint_cache_dir"
+
+    def test_01_key_depends_on_content(self):
+        """
+        Verify that the key of a file changes with its content, but not with its location on disk.
+        """
+        # Arrange
+        context = PylintCache.compute_context(None, [], "")
+        file_path = self.__create_sample_file("first/main.py", "print('hello')\n")
+        same_file_path = self.__create_sample_file("second/main.py", "print('hello')\n")
+
+        # Act
+        key = PylintCache.compute_key(file_path, "main.py", context)
+        same_key = PylintCache.compute_key(same_file_path, "main.py", context)
+        self.__create_sample_file("first/main.py", "print('bye')\n")
+        changed_key = PylintCache.compute_key(file_path, "main.py", context)
+
+        # Assert
+        self.assertEqual(key, same_key)
+        self.assertNotEqual(key, changed_key)
+
+    def test_02_key_depends_on_context(self):
+        """
+        Verify that the key of a file changes with its path in the project, the pylintrc, the requirements
+        and the other project files.
+        """
+        # Arrange
+        file_path = self.__create_sample_file("main.py", "print('hello')\n")
+        rcfile_path = self.__create_sample_file("pylintrc", "[FORMAT]\nmax-line-length=120\n")
+        context = PylintCache.compute_context(rcfile_path, [], "")
+        key = PylintCache.compute_key(file_path, "main.py", context)
+
+        # Act
+        other_path_key = PylintCache.compute_key(file_path, "app.py", context)
+        other_requirements_key = PylintCache.compute_key(
+            file_path, "main.py", PylintCache.compute_context(rcfile_path, ["numpy==2.2.1"], "")
+        )
+        other_project_key = PylintCache.compute_key(
+            file_path, "main.py", PylintCache.compute_context(rcfile_path, [], hash_files([file_path], self.sample_dir))
+        )
+        self.__create_sample_file("pylintrc", "[FORMAT]\nmax-line-length=100\n")
+        other_rcfile_key = PylintCache.compute_key(
+            file_path, "main.py", PylintCache.compute_context(rcfile_path, [], "")
+        )
+
+        # Assert
+        self.assertNotEqual(key, other_path_key)
+        self.assertNotEqual(key, other_requirements_key)
+        self.assertNotEqual(key, other_rcfile_key)
+        self.assertNotEqual(key, other_project_key)
+
+    def test_03_put_and_get(self):
+        """
+        Verify that stored results are returned, and missing results are not.
+        """
+        # Arrange
+        cache = PylintCache(os.path.join(self.sample_dir, "cache"))
+        results = {"stats": {"statement": 3, "convention": 1}, "messages": [{"symbol": "missing-module-docstring"}]}
+
+        # Act
+        missing_results = cache.get("key")
+        cache.put("key", results)
+        cached_results = cache.get("key")
+
+        # Assert
+        self.assertIsNone(missing_results)
+        self.assertEqual(results, cached_results)
+
+    def test_04_hash_files(self):
+        """
+        Verify that the digest of many files changes with their content and paths, but not with their order.
+        """
+        # Arrange
+        main_path = self.__create_sample_file("project/main.py", "import utils\n")
+        utils_path = self.__create_sample_file("project/utils.py", "VALUE = 1\n")
+        project_root = os.path.join(self.sample_dir, "project")
+        digest = hash_files([main_path, utils_path], project_root)
+
+        # Act
+        reordered_digest = hash_files([utils_path, main_path], project_root)
+        other_root_digest = hash_files([main_path, utils_path], self.sample_dir)
+        self.__create_sample_file("project/utils.py", "VALUE = 2\n")
+        changed_digest = hash_files([main_path, utils_path], project_root)
+
+        # Assert
+        self.assertEqual(digest, reordered_digest)
+        self.assertNotEqual(digest, other_root_digest)
+        self.assertNotEqual(digest, changed_digest)
+
+    def __create_sample_file(self, relative_path: str, content: str) -> str:
+        """
+        Create a sample file.
+
+        :param relative_path: The path to the file, relative to the sample directory.
+        :type relative_path: str
+        :param content: The content of the file.
+        :type content: str
+        :return: The path to the file.
+        :rtype: str
+        """
+        file_path = os.path.join(self.sample_dir, relative_path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(content)
+
+        return file_path
@@ -2,15 +2,28 @@
 Unit tests for the PylintCheck class.
 """
 
+import json
+import os
+import shutil
+import sys
+from io import StringIO
 from subprocess import CompletedProcess
+from typing import Optional
 import unittest
 from unittest.mock import patch, MagicMock
 
+from astroid import MANAGER
+from pylint import lint
+
 import grader.utils.constants as const
-from grader.checks.pylint_check import PylintCheck
+from grader.checks.pylint_check import PylintCheck, compute_pylint_score, split_into_shards
+from grader.checks.pylint_plugins.grader_stats_reporter import GraderStatsReporter
+from grader.utils import process
+from grader.utils.astroid_cache import AstroidCache
+from grader.utils.pylint_cache import PylintCache
 
 
-class TestPylintCheck(unittest.TestCase):
+class TestPylintCheck(unittest.TestCase):  # pylint: disable=too-many-public-methods
     """
     Test cases for the PylintCheck class.
     """
@@ -49,6 +62,7 @@ class TestPylintCheck(unittest.TestCase):
         self.assertIn("file1.py", called_with[0][0])
         self.assertIn("file2.py", called_with[0][0])
 
+    @patch("grader.utils.files.find_all_files_under_directory", MagicMock(return_value=["main.py"]))
     @patch("grader.utils.process.run")
     @patch("os.path.exists")
     def test_02_pylintrc_file_exists(self, mocked_os_path_exists: MagicMock, mocked_pylint: MagicMock):
@@ -75,6 +89,7 @@ class TestPylintCheck(unittest.TestCase):
         self.assertIn("--rcfile", called_with[0][0])
         self.assertIn(const.PYLINTRC, called_with[0][0])
 
+    @patch("grader.utils.files.find_all_files_under_directory", MagicMock(return_value=["main.py"]))
     @patch("grader.utils.process.run")
     @patch("os.path.exists")
     def test_03_pylintrc_file_does_not_exist(self, mocked_os_path_exists: MagicMock, mocked_pylint: MagicMock):
@@ -101,6 +116,7 @@ class TestPylintCheck(unittest.TestCase):
         self.assertNotIn("--rcfile", called_with[0][0])
         self.assertNotIn(const.PYLINTRC, called_with[0][0])
 
+    @patch("grader.utils.files.find_all_files_under_directory", MagicMock(return_value=["main.py"]))
     @patch("grader.utils.process.run")
     def test_04_translate_score_zero(self, mocked_pylint: MagicMock):
         """
@@ -119,6 +135,7 @@ class TestPylintCheck(unittest.TestCase):
         # Assert
         self.assertEqual(expected_score, actual_score)
 
+    @patch("grader.utils.files.find_all_files_under_directory", MagicMock(return_value=["main.py"]))
     @patch("grader.utils.process.run")
     def test_05_translate_score_inside_first_range(self, mocked_pylint: MagicMock):
         """
@@ -137,6 +154,7 @@ class TestPylintCheck(unittest.TestCase):
         # Assert
         self.assertEqual(expected_score, actual_score)
 
+    @patch("grader.utils.files.find_all_files_under_directory", MagicMock(return_value=["main.py"]))
     @patch("grader.utils.process.run")
     def test_06_translate_score_right_bound_first_range(self, mocked_pylint: MagicMock):
         """
@@ -155,6 +173,7 @@ class TestPylintCheck(unittest.TestCase):
         # Assert
         self.assertEqual(expected_score, actual_score)
 
+    @patch("grader.utils.files.find_all_files_under_directory", MagicMock(return_value=["main.py"]))
     @patch("grader.utils.process.run")
     def test_07_translate_score_left_bound_second_range(self, mocked_pylint: MagicMock):
         """
@@ -173,6 +192,7 @@ class TestPylintCheck(unittest.TestCase):
         # Assert
         self.assertEqual(expected_score, actual_score)
 
+    @patch("grader.utils.files.find_all_files_under_directory", MagicMock(return_value=["main.py"]))
     @patch("grader.utils.process.run")
     def test_08_translate_score_inside_bound_second_range(self, mocked_pylint: MagicMock):
         """
@@ -191,6 +211,7 @@ class TestPylintCheck(unittest.TestCase):
         # Assert
         self.assertEqual(expected_score, actual_score)
 
+    @patch("grader.utils.files.find_all_files_under_directory", MagicMock(return_value=["main.py"]))
     @patch("grader.utils.process.run")
     def test_09_translate_score_right_bound_second_range(self, mocked_pylint: MagicMock):
         """
@@ -209,6 +230,7 @@ class TestPylintCheck(unittest.TestCase):
         # Assert
         self.assertEqual(expected_score, actual_score)
 
+    @patch("grader.utils.files.find_all_files_under_directory", MagicMock(return_value=["main.py"]))
     @patch("grader.utils.process.run")
     def test_10_translate_score_inside_bound_third_range(self, mocked_pylint: MagicMock):
         """
@@ -227,6 +249,7 @@ class TestPylintCheck(unittest.TestCase):
         # Assert
         self.assertEqual(expected_score, actual_score)
 
+    @patch("grader.utils.files.find_all_files_under_directory", MagicMock(return_value=["main.py"]))
     @patch("grader.utils.process.run")
     def test_11_translate_score_max(self, mocked_pylint: MagicMock):
         """
@@ -245,23 +268,297 @@ class TestPylintCheck(unittest.TestCase):
         # Assert
         self.assertEqual(expected_score, actual_score)
 
+    @patch("grader.utils.process.run")
+    def test_12_run_in_process(self, mocked_pylint: MagicMock):
+        """
+        Test if pylint is run in the grader process, without starting a pylint process.
+
+        :param mocked_pylint: Mocked grader.utils.process.run function.
+        :type mocked_pylint: MagicMock
+        """
+        # Arrange
+        project_root = self.__create_sample_project()
+        pylint_check = PylintCheck("pylint", 2, project_root, in_process=True)
+
+        # Act
+        actual_score = pylint_check.run()
+
+        # Assert
+        mocked_pylint.assert_not_called()
+        self.assertEqual(2, actual_score)
+
+    def test_13_in_process_forgets_project_modules(self):
+        """
+        Test if the modules of the project are removed from the astroid cache, while the standard library is kept.
+        """
+        # Arrange
+        project_root = self.__create_sample_project()
+        pylint_check = PylintCheck("pylint", 2, project_root, in_process=True)
+
+        # Act
+        pylint_check.run()
+
+        # Assert
+        self.assertNotIn("calc", MANAGER.astroid_cache)
+        self.assertIn("os", MANAGER.astroid_cache)
+
+    def test_14_cached_run(self):
+        """
+        Test if only a changed project is linted again, and the score is the same as without the cache.
+        """
+        # Arrange
+        project_root = self.__create_sample_project()
+        with open(os.path.join(project_root, "app.py"), "w", encoding="utf-8") as module_file:
+            module_file.write("import os\nprint(os.sep)\n")
+
+        cache_dir = os.path.abspath("sample_pylint_check_cache")
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+        expected_score = PylintCheck("pylint", 9, project_root, in_process=True).run()
+
+        pylint_check = PylintCheck("pylint", 9, project_root, in_process=True, cache_dir=cache_dir)
+        first_score = pylint_check.run()
+
+        # Act
+        with patch.object(lint.PyLinter, "check", autospec=True, side_effect=lint.PyLinter.check) as wrapped_check:
+            cached_score = pylint_check.run()
+            cached_call_count = wrapped_check.call_count
+
+            with open(os.path.join(project_root, "app.py"), "a", encoding="utf-8") as module_file:
+                module_file.write("print(os.name)\n")
+            second_score = pylint_check.run()
+            linted_files = [arg for arg in wrapped_check.call_args[0][1] if arg.endswith(".py")]
+
+        # Assert
+        self.assertEqual(expected_score, first_score)
+        self.assertEqual(expected_score, cached_score)
+        self.assertEqual(0, cached_call_count)
+        self.assertEqual(PylintCheck("pylint", 9, project_root, in_process=True).run(), second_score)
+        self.assertEqual(
+            sorted([os.path.join(project_root, "app.py"), os.path.join(project_root, "calc.py")]), sorted(linted_files)
+        )
+        self.assertTrue(os.path.isdir(PylintCache(cache_dir).cache_dir))
+
+    def test_15_compute_pylint_score(self):
+        """
+        Test if the score is computed from the statistics of all files, the same way pylint does.
+        """
+        # Arrange
+        file_stats = [
+            {"statement": 10, "error": 1, "warning": 0, "refactor": 0, "convention": 1, "fatal": 0},
+            {"statement": 10, "error": 0, "warning": 1, "refactor": 1, "convention": 0, "fatal": 0},
+        ]
+
+        # Act
+        score = compute_pylint_score(file_stats)
+        fatal_score = compute_pylint_score(file_stats + [{"statement": 0, "fatal": 1}])
+        empty_score = compute_pylint_score([])
+
+        custom_score = compute_pylint_score(file_stats, "10 - error - warning")
+
+        # Assert
+        self.assertAlmostEqual(6.0, score)
+        self.assertEqual(0.0, fatal_score)
+        self.assertEqual(0.0, empty_score)
+        self.assertEqual(8.0, custom_score)
+
+    @patch("grader.utils.process.run")
+    @patch("grader.utils.files.find_all_files_under_directory")
+    def test_16_sharded_run(self, mocked_find_python_files: MagicMock, mocked_pylint: MagicMock):
+        """
+        Test if the files are split between the pylint processes, and the score is computed from all of them.
+
+        :param mocked_find_python_files: Mocked find_all_files_under_directory function.
+        :type mocked_find_python_files: MagicMock
+        :param mocked_pylint: Mocked grader.utils.process.run function.
+        :type mocked_pylint: MagicMock
+        """
+        # Arrange
+        files = ["file1.py", "file2.py", "file3.py"]
+        mocked_find_python_files.return_value = files
+
+        def lint_shard(command, **_):
+            shard_files = [arg for arg in command if arg.endswith(".py")]
+            score = 0 if "file1.py" in shard_files and "--disable=all" not in command else 10
+            return CompletedProcess(command, 16, self.__create_sample_pylint_output(score, shard_files))
+
+        mocked_pylint.side_effect = lint_shard
+        pylint_check = PylintCheck("pylint", 2, "sample_dir", shards=2)
+
+        # Act
+        actual_score = pylint_check.run()
+        commands = [call.args[0] for call in mocked_pylint.call_args_list]
+
+        # Assert
+        # Two shards, and a run looking for duplicate code over all files
+        self.assertEqual(3, mocked_pylint.call_count)
+        self.assertEqual(2, len([command for command in commands if "--disable=duplicate-code" in command]))
+        self.assertEqual([["file1.py", "file3.py"], ["file2.py"]], split_into_shards(files, 2))
+        self.assertEqual(1, actual_score)
+
+    def test_17_reporter_matches_pylint_score(self):
+        """
+        Test if the score computed from the statistics of the reporter is the same as the score of pylint.
+        """
+        # Arrange
+        project_root = self.__create_sample_project()
+        with open(os.path.join(project_root, "app.py"), "w", encoding="utf-8") as module_file:
+            module_file.write("import os\nimport sys\nx = 1\nprint(os.sep)\n")
+
+        reporter = GraderStatsReporter(StringIO())
+        python_files = [os.path.join(project_root, "app.py"), os.path.join(project_root, "calc.py")]
+
+        # Act
+        results = lint.Run(python_files, reporter=reporter, exit=False)
+
+        # Assert
+        assert reporter.results is not None
+        file_stats = [file_results["stats"] for file_results in reporter.results["files"].values()]
+        self.assertEqual(set(python_files), set(reporter.results["files"]))
+        self.assertAlmostEqual(results.linter.stats.global_note, compute_pylint_score(file_stats))
+        self.assertIn(
+            "unused-import", [message["symbol"] for message in reporter.results["files"][python_files[0]]["messages"]]
+        )
+
+    def test_18_astroid_cache(self):
+        """
+        Test if the standard library trees are saved to the astroid cache, without changing the score.
+        """
+        # Arrange
+        project_root = self.__create_sample_project()
+        astroid_cache_dir = os.path.abspath("sample_astroid_cache_dir")
+        self.addCleanup(shutil.rmtree, astroid_cache_dir, True)
+        expected_score = PylintCheck("pylint", 9, project_root, in_process=True).run()
+
+        pylint_check = PylintCheck("pylint", 9, project_root, astroid_cache_dir=astroid_cache_dir)
+
+        # Act
+        actual_score = pylint_check.run()
+
+        # Assert
+        self.assertEqual(expected_score, actual_score)
+        self.assertTrue(os.path.exists(AstroidCache(astroid_cache_dir).cache_path))
+
+    def test_19_cached_run_dependency_changed(self):
+        """
+        Test if the cached results of a module aren't used, once a module it imports has changed.
+        """
+        # Arrange
+        project_root = self.__create_sample_project()
+        with open(os.path.join(project_root, "app.py"), "w", encoding="utf-8") as module_file:
+            module_file.write('"""\nSample app.\n"""\n\nfrom calc import get_separator\n\nprint(get_separator())\n')
+
+        cache_dir = os.path.abspath("sample_pylint_check_cache")
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+        pylint_check = PylintCheck("pylint", 9, project_root, in_process=True, cache_dir=cache_dir)
+        pylint_check.run()
+
+        with open(os.path.join(project_root, "calc.py"), "w", encoding="utf-8") as module_file:
+            module_file.write('"""\nSample module.\n"""\n\nSEPARATOR = "/"\n')
+
+        # Act
+        actual_score = pylint_check.run()
+
+        # Assert
+        self.assertEqual(PylintCheck("pylint", 9, project_root, in_process=True).run(), actual_score)
+        self.assertLess(actual_score, 9)
+
+    def test_20_sharded_run_duplicate_code(self):
+        """
+        Test if duplicate code between the files of different shards is found, and the score is the same
+        as the score of a single pylint process.
+        """
+        # Arrange
+        project_root = self.__create_sample_project()
+        body = "".join(f"    value_{index} = int(text) * {index}\n    print(value_{index})\n" for index in range(8))
+        for module_name in ["first", "second", "third"]:
+            with open(os.path.join(project_root, f"{module_name}.py"), "w", encoding="utf-8") as module_file:
+                module_file.write(
+                    f'"""\nSample module.\n"""\n\n\ndef run(text: str):\n    """\n    Run.\n    """\n{body}'
+                )
+
+        def run_pylint(command: list[str], **kwargs) -> CompletedProcess[str]:
+            # The pylint of the grader, instead of the pylint of the project's venv
+            return run_process([sys.executable, "-m", "pylint"] + command[1:], **kwargs)
+
+        run_process = process.run
+
+        # Act
+        with patch("grader.utils.process.run", side_effect=run_pylint) as mocked_run:
+            expected_score = PylintCheck("pylint", 100, project_root).run()
+            actual_score = PylintCheck("pylint", 100, project_root, shards=4).run()
+            duplicate_code_commands = [
+                call.args[0] for call in mocked_run.call_args_list if "--disable=all" in call.args[0]
+            ]
+
+        # Assert
+        self.assertLess(expected_score, 100)
+        self.assertEqual(expected_score, actual_score)
+        self.assertEqual(1, len(duplicate_code_commands))
+
+    def test_21_in_process_isolated_from_grader(self):
+        """
+        Test if in-process, the modules are only imported from the project's venv and the standard library,
+        and not from the packages of the grader - like the pylint process of the venv.
+        """
+        # Arrange
+        project_root = self.__create_sample_project()
+        site_packages = os.path.join(project_root, const.VENV_NAME, "lib", "python3", "site-packages")
+        os.makedirs(os.path.join(site_packages, "helpers"))
+        with open(os.path.join(site_packages, "helpers", "__init__.py"), "w", encoding="utf-8") as module_file:
+            module_file.write("VALUE = 1\n")
+        with open(os.path.join(project_root, "app.py"), "w", encoding="utf-8") as module_file:
+            # Pylint is installed for the grader, and not in the venv
+            module_file.write('"""\nSample app.\n"""\n\nimport helpers\nimport pylint\n\nprint(helpers, pylint)\n')
+
+        reporter = GraderStatsReporter(StringIO())
+        sys_path = list(sys.path)
+
+        # Act
+        with patch("grader.checks.pylint_check.GraderStatsReporter", return_value=reporter):
+            PylintCheck("pylint", 2, project_root, in_process=True).run()
+
+        # Assert
+        assert reporter.results is not None
+        messages = reporter.results["files"][os.path.join(project_root, "app.py")]["messages"]
+        self.assertEqual(["Unable to import 'pylint'"], [message["message"] for message in messages])
+        self.assertEqual(sys_path, sys.path)
+
+    def __create_sample_project(self) -> str:
+        """
+        Create a sample project with a single, well written module.
+
+        :return: The path to the project.
+        :rtype: str
+        """
+        project_root = os.path.abspath("sample_pylint_project")
+        os.makedirs(project_root, exist_ok=True)
+        self.addCleanup(shutil.rmtree, project_root)
+
+        with open(os.path.join(project_root, "calc.py"), "w", encoding="utf-8") as module_file:
+            module_file.write(
+                '"""\nSample module.\n"""\n\nimport os\n\n\n'
+                'def get_separator() -> str:\n    """\n    Get the path separator.\n    """\n    return os.sep\n'
+            )
+
+        return project_root
+
     @staticmethod
-    def __create_sample_pylint_output(score: float) -> str:
+    def __create_sample_pylint_output(score: float, files: Optional[list[str]] = None) -> str:
         """
-        Create a sample pylint output with the given score.
+        Create a sample output of the grader stats reporter with the given score.
 
-        :param score: The score to be included in the output.
+        :param score: The score of the files, under the default evaluation formula.
         :type score: float
+        :param files: The linted files, defaults to a single file.
+        :type files: Optional[list[str]]
         :return: The sample pylint output.
         :rtype: str
         """
-        content = [
-            "************* Module main",
-            "/tmp/temp_project/main.py:1:0: C0114: Missing module docstring (missing-module-docstring)",
-            "/tmp/temp_project/main.py:2:0: E0401: Unable to import 'numpy' (import-error)",
-            '/tmp/temp_project/main.py:2:0: C0413: Import "import numpy as np" should be placed at the top of the module (wrong-import-position)',
-            "",
-            "------------------------------------------------------------------",
-            "Your code has been rated at {score:.2f}/10 (previous run: 1.25/10, +0.00)]",
-        ]
-        return "\n".join(content).format(score=score)
+        stats = {category: 0 for category in const.PYLINT_STAT_CATEGORIES}
+        stats.update({"statement": 3000, "convention": round((10 - score) * 300)})
+
+        results = {
+            "evaluation": const.PYLINT_DEFAULT_EVALUATION,
+            "files": {os.path.abspath(file): {"stats": stats, "messages": []} for file in files or ["main.py"]},
+        }
+        return json.dumps(results) + "\n"
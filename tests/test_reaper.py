@@ -0,0 +1,127 @@
+"""
+Unit tests for the Reaper class.
+"""
+
+import os
+import shutil
+import threading
+from unittest.mock import patch
+
+from grader.utils.reaper import Reaper, get_reaper, reset_reaper
+from tests.sample_dir_test_case import SampleDirTestCase
+
+
+class TestReaper(SampleDirTestCase):
+    """
+    Test cases for the Reaper class.
+    """
+
+    sample_dir_name = "sample_reaper_dir"
+
+    def test_01_remove(self):
+        """
+        Verify that the path is free right away, and the directory is deleted once the reaper is flushed.
+        """
+        # Arrange
+        reaper = Reaper()
+        directory = self.__create_sample_directory("venv")
+
+        # Act
+        reaper.remove(directory)
+        does_path_exist = os.path.exists(directory)
+        reaper.flush()
+
+        # Assert
+        self.assertFalse(does_path_exist)
+        self.assertEqual([], os.listdir(self.sample_dir))
+
+    def test_02_remove_in_background(self):
+        """
+        Verify that the deletion doesn't block the caller.
+        """
+        # Arrange
+        reaper = Reaper()
+        directory = self.__create_sample_directory("venv")
+        deletion_started = threading.Event()
+        deletion_allowed = threading.Event()
+        rmtree = shutil.rmtree
+
+        def blocked_rmtree(path: str, ignore_errors: bool = False):
+            deletion_started.set()
+            deletion_allowed.wait(5)
+            rmtree(path, ignore_errors=ignore_errors)
+
+        # Act
+        with patch("grader.utils.reaper.shutil.rmtree", side_effect=blocked_rmtree):
+            reaper.remove(directory)
+            self.assertTrue(deletion_started.wait(5))
+            is_pending = len(os.listdir(self.sample_dir)) == 1
+
+            deletion_allowed.set()
+            reaper.flush()
+
+        # Assert
+        self.assertTrue(is_pending)
+        self.assertEqual([], os.listdir(self.sample_dir))
+
+    def test_03_bounded_backlog(self):
+        """
+        Verify that every directory is deleted, even when more are handed over than the backlog can hold.
+        """
+        # Arrange
+        reaper = Reaper(max_backlog=1)
+        directories = [self.__create_sample_directory(f"venv{index}") for index in range(5)]
+
+        # Act
+        for directory in directories:
+            reaper.remove(directory)
+        reaper.flush()
+
+        # Assert
+        self.assertEqual([], os.listdir(self.sample_dir))
+
+    def test_04_remove_missing(self):
+        """
+        Verify that a missing directory is ignored.
+        """
+        # Arrange
+        reaper = Reaper()
+
+        # Act
+        reaper.remove(os.path.join(self.sample_dir, "missing"))
+        reaper.flush()
+
+        # Assert
+        self.assertEqual([], os.listdir(self.sample_dir))
+
+    def test_05_get_reaper(self):
+        """
+        Verify that the reaper is shared within the process, and replaced once reset.
+        """
+        # Act
+        reaper = get_reaper()
+        same_reaper = get_reaper()
+        reset_reaper()
+        new_reaper = get_reaper()
+
+        # Assert
+        self.assertIs(reaper, same_reaper)
+        self.assertIsNot(reaper, new_reaper)
+
+    def __create_sample_directory(self, name: str) -> str:
+        """
+        Create a sample directory with a few files in it.
+
+        :param name: The name of the directory.
+        :type name: str
+        :return: The path to the directory.
+        :rtype: str
+        """
+        directory = os.path.join(self.sample_dir, name)
+        os.makedirs(os.path.join(directory, "lib"))
+
+        for index in range(10):
+            with open(os.path.join(directory, "lib", f"module{index}.py"), "w", encoding="utf-8") as file:
+                file.write("pass\n")
+
+        return directory
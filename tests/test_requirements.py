@@ -0,0 +1,176 @@
+"""
+Unit tests for the requirements module.
+"""
+
+import os
+import shutil
+import unittest
+
+from grader.utils.requirements import (
+    get_conflicting_names,
+    get_requirements_delta,
+    has_local_references,
+    normalize_requirement,
+    read_installed_distributions,
+    read_requirements,
+    RequirementsError,
+)
+
+
+class TestRequirements(unittest.TestCase):
+    """
+    Test cases for the requirements parsing functions.
+    """
+
+    def __init__(self, methodName="runTest"):
+        """
+        Initialize the test case.
+
+        :param methodName: The name of the test method to run.
+        :type methodName: str
+        """
+        self.__sample_dir = "sample_requirements_dir"
+        self.__requirements_path = os.path.join(self.__sample_dir, "requirements.txt")
+        super().__init__(methodName)
+
+    def setUp(self):
+        """
+        Set up the test environment.
+        """
+        os.makedirs(self.__sample_dir, exist_ok=True)
+        return super().setUp()
+
+    def tearDown(self):
+        """
+        Tear down the test environment.
+        """
+        if os.path.exists(self.__sample_dir):
+            shutil.rmtree(self.__sample_dir)
+        return super().tearDown()
+
+    def test_01_normalize_requirement(self):
+        """
+        Verify that equivalent requirement lines are normalized to the same string.
+        """
+        # Arrange
+        lines = ["Flask_SQLAlchemy == 3.0", "flask-sqlalchemy==3.0", "flask.sqlalchemy==3.0  # database"]
+
+        # Act
+        normalized = {normalize_requirement(line) for line in lines}
+
+        # Assert
+        self.assertEqual({"flask-sqlalchemy==3.0"}, normalized)
+
+    def test_02_normalize_comment_only(self):
+        """
+        Verify that comments and blank lines are normalized to an empty string.
+        """
+        # Act & Assert
+        self.assertEqual("", normalize_requirement("# only a comment"))
+        self.assertEqual("", normalize_requirement("   "))
+
+    def test_03_read_requirements(self):
+        """
+        Verify that the requirements are read, normalized and sorted.
+        """
+        # Arrange
+        with open(self.__requirements_path, "w", encoding="utf-8") as requirements_file:
+            requirements_file.write("# Dependencies\nRequests >= 2.0, <3\n\nnumpy==1.26.4\n")
+
+        # Act
+        requirements = read_requirements(self.__requirements_path)
+
+        # Assert
+        self.assertEqual(["numpy==1.26.4", "requests>=2.0,<3"], requirements)
+
+    def test_04_read_missing_requirements(self):
+        """
+        Verify that a missing requirements file is treated as an empty one.
+        """
+        # Act & Assert
+        self.assertEqual([], read_requirements(self.__requirements_path))
+
+    def test_05_local_references(self):
+        """
+        Verify that references to other files and local paths are detected.
+        """
+        # Act & Assert
+        self.assertTrue(has_local_references(["numpy", "-r other.txt"]))
+        self.assertTrue(has_local_references(["./my_package"]))
+        self.assertFalse(has_local_references(["numpy==1.26.4", "requests>=2.0"]))
+
+    def test_06_requirements_delta(self):
+        """
+        Verify that the missing and changed requirements are installed, and the ones not required are removed.
+        """
+        # Arrange
+        base_requirements = ["numpy==1.26.4", "pandas==2.2.0", "requests==2.31.0"]
+        requirements = ["flask==3.0.0", "numpy==1.26.4", "requests==2.32.0"]
+
+        # Act
+        missing, extra = get_requirements_delta(requirements, base_requirements)
+
+        # Assert
+        self.assertEqual(["flask==3.0.0", "requests==2.32.0"], missing)
+        self.assertEqual(["pandas"], extra)
+
+    def test_07_read_installed_distributions(self):
+        """
+        Verify that the installed projects are read from the names of the dist-info directories.
+        """
+        # Arrange
+        for entry in ["typing_extensions-4.12.2.dist-info", "numpy-1.26.4.dist-info", "numpy", "_distutils_hack"]:
+            os.makedirs(os.path.join(self.__sample_dir, entry))
+
+        # Act
+        installed = read_installed_distributions(self.__sample_dir)
+
+        # Assert
+        self.assertEqual({"typing-extensions", "numpy"}, installed)
+
+    def test_08_read_encoded_requirements(self):
+        """
+        Verify that the requirements are decoded like pip decodes them - by the byte order mark, or the coding comment.
+        """
+        # Arrange
+        with open(self.__requirements_path, "w", encoding="utf-16") as requirements_file:
+            requirements_file.write("numpy==1.26.4\n")
+
+        # Act
+        utf_16_requirements = read_requirements(self.__requirements_path)
+
+        with open(self.__requirements_path, "w", encoding="latin-1") as requirements_file:
+            requirements_file.write("# -*- coding: latin-1 -*-\n# Grégoire\nnumpy==1.26.4\n")
+
+        latin_1_requirements = read_requirements(self.__requirements_path)
+
+        # Assert
+        self.assertEqual(["numpy==1.26.4"], utf_16_requirements)
+        self.assertEqual(["numpy==1.26.4"], latin_1_requirements)
+
+    def test_09_read_undecodable_requirements(self):
+        """
+        Verify that an error is raised for requirements, which can't be decoded.
+        """
+        # Arrange
+        with open(self.__requirements_path, "wb") as requirements_file:
+            requirements_file.write(b"numpy==1.26.4 # \xff\xfe\xfa\n")
+
+        # Act & Assert
+        with self.assertRaises(RequirementsError):
+            read_requirements(self.__requirements_path)
+
+    def test_10_conflicting_names(self):
+        """
+        Verify that the projects required by both sets of requirements are found by their canonical names,
+        whatever their versions, and the options and references are skipped.
+        """
+        # Arrange
+        requirements = ["pylint==2.17.7", "typing-extensions", "numpy==1.26.4", "-e .", "--pre"]
+        grader_requirements = ["pylint==3.3.3", "typing_extensions==4.12.2", "coverage==7.6.10", "--pre"]
+
+        # Act
+        conflicts = get_conflicting_names(requirements, grader_requirements)
+
+        # Assert
+        self.assertEqual(["pylint", "typing-extensions"], conflicts)
@@ -0,0 +1,173 @@
+"""
+Unit tests for the runner module.
+"""
+
+import asyncio
+import sys
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from grader.checks.abstract_check import AbstractCheck, CheckError
+from grader.runner import grade_project, grade_project_async, run_check
+from grader.utils.process import Command, Steps
+
+
+class DummyCheck(AbstractCheck):
+    """
+    Check returning a fixed score, or failing if no score is given.
+    """
+
+    def __init__(self, name: str, score: float | None):
+        super().__init__(name, 2, "dummy")
+        self.__score = score
+
+    def run(self) -> float:
+        """
+        Run the dummy check.
+        """
+        super().run()
+        if self.__score is None:
+            raise CheckError("Dummy check failed")
+        return self.__score
+
+
+class CommandCheck(AbstractCheck):
+    """
+    Check scored by the output of a command, or failing if the command can't be started.
+    """
+
+    def __init__(self, name: str, command: list[str]):
+        super().__init__(name, 2, "dummy")
+        self.__command = command
+
+    def _steps(self) -> Steps[float]:
+        """
+        Run the command and parse its output as the score.
+        """
+        yield from super()._steps()
+
+        try:
+            [output] = yield [Command(self.__command)]
+        except OSError as error:
+            raise CheckError("Command check failed") from error
+
+        return float(output.stdout)
+
+
+class TestRunner(unittest.TestCase):
+    """
+    Test cases for the runner module.
+    """
+
+    def test_01_run_check_success(self):
+        """
+        Test that a successful check returns its name, score and max points.
+        """
+        # Arrange
+        check = DummyCheck("dummy", 1.0)
+
+        # Act
+        result = run_check(check)
+
+        # Assert
+        self.assertEqual(("dummy", 1.0, 2), result)
+
+    def test_02_run_check_failure(self):
+        """
+        Test that a failed check is scored with 0 points and the error is logged.
+        """
+        # Arrange
+        check = DummyCheck("dummy", None)
+
+        # Act
+        with self.assertLogs("grader", level="ERROR") as log:
+            result = run_check(check)
+            is_message_logged = "ERROR:grader:Check failed: Dummy check failed" in log.output
+
+        # Assert
+        self.assertEqual(("dummy", 0.0, 2), result)
+        self.assertTrue(is_message_logged)
+
+    @patch("grader.runner.VirtualEnvironment")
+    @patch("grader.runner.create_checks")
+    def test_03_grade_project_order(self, mocked_create_checks: MagicMock, mocked_venv: MagicMock):
+        """
+        Test that the non-venv checks are executed before the venv checks, inside the virtual environment.
+        """
+        # Arrange
+        mocked_create_checks.return_value = ([DummyCheck("first", 1.0)], [DummyCheck("second", 2.0)])
+
+        # Act
+        scores = grade_project({}, "dummy")
+
+        # Assert
+        self.assertEqual([("first", 1.0, 2), ("second", 2.0, 2)], scores)
+        mocked_venv.assert_called_once_with("dummy")
+
+    @patch("grader.runner.VirtualEnvironment")
+    @patch("grader.runner.create_checks")
+    def test_04_grade_project_parallel(self, mocked_create_checks: MagicMock, _: MagicMock):
+        """
+        Test that the checks run at the same time when parallelism is allowed.
+        Each check waits on a barrier, which is only passed if all of them are running at once.
+        """
+
+        # Arrange
+        class BarrierCheck(AbstractCheck):
+            """
+            Check waiting for all other barrier checks.
+            """
+
+            barrier = threading.Barrier(3, timeout=5)
+
+            def run(self) -> float:
+                """
+                Wait for the other checks to start.
+                """
+                self.barrier.wait()
+                return 1.0
+
+        mocked_create_checks.return_value = (
+            [BarrierCheck("first", 1, "dummy")],
+            [BarrierCheck("second", 1, "dummy"), BarrierCheck("third", 1, "dummy")],
+        )
+
+        # Act
+        scores = grade_project({}, "dummy", max_parallel_checks=3)
+
+        # Assert
+        self.assertEqual([("first", 1.0, 1), ("second", 1.0, 1), ("third", 1.0, 1)], scores)
+
+    @patch("grader.runner.VirtualEnvironment")
+    @patch("grader.runner.create_checks")
+    def test_05_grade_project_async(self, mocked_create_checks: MagicMock, mocked_venv: MagicMock):
+        """
+        Test that the projects graded on the event loop get the same scores as the projects graded in threads,
+        with the failed checks scored with 0 points.
+        """
+        # Arrange
+        mocked_create_checks.side_effect = lambda *_: (
+            [CommandCheck("first", [sys.executable, "-c", "print(1.5)"])],
+            [CommandCheck("second", [sys.executable, "-c", "print(2)"]), CommandCheck("third", ["missing-command"])],
+        )
+        expected = [("first", 1.5, 2), ("second", 2.0, 2), ("third", 0.0, 2)]
+
+        async def grade_projects() -> list:
+            semaphore = asyncio.Semaphore(2)
+            return list(
+                await asyncio.gather(
+                    grade_project_async({}, "first", semaphore), grade_project_async({}, "second", semaphore)
+                )
+            )
+
+        # Act
+        with self.assertLogs("grader", level="ERROR"):
+            scores = grade_project({}, "dummy")
+            async_scores = asyncio.run(grade_projects())
+
+        # Assert
+        self.assertEqual(expected, scores)
+        self.assertEqual([expected, expected], async_scores)
+        mocked_venv.assert_any_call("first")
+        mocked_venv.assert_any_call("second")
@@ -0,0 +1,56 @@
+"""
+Unit tests for the SharedVenv class.
+"""
+
+import os
+from unittest.mock import MagicMock
+
+from grader.utils.shared_venv import SharedVenv
+from tests.venv_test_case import VenvTestCase
+
+
+class TestSharedVenv(VenvTestCase):
+    """
+    Test cases for the SharedVenv class.
+    """
+
+    sample_dir_name = "sample_shared_venv_dir"
+
+    def test_01_created_once(self):
+        """
+        Verify that the shared environment is created on first use, and reused afterwards.
+        """
+        # Arrange
+        shared = SharedVenv(self.sample_dir)
+        create = MagicMock(side_effect=os.makedirs)
+
+        # Act
+        venv_path = shared.get_or_create(create)
+        same_venv_path = shared.get_or_create(create)
+
+        # Assert
+        create.assert_called_once()
+        self.assertEqual(venv_path, same_venv_path)
+        self.assertTrue(os.path.isdir(venv_path))
+
+    def test_02_variant(self):
+        """
+        Verify that a separate shared environment is created for each variant.
+        """
+        # Arrange
+        shared = SharedVenv(self.sample_dir)
+
+        # Act
+        venv_path = shared.get_or_create(os.makedirs)
+        variant_venv_path = shared.get_or_create(os.makedirs, variant="/tool/layer")
+
+        # Assert
+        self.assertNotEqual(venv_path, variant_venv_path)
+
+    def test_03_is_supported(self):
+        """
+        Verify that only projects without requirements can use the shared environment.
+        """
+        # Act & Assert
+        self.assertTrue(SharedVenv.is_supported([]))
+        self.assertFalse(SharedVenv.is_supported(["requests==2.32.3"]))
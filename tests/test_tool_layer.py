@@ -0,0 +1,108 @@
+"""
+Unit tests for the ToolLayer class.
+"""
+
+import os
+import shutil
+import unittest
+from unittest.mock import patch
+
+import grader.utils.constants as const
+from grader.utils.tool_layer import ToolLayer, ToolLayerError
+
+
+class TestToolLayer(unittest.TestCase):
+    """
+    Test cases for the ToolLayer class.
+    """
+
+    def __init__(self, methodName="runTest"):
+        """
+        Initialize the test case.
+
+        :param methodName: The name of the test method to run.
+        :type methodName: str
+        """
+        self.__sample_dir = os.path.abspath("sample_tool_layer_dir")
+        self.__base_venv_path = os.path.join(self.__sample_dir, "base")
+        self.__venv_path = os.path.join(self.__sample_dir, "student")
+        super().__init__(methodName)
+
+    def setUp(self):
+        """
+        Set up the test environment, containing a fake base and a fake student environment.
+        """
+        for venv_path in (self.__base_venv_path, self.__venv_path):
+            os.makedirs(os.path.join(venv_path, "lib", "python3.11", "site-packages"))
+            os.makedirs(os.path.join(venv_path, "bin"))
+
+        base_bin_path = os.path.join(self.__base_venv_path, "bin")
+        with open(os.path.join(base_bin_path, "pylint"), "w", encoding="utf-8") as script_file:
+            script_file.write(f"#!{base_bin_path}/python\nfrom pylint import run_pylint\nrun_pylint()\n")
+
+        with open(os.path.join(base_bin_path, "pip"), "w", encoding="utf-8") as script_file:
+            script_file.write(f"#!{base_bin_path}/python\n")
+
+        with open(os.path.join(self.__venv_path, "bin", "pip"), "w", encoding="utf-8") as script_file:
+            script_file.write("student pip")
+
+        return super().setUp()
+
+    def tearDown(self):
+        """
+        Tear down the test environment.
+        """
+        if os.path.exists(self.__sample_dir):
+            shutil.rmtree(self.__sample_dir)
+
+        return super().tearDown()
+
+    @unittest.skipIf(os.name == "nt", "The tool layer is not supported on Windows")
+    def test_01_apply(self):
+        """
+        Verify that the base site-packages are added with a .pth file, and the missing scripts are relocated.
+        """
+        # Arrange
+        base_site_packages = os.path.join(self.__base_venv_path, "lib", "python3.11", "site-packages")
+        pth_path = os.path.join(self.__venv_path, "lib", "python3.11", "site-packages", const.TOOL_LAYER_PTH_FILENAME)
+
+        # Act
+        ToolLayer.apply(self.__base_venv_path, self.__venv_path)
+
+        with open(pth_path, "r", encoding="utf-8") as pth_file:
+            pth_content = pth_file.read()
+
+        with open(os.path.join(self.__venv_path, "bin", "pylint"), "r", encoding="utf-8") as script_file:
+            script_content = script_file.read()
+
+        with open(os.path.join(self.__venv_path, "bin", "pip"), "r", encoding="utf-8") as script_file:
+            pip_content = script_file.read()
+
+        # Assert
+        self.assertIn(repr(base_site_packages), pth_content)
+        self.assertTrue(script_content.startswith(f"#!{os.path.join(self.__venv_path, 'bin')}/python\n"))
+        self.assertTrue(os.access(os.path.join(self.__venv_path, "bin", "pylint"), os.X_OK))
+        self.assertEqual("student pip", pip_content)
+
+    def test_02_apply_missing_site_packages(self):
+        """
+        Verify that an error is raised if an environment has no site-packages directory.
+        """
+        # Arrange
+        shutil.rmtree(os.path.join(self.__venv_path, "lib"))
+
+        # Act & Assert
+        with self.assertLogs("grader", level="ERROR"):
+            with self.assertRaises(ToolLayerError):
+                ToolLayer.apply(self.__base_venv_path, self.__venv_path)
+
+    @patch("os.name", "posix")
+    def test_03_is_supported(self):
+        """
+        Verify that the layer is not used when the student requires one of the grader dependencies.
+        """
+        # Act & Assert
+        self.assertTrue(ToolLayer.is_supported([]))
+        self.assertTrue(ToolLayer.is_supported(["numpy==1.26.4"]))
+        self.assertFalse(ToolLayer.is_supported(["numpy==1.26.4", "Packaging>=20"]))
+        self.assertFalse(ToolLayer.is_supported(["Pylint==2.0"]))
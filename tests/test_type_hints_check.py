@@ -4,16 +4,41 @@ Unit tests for the TypeHintsCheck class.
 
 import os
 import shutil
+import threading
 import unittest
 from subprocess import CompletedProcess
+from typing import Callable
 from unittest.mock import patch, MagicMock
 
 import grader.utils.constants as const
 from grader.checks.abstract_check import CheckError
 from grader.checks.type_hints_check import TypeHintsCheck
+from grader.utils import linecount
+from grader.utils.config import InvalidConfigError
+from grader.utils.mypy_daemon import MypyDaemon, is_mypy_daemon_supported
 
 
-class TestTypeHintsCheck(unittest.TestCase):
+def fake_mypy(report: str) -> Callable[..., CompletedProcess]:
+    """
+    Create a fake mypy run, writing the given linecount report to the reports directory of the command.
+
+    :param report: The content of the linecount report.
+    :type report: str
+    :return: The fake run function.
+    :rtype: Callable[..., CompletedProcess]
+    """
+
+    def run(command: list[str], **_) -> CompletedProcess:
+        reports_dir = command[command.index("--linecount-report") + 1]
+        with open(os.path.join(reports_dir, const.MYPY_LINE_COUNT_REPORT_NAME), "w", encoding="utf-8") as report_file:
+            report_file.write(report)
+
+        return CompletedProcess(args=command, returncode=0)
+
+    return run
+
+
+class TestTypeHintsCheck(unittest.TestCase):  # pylint: disable=too-many-public-methods
     """
     Test cases for the TypeHintsCheck class.
     """
@@ -22,7 +47,7 @@ class TestTypeHintsCheck(unittest.TestCase):
         """
         Set up the test environment.
         """
-        self.type_hints_check = TypeHintsCheck("type_hints", 2, "sample_dir")
+        self.type_hints_check = TypeHintsCheck("type_hints", 2, "sample_dir", engine=const.TYPE_HINTS_ENGINE_MYPY)
         # This way, we have 3 ranges: 0-33, 34-66, 67-100
         return super().setUp()
 
@@ -39,11 +64,8 @@ class TestTypeHintsCheck(unittest.TestCase):
         """
         # Arrange
         mocked_find_python_files.return_value = ["file1.py", "file2.py"]
-        mocked_run.return_value = CompletedProcess(args=["mypy"], returncode=0)
-
-        # Copy mypy_sample_linecount.txt to the reports directory
-        os.makedirs(const.REPORTS_TEMP_DIR, exist_ok=True)
-        shutil.copy(os.path.join("tests", "mypy_sample_linecount.txt"), const.MYPY_LINE_COUNT_REPORT)
+        with open(os.path.join("tests", "mypy_sample_linecount.txt"), "r", encoding="utf-8") as sample_file:
+            mocked_run.side_effect = fake_mypy(sample_file.read())
 
         # Act
         self.type_hints_check.run()
@@ -67,9 +89,6 @@ class TestTypeHintsCheck(unittest.TestCase):
         # Arrange
         mocked_run.return_value = CompletedProcess(args=["mypy"], returncode=0)
 
-        if os.path.exists(const.MYPY_LINE_COUNT_REPORT):
-            os.remove(const.MYPY_LINE_COUNT_REPORT)
-
         # Act
         with self.assertLogs(level="ERROR") as cm:
             with self.assertRaises(CheckError):
@@ -88,9 +107,7 @@ class TestTypeHintsCheck(unittest.TestCase):
         :type mocked_run: MagicMock
         """
         # Arrange
-        mocked_run.return_value = CompletedProcess(args=["mypy"], returncode=0)
-        with open(const.MYPY_LINE_COUNT_REPORT, "w", encoding="utf-8") as report_file:
-            report_file.write("0 0 0 100 0")
+        mocked_run.side_effect = fake_mypy("0 0 0 100 0")
 
         expected_score = 0
 
@@ -109,9 +126,7 @@ class TestTypeHintsCheck(unittest.TestCase):
         :type mocked_run: MagicMock
         """
         # Arrange
-        mocked_run.return_value = CompletedProcess(args=["mypy"], returncode=0)
-        with open(const.MYPY_LINE_COUNT_REPORT, "w", encoding="utf-8") as report_file:
-            report_file.write("0 0 20 100 0")
+        mocked_run.side_effect = fake_mypy("0 0 20 100 0")
 
         expected_score = 0
 
@@ -130,9 +145,7 @@ class TestTypeHintsCheck(unittest.TestCase):
         :type mocked_run: MagicMock
         """
         # Arrange
-        mocked_run.return_value = CompletedProcess(args=["mypy"], returncode=0)
-        with open(const.MYPY_LINE_COUNT_REPORT, "w", encoding="utf-8") as report_file:
-            report_file.write("0 0 1 3 0")
+        mocked_run.side_effect = fake_mypy("0 0 1 3 0")
 
         expected_score = 1
 
@@ -151,9 +164,7 @@ class TestTypeHintsCheck(unittest.TestCase):
         :type mocked_run: MagicMock
         """
         # Arrange
-        mocked_run.return_value = CompletedProcess(args=["mypy"], returncode=0)
-        with open(const.MYPY_LINE_COUNT_REPORT, "w", encoding="utf-8") as report_file:
-            report_file.write("0 0 11 30 0")
+        mocked_run.side_effect = fake_mypy("0 0 11 30 0")
 
         expected_score = 1
 
@@ -172,9 +183,7 @@ class TestTypeHintsCheck(unittest.TestCase):
         :type mocked_run: MagicMock
         """
         # Arrange
-        mocked_run.return_value = CompletedProcess(args=["mypy"], returncode=0)
-        with open(const.MYPY_LINE_COUNT_REPORT, "w", encoding="utf-8") as report_file:
-            report_file.write("0 0 15 30 0")
+        mocked_run.side_effect = fake_mypy("0 0 15 30 0")
 
         expected_score = 1
 
@@ -193,9 +202,7 @@ class TestTypeHintsCheck(unittest.TestCase):
         :type mocked_run: MagicMock
         """
         # Arrange
-        mocked_run.return_value = CompletedProcess(args=["mypy"], returncode=0)
-        with open(const.MYPY_LINE_COUNT_REPORT, "w", encoding="utf-8") as report_file:
-            report_file.write("0 0 22 33 0")
+        mocked_run.side_effect = fake_mypy("0 0 22 33 0")
 
         expected_score = 2
 
@@ -214,9 +221,7 @@ class TestTypeHintsCheck(unittest.TestCase):
         :type mocked_run: MagicMock
         """
         # Arrange
-        mocked_run.return_value = CompletedProcess(args=["mypy"], returncode=0)
-        with open(const.MYPY_LINE_COUNT_REPORT, "w", encoding="utf-8") as report_file:
-            report_file.write("0 0 35 40 0")
+        mocked_run.side_effect = fake_mypy("0 0 35 40 0")
 
         expected_score = 2
 
@@ -235,9 +240,7 @@ class TestTypeHintsCheck(unittest.TestCase):
         :type mocked_run: MagicMock
         """
         # Arrange
-        mocked_run.return_value = CompletedProcess(args=["mypy"], returncode=0)
-        with open(const.MYPY_LINE_COUNT_REPORT, "w", encoding="utf-8") as report_file:
-            report_file.write("1290 1805 107 107 total")
+        mocked_run.side_effect = fake_mypy("1290 1805 107 107 total")
 
         expected_score = 2
 
@@ -256,9 +259,7 @@ class TestTypeHintsCheck(unittest.TestCase):
         :type mocked_run: MagicMock
         """
         # Arrange
-        mocked_run.return_value = CompletedProcess(args=["mypy"], returncode=0)
-        with open(const.MYPY_LINE_COUNT_REPORT, "w", encoding="utf-8") as report_file:
-            report_file.write("0 0 0 0 0")
+        mocked_run.side_effect = fake_mypy("0 0 0 0 0")
 
         expected_score = 0
 
@@ -267,3 +268,305 @@ class TestTypeHintsCheck(unittest.TestCase):
 
         # Assert
         self.assertEqual(expected_score, actual_score)
+
+    @patch("grader.utils.process.run")
+    def test_13_run_in_process(self, mocked_run: MagicMock):
+        """
+        Test if mypy is run in the grader process, with its cache in a SQLite database in the cache directory.
+
+        :param mocked_run: Mocked run function.
+        :type mocked_run: MagicMock
+        """
+        # Arrange
+        project_root = os.path.abspath("sample_type_hints_project")
+        cache_dir = os.path.abspath("sample_mypy_cache_dir")
+        os.makedirs(project_root, exist_ok=True)
+        self.addCleanup(shutil.rmtree, project_root)
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+
+        with open(os.path.join(project_root, "calc.py"), "w", encoding="utf-8") as module_file:
+            module_file.write("def add(a: int, b: int) -> int:\n    return a + b\n")
+
+        type_hints_check = TypeHintsCheck("type_hints", 2, project_root, in_process=True, cache_dir=cache_dir)
+
+        # Act
+        first_score = type_hints_check.run()
+        second_score = type_hints_check.run()
+
+        # Assert
+        mocked_run.assert_not_called()
+        self.assertEqual(2, first_score)
+        self.assertEqual(2, second_score)
+        self.assertIn("cache.db", [name for _, _, names in os.walk(cache_dir) for name in names])
+
+    @patch("grader.utils.process.run")
+    def test_14_native_engine(self, mocked_run: MagicMock):
+        """
+        Test if the native engine writes the same linecount report as mypy, without running mypy.
+
+        :param mocked_run: Mocked run function.
+        :type mocked_run: MagicMock
+        """
+        # Arrange
+        project_root = os.path.abspath("sample_type_hints_project")
+        os.makedirs(os.path.join(project_root, "package"), exist_ok=True)
+        self.addCleanup(shutil.rmtree, project_root)
+
+        with open(os.path.join(project_root, "calc.py"), "w", encoding="utf-8") as module_file:
+            module_file.write("def add(a: int, b: int) -> int:\n    return a + b\n\n\n")
+            module_file.write("def sub(a, b):\n    return a - b\n")
+        with open(os.path.join(project_root, "package", "__init__.py"), "w", encoding="utf-8") as module_file:
+            module_file.write("")
+        with open(os.path.join(project_root, "package", "shapes.py"), "w", encoding="utf-8") as module_file:
+            module_file.write("from dataclasses import dataclass\n\n\n@dataclass\nclass Point:\n    x: int\n")
+
+        type_hints_check = TypeHintsCheck("type_hints", 2, project_root, engine=const.TYPE_HINTS_ENGINE_NATIVE)
+
+        # Act
+        with patch("grader.utils.linecount.write_report", wraps=linecount.write_report) as wrapped:
+            score = type_hints_check.run()
+
+        # Assert
+        mocked_run.assert_not_called()
+        expected_counts = {"package.shapes": (6, 6, 2, 2), "calc": (3, 6, 1, 2), "package": (0, 0, 0, 0)}
+        self.assertEqual(expected_counts, wrapped.call_args.args[0])
+        self.assertEqual(2, score)
+
+    def test_15_native_engine_syntax_error(self):
+        """
+        Test if an error is raised, when the native engine can't parse a source file.
+        """
+        # Arrange
+        project_root = os.path.abspath("sample_type_hints_project")
+        os.makedirs(project_root, exist_ok=True)
+        self.addCleanup(shutil.rmtree, project_root)
+
+        with open(os.path.join(project_root, "broken.py"), "w", encoding="utf-8") as module_file:
+            module_file.write("def broken(:\n")
+
+        type_hints_check = TypeHintsCheck("type_hints", 2, project_root, engine=const.TYPE_HINTS_ENGINE_NATIVE)
+
+        # Act & Assert
+        with self.assertLogs(level="ERROR"):
+            with self.assertRaises(CheckError):
+                type_hints_check.run()
+
+    def test_16_unknown_engine(self):
+        """
+        Test if an error is raised for an unknown engine.
+        """
+        # Act & Assert
+        with self.assertRaises(InvalidConfigError):
+            TypeHintsCheck("type_hints", 2, "sample_dir", engine="pyright")
+
+    @patch("grader.utils.process.run")
+    def test_17_concurrent_runs(self, mocked_run: MagicMock):
+        """
+        Test if the checks of two projects, run at the same time, read their own reports, which are removed after.
+
+        :param mocked_run: Mocked run function.
+        :type mocked_run: MagicMock
+        """
+        # Arrange
+        barrier = threading.Barrier(2)
+        reports = {"first": "0 0 0 100 0", "second": "1290 1805 107 107 total"}
+        reports_dirs = []
+
+        def run(command: list[str], **_) -> CompletedProcess:
+            project = "first" if "first.py" in command else "second"
+            output = fake_mypy(reports[project])(command)
+            reports_dirs.append(command[command.index("--linecount-report") + 1])
+            # Both reports are written, before either of them is read
+            barrier.wait(timeout=10)
+            return output
+
+        mocked_run.side_effect = run
+        scores = {}
+
+        def grade(project: str):
+            check = TypeHintsCheck("type_hints", 2, project, engine=const.TYPE_HINTS_ENGINE_MYPY)
+            scores[project] = check.run()
+
+        # Act
+        with patch("grader.utils.files.find_all_source_files", MagicMock(side_effect=lambda root: [f"{root}.py"])):
+            threads = [threading.Thread(target=grade, args=(project,)) for project in reports]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # Assert
+        self.assertEqual({"first": 0, "second": 2}, scores)
+        self.assertEqual(2, len(set(reports_dirs)))
+        self.assertFalse(any(os.path.exists(reports_dir) for reports_dir in reports_dirs))
+
+    @patch("grader.utils.process.run")
+    def test_18_linecount_cache(self, mocked_run: MagicMock):
+        """
+        Test if the counts of the modules are cached, an unchanged project isn't checked again,
+        and a change to any module checks all modules again.
+
+        :param mocked_run: Mocked run function.
+        :type mocked_run: MagicMock
+        """
+        # Arrange
+        project_root = os.path.abspath("sample_type_hints_project")
+        cache_dir = os.path.abspath("sample_linecount_cache")
+        os.makedirs(project_root, exist_ok=True)
+        self.addCleanup(shutil.rmtree, project_root)
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+
+        for module_name in ["calc", "shapes"]:
+            with open(os.path.join(project_root, f"{module_name}.py"), "w", encoding="utf-8") as module_file:
+                module_file.write(f"# {module_name}\n")
+
+        type_hints_check = TypeHintsCheck(
+            "type_hints", 2, project_root, engine=const.TYPE_HINTS_ENGINE_MYPY, linecount_cache_dir=cache_dir
+        )
+
+        # Act
+        mocked_run.side_effect = fake_mypy("10 20 3 6 total\n6 10 3 3 calc\n4 10 0 3 shapes\n")
+        first_score = type_hints_check.run()
+
+        mocked_run.reset_mock()
+        cached_score = type_hints_check.run()
+        cached_call_count = mocked_run.call_count
+
+        with open(os.path.join(project_root, "shapes.py"), "a", encoding="utf-8") as module_file:
+            module_file.write("# annotated\n")
+        mocked_run.side_effect = fake_mypy("16 20 6 6 total\n6 10 3 3 calc\n10 10 3 3 shapes\n")
+        second_score = type_hints_check.run()
+        second_command = mocked_run.call_args.args[0]
+
+        # Assert
+        self.assertEqual(1, first_score)
+        self.assertEqual(1, cached_score)
+        self.assertEqual(0, cached_call_count)
+        self.assertEqual(2, second_score)
+        self.assertIn(os.path.join(project_root, "shapes.py"), second_command)
+        self.assertIn(os.path.join(project_root, "calc.py"), second_command)
+
+    def test_19_regrade_in_process_with_cache(self):
+        """
+        Test if a project is counted the same way as by a mypy process, when it is graded again against the same mypy
+        cache directory - with the methods mypy adds to its dataclasses, and without the annotated functions of the
+        modules ignoring their errors inline.
+        """
+        # Arrange
+        project_root = os.path.abspath("sample_type_hints_project")
+        cache_dir = os.path.abspath("sample_mypy_cache_dir")
+        os.makedirs(project_root, exist_ok=True)
+        self.addCleanup(shutil.rmtree, project_root)
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+
+        with open(os.path.join(project_root, "shapes.py"), "w", encoding="utf-8") as module_file:
+            module_file.write("from dataclasses import dataclass\n\n\n@dataclass\nclass Point:\n    x: int\n\n")
+            module_file.write("    def norm(self) -> int:\n        return self.x\n")
+        with open(os.path.join(project_root, "legacy.py"), "w", encoding="utf-8") as module_file:
+            module_file.write("# mypy: ignore-errors\ndef add(a: int, b: int) -> int:\n    return a + b\n")
+
+        type_hints_check = TypeHintsCheck("type_hints", 2, project_root, cache_dir=cache_dir)
+        reports = []
+
+        def read_report(reports_dir: str) -> tuple[linecount.LineCount, dict[str, linecount.LineCount]]:
+            reports.append(read_mypy_report(reports_dir))
+            return reports[-1]
+
+        # Act
+        read_mypy_report = linecount.read_report
+        with patch("grader.utils.linecount.read_report", side_effect=read_report):
+            type_hints_check.run()
+            type_hints_check.run()
+            TypeHintsCheck("type_hints", 2, project_root).run()
+
+        # Assert
+        # The same counts as the linecount report of a mypy process
+        expected_report = ((9, 12, 3, 4), {"shapes": (9, 9, 3, 3), "legacy": (0, 3, 0, 1)})
+        self.assertEqual([expected_report, expected_report, expected_report], reports)
+
+    @patch("grader.utils.process.run")
+    def test_20_linecount_cache_missing_config(self, mocked_run: MagicMock):
+        """
+        Test if the linecount cache is skipped, instead of failing the check, when the mypy config can't be read.
+
+        :param mocked_run: Mocked run function.
+        :type mocked_run: MagicMock
+        """
+        # Arrange
+        project_root = os.path.abspath("sample_type_hints_project")
+        cache_dir = os.path.abspath("sample_linecount_cache")
+        os.makedirs(project_root, exist_ok=True)
+        self.addCleanup(shutil.rmtree, project_root)
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+
+        with open(os.path.join(project_root, "calc.py"), "w", encoding="utf-8") as module_file:
+            module_file.write("# calc\n")
+
+        mocked_run.side_effect = fake_mypy("10 10 3 3 total\n10 10 3 3 calc\n")
+        type_hints_check = TypeHintsCheck("type_hints", 2, project_root, linecount_cache_dir=cache_dir)
+
+        # Act
+        with patch("grader.checks.type_hints_check.MYPY_TYPE_HINT_CONFIG", os.path.join(project_root, "missing.ini")):
+            actual_score = type_hints_check.run()
+
+        # Assert
+        self.assertEqual(2, actual_score)
+        self.assertFalse(os.path.exists(cache_dir))
+
+    @unittest.skipUnless(is_mypy_daemon_supported(), "The mypy daemon is not supported on this platform")
+    def test_21_daemon(self):
+        """
+        Test if the daemon counts a project the same way as a mypy process - with the methods mypy adds to its
+        dataclasses, and without the annotated functions of the modules ignoring their errors inline.
+        """
+        # Arrange
+        project_root = os.path.abspath("sample_type_hints_project")
+        os.makedirs(project_root, exist_ok=True)
+        self.addCleanup(shutil.rmtree, project_root)
+
+        with open(os.path.join(project_root, "shapes.py"), "w", encoding="utf-8") as module_file:
+            module_file.write(
+                "from dataclasses import dataclass\n\n\n@dataclass(order=True)\nclass Point:\n    x: int\n\n"
+            )
+            module_file.write("    def norm(self) -> int:\n        return self.x\n")
+        with open(os.path.join(project_root, "legacy.py"), "w", encoding="utf-8") as module_file:
+            module_file.write("# mypy: ignore-errors\ndef add(a: int, b: int) -> int:\n    return a + b\n")
+
+        reports = []
+
+        def read_report(reports_dir: str) -> tuple[linecount.LineCount, dict[str, linecount.LineCount]]:
+            reports.append(read_mypy_report(reports_dir))
+            return reports[-1]
+
+        # Act
+        read_mypy_report = linecount.read_report
+        with patch("grader.utils.linecount.read_report", side_effect=read_report):
+            with MypyDaemon(const.MYPY_TYPE_HINT_CONFIG) as daemon:
+                daemon_score = TypeHintsCheck("type_hints", 2, project_root, daemon=daemon.address).run()
+            score = TypeHintsCheck("type_hints", 2, project_root).run()
+
+        # Assert
+        self.assertEqual(score, daemon_score)
+        self.assertEqual(2, len(reports))
+        self.assertEqual(reports[1], reports[0])
+        self.assertEqual({"shapes": (9, 9, 7, 7), "legacy": (0, 3, 0, 1)}, reports[0][1])
+
+    @patch("grader.utils.process.run")
+    def test_22_daemon_unreachable(self, mocked_run: MagicMock):
+        """
+        Test if mypy is run in a process of its own, when the daemon can't be reached.
+
+        :param mocked_run: Mocked run function.
+        :type mocked_run: MagicMock
+        """
+        # Arrange
+        mocked_run.side_effect = fake_mypy("10 10 3 3 total\n10 10 3 3 calc\n")
+        type_hints_check = TypeHintsCheck("type_hints", 2, "sample_dir", daemon=os.path.abspath("missing.sock"))
+
+        # Act
+        with patch("grader.utils.constants.MYPY_DAEMON_CONNECT_TIMEOUT", 0), self.assertLogs("grader", "WARNING"):
+            actual_score = type_hints_check.run()
+
+        # Assert
+        self.assertEqual(2, actual_score)
+        mocked_run.assert_called_once()
@@ -0,0 +1,211 @@
+"""
+Unit tests for the VenvCache class.
+"""
+
+import os
+import time
+from subprocess import CompletedProcess
+from unittest.mock import MagicMock, patch
+
+import grader.utils.constants as const
+from grader.utils.venv_cache import VenvCache, VenvCacheError
+from tests.venv_test_case import VenvTestCase
+
+
+class TestVenvCache(VenvTestCase):
+    """
+    Test cases for the VenvCache class.
+    """
+
+    sample_dir_name = "sample_cache_dir"
+
+    def test_01_key_depends_on_inputs(self):
+        """
+        Verify that the key is stable for the same inputs, and changes with each of them.
+        """
+        # Arrange
+        cache = VenvCache(self.sample_dir)
+
+        # Act
+        key = cache.compute_key(["numpy==1.26.4"], ["pylint==3.3.3"])
+        same_key = cache.compute_key(["numpy==1.26.4"], ["pylint==3.3.3"])
+        other_requirements_key = cache.compute_key(["numpy==2.0.0"], ["pylint==3.3.3"])
+        other_grader_key = cache.compute_key(["numpy==1.26.4"], ["pylint==3.3.4"])
+
+        self.mocked_run.return_value = CompletedProcess([], 0, "3.12.1 (main)\n")
+        other_python_key = VenvCache(self.sample_dir).compute_key(["numpy==1.26.4"], ["pylint==3.3.3"])
+
+        # Assert
+        self.assertEqual(key, same_key)
+        self.assertEqual(4, len({key, other_requirements_key, other_grader_key, other_python_key}))
+
+    def test_02_key_python_version_failure(self):
+        """
+        Verify that an error is raised if the Python version can't be determined.
+        """
+        # Arrange
+        self.mocked_run.return_value = CompletedProcess([], 1)
+        cache = VenvCache(self.sample_dir)
+
+        # Act & Assert
+        with self.assertRaises(VenvCacheError):
+            cache.compute_key([], [])
+
+    def test_03_create_only_on_miss(self):
+        """
+        Verify that the venv is created on the first use only, and reused afterwards.
+        """
+        # Arrange
+        cache = VenvCache(self.sample_dir)
+        create = MagicMock(side_effect=self.__create_sample_venv)
+
+        # Act
+        first_path = cache.get_or_create("key", create)
+        second_path = cache.get_or_create("key", create)
+
+        # Assert
+        create.assert_called_once()
+        self.assertEqual(first_path, second_path)
+        self.assertTrue(os.path.exists(os.path.join(first_path, "marker")))
+
+    def test_04_failed_creation_not_cached(self):
+        """
+        Verify that a failed creation leaves nothing behind in the cache.
+        """
+        # Arrange
+        cache = VenvCache(self.sample_dir)
+
+        def failing_create(venv_path: str):
+            self.__create_sample_venv(venv_path)
+            raise RuntimeError("Failed")
+
+        # Act
+        with self.assertRaises(RuntimeError):
+            cache.get_or_create("key", failing_create)
+
+        # Assert
+        self.assertIsNone(cache.get("key"))
+        self.assertFalse(os.path.exists(os.path.join(self.sample_dir, "key")))
+        self.assertFalse(os.path.exists(os.path.join(self.sample_dir, "key.lock")))
+
+    @patch("grader.utils.venv_cache.const.VENV_CACHE_EVICTION_GRACE_PERIOD", 0)
+    def test_05_evict_least_recently_used(self):
+        """
+        Verify that the least recently used entries are evicted once the cache is over its size budget.
+        """
+        # Arrange
+        cache = VenvCache(self.sample_dir, max_size=250)
+
+        cache.get_or_create("oldest", self.__create_sample_venv)
+        cache.get_or_create("recent", self.__create_sample_venv)
+        self.__set_last_used("oldest", time.time() - 100)
+        self.__set_last_used("recent", time.time() - 50)
+
+        # Act
+        cache.get_or_create("newest", self.__create_sample_venv)
+
+        # Assert
+        self.assertIsNone(cache.get("oldest"))
+        self.assertIsNotNone(cache.get("recent"))
+        self.assertIsNotNone(cache.get("newest"))
+
+    def test_06_evict_keeps_recently_used(self):
+        """
+        Verify that entries used within the grace period are never evicted.
+        """
+        # Arrange
+        cache = VenvCache(self.sample_dir, max_size=0)
+
+        # Act
+        cache.get_or_create("first", self.__create_sample_venv)
+        cache.get_or_create("second", self.__create_sample_venv)
+
+        # Assert
+        self.assertIsNotNone(cache.get("first"))
+        self.assertIsNotNone(cache.get("second"))
+
+    def test_07_find_nearest(self):
+        """
+        Verify that the entry of the same family with the closest requirements is found.
+        """
+        # Arrange
+        cache = VenvCache(self.sample_dir)
+
+        for key, family, requirements in [
+            ("empty", "family", []),
+            ("close", "family", ["numpy==1.26.4", "requests==2.31.0"]),
+            ("other_family", "other", ["numpy==1.26.4", "pandas==2.2.0", "requests==2.31.0"]),
+        ]:
+            cache.get_or_create(
+                key, self.__create_sample_venv, metadata={"family": family, "requirements": requirements}
+            )
+
+        # Act
+        nearest = cache.find_nearest(["numpy==1.26.4", "pandas==2.2.0", "requests==2.31.0"], "family")
+
+        # Assert
+        self.assertEqual((cache.get("close"), ["numpy==1.26.4", "requests==2.31.0"]), nearest)
+
+    def test_08_find_nearest_no_entries(self):
+        """
+        Verify that nothing is found without entries of the same family, or entries without requirements.
+        """
+        # Arrange
+        cache = VenvCache(self.sample_dir)
+        cache.get_or_create("no_metadata", self.__create_sample_venv)
+        cache.get_or_create("other_family", self.__create_sample_venv, metadata={"family": "other", "requirements": []})
+
+        # Act & Assert
+        self.assertIsNone(cache.find_nearest(["numpy==1.26.4"], "family"))
+
+    @patch("grader.utils.venv_cache.const.VENV_CACHE_LOCK_HEARTBEAT_INTERVAL", 0.01)
+    def test_09_lock_refreshed_during_build(self):
+        """
+        Verify that the lock of an entry is refreshed while it is built, so that a slow build isn't taken for
+        an abandoned one.
+        """
+        # Arrange
+        cache = VenvCache(self.sample_dir)
+        lock_path = os.path.join(self.sample_dir, "key.lock")
+        abandoned_time = time.time() - 2 * const.VENV_CACHE_LOCK_TIMEOUT
+        is_refreshed = []
+
+        def slow_create(venv_path: str):
+            os.utime(lock_path, (abandoned_time, abandoned_time))
+            deadline = time.time() + 5
+            while os.path.getmtime(lock_path) == abandoned_time and time.time() < deadline:
+                time.sleep(0.01)
+
+            is_refreshed.append(time.time() - os.path.getmtime(lock_path) < const.VENV_CACHE_LOCK_TIMEOUT)
+            self.__create_sample_venv(venv_path)
+
+        # Act
+        cache.get_or_create("key", slow_create)
+
+        # Assert
+        self.assertEqual([True], is_refreshed)
+        self.assertFalse(os.path.exists(lock_path))
+
+    def __set_last_used(self, key: str, timestamp: float):
+        """
+        Change the last use time of a cache entry.
+
+        :param key: The cache key.
+        :type key: str
+        :param timestamp: The last use time.
+        :type timestamp: float
+        """
+        metadata_path = os.path.join(self.sample_dir, key, const.VENV_CACHE_METADATA_FILENAME)
+        os.utime(metadata_path, (timestamp, timestamp))
+
+    @staticmethod
+    def __create_sample_venv(venv_path: str):
+        """
+        Create a fake venv, containing a single 100 bytes file.
+
+        :param venv_path: The path to the venv.
+        :type venv_path: str
+        """
+        os.makedirs(venv_path)
+        with open(os.path.join(venv_path, "marker"), "w", encoding="utf-8") as marker_file:
+            marker_file.write("x" * 100)
@@ -0,0 +1,299 @@
+"""
+Unit tests for the VenvPool and VenvPoolReplenisher classes.
+"""
+
+import os
+import shutil
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import grader.utils.constants as const
+from grader.utils.reaper import get_reaper
+from grader.utils.venv_pool import VenvPool, VenvPoolReplenisher
+from tests.venv_test_case import VenvTestCase
+
+
+def fake_create(venv_path: str):
+    """
+    Create a fake virtual environment.
+
+    :param venv_path: The path to the virtual environment
+    """
+    os.makedirs(os.path.join(venv_path, "bin"))
+
+
+class TestVenvPool(VenvTestCase):
+    """
+    Test cases for the VenvPool class.
+    """
+
+    sample_dir_name = "sample_venv_pool_dir"
+
+    def test_01_key_depends_on_variant(self):
+        """
+        Verify that the pool key is stable, and depends on the variant.
+        """
+        # Arrange
+        pool = VenvPool(self.sample_dir)
+
+        # Act
+        key = pool.compute_key()
+
+        # Assert
+        self.assertEqual(key, pool.compute_key())
+        self.assertNotEqual(key, pool.compute_key("/tool/layer"))
+
+    def test_02_acquire_empty(self):
+        """
+        Verify that nothing is acquired from an empty pool.
+        """
+        # Arrange
+        pool = VenvPool(self.sample_dir)
+
+        # Act
+        venv_path = pool.acquire(pool.compute_key())
+
+        # Assert
+        self.assertIsNone(venv_path)
+        self.assertFalse(pool.is_full(pool.compute_key()))
+
+    def test_03_acquire_once(self):
+        """
+        Verify that a ready venv is handed out only once, and is removed once released.
+        """
+        # Arrange
+        pool = VenvPool(self.sample_dir, size=1)
+        key = pool.compute_key()
+        pool.add(key, fake_create)
+
+        # Act
+        is_full_before = pool.is_full(key)
+        venv_path = pool.acquire(key)
+        second_venv_path = pool.acquire(key)
+        is_full_after = pool.is_full(key)
+
+        # Assert
+        self.assertTrue(is_full_before)
+        self.assertIsNotNone(venv_path)
+        self.assertIsNone(second_venv_path)
+        self.assertFalse(is_full_after)
+
+        assert venv_path is not None
+        self.assertEqual(const.VENV_NAME, os.path.basename(venv_path))
+        self.assertTrue(os.path.isdir(venv_path))
+
+        pool.release(venv_path)
+        self.assertFalse(os.path.exists(os.path.dirname(venv_path)))
+
+    def test_04_acquire_other_key(self):
+        """
+        Verify that venvs built for another key are not handed out.
+        """
+        # Arrange
+        pool = VenvPool(self.sample_dir)
+        pool.add(pool.compute_key("/tool/layer"), fake_create)
+
+        # Act
+        venv_path = pool.acquire(pool.compute_key())
+
+        # Assert
+        self.assertIsNone(venv_path)
+
+    def test_05_entry_in_progress(self):
+        """
+        Verify that an entry being built counts towards the pool size, but is not handed out.
+        """
+        # Arrange
+        pool = VenvPool(self.sample_dir, size=1)
+        key = pool.compute_key()
+        is_full_during_create = []
+
+        def create(venv_path: str):
+            fake_create(venv_path)
+            is_full_during_create.append(pool.is_full(key))
+            is_full_during_create.append(pool.acquire(key))
+
+        # Act
+        pool.add(key, create)
+
+        # Assert
+        self.assertEqual([True, None], is_full_during_create)
+
+    def test_06_failed_create(self):
+        """
+        Verify that the entry of a failed venv creation is removed.
+        """
+        # Arrange
+        pool = VenvPool(self.sample_dir)
+        create = MagicMock(side_effect=RuntimeError("Failed"))
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            pool.add(pool.compute_key(), create)
+
+        self.assertEqual([], os.listdir(self.sample_dir))
+
+    def test_07_remove_stale_entries(self):
+        """
+        Verify that only entries which haven't changed for longer than the stale timeout are removed.
+        """
+        # Arrange
+        pool = VenvPool(self.sample_dir)
+        key = pool.compute_key()
+        pool.add(key, fake_create)
+        pool.add(key, fake_create)
+
+        stale_entry, fresh_entry = sorted(os.listdir(self.sample_dir))
+        stale_time = time.time() - const.VENV_POOL_STALE_TIMEOUT - 60
+        stale_entry_path = os.path.join(self.sample_dir, stale_entry)
+        os.utime(os.path.join(stale_entry_path, const.VENV_POOL_READY_MARKER), (stale_time, stale_time))
+        os.utime(stale_entry_path, (stale_time, stale_time))
+
+        # Act
+        pool.remove_stale_entries()
+        get_reaper().flush()
+
+        # Assert
+        self.assertEqual([fresh_entry], os.listdir(self.sample_dir))
+
+    def __make_stale(self, entry_name: str):
+        """
+        Make an entry of the pool, and its markers, older than the stale timeout.
+
+        :param entry_name: The name of the entry directory.
+        :type entry_name: str
+        """
+        stale_time = time.time() - const.VENV_POOL_STALE_TIMEOUT - 60
+        entry_path = os.path.join(self.sample_dir, entry_name)
+
+        for marker in [const.VENV_POOL_READY_MARKER, const.VENV_POOL_CLAIMED_MARKER]:
+            if os.path.exists(os.path.join(entry_path, marker)):
+                os.utime(os.path.join(entry_path, marker), (stale_time, stale_time))
+        os.utime(entry_path, (stale_time, stale_time))
+
+    def test_08_stale_ready_entries_of_key_kept(self):
+        """
+        Verify that old ready entries of the key in use are kept, and still handed out.
+        """
+        # Arrange
+        pool = VenvPool(self.sample_dir)
+        key = pool.compute_key()
+        other_key = pool.compute_key("/tool/layer")
+        pool.add(key, fake_create)
+        pool.add(other_key, fake_create)
+        for entry_name in os.listdir(self.sample_dir):
+            self.__make_stale(entry_name)
+
+        # Act
+        pool.remove_stale_entries(key)
+        get_reaper().flush()
+        entries = os.listdir(self.sample_dir)
+        venv_path = pool.acquire(key)
+
+        # Assert
+        self.assertEqual(1, len(entries))
+        self.assertTrue(entries[0].startswith(key + "-"))
+        self.assertIsNotNone(venv_path)
+        self.assertTrue(os.path.isdir(venv_path))
+
+    def test_09_claimed_entries_kept_while_owner_runs(self):
+        """
+        Verify that an old claimed entry is only removed once the process which claimed it has exited.
+        """
+        # Arrange
+        pool = VenvPool(self.sample_dir)
+        key = pool.compute_key()
+        pool.add(key, fake_create)
+        venv_path = pool.acquire(key)
+        entry_name = os.path.basename(os.path.dirname(venv_path))
+        self.__make_stale(entry_name)
+
+        # Act
+        pool.remove_stale_entries()
+        get_reaper().flush()
+        is_kept_while_running = os.path.isdir(venv_path)
+
+        with patch("grader.utils.venv_pool.is_process_alive", return_value=False):
+            pool.remove_stale_entries()
+        get_reaper().flush()
+
+        # Assert
+        self.assertTrue(is_kept_while_running)
+        self.assertEqual([], os.listdir(self.sample_dir))
+
+
+class TestVenvPoolReplenisher(unittest.TestCase):
+    """
+    Test cases for the VenvPoolReplenisher class.
+    """
+
+    def __init__(self, methodName="runTest"):
+        """
+        Initialize the test case.
+
+        :param methodName: The name of the test method to run.
+        :type methodName: str
+        """
+        self.__sample_pool_dir = os.path.abspath("sample_venv_pool_dir")
+        super().__init__(methodName)
+
+    def tearDown(self):
+        """
+        Tear down the test environment.
+        """
+        get_reaper().flush()
+
+        if os.path.exists(self.__sample_pool_dir):
+            shutil.rmtree(self.__sample_pool_dir)
+
+        return super().tearDown()
+
+    def test_01_replenish(self):
+        """
+        Verify that the pool is filled in the background, and refilled once a venv is taken out.
+        """
+        # Arrange
+        pool = VenvPool(self.__sample_pool_dir, size=2)
+        key = "key"
+
+        # Act
+        with VenvPoolReplenisher(pool, key, fake_create, poll_interval=0.01):
+            self.assertTrue(wait_for(lambda: pool.is_full(key)))
+
+            venv_path = pool.acquire(key)
+            self.assertIsNotNone(venv_path)
+            self.assertTrue(wait_for(lambda: pool.is_full(key)))
+
+        # Assert
+        self.assertEqual(3, len(os.listdir(self.__sample_pool_dir)))
+
+    def test_02_failed_create(self):
+        """
+        Verify that a failed venv creation is logged, and doesn't stop the replenisher.
+        """
+        # Arrange
+        pool = VenvPool(self.__sample_pool_dir, size=1)
+        create = MagicMock(side_effect=[RuntimeError("Failed"), None])
+
+        # Act
+        with self.assertLogs("grader", level="ERROR"):
+            with VenvPoolReplenisher(pool, "key", create, poll_interval=0.01):
+                self.assertTrue(wait_for(lambda: create.call_count == 2))
+
+
+def wait_for(condition, timeout: float = 5) -> bool:
+    """
+    Wait until a condition is met.
+
+    :param condition: Function checking the condition
+    :param timeout: The maximum time to wait, in seconds
+    :return: True if the condition was met, False if the timeout passed
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+
+    return False
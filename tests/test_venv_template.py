@@ -0,0 +1,136 @@
+"""
+Unit tests for the VenvTemplate class.
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+from grader.utils.venv_template import VenvTemplate
+from tests.venv_test_case import VenvTestCase
+
+
+@unittest.skipIf(os.name == "nt", "Cloning venvs is not supported on Windows")
+class TestVenvTemplate(VenvTestCase):
+    """
+    Test cases for the VenvTemplate class.
+    """
+
+    sample_dir_name = "sample_venv_template_dir"
+
+    def setUp(self):
+        """
+        Set up the test environment, containing a fake template environment.
+        """
+        super().setUp()
+        self.__template_path = os.path.join(self.sample_dir, "template")
+        self.__venv_path = os.path.join(self.sample_dir, "clone")
+
+        bin_path = os.path.join(self.__template_path, "bin")
+        site_packages = os.path.join(self.__template_path, "lib", "python3.11", "site-packages")
+        os.makedirs(bin_path)
+        os.makedirs(os.path.join(site_packages, "pylint"))
+
+        os.symlink(sys.executable, os.path.join(bin_path, "python"))
+        os.symlink(os.path.join(bin_path, "python"), os.path.join(bin_path, "python3"))
+        os.symlink("lib", os.path.join(self.__template_path, "lib64"))
+
+        with open(os.path.join(bin_path, "pylint"), "w", encoding="utf-8") as script_file:
+            script_file.write(f"#!{bin_path}/python\nfrom pylint import run_pylint\nrun_pylint()\n")
+        os.chmod(os.path.join(bin_path, "pylint"), 0o755)
+
+        with open(os.path.join(self.__template_path, "pyvenv.cfg"), "w", encoding="utf-8") as config_file:
+            config_file.write(f"home = /usr/bin\ncommand = /usr/bin/python3 -m venv {self.__template_path}\n")
+
+        with open(os.path.join(site_packages, "pylint", "__init__.py"), "w", encoding="utf-8") as module_file:
+            module_file.write(f"# {self.__template_path}\n")
+
+    def test_01_clone_links_files(self):
+        """
+        Verify that the regular files are shared with the template, through hard links.
+        """
+        # Arrange
+        module_path = os.path.join("lib", "python3.11", "site-packages", "pylint", "__init__.py")
+
+        # Act
+        VenvTemplate.clone(self.__template_path, self.__venv_path)
+
+        # Assert
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(self.__template_path, module_path), os.path.join(self.__venv_path, module_path)
+            )
+        )
+
+    def test_02_clone_rewrites_paths(self):
+        """
+        Verify that the scripts and pyvenv.cfg refer to the clone, and are not shared with the template.
+        """
+        # Arrange
+        script_path = os.path.join(self.__venv_path, "bin", "pylint")
+
+        # Act
+        VenvTemplate.clone(self.__template_path, self.__venv_path)
+
+        with open(script_path, "r", encoding="utf-8") as script_file:
+            script_content = script_file.read()
+
+        with open(os.path.join(self.__venv_path, "pyvenv.cfg"), "r", encoding="utf-8") as config_file:
+            config_content = config_file.read()
+
+        # Assert
+        self.assertTrue(script_content.startswith(f"#!{self.__venv_path}/bin/python\n"))
+        self.assertTrue(os.access(script_path, os.X_OK))
+        self.assertFalse(os.path.samefile(os.path.join(self.__template_path, "bin", "pylint"), script_path))
+        self.assertIn(f"-m venv {self.__venv_path}\n", config_content)
+        self.assertNotIn(self.__template_path, config_content)
+
+    def test_03_clone_symlinks(self):
+        """
+        Verify that the symbolic links are recreated, and the ones pointing into the template point into the clone.
+        """
+        # Act
+        VenvTemplate.clone(self.__template_path, self.__venv_path)
+
+        # Assert
+        self.assertEqual(sys.executable, os.readlink(os.path.join(self.__venv_path, "bin", "python")))
+        self.assertEqual(
+            os.path.join(self.__venv_path, "bin", "python"),
+            os.readlink(os.path.join(self.__venv_path, "bin", "python3")),
+        )
+        self.assertEqual("lib", os.readlink(os.path.join(self.__venv_path, "lib64")))
+
+    def test_04_get_or_create(self):
+        """
+        Verify that the template is created once per variant.
+        """
+        # Arrange
+        template = VenvTemplate(os.path.join(self.sample_dir, "templates"))
+        create = MagicMock(side_effect=os.makedirs)
+
+        # Act
+        first_path = template.get_or_create(create)
+        second_path = template.get_or_create(create)
+        variant_path = template.get_or_create(create, variant="/tool/layer")
+
+        # Assert
+        self.assertEqual(first_path, second_path)
+        self.assertNotEqual(first_path, variant_path)
+        self.assertEqual(2, create.call_count)
+
+    def test_05_clone_fallback_copy(self):
+        """
+        Verify that the files are copied, if they can't be hard linked.
+        """
+        # Arrange
+        module_path = os.path.join("lib", "python3.11", "site-packages", "pylint", "__init__.py")
+
+        # Act
+        with patch("grader.utils.venv_template.os.link", side_effect=OSError("Invalid cross-device link")):
+            VenvTemplate.clone(self.__template_path, self.__venv_path)
+
+        # Assert
+        cloned_module_path = os.path.join(self.__venv_path, module_path)
+        self.assertTrue(os.path.isfile(cloned_module_path))
+        self.assertFalse(os.path.samefile(os.path.join(self.__template_path, module_path), cloned_module_path))
@@ -10,11 +10,17 @@ from unittest.mock import MagicMock, patch
 
 import grader.utils.constants as const
 from grader.utils.process import run
+from grader.utils.reaper import get_reaper
+from grader.utils.shared_venv import SharedVenv
+from grader.utils.tool_layer import ToolLayer, find_site_packages
+from grader.utils.venv_cache import VenvCache
+from grader.utils.venv_pool import VenvPool
+from grader.utils.venv_template import VenvTemplate
 from grader.utils.virtual_environment import VirtualEnvironment, VirtualEnvironmentError
 
 
 # TODO - These tests take some time to run, also aren't exactly unit tests. Consider refactoring
-class TestsVirtualEnvironment(unittest.TestCase):
+class TestsVirtualEnvironment(unittest.TestCase):  # pylint: disable=too-many-public-methods
     """
     Test cases for the VirtualEnvironment class.
     """
@@ -27,6 +33,11 @@ class TestsVirtualEnvironment(unittest.TestCase):
         :type methodName: str
         """
         self.__sample_root_dir_path = "sample_root_dir"
+        self.__sample_cache_dir_path = "sample_cache_dir"
+        self.__sample_tool_layer_dir_path = "sample_tool_layer_dir"
+        self.__sample_pool_dir_path = "sample_pool_dir"
+        self.__sample_template_dir_path = "sample_template_dir"
+        self.__sample_shared_dir_path = "sample_shared_dir"
         self.__sample_package_name = "pylint"
         self.__sample_package_version = "3.3.3"
         super().__init__(methodName)
@@ -43,9 +54,22 @@ class TestsVirtualEnvironment(unittest.TestCase):
         """
         Tear down the test environment.
         """
+        # The venvs are deleted in the background
+        get_reaper().flush()
+
         if os.path.exists(self.__sample_root_dir_path):
             shutil.rmtree(self.__sample_root_dir_path)
 
+        for path in (
+            self.__sample_cache_dir_path,
+            self.__sample_tool_layer_dir_path,
+            self.__sample_pool_dir_path,
+            self.__sample_template_dir_path,
+            self.__sample_shared_dir_path,
+        ):
+            if os.path.exists(path):
+                shutil.rmtree(path)
+
         return super().tearDown()
 
     def test_01_existing_venv(self):
@@ -219,6 +243,304 @@ class TestsVirtualEnvironment(unittest.TestCase):
         self.assertTrue(does_venv_exist_before)
         self.assertFalse(does_venv_exist_after)
 
+    def test_10_cached_venv(self):
+        """
+        Verify that a cached venv is linked into the project, and kept in the cache after the teardown.
+        """
+        # Arrange
+        cache = VenvCache(self.__sample_cache_dir_path)
+        venv_path = os.path.join(self.__sample_root_dir_path, const.VENV_NAME)
+        pip_full_path = os.path.join(venv_path, const.PIP_PATH)
+
+        # Act
+        with VirtualEnvironment(self.__sample_root_dir_path, cache=cache):
+            is_venv_linked = os.path.islink(venv_path)
+            pip_run_result = run([pip_full_path, "freeze"])
+
+        does_venv_exist_after = os.path.lexists(venv_path)
+
+        with patch("grader.utils.virtual_environment.run") as patched_run:
+            with VirtualEnvironment(self.__sample_root_dir_path, cache=cache):
+                pass
+
+        # Assert
+        self.assertTrue(is_venv_linked)
+        self.assertIn("coverage", pip_run_result.stdout)
+        self.assertFalse(does_venv_exist_after)
+        patched_run.assert_not_called()
+
+    @unittest.skipIf(os.name == "nt", "The tool layer is not supported on Windows")
+    def test_11_tool_layer(self):
+        """
+        Verify that the grader tools are usable from the venv, without being installed in it.
+        """
+        # Arrange
+        tool_layer = ToolLayer(self.__sample_tool_layer_dir_path)
+        venv_path = os.path.join(self.__sample_root_dir_path, const.VENV_NAME)
+        pylint_full_path = os.path.join(self.__sample_root_dir_path, const.PYLINT_PATH)
+
+        # Act
+        with VirtualEnvironment(self.__sample_root_dir_path, tool_layer=tool_layer):
+            pylint_run_result = run([pylint_full_path, "--version"])
+            site_packages = find_site_packages(venv_path) or ""
+            is_pylint_installed_in_venv = os.path.exists(os.path.join(site_packages, "pylint"))
+
+        # Assert
+        self.assertEqual(0, pylint_run_result.returncode)
+        self.assertFalse(is_pylint_installed_in_venv)
+
+    def test_12_pooled_venv(self):
+        """
+        Verify that a pooled venv is linked into the project without creating a new venv, and removed afterwards.
+        """
+        # Arrange
+        pool = VenvPool(self.__sample_pool_dir_path, size=1)
+        pool.add(pool.compute_key(), lambda venv_path: run([const.PYTHON_BIN, "-m", "venv", venv_path]))
+        venv_path = os.path.join(self.__sample_root_dir_path, const.VENV_NAME)
+
+        # Act
+        with patch("grader.utils.virtual_environment.run") as patched_run:
+            with VirtualEnvironment(self.__sample_root_dir_path, pool=pool):
+                is_venv_linked = os.path.islink(venv_path)
+                python_run_result = run([os.path.join(venv_path, const.VENV_BIN_DIR, "python"), "--version"])
+
+        # Assert
+        self.assertTrue(is_venv_linked)
+        self.assertEqual(0, python_run_result.returncode)
+        patched_run.assert_not_called()
+        self.assertFalse(os.path.lexists(venv_path))
+
+        get_reaper().flush()
+        self.assertEqual([], os.listdir(self.__sample_pool_dir_path))
+
+    @unittest.skipIf(os.name == "nt", "Cloning venvs is not supported on Windows")
+    def test_13_cloned_venv(self):
+        """
+        Verify that a venv cloned from the template has the grader dependencies, and its scripts run.
+        """
+        # Arrange
+        template = VenvTemplate(self.__sample_template_dir_path)
+        venv_path = os.path.join(self.__sample_root_dir_path, const.VENV_NAME)
+        pip_full_path = os.path.join(venv_path, const.PIP_PATH)
+
+        # Act
+        with VirtualEnvironment(self.__sample_root_dir_path, template=template):
+            is_venv_linked = os.path.islink(venv_path)
+            pip_run_result = run([pip_full_path, "freeze"])
+
+        # Assert
+        self.assertFalse(is_venv_linked)
+        self.assertEqual(0, pip_run_result.returncode)
+        self.assertIn("coverage", pip_run_result.stdout)
+        self.assertFalse(os.path.exists(venv_path))
+
+    @unittest.skipIf(os.name == "nt", "Cloning venvs is not supported on Windows")
+    def test_14_incremental_install(self):
+        """
+        Verify that a new cached venv is cloned from the closest cached venv, and only the difference is installed.
+        """
+        # Arrange
+        cache = VenvCache(self.__sample_cache_dir_path)
+        requirements_path = os.path.join(self.__sample_root_dir_path, const.REQUIREMENTS_FILENAME)
+        venv_path = os.path.join(self.__sample_root_dir_path, const.VENV_NAME)
+        pip_full_path = os.path.join(venv_path, const.PIP_PATH)
+
+        with VirtualEnvironment(self.__sample_root_dir_path, cache=cache, incremental=True):
+            base_venv_path = os.path.realpath(venv_path)
+
+        # Not one of the grader dependencies, which are never installed incrementally
+        with open(requirements_path, "w", encoding="utf-8") as requirements_file:
+            requirements_file.write("six==1.16.0\n")
+
+        # Act
+        with VirtualEnvironment(self.__sample_root_dir_path, cache=cache, incremental=True):
+            incremental_venv_path = os.path.realpath(venv_path)
+            pip_run_result = run([pip_full_path, "freeze"])
+
+        # Assert
+        self.assertNotEqual(base_venv_path, incremental_venv_path)
+        self.assertIn("six==1.16.0", pip_run_result.stdout)
+        self.assertIn("coverage", pip_run_result.stdout)
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(find_site_packages(base_venv_path) or "", "coverage", "__init__.py"),
+                os.path.join(find_site_packages(incremental_venv_path) or "", "coverage", "__init__.py"),
+            )
+        )
+
+    @patch("subprocess.run")
+    def test_15_venv_path(self, patched_run: MagicMock):
+        """
+        Verify that the venv is created at the given venv path, and the project directory is left untouched.
+
+        :param patched_run: Mocked subprocess.run function.
+        :type patched_run: MagicMock
+        """
+        # Arrange
+        patched_run.return_value = subprocess.CompletedProcess([], 0, "", "")
+        project_venv_path = os.path.join(self.__sample_root_dir_path, const.VENV_NAME)
+        venv_path = os.path.join(self.__sample_root_dir_path, "workspace", const.VENV_NAME)
+        os.makedirs(project_venv_path)
+
+        # Act
+        with VirtualEnvironment(self.__sample_root_dir_path, venv_path=venv_path):
+            create_command = patched_run.call_args_list[0][0][0]
+
+        # Assert
+        self.assertEqual([const.PYTHON_BIN, "-m", "venv", venv_path], create_command)
+        self.assertTrue(os.path.isdir(project_venv_path))
+
+    def test_16_shared_venv(self):
+        """
+        Verify that a project without requirements uses the shared environment, without creating a venv.
+        """
+        # Arrange
+        shared = SharedVenv(self.__sample_shared_dir_path)
+        shared_venv_path = shared.get_or_create(lambda venv_path: run([const.PYTHON_BIN, "-m", "venv", venv_path]))
+        venv_path = os.path.join(self.__sample_root_dir_path, const.VENV_NAME)
+
+        # Act
+        with patch("grader.utils.virtual_environment.run") as patched_run:
+            with VirtualEnvironment(self.__sample_root_dir_path, shared=shared):
+                linked_venv_path = os.path.realpath(venv_path)
+
+        # Assert
+        self.assertEqual(os.path.realpath(shared_venv_path), linked_venv_path)
+        patched_run.assert_not_called()
+        self.assertFalse(os.path.lexists(venv_path))
+        self.assertTrue(os.path.isdir(shared_venv_path))
+
+    @patch("subprocess.run")
+    def test_17_undecodable_requirements(self, patched_run: MagicMock):
+        """
+        Verify that requirements, which can't be read, are installed by pip as they are, in a venv of the project's own.
+
+        :param patched_run: Mocked subprocess.run function.
+        :type patched_run: MagicMock
+        """
+        # Arrange
+        patched_run.return_value = subprocess.CompletedProcess([], 0, "", "")
+        requirements_path = os.path.join(self.__sample_root_dir_path, const.REQUIREMENTS_FILENAME)
+        with open(requirements_path, "wb") as requirements_file:
+            requirements_file.write(b"numpy==1.26.4 # \xff\xfe\xfa\n")
+        shared = SharedVenv(self.__sample_shared_dir_path)
+
+        # Act
+        with self.assertLogs("grader", level="WARNING"):
+            with VirtualEnvironment(self.__sample_root_dir_path, shared=shared):
+                commands = [call.args[0] for call in patched_run.call_args_list]
+
+        # Assert
+        self.assertIn(["-r", requirements_path], [command[-2:] for command in commands])
+        self.assertFalse(os.path.exists(self.__sample_shared_dir_path))
+
+    @patch("subprocess.run")
+    def test_18_pooled_venv_grader_conflict(self, patched_run: MagicMock):
+        """
+        Verify that a project requiring one of the grader dependencies gets a new venv instead of a pooled one,
+        with the grader dependencies installed after its requirements.
+
+        :param patched_run: Mocked subprocess.run function.
+        :type patched_run: MagicMock
+        """
+        # Arrange
+        patched_run.return_value = subprocess.CompletedProcess([], 0, "", "")
+        pool = VenvPool(self.__sample_pool_dir_path, size=1)
+        pool.add(pool.compute_key(), os.makedirs)
+        requirements_path = os.path.join(self.__sample_root_dir_path, const.REQUIREMENTS_FILENAME)
+        self.__create_sample_requirements(requirements_path)
+        venv_path = os.path.join(self.__sample_root_dir_path, const.VENV_NAME)
+
+        # Act
+        with VirtualEnvironment(self.__sample_root_dir_path, pool=pool):
+            is_venv_linked = os.path.islink(venv_path)
+            commands = [call.args[0] for call in patched_run.call_args_list]
+
+        # Assert
+        self.assertFalse(is_venv_linked)
+        self.assertIn([const.PYTHON_BIN, "-m", "venv", venv_path], commands)
+        self.assertEqual(
+            [["-r", requirements_path], ["-r", const.GRADER_REQUIREMENTS]],
+            [command[-2:] for command in commands if command[-2:-1] == ["-r"]],
+        )
+        self.assertIsNotNone(pool.acquire(pool.compute_key()))
+
+    @unittest.skipIf(os.name == "nt", "Cloning venvs is not supported on Windows")
+    @patch("subprocess.run")
+    def test_19_cloned_venv_grader_conflict(self, patched_run: MagicMock):
+        """
+        Verify that a project requiring one of the grader dependencies gets a new venv instead of a clone of the
+        template, with the grader dependencies installed after its requirements.
+
+        :param patched_run: Mocked subprocess.run function.
+        :type patched_run: MagicMock
+        """
+        # Arrange
+        patched_run.return_value = subprocess.CompletedProcess([], 0, "", "")
+        template = VenvTemplate(self.__sample_template_dir_path)
+        requirements_path = os.path.join(self.__sample_root_dir_path, const.REQUIREMENTS_FILENAME)
+        self.__create_sample_requirements(requirements_path)
+        venv_path = os.path.join(self.__sample_root_dir_path, const.VENV_NAME)
+
+        # Act
+        with VirtualEnvironment(self.__sample_root_dir_path, template=template):
+            commands = [call.args[0] for call in patched_run.call_args_list]
+
+        # Assert
+        self.assertIn([const.PYTHON_BIN, "-m", "venv", venv_path], commands)
+        self.assertEqual(
+            [["-r", requirements_path], ["-r", const.GRADER_REQUIREMENTS]],
+            [command[-2:] for command in commands if command[-2:-1] == ["-r"]],
+        )
+        self.assertFalse(os.path.exists(self.__sample_template_dir_path))
+
+    @unittest.skipIf(os.name == "nt", "Cloning venvs is not supported on Windows")
+    @patch("subprocess.run")
+    def test_20_incremental_install_grader_conflict(self, patched_run: MagicMock):
+        """
+        Verify that a project requiring one of the grader dependencies gets a new cached venv, instead of one built
+        incrementally, with the grader dependencies installed after its requirements.
+
+        :param patched_run: Mocked subprocess.run function.
+        :type patched_run: MagicMock
+        """
+        # Arrange
+        patched_run.side_effect = self.__run_sample_command
+        cache = VenvCache(self.__sample_cache_dir_path)
+        requirements_path = os.path.join(self.__sample_root_dir_path, const.REQUIREMENTS_FILENAME)
+
+        with VirtualEnvironment(self.__sample_root_dir_path, cache=cache, incremental=True):
+            pass
+
+        self.__create_sample_requirements(requirements_path)
+        patched_run.reset_mock()
+
+        # Act
+        with VirtualEnvironment(self.__sample_root_dir_path, cache=cache, incremental=True):
+            commands = [call.args[0] for call in patched_run.call_args_list]
+
+        # Assert
+        self.assertIn(["-m", "venv"], [command[1:3] for command in commands])
+        self.assertEqual(
+            [["-r", requirements_path], ["-r", const.GRADER_REQUIREMENTS]],
+            [command[-2:] for command in commands if "install" in command],
+        )
+
+    @staticmethod
+    def __run_sample_command(command: list[str], **_) -> subprocess.CompletedProcess:
+        """
+        Simulate a command, creating the venv directory for the venv creation commands.
+
+        :param command: Command to simulate.
+        :type command: list[str]
+        :return: Successful process result.
+        :rtype: subprocess.CompletedProcess
+        """
+        if command[1:3] == ["-m", "venv"]:
+            os.makedirs(command[3], exist_ok=True)
+
+        return subprocess.CompletedProcess(command, 0, "", "")
+
     def __create_sample_requirements(self, requirements_path: str):
         """
         Create a sample requirements.txt file.
@@ -0,0 +1,98 @@
+"""
+Unit tests for the Wheelhouse class.
+"""
+
+import os
+import shutil
+import unittest
+from subprocess import CompletedProcess
+from unittest.mock import MagicMock, patch
+
+from grader.utils.wheelhouse import Wheelhouse, WheelhouseError, get_pip_cache_args
+
+
+class TestWheelhouse(unittest.TestCase):
+    """
+    Test cases for the Wheelhouse class.
+    """
+
+    def __init__(self, methodName="runTest"):
+        """
+        Initialize the test case.
+
+        :param methodName: The name of the test method to run.
+        :type methodName: str
+        """
+        self.__sample_wheelhouse_dir = os.path.abspath("sample_wheelhouse_dir")
+        super().__init__(methodName)
+
+    def tearDown(self):
+        """
+        Tear down the test environment.
+        """
+        if os.path.exists(self.__sample_wheelhouse_dir):
+            shutil.rmtree(self.__sample_wheelhouse_dir)
+
+        return super().tearDown()
+
+    @patch("grader.utils.wheelhouse.run")
+    def test_01_build(self, mocked_run: MagicMock):
+        """
+        Verify that the wheels are fetched for every requirements file, using the given pip cache.
+
+        :param mocked_run: Mocked run function.
+        :type mocked_run: MagicMock
+        """
+        # Arrange
+        mocked_run.return_value = CompletedProcess([], 0)
+        wheelhouse = Wheelhouse(self.__sample_wheelhouse_dir)
+
+        # Act
+        wheelhouse.build(["grader.txt", "course.txt"], pip_cache_dir="/tmp/pip-cache")
+        commands = [call[0][0] for call in mocked_run.call_args_list]
+
+        # Assert
+        self.assertEqual(2, len(commands))
+        for command, requirements_path in zip(commands, ["grader.txt", "course.txt"]):
+            self.assertEqual(["-m", "pip", "wheel", "--wheel-dir", self.__sample_wheelhouse_dir], command[1:6])
+            self.assertIn("/tmp/pip-cache", command)
+            self.assertEqual(["-r", requirements_path], command[-2:])
+
+    @patch("grader.utils.wheelhouse.run")
+    def test_02_build_failure(self, mocked_run: MagicMock):
+        """
+        Verify that an error is raised if fetching the wheels fails.
+
+        :param mocked_run: Mocked run function.
+        :type mocked_run: MagicMock
+        """
+        # Arrange
+        mocked_run.return_value = CompletedProcess([], 1)
+        wheelhouse = Wheelhouse(self.__sample_wheelhouse_dir)
+
+        # Act & Assert
+        with self.assertLogs("grader", level="ERROR"):
+            with self.assertRaises(WheelhouseError):
+                wheelhouse.build(["grader.txt"])
+
+    def test_03_install_args(self):
+        """
+        Verify that the install arguments disable the package index, and point pip to the wheelhouse.
+        """
+        # Arrange
+        wheelhouse = Wheelhouse(self.__sample_wheelhouse_dir)
+
+        # Act
+        install_args = wheelhouse.get_install_args()
+
+        # Assert
+        self.assertIn("--no-index", install_args)
+        self.assertEqual(self.__sample_wheelhouse_dir, install_args[install_args.index("--find-links") + 1])
+
+    def test_04_pip_cache_args(self):
+        """
+        Verify that the pip cache arguments are only given when a cache directory is set.
+        """
+        # Act & Assert
+        self.assertEqual([], get_pip_cache_args(None))
+        self.assertEqual(["--cache-dir", os.path.abspath("cache")], get_pip_cache_args("cache"))
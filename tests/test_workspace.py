@@ -0,0 +1,110 @@
+"""
+Unit tests for the Workspace class.
+"""
+
+import os
+import shutil
+import unittest
+
+import grader.utils.constants as const
+from grader.utils.reaper import get_reaper
+from grader.utils.workspace import Workspace
+
+
+class TestWorkspace(unittest.TestCase):
+    """
+    Test cases for the Workspace class.
+    """
+
+    def __init__(self, methodName="runTest"):
+        """
+        Initialize the test case.
+
+        :param methodName: The name of the test method to run.
+        :type methodName: str
+        """
+        self.__sample_project_dir = os.path.abspath("sample_project")
+        self.__sample_workspace_dir = os.path.abspath("sample_workspace_dir")
+        super().__init__(methodName)
+
+    def tearDown(self):
+        """
+        Tear down the test environment.
+        """
+        get_reaper().flush()
+
+        if os.path.exists(self.__sample_workspace_dir):
+            shutil.rmtree(self.__sample_workspace_dir)
+
+        return super().tearDown()
+
+    def test_01_default_paths(self):
+        """
+        Verify that without a workspace directory, the artifacts are placed where the tools place them.
+        """
+        # Act
+        with Workspace(self.__sample_project_dir) as workspace:
+            # Assert
+            self.assertFalse(workspace.is_isolated)
+            self.assertEqual(os.path.join(self.__sample_project_dir, const.VENV_NAME), workspace.venv_path)
+            self.assertEqual(const.REPORTS_TEMP_DIR, workspace.reports_dir)
+            self.assertIsNone(workspace.pytest_cache_dir)
+            self.assertIsNone(workspace.mypy_cache_dir)
+            self.assertIsNone(workspace.get_environment())
+
+        self.assertFalse(os.path.exists(self.__sample_workspace_dir))
+
+    def test_02_isolated_paths(self):
+        """
+        Verify that with a workspace directory, every artifact is placed in the job directory.
+        """
+        # Act
+        with Workspace(self.__sample_project_dir, self.__sample_workspace_dir) as workspace:
+            (job_dir,) = os.listdir(self.__sample_workspace_dir)
+            job_dir = os.path.join(self.__sample_workspace_dir, job_dir)
+            environment = workspace.get_environment()
+
+            # Assert
+            self.assertTrue(workspace.is_isolated)
+            self.assertTrue(os.path.basename(job_dir).startswith("sample_project-"))
+            self.assertEqual(os.path.join(job_dir, const.VENV_NAME), workspace.venv_path)
+            self.assertTrue(os.path.isdir(workspace.reports_dir))
+
+            assert environment is not None
+            paths = [
+                workspace.reports_dir,
+                workspace.pytest_cache_dir,
+                workspace.mypy_cache_dir,
+                environment["COVERAGE_FILE"],
+                environment["PYTHONPYCACHEPREFIX"],
+            ]
+            for path in paths:
+                assert path is not None
+                self.assertEqual(job_dir, os.path.dirname(path))
+
+    def test_03_jobs_are_separate(self):
+        """
+        Verify that the jobs of the same project get separate directories.
+        """
+        # Act
+        with Workspace(self.__sample_project_dir, self.__sample_workspace_dir) as first:
+            with Workspace(self.__sample_project_dir, self.__sample_workspace_dir) as second:
+                # Assert
+                self.assertNotEqual(first.reports_dir, second.reports_dir)
+                self.assertNotEqual(first.venv_path, second.venv_path)
+
+    def test_04_teardown(self):
+        """
+        Verify that the job directory is removed with everything in it.
+        """
+        # Arrange
+        with Workspace(self.__sample_project_dir, self.__sample_workspace_dir) as workspace:
+            with open(os.path.join(workspace.reports_dir, "report.txt"), "w", encoding="utf-8") as file:
+                file.write("report\n")
+
+        # Act
+        get_reaper().flush()
+
+        # Assert
+        self.assertFalse(workspace.is_isolated)
+        self.assertEqual([], os.listdir(self.__sample_workspace_dir))
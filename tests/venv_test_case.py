@@ -0,0 +1,44 @@
+"""
+Base test case for the tests of the virtual environment cache and pool.
+"""
+
+import os
+import shutil
+import unittest
+from subprocess import CompletedProcess
+from unittest.mock import patch
+
+from grader.utils.reaper import get_reaper
+
+
+class VenvTestCase(unittest.TestCase):
+    """
+    Test case with a fixed Python version, removing its sample directory after each test,
+    once the venvs removed in the background are deleted.
+    """
+
+    sample_dir_name = "sample_dir"
+
+    def setUp(self):
+        """
+        Set up the test environment, with a fixed Python version.
+        """
+        self.sample_dir = os.path.abspath(self.sample_dir_name)
+
+        patcher = patch("grader.utils.venv_cache.run")
+        self.mocked_run = patcher.start()
+        self.mocked_run.return_value = CompletedProcess([], 0, "3.11.7 (main)\n")
+        self.addCleanup(patcher.stop)
+
+        return super().setUp()
+
+    def tearDown(self):
+        """
+        Tear down the test environment.
+        """
+        get_reaper().flush()
+
+        if os.path.exists(self.sample_dir):
+            shutil.rmtree(self.sample_dir)
+
+        return super().tearDown()